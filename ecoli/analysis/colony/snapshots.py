@@ -4,18 +4,22 @@ import random
 import itertools
 import shutil
 import concurrent.futures
-from typing import Any
+from collections import deque
+from typing import Any, Iterator, Optional, cast
 
+import imageio.v2 as iio_v2
 import imageio.v3 as iio
 from duckdb import DuckDBPyConnection
 import numpy as np
 import matplotlib
+import polars as pl
 
 matplotlib.use("agg")
 import matplotlib.pyplot as plt
 from tqdm import tqdm
 
 import matplotlib.patches as patches
+from matplotlib.collections import LineCollection
 from matplotlib.lines import Line2D
 from matplotlib.colors import hsv_to_rgb, rgb_to_hsv
 from mpl_toolkits.axes_grid1 import make_axes_locatable, anchored_artists
@@ -1283,6 +1287,253 @@ def make_video(
     shutil.rmtree(images_dir)
 
 
+SNAPSHOT_COLUMNS = {
+    "x": "boundary__location[1]",
+    "y": "boundary__location[2]",
+    "length": "boundary__length",
+    "width": "boundary__width",
+    "angle": "boundary__angle",
+}
+"""
+Mapping from agent geometry attributes to DuckDB expressions for the
+corresponding columns in the Parquet history (note 1-indexed arrays).
+"""
+
+
+def stream_snapshot_frames(
+    conn: DuckDBPyConnection,
+    history_sql: str,
+    color_column: Optional[str] = None,
+    step: int = 1,
+    batch_rows: int = 100000,
+) -> Iterator[tuple[float, pl.DataFrame]]:
+    """Stream agent geometry for one colony one timepoint at a time.
+
+    Only the geometry columns (and ``color_column``) are read and a single
+    query sorted by time is fetched in Arrow record batches, so at most
+    ``batch_rows`` rows (plus the agents of one timepoint) are held in memory
+    regardless of the length of the simulation.
+
+    Args:
+        conn: DuckDB connection
+        history_sql: SQL query from
+            :py:func:`~ecoli.library.parquet_emitter.dataset_sql`, filtered
+            to the cells of a single colony
+        color_column: DuckDB expression for an optional per-agent value
+            used to color agents (e.g. a bulk molecule count)
+        step: Only yield every ``step``-th timepoint
+        batch_rows: Number of rows to fetch from DuckDB at a time
+
+    Yields:
+        Tuples of time and a DataFrame with one row per agent alive at that
+        time and columns ``agent_id``, the keys of :py:data:`SNAPSHOT_COLUMNS`,
+        and ``color`` (if ``color_column`` was given).
+    """
+    columns = [f"{expr} AS {name}" for name, expr in SNAPSHOT_COLUMNS.items()]
+    if color_column is not None:
+        columns.append(f"{color_column} AS color")
+    query = f"""
+        WITH history AS (SELECT agent_id, time, {", ".join(columns)}
+            FROM ({history_sql})),
+        times AS (SELECT time, row_number() OVER (ORDER BY time) - 1 AS t_idx
+            FROM (SELECT DISTINCT time FROM history))
+        SELECT history.* FROM history JOIN times USING (time)
+        WHERE t_idx % {step} = 0
+        ORDER BY time, agent_id
+        """
+    reader = conn.execute(query).fetch_record_batch(batch_rows)
+    leftover: Optional[pl.DataFrame] = None
+    for batch in reader:
+        data = pl.from_arrow(batch)
+        assert isinstance(data, pl.DataFrame)
+        if leftover is not None:
+            data = pl.concat([leftover, data])
+        # Rows for the last timepoint in a batch may continue in the next
+        last_time = data["time"][-1]
+        leftover = data.filter(pl.col("time") == last_time)
+        data = data.filter(pl.col("time") != last_time)
+        for (time,), frame in data.partition_by(
+            "time", as_dict=True, maintain_order=True
+        ).items():
+            yield time, frame
+    if leftover is not None and len(leftover) > 0:
+        yield leftover["time"][0], leftover
+
+
+class SnapshotRenderer:
+    """Renders colony snapshots to RGB arrays using a single reused figure.
+
+    Agents are drawn as round-capped segments like ``agent_shape="segment"``
+    in :py:func:`plot_agent`, but with one :py:class:`LineCollection` for
+    all membranes and one for all bodies whose data are replaced for each
+    frame, so no artists are created after initialization.
+
+    Args:
+        bounds: Size of environment in microns
+        agent_colors: Mapping from agent ID to HSV color
+        color_range: ``(min, max)`` of the ``color`` column of frames. If
+            given, agents are colored by value with ``colormap`` instead
+            of by ``agent_colors``.
+        colormap: Name of Matplotlib colormap for ``color`` values
+        plot_width: Width of figure in inches
+        dpi: Resolution of figure
+        membrane_width: Width of agent outline in microns
+        membrane_color: RGB color of agent outline
+    """
+
+    def __init__(
+        self,
+        bounds,
+        agent_colors=None,
+        color_range=None,
+        colormap="viridis",
+        plot_width=PLOT_WIDTH,
+        dpi=100,
+        membrane_width=0.1,
+        membrane_color=(1, 1, 1),
+    ):
+        self.agent_colors = agent_colors or {}
+        self.color_range = color_range
+        self.cmap = plt.get_cmap(colormap)
+        self.membrane_width = membrane_width
+        self.default_rgb = hsv_to_rgb([DEFAULT_HUE] + DEFAULT_SV)
+
+        # Video encoders work in 16 x 16 pixel blocks
+        width_px = 16 * max(1, round(plot_width * dpi / 16))
+        height_px = 16 * max(1, round(width_px * bounds[1] / bounds[0] / 16))
+        self.fig = plt.figure(figsize=(width_px / dpi, height_px / dpi), dpi=dpi)
+        self.ax = self.fig.add_axes((0.05, 0.05, 0.9, 0.85))
+        self.ax.set(xlim=[0, bounds[0]], ylim=[0, bounds[1]])
+        self.ax.set_yticklabels([])
+        self.ax.set_xticklabels([])
+        self.title = self.ax.set_title("", y=1.02)
+
+        # Axes aspect is fixed because the figure size is never changed
+        self.ax.set_aspect(1, adjustable="box")
+        self.fig.canvas.draw()
+        bbox = self.ax.get_window_extent()
+        self.points_per_micron = bbox.width / bounds[0] * 72 / dpi
+
+        self.membranes = LineCollection([], colors=[membrane_color], capstyle="round")
+        self.bodies = LineCollection([], capstyle="round")
+        self.ax.add_collection(self.membranes)
+        self.ax.add_collection(self.bodies)
+
+    def agent_rgb(self, frame):
+        """Get RGB colors for the agents in a frame."""
+        if self.color_range is not None and "color" in frame.columns:
+            vmin, vmax = self.color_range
+            values = frame["color"].to_numpy().astype(float)
+            scaled = (values - vmin) / (vmax - vmin) if vmax > vmin else values * 0
+            return self.cmap(np.clip(scaled, 0, 1))[:, :3]
+        colors = [self.agent_colors.get(agent_id) for agent_id in frame["agent_id"]]
+        return np.array(
+            [
+                self.default_rgb if color is None else hsv_to_rgb(color)
+                for color in colors
+            ]
+        ).reshape(-1, 3)
+
+    def render(self, time, frame):
+        """Draw the agents in ``frame`` at ``time`` and return the RGB image.
+
+        Args:
+            time: Simulation time of the frame
+            frame: DataFrame from :py:func:`stream_snapshot_frames`
+
+        Returns:
+            Array of shape (height, width, 3) with dtype uint8
+        """
+        x, y, length, width, angle = (
+            frame[name].to_numpy().astype(float) for name in SNAPSHOT_COLUMNS
+        )
+        # Same geometry as plot_agent (rotated 90 degrees to match field)
+        theta = angle + PI / 2
+        length_offset = length / 2 - width / 2
+        dx = -length_offset * np.sin(theta)
+        dy = length_offset * np.cos(theta)
+        segments = np.stack(
+            [np.stack([x - dx, y - dy], axis=1), np.stack([x + dx, y + dy], axis=1)],
+            axis=1,
+        )
+
+        self.membranes.set_segments(segments)
+        self.membranes.set_linewidths(width * self.points_per_micron)
+        self.bodies.set_segments(segments)
+        self.bodies.set_linewidths(
+            (width - self.membrane_width) * self.points_per_micron
+        )
+        self.bodies.set_colors(self.agent_rgb(frame))
+        n_agents = len(frame)
+        self.title.set_text(
+            f"time: {float(time):.1f} s, {n_agents} agent{'s' * (n_agents != 1)}"
+        )
+
+        self.fig.canvas.draw()
+        return np.asarray(self.fig.canvas.buffer_rgba())[..., :3].copy()
+
+
+_renderer: Optional[SnapshotRenderer] = None
+
+
+def _init_renderer(renderer_kwargs):
+    """Create the figure for a worker process once."""
+    global _renderer
+    _renderer = SnapshotRenderer(**renderer_kwargs)
+
+
+def _render_frame(time_frame):
+    assert _renderer is not None
+    return _renderer.render(*time_frame)
+
+
+def write_colony_video(
+    frames, out_file, renderer_kwargs, cpus=1, fps=15, max_pending=None
+):
+    """Render frames in a process pool and append them to a video in order.
+
+    At most ``max_pending`` frames (default: twice the number of processes)
+    are submitted but not yet written at any time, so memory use does not
+    grow with the number of frames.
+
+    Args:
+        frames: Iterable of (time, DataFrame) tuples, e.g. from
+            :py:func:`stream_snapshot_frames`
+        out_file: Path to output video
+        renderer_kwargs: Keyword arguments for :py:class:`SnapshotRenderer`
+        cpus: Number of processes to render frames with
+        fps: Frames per second for the video
+        max_pending: Maximum number of frames being rendered at once
+
+    Returns:
+        Number of frames written
+    """
+    n_frames = 0
+    with iio_v2.get_writer(out_file, format="FFMPEG", fps=fps) as writer:
+        if cpus == 1:
+            renderer = SnapshotRenderer(**renderer_kwargs)
+            for time, frame in tqdm(frames):
+                writer.append_data(renderer.render(time, frame))
+                n_frames += 1
+            plt.close(renderer.fig)
+            return n_frames
+
+        max_pending = max_pending or 2 * cpus
+        with concurrent.futures.ProcessPoolExecutor(
+            cpus, initializer=_init_renderer, initargs=(renderer_kwargs,)
+        ) as executor:
+            pending: deque[concurrent.futures.Future] = deque()
+            for time_frame in tqdm(frames):
+                pending.append(executor.submit(_render_frame, time_frame))
+                if len(pending) >= max_pending:
+                    writer.append_data(pending.popleft().result())
+                    n_frames += 1
+            while pending:
+                writer.append_data(pending.popleft().result())
+                n_frames += 1
+    return n_frames
+
+
 def plot(
     params: dict[str, Any],
     conn: DuckDBPyConnection,
@@ -1293,7 +1544,85 @@ def plot(
     validation_data_paths: list[str],
     outdir: str,
     variant_metadata: dict[str, dict[int, Any]],
-    variant_name: str,
+    variant_names: dict[str, str],
 ):
-    # TODO: Write analysis script using DuckDB
-    raise NotImplementedError("Still need to write analysis script using DuckDB!")
+    """Make a snapshot video for each colony (experiment, variant, and
+    lineage seed) by streaming agent geometry from the Parquet output.
+
+    Supported ``params``:
+
+    - ``step``: Only render every ``step``-th timepoint (default: 1)
+    - ``cpus``: Number of processes to render frames with (default: 1)
+    - ``fps``: Frames per second of videos (default: 15)
+    - ``bounds``: Size of environment in microns (default: bounding box
+      of all agent locations)
+    - ``color_column``: DuckDB expression to color agents by instead of
+      by phylogeny (e.g. ``"bulk[100 + 1]"``)
+    - ``snapshot_times``: List of times to also save as PNG images
+    """
+    colonies = conn.sql(
+        f"SELECT DISTINCT experiment_id, variant, lineage_seed FROM ({history_sql})"
+    ).fetchall()
+    snapshot_times = set(params.get("snapshot_times", []))
+    for experiment_id, variant, lineage_seed in colonies:
+        colony_sql = f"""SELECT * FROM ({history_sql})
+            WHERE experiment_id = '{experiment_id}' AND variant = {variant}
+            AND lineage_seed = {lineage_seed}"""
+        agent_ids = [
+            row[0]
+            for row in conn.sql(
+                f"SELECT DISTINCT agent_id FROM ({colony_sql})"
+            ).fetchall()
+        ]
+        renderer_kwargs: dict[str, Any] = {
+            "agent_colors": get_phylogeny_colors_from_names(agent_ids)
+        }
+        color_column = params.get("color_column")
+        color_range_sql = (
+            f"min({color_column}), max({color_column})"
+            if color_column
+            else "NULL, NULL"
+        )
+        x_max, y_max, color_min, color_max = cast(
+            tuple,
+            conn.sql(
+                f"""SELECT max({SNAPSHOT_COLUMNS["x"]}), max({SNAPSHOT_COLUMNS["y"]}),
+                {color_range_sql} FROM ({colony_sql})"""
+            ).fetchone(),
+        )
+        renderer_kwargs["bounds"] = params.get("bounds", [x_max, y_max])
+        if color_column:
+            renderer_kwargs["color_range"] = (color_min, color_max)
+
+        frames = stream_snapshot_frames(
+            conn, colony_sql, color_column, params.get("step", 1)
+        )
+        if snapshot_times:
+            frames = _save_snapshot_frames(
+                frames,
+                snapshot_times,
+                renderer_kwargs,
+                os.path.join(outdir, f"{experiment_id}_{variant}_{lineage_seed}"),
+            )
+        write_colony_video(
+            frames,
+            os.path.join(
+                outdir, f"{experiment_id}_{variant}_{lineage_seed}_snapshots.mp4"
+            ),
+            renderer_kwargs,
+            cpus=params.get("cpus", 1),
+            fps=params.get("fps", 15),
+        )
+
+
+def _save_snapshot_frames(frames, snapshot_times, renderer_kwargs, prefix):
+    """Pass frames through while saving those at ``snapshot_times`` as PNGs."""
+    renderer = None
+    for time, frame in frames:
+        if time in snapshot_times:
+            if renderer is None:
+                renderer = SnapshotRenderer(**renderer_kwargs)
+            iio.imwrite(f"{prefix}_t{time}.png", renderer.render(time, frame))
+        yield time, frame
+    if renderer is not None:
+        plt.close(renderer.fig)
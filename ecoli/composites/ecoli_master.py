@@ -106,6 +106,7 @@ class Ecoli(Composer):
             self.config["topology"] = deepcopy(ECOLI_DEFAULT_TOPOLOGY)
 
         self.processes_and_steps = self.generate_processes_and_steps(self.config)
+        self.load_sim_data.save_process_config_bundle()
 
     def initial_state(self, config: Optional[dict[str, Any]] = None) -> dict[str, Any]:
         """Users have three options for configuring the simulation initial state:
@@ -437,23 +438,15 @@ class Ecoli(Composer):
                 unique_update_counter += 1
 
         # Add Allocator Steps
-        allocator_config = self.load_sim_data.get_allocator_config(
-            time_step, process_names=self.partitioned_processes
-        )
+        allocator_config = self.load_sim_data.get_config_by_name("allocator", time_step)
+        allocator_config["process_names"] = self.partitioned_processes
         for i in range(1, allocator_counter):
             steps[f"allocator_{i}"] = Allocator(allocator_config)
 
         # Add UniqueUpdate Steps
-        unique_mols = (
-            self.load_sim_data.sim_data.internal_state
-        ).unique_molecule.unique_molecule_definitions.keys()
-        unique_topo = {
-            unique_mol + "s": ("unique", unique_mol)
-            for unique_mol in unique_mols
-            if unique_mol not in ["active_ribosome", "DnaA_box"]
-        }
-        unique_topo["active_ribosome"] = ("unique", "active_ribosome")
-        unique_topo["DnaA_boxes"] = ("unique", "DnaA_box")
+        unique_topo = self.load_sim_data.get_config_by_name("unique-update")[
+            "unique_topo"
+        ]
         params = {"unique_topo": unique_topo, "emit_unique": config["emit_unique"]}
         for i in range(1, unique_update_counter):
             steps[f"unique_update_{i}"] = UniqueUpdate(params)
@@ -465,7 +458,9 @@ class Ecoli(Composer):
                 "agent_id": config["agent_id"],
                 "composer": Ecoli,
                 "composer_config": self.config,
-                "dry_mass_inc_dict": self.load_sim_data.sim_data.expectedDryMassIncreaseDict,
+                "dry_mass_inc_dict": self.load_sim_data.get_config_by_name(
+                    "ecoli-cell-division"
+                )["dry_mass_inc_dict"],
                 "seed": config["seed"],
             }
             steps["division"] = Division(division_config)
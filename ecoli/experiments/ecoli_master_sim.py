@@ -40,7 +40,7 @@ from ecoli.processes.registries import topology_registry
 
 from configs import CONFIG_DIR_PATH
 from ecoli.library.parquet_emitter import ParquetEmitter
-from ecoli.library.schema import not_a_process
+from ecoli.library.schema import not_a_process, unique_view_cache
 
 from wholecell.utils.filepath import ROOT_PATH
 
@@ -172,6 +172,24 @@ def report_profiling(stats: pstats.Stats) -> None:
     stats.sort_stats("cumtime").print_stats(20)
 
 
+def report_unique_view_cache(n_steps: float) -> None:
+    """Prints out the counters of
+    :py:data:`~ecoli.library.schema.unique_view_cache` when ``profile``
+    option is ``True`` in the config given to
+    :py:class:`~ecoli.experiments.ecoli_master_sim.EcoliSim`
+
+    Args:
+        n_steps: Number of simulated timesteps."""
+    cache_stats = unique_view_cache.stats()
+    n_steps = max(n_steps, 1)
+    print("\nUnique molecule attribute cache:\n")
+    print(f"Hit rate: {cache_stats['hit_rate']:.1%}")
+    print(f"Hits per step: {cache_stats['hits'] / n_steps:.1f}")
+    print(f"Misses per step: {cache_stats['misses'] / n_steps:.1f}")
+    print(f"Store updates per step: {cache_stats['n_invalidations'] / n_steps:.1f}")
+    print(f"MB copied per step: {cache_stats['bytes_copied'] / n_steps / 1e6:.3f}")
+
+
 def parse_key_value_args(args_list: list[str]) -> dict[str, str]:
     """Parses key-value pairs specified as strings of the form ``key=value``
     via CLI. See ``emitter_arg`` option in
@@ -888,6 +906,7 @@ class EcoliSim:
             r"has the value <bound method UniqueNumpyUpdater\.updater",
         )
         self.ecoli_experiment = Engine(**experiment_config)
+        unique_view_cache.reset_stats()
 
         # Only emit designated stores if specified
         if self.config["emit_paths"]:
@@ -911,6 +930,9 @@ class EcoliSim:
         self.ecoli_experiment.end()
         if self.profile:
             report_profiling(self.ecoli_experiment.stats)
+            report_unique_view_cache(
+                self.ecoli_experiment.global_time / self.config["time_step"]
+            )
         if self.fail_at_max_duration:
             raise TimeLimitError(
                 f"Exceeded maximum simulation time: {self.max_duration}"
@@ -134,6 +134,67 @@ class HoleSizeDict(MutableMapping):
         return f"{type(self).__name__}({self.mapping})"
 
 
+class HoleUnionFind:
+    """Array-backed union-find over integer hole labels.
+
+    Uses path compression and union by size, and keeps track of the size of
+    the largest hole so that it can be queried in constant time.
+
+    Args:
+        sizes: Number of lattice sites in each initially separate hole, indexed
+            by hole label.
+    """
+
+    def __init__(self, sizes):
+        self.size = np.array(sizes, dtype=np.int64)
+        self.parent = np.arange(self.size.size)
+        self.largest_hole = int(self.size.max()) if self.size.size > 0 else 0
+
+    def find(self, label):
+        root = label
+        while self.parent[root] != root:
+            root = self.parent[root]
+
+        # Path compression
+        while self.parent[label] != root:
+            self.parent[label], label = root, self.parent[label]
+
+        return root
+
+    def union(self, label_1, label_2):
+        root_1 = self.find(label_1)
+        root_2 = self.find(label_2)
+        if root_1 == root_2:
+            return root_1
+
+        # Union by size
+        if self.size[root_1] < self.size[root_2]:
+            root_1, root_2 = root_2, root_1
+        self.parent[root_2] = root_1
+        self.size[root_1] += self.size[root_2]
+        if self.size[root_1] > self.largest_hole:
+            self.largest_hole = int(self.size[root_1])
+
+        return root_1
+
+    def roots(self):
+        """Fully compresses all paths and returns the root of every label."""
+        parent = self.parent
+        grandparent = parent[parent]
+        while not np.array_equal(grandparent, parent):
+            parent = grandparent
+            grandparent = parent[parent]
+        self.parent = parent
+        return parent
+
+    def hole_sizes(self):
+        """Returns the size of every hole (one entry per root label)."""
+        return self.size[self.roots() == np.arange(self.size.size)]
+
+    def max(self):
+        return self.largest_hole
+
+
 def detect_holes(lattice, on_cylinder=True, critical_size=None, prune_subtrees=True):
     # Create "hole view" of lattice.
     # Each position contains a set of integers representing the id of the hole
@@ -273,6 +334,48 @@ def detect_holes_skimage(lattice, on_cylinder=True):
     return hole_sizes, hole_view
 
 
+def detect_holes_union_find(lattice, on_cylinder=True):
+    """Finds holes (8-connected regions of zeros) in a murein lattice.
+
+    Holes are first labelled on the plane, then holes touching across the
+    top and bottom rows are merged with a :py:class:`HoleUnionFind` when the
+    lattice wraps around a cylinder. Merging only visits the two boundary
+    rows, so the cost of wraparound does not grow with the number of holes.
+
+    Args:
+        lattice: 2D array of 1s (murein) and 0s (holes).
+        on_cylinder: Whether the first and last rows are adjacent.
+
+    Returns:
+        Tuple of the sizes of all holes and the hole view (lattice of hole
+        labels, 0 for murein).
+    """
+    hole_view = measure.label(lattice, background=1, connectivity=2)
+    sizes = np.bincount(hole_view.ravel())
+    sizes[0] = 0
+    holes = HoleUnionFind(sizes)
+
+    if on_cylinder:
+        top = hole_view[0]
+        bottom = hole_view[-1]
+        pairs = np.concatenate(
+            [
+                np.stack([top, bottom]),
+                np.stack([top[1:], bottom[:-1]]),
+                np.stack([top[:-1], bottom[1:]]),
+            ],
+            axis=1,
+        )
+        pairs = pairs[:, (pairs[0] != 0) & (pairs[1] != 0) & (pairs[0] != pairs[1])]
+        for label_1, label_2 in np.unique(pairs, axis=1).T:
+            holes.union(label_1, label_2)
+
+    roots = holes.roots()
+    is_hole = roots == np.arange(roots.size)
+    is_hole[0] = False
+    return holes.size[is_hole], roots[hole_view]
+
+
 def test_hole_size_dict():
     hsd = HoleSizeDict({frozenset([1]): 1, frozenset([2]): 2})
 
@@ -296,6 +399,41 @@ def test_hole_size_dict():
     assert len(hsd) == 1 and frozenset([3]) in hsd
 
 
+def test_hole_union_find():
+    holes = HoleUnionFind([0, 1, 2, 3, 1])
+    assert holes.max() == 3
+
+    # Union by size keeps the larger hole as root
+    assert holes.union(1, 3) == 3
+    assert holes.union(4, 1) == 3
+    assert holes.max() == 5
+    assert holes.find(4) == 3
+    assert sorted(holes.hole_sizes()) == [0, 2, 5]
+
+    # Holes touching across the top and bottom rows are merged on a cylinder
+    lattice = np.array(
+        [
+            [0, 1, 1, 1],
+            [1, 1, 1, 1],
+            [1, 1, 0, 1],
+            [1, 0, 1, 1],
+        ]
+    )
+    hole_sizes, hole_view = detect_holes_union_find(lattice, on_cylinder=False)
+    assert sorted(hole_sizes) == [1, 2]
+    hole_sizes, hole_view = detect_holes_union_find(lattice)
+    assert hole_sizes.tolist() == [3]
+    assert hole_view[0, 0] == hole_view[3, 1] == hole_view[2, 2] != 0
+
+    # Agrees with skimage-based detection on random lattices
+    rng = np.random.default_rng(0)
+    for density in np.arange(0.1, 1, 0.2):
+        lattice = rng.binomial(1, 1 - density, size=(40, 30))
+        expected, _ = detect_holes_skimage(lattice.copy())
+        hole_sizes, _ = detect_holes_union_find(lattice)
+        np.testing.assert_array_equal(np.sort(hole_sizes), np.sort(expected))
+
+
 def test_detect_holes():
     # Create output directory
     os.makedirs("out/hole_detection", exist_ok=True)
@@ -319,6 +457,7 @@ def test_detect_holes():
         for method_name, detection_method in {
             "detect_holes": detect_holes,
             "detect_holes_skimage": detect_holes_skimage,
+            "detect_holes_union_find": detect_holes_union_find,
         }.items():
             print(f"Detection method: {method_name}")
 
@@ -348,7 +487,7 @@ def test_detect_holes():
                             va="center",
                             color="w",
                         )
-                    elif method_name == "detect_holes_skimage":
+                    else:
                         ax.text(
                             c,
                             r,
@@ -365,7 +504,7 @@ def test_detect_holes():
             plt.close()
 
     print("===============================================")
-    print(f"Passed {n_passed}/{2 * len(test_files)} tests.")
+    print(f"Passed {n_passed}/{3 * len(test_files)} tests.")
     print()
 
 
@@ -379,6 +518,7 @@ def test_runtime():
 
     detection_methods = {
         "detect_holes_skimage": detect_holes_skimage,
+        "detect_holes_union_find": detect_holes_union_find,
         "detect_holes": detect_holes,
     }
 
@@ -539,6 +679,7 @@ def test_merge_time():
 
 def main():
     test_hole_size_dict()
+    test_hole_union_find()
     test_detect_holes()
     test_runtime()
     test_merge_time()
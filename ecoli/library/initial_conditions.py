@@ -2,6 +2,8 @@
 Functions to initialize molecule states from sim_data.
 """
 
+import weakref
+
 import numpy as np
 import numpy.typing as npt
 from numpy.lib import recfunctions as rfn
@@ -19,6 +21,11 @@ from ecoli.processes.polypeptide_elongation import (
     REMOVED_FROM_CHARGING,
     MICROMOLAR_UNITS,
 )
+from ecoli.processes.tf_binding import (
+    sample_bound_sites,
+    tf_binding_sites,
+    tf_target_matrix,
+)
 from wholecell.utils import units
 from wholecell.utils.fitting import (
     countsFromMassAndExpression,
@@ -33,7 +40,6 @@ except ImportError as exc:
         "Failed to import Cython module. Try running 'make clean compile'."
     ) from exc
 from wholecell.utils.polymerize import computeMassIncrease
-from wholecell.utils.random import stochasticRound
 
 RAND_MAX = 2**31
 
@@ -816,45 +822,33 @@ def initialize_transcription_factors(
     tf_to_tf_type = sim_data.process.transcription_regulation.tf_to_tf_type
     p_promoter_bound_TF = sim_data.process.transcription_regulation.p_promoter_bound_tf
 
-    # Build dict that maps TFs to transcription units they regulate
-    delta_prob = sim_data.process.transcription_regulation.delta_prob
-    TF_to_TU_idx = {}
+    # Build sparse matrix of the transcription units each TF regulates
+    tf_targets = tf_target_matrix(
+        sim_data.process.transcription_regulation.delta_prob, len(tf_ids)
+    )
 
+    # Get indexes of active and inactive forms of transcription factors
+    active_tf_idx = bulk_name_to_idx([tf + "[c]" for tf in tf_ids], bulk_state["id"])
+    inactive_tf_idx = np.zeros(len(tf_ids), dtype=int)
+    tf_is_0CS = np.array([tf_to_tf_type[tf] == "0CS" for tf in tf_ids])
     for i, tf in enumerate(tf_ids):
-        TF_to_TU_idx[tf] = delta_prob["deltaI"][delta_prob["deltaJ"] == i]
-
-    # Get views into bulk molecule representations of transcription factors
-    active_tf_view = {}
-    inactive_tf_view = {}
-    active_tf_view_idx = {}
-    inactive_tf_view_idx = {}
-
-    for tf in tf_ids:
-        tf_idx = bulk_name_to_idx(tf + "[c]", bulk_state["id"])
-        active_tf_view[tf] = bulk_state["count"][tf_idx]
-        active_tf_view_idx[tf] = tf_idx
-
         if tf_to_tf_type[tf] == "1CS":
             if tf == sim_data.process.transcription_regulation.active_to_bound[tf]:
-                inactive_tf_idx = bulk_name_to_idx(
+                inactive_tf_idx[i] = bulk_name_to_idx(
                     sim_data.process.equilibrium.get_unbound(tf + "[c]"),
                     bulk_state["id"],
                 )
-                inactive_tf_view[tf] = bulk_state["count"][inactive_tf_idx]
             else:
-                inactive_tf_idx = bulk_name_to_idx(
+                inactive_tf_idx[i] = bulk_name_to_idx(
                     sim_data.process.transcription_regulation.active_to_bound[tf]
                     + "[c]",
                     bulk_state["id"],
                 )
-                inactive_tf_view[tf] = bulk_state["count"][inactive_tf_idx]
         elif tf_to_tf_type[tf] == "2CS":
-            inactive_tf_idx = bulk_name_to_idx(
+            inactive_tf_idx[i] = bulk_name_to_idx(
                 sim_data.process.two_component_system.active_to_inactive_tf[tf + "[c]"],
                 bulk_state["id"],
             )
-            inactive_tf_view[tf] = bulk_state["count"][inactive_tf_idx]
-        inactive_tf_view_idx[tf] = inactive_tf_idx
 
     # Get masses of active transcription factors
     tf_indexes = [np.where(bulk_state["id"] == tf_id + "[c]")[0][0] for tf_id in tf_ids]
@@ -866,55 +860,30 @@ def initialize_transcription_factors(
     # Get TU indices of promoters
     TU_index = unique_molecules["promoter"]["TU_index"]
 
-    # Initialize bound_TF array
-    bound_TF = np.zeros((len(TU_index), len(tf_ids)), dtype=bool)
-
-    for tf_idx, tf_id in enumerate(tf_ids):
-        # Get counts of transcription factors
-        active_tf_counts = active_tf_view[tf_id]
-
-        # If there are no active transcription factors at initialization,
-        # continue to the next transcription factor
-        if active_tf_counts == 0:
-            continue
-
-        # Compute probability of binding the promoter
-        if tf_to_tf_type[tf_id] == "0CS":
-            p_promoter_bound = 1.0
-        else:
-            inactive_tf_counts = inactive_tf_view[tf_id]
-            p_promoter_bound = p_promoter_bound_TF(active_tf_counts, inactive_tf_counts)
-
-        # Determine the number of available promoter sites
-        available_promoters = np.isin(TU_index, TF_to_TU_idx[tf_id])
-        n_available_promoters = available_promoters.sum()
-
-        # Calculate the number of promoters that should be bound
-        n_to_bind = int(
-            stochasticRound(
-                random_state, np.full(n_available_promoters, p_promoter_bound)
-            ).sum()
+    # Get counts of transcription factors
+    active_tf_counts = bulk_state["count"][active_tf_idx]
+    inactive_tf_counts = bulk_state["count"][inactive_tf_idx]
+
+    # Compute probability of binding the promoter for TFs with active
+    # molecules at initialization (the others do not bind)
+    p_promoter_bound = np.zeros(len(tf_ids))
+    has_active_tfs = active_tf_counts > 0
+    p_promoter_bound[has_active_tfs & tf_is_0CS] = 1.0
+    for tf_idx in np.flatnonzero(has_active_tfs & ~tf_is_0CS):
+        p_promoter_bound[tf_idx] = p_promoter_bound_TF(
+            active_tf_counts[tf_idx], inactive_tf_counts[tf_idx]
         )
 
-        bound_locs = np.zeros(n_available_promoters, dtype=bool)
-        if n_to_bind > 0:
-            # Determine randomly which DNA targets to bind based on which of
-            # the following is more limiting:
-            # number of promoter sites to bind, or number of active
-            # transcription factors
-            bound_locs[
-                random_state.choice(
-                    n_available_promoters,
-                    size=min(n_to_bind, active_tf_view[tf_id]),
-                    replace=False,
-                )
-            ] = True
-
-            # Update count of free transcription factors
-            bulk_state["count"][active_tf_view_idx[tf_id]] -= bound_locs.sum()
+    # Determine randomly which DNA targets each TF binds
+    site_promoter, site_TF = tf_binding_sites(tf_targets, TU_index)
+    bound_sites, _ = sample_bound_sites(
+        random_state, site_TF, p_promoter_bound, active_tf_counts
+    )
 
-            # Update bound_TF array
-            bound_TF[available_promoters, tf_idx] = bound_locs
+    # Update bound_TF array and counts of free transcription factors
+    bound_TF = np.zeros((len(TU_index), len(tf_ids)), dtype=bool)
+    bound_TF[site_promoter[bound_sites], site_TF[bound_sites]] = True
+    bulk_state["count"][active_tf_idx] -= bound_TF.sum(axis=0)
 
     # Calculate masses of bound TFs
     mass_diffs = bound_TF.dot(active_tf_masses)
@@ -1452,6 +1421,52 @@ def initialize_chromosomal_segments(unique_molecules, sim_data, unique_id_rng):
     )
 
 
+# Seed-independent lookup tables derived from sim_data, shared by all initial
+# states generated from the same sim_data object
+_SIM_DATA_TABLES: "weakref.WeakKeyDictionary[Any, dict[str, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_cistron_positions_in_TUs(sim_data) -> dict[str, Any]:
+    """
+    Builds (once per sim_data object) arrays of all cistron-TU pairs sorted
+    by TU index, so the cistrons of many TUs can be looked up at once.
+
+    Returns:
+        Dictionary with the following keys::
+
+            {
+                "TU_ptr": Pairs of TU i are at positions TU_ptr[i] to
+                    TU_ptr[i + 1] of the arrays below
+                "cistron_index": Cistron index of each pair
+                "start_position": Start position of the cistron in the TU
+                "monomer_to_cistron": Mapping from monomer indexes to the
+                    indexes of the cistrons that encode them
+            }
+    """
+    tables = _SIM_DATA_TABLES.setdefault(sim_data, {})
+    if "cistron_positions" not in tables:
+        transcription = sim_data.process.transcription
+        pairs = np.array(list(transcription.cistron_start_end_pos_in_tu.keys()))
+        start_positions = np.array(
+            [start for start, _ in transcription.cistron_start_end_pos_in_tu.values()]
+        )
+        order = np.lexsort((pairs[:, 0], pairs[:, 1]))
+        tables["cistron_positions"] = {
+            "TU_ptr": np.searchsorted(
+                pairs[order, 1], np.arange(len(transcription.rna_data) + 1)
+            ),
+            "cistron_index": pairs[order, 0],
+            "start_position": start_positions[order],
+            "monomer_to_cistron": {
+                i: transcription._cistron_id_to_index[monomer["cistron_id"]]
+                for (i, monomer) in enumerate(sim_data.process.translation.monomer_data)
+            },
+        }
+    return tables["cistron_positions"]
+
+
 def initialize_translation(
     bulk_state, unique_molecules, sim_data, random_state, unique_id_rng
 ):
@@ -1479,10 +1494,8 @@ def initialize_translation(
     )
     TU_ids = sim_data.process.transcription.rna_data["id"]
     monomer_index_to_tu_indexes = sim_data.relation.monomer_index_to_tu_indexes
-    monomer_index_to_cistron_index = {
-        i: sim_data.process.transcription._cistron_id_to_index[monomer["cistron_id"]]
-        for (i, monomer) in enumerate(sim_data.process.translation.monomer_data)
-    }
+    cistron_positions = get_cistron_positions_in_TUs(sim_data)
+    monomer_index_to_cistron_index = cistron_positions["monomer_to_cistron"]
 
     # Get attributes of RNAs
     (
@@ -1521,27 +1534,28 @@ def initialize_translation(
     TU_index_incomplete_mRNAs = TU_index_mRNAs[np.logical_not(is_full_transcript_mRNAs)]
     length_incomplete_mRNAs = length_mRNAs[np.logical_not(is_full_transcript_mRNAs)]
 
-    TU_index_to_mRNA_lengths = {}
-    for TU_index, length in zip(TU_index_incomplete_mRNAs, length_incomplete_mRNAs):
-        TU_index_to_mRNA_lengths.setdefault(TU_index, []).append(length)
-
-    for TU_index, available_lengths in TU_index_to_mRNA_lengths.items():
-        cistron_indexes = sim_data.process.transcription.rna_id_to_cistron_indexes(
-            TU_ids[TU_index]
-        )
-        cistron_start_positions = np.array(
-            [
-                sim_data.process.transcription.cistron_start_end_pos_in_tu[
-                    (cistron_index, TU_index)
-                ][0]
-                for cistron_index in cistron_indexes
-            ]
+    # Expand incomplete mRNAs into one entry per constituent cistron
+    TU_ptr = cistron_positions["TU_ptr"]
+    n_cistrons_per_mRNA = (
+        TU_ptr[TU_index_incomplete_mRNAs + 1] - TU_ptr[TU_index_incomplete_mRNAs]
+    )
+    pair_indexes = np.repeat(TU_ptr[TU_index_incomplete_mRNAs], n_cistrons_per_mRNA) + (
+        np.arange(n_cistrons_per_mRNA.sum())
+        - np.repeat(
+            np.cumsum(n_cistrons_per_mRNA) - n_cistrons_per_mRNA, n_cistrons_per_mRNA
         )
-
-        for length in available_lengths:
-            available_cistron_lengths[cistron_indexes] += np.clip(
-                length - cistron_start_positions, 0, cistron_lengths[cistron_indexes]
-            )
+    )
+    pair_cistron_indexes = cistron_positions["cistron_index"][pair_indexes]
+    available_cistron_lengths += np.bincount(
+        pair_cistron_indexes,
+        weights=np.clip(
+            np.repeat(length_incomplete_mRNAs, n_cistrons_per_mRNA)
+            - cistron_positions["start_position"][pair_indexes],
+            0,
+            cistron_lengths[pair_cistron_indexes],
+        ),
+        minlength=len(cistron_lengths),
+    ).astype(available_cistron_lengths.dtype)
 
     # Find number of ribosomes to activate
     ribosome30S_idx = bulk_name_to_idx(
@@ -1577,6 +1591,10 @@ def initialize_translation(
     start_index = 0
     nonzero_count = n_new_proteins > 0
 
+    # Sort mRNAs by TU index once to look up the mRNAs of each TU
+    mRNA_order = np.argsort(TU_index_mRNAs, kind="stable")
+    TU_index_mRNAs_sorted = TU_index_mRNAs[mRNA_order]
+
     for protein_index, protein_counts in zip(
         np.arange(n_new_proteins.size)[nonzero_count], n_new_proteins[nonzero_count]
     ):
@@ -1595,7 +1613,11 @@ def initialize_translation(
         # Distribute ribosomes among mRNAs that produce this protein, weighted
         # by their lengths
         for TU_index in monomer_index_to_tu_indexes[protein_index]:
-            attribute_indexes_this_TU = np.where(TU_index_mRNAs == TU_index)[0]
+            attribute_indexes_this_TU = mRNA_order[
+                np.searchsorted(TU_index_mRNAs_sorted, TU_index, side="left") : (
+                    np.searchsorted(TU_index_mRNAs_sorted, TU_index, side="right")
+                )
+            ]
             cistron_start_position = (
                 sim_data.process.transcription.cistron_start_end_pos_in_tu[
                     (cistron_index, TU_index)
@@ -148,6 +148,8 @@ def construct_convenience_rate_law(
                 # print('removing parameter: {}'.format(parameter))
 
     # if reversible, determine direction by looking at stoichiometry
+    # (no kcat if cofactors are a mix of reactants and products)
+    kcat = None
     if kcat_r:
         coeff = [
             stoichiometry[mol] for cofactors in cofactors_sets for mol in cofactors
@@ -194,6 +196,14 @@ def construct_convenience_rate_law(
 
         return flux
 
+    # Expose the (shared and mutable) inputs of the rate law so that
+    # CompiledRateLaws can evaluate it exactly as it would be called
+    rate_law.enzyme = enzyme
+    rate_law.kcat = kcat
+    rate_law.cofactors_sets = cofactors_sets
+    rate_law.partition = partition
+    rate_law.parameters = parameters
+
     return rate_law
 
 
@@ -264,6 +274,135 @@ def make_rate_laws(
     return rate_laws
 
 
+class CompiledRateLaws(object):
+    """
+    Rate laws made by :py:func:`make_rate_laws` compiled into index arrays,
+    so that the fluxes of all reactions are calculated in one vectorized pass
+    over an array of concentrations. Gives the same fluxes as calling each
+    rate law with a dictionary of concentrations and summing the fluxes of
+    the enzymes of each reaction.
+
+    Rate laws share and modify their cofactor and partition lists while they
+    are made, so compile only after all rate laws of a model are made.
+
+    Args:
+        rate_laws: Dictionary of rate laws by reaction and enzyme, as
+            returned by :py:func:`make_rate_laws`
+        molecule_ids: Order of molecules in concentration arrays
+        reaction_ids: Order of reactions in flux arrays (reactions without
+            rate laws have zero flux)
+    """
+
+    def __init__(
+        self,
+        rate_laws: dict[str, dict[str, Callable]],
+        molecule_ids: list,
+        reaction_ids: list,
+    ):
+        molecule_to_index = {mol: i for i, mol in enumerate(molecule_ids)}
+        reaction_to_index = {rxn: i for i, rxn in enumerate(reaction_ids)}
+        self.n_reactions = len(reaction_ids)
+
+        # Rate laws in the order they are summed for each reaction
+        rate_law_reaction = []
+        rate_law_enzyme = []
+        # Numerator terms (one per cofactor set) and denominator terms (one
+        # per partition set) of each rate law and factors of each term
+        numerator_rate_law, numerator_kcat = [], []
+        numerator_factor_term, numerator_factor_mol = [], []
+        numerator_factor_inv_km = []
+        denominator_rate_law = []
+        denominator_factor_term, denominator_factor_mol = [], []
+        denominator_factor_inv_km = []
+
+        for reaction_id, enzymes in rate_laws.items():
+            for enzyme, rate_law in enzymes.items():
+                rate_law_index = len(rate_law_reaction)
+                rate_law_reaction.append(reaction_to_index[reaction_id])
+                rate_law_enzyme.append(molecule_to_index[rate_law.enzyme])
+                parameters = rate_law.parameters
+                if rate_law.kcat is None and rate_law.cofactors_sets:
+                    raise ValueError(
+                        f"No kcat for {enzyme} in reaction {reaction_id} (missing"
+                        " kcat_f or cofactors are both reactants and products)."
+                    )
+
+                for cofactors in rate_law.cofactors_sets:
+                    term_index = len(numerator_rate_law)
+                    numerator_rate_law.append(rate_law_index)
+                    numerator_kcat.append(rate_law.kcat)
+                    for molecule in cofactors:
+                        km = parameters[molecule]
+                        numerator_factor_term.append(term_index)
+                        numerator_factor_mol.append(molecule_to_index[molecule])
+                        numerator_factor_inv_km.append(1 / km if km else 0)
+
+                for cofactors_set in rate_law.partition:
+                    term_index = len(denominator_rate_law)
+                    denominator_rate_law.append(rate_law_index)
+                    for molecule in cofactors_set:
+                        km = parameters[molecule]
+                        denominator_factor_term.append(term_index)
+                        denominator_factor_mol.append(molecule_to_index[molecule])
+                        denominator_factor_inv_km.append(1 / km if km else 0)
+
+        self.rate_law_reaction = np.array(rate_law_reaction, dtype=np.int64)
+        self.rate_law_enzyme = np.array(rate_law_enzyme, dtype=np.int64)
+        self.numerator_rate_law = np.array(numerator_rate_law, dtype=np.int64)
+        self.numerator_kcat = np.array(numerator_kcat, dtype=np.float64)
+        self.numerator_factor_term = np.array(numerator_factor_term, dtype=np.int64)
+        self.numerator_factor_mol = np.array(numerator_factor_mol, dtype=np.int64)
+        self.numerator_factor_inv_km = np.array(numerator_factor_inv_km)
+        self.denominator_rate_law = np.array(denominator_rate_law, dtype=np.int64)
+        self.denominator_factor_term = np.array(denominator_factor_term, dtype=np.int64)
+        self.denominator_factor_mol = np.array(denominator_factor_mol, dtype=np.int64)
+        self.denominator_factor_inv_km = np.array(denominator_factor_inv_km)
+
+    def fluxes(self, concentrations: np.ndarray) -> np.ndarray:
+        """
+        Calculate the flux through every reaction
+
+        Args:
+            concentrations: Concentration of each molecule in mmol/L, in the
+                order of ``molecule_ids``
+
+        Returns:
+            Flux through each reaction, in the order of ``reaction_ids``
+        """
+        concentrations = np.asarray(concentrations, dtype=np.float64)
+        n_rate_laws = len(self.rate_law_reaction)
+
+        # Multiply the affinities of the cofactors in each term. Cofactors
+        # without a km contribute 0 to the numerator and 1 to the denominator
+        numerator_terms = np.ones(len(self.numerator_rate_law))
+        np.multiply.at(
+            numerator_terms,
+            self.numerator_factor_term,
+            concentrations[self.numerator_factor_mol] * self.numerator_factor_inv_km,
+        )
+        denominator_terms = np.ones(len(self.denominator_rate_law))
+        np.multiply.at(
+            denominator_terms,
+            self.denominator_factor_term,
+            1
+            + concentrations[self.denominator_factor_mol]
+            * self.denominator_factor_inv_km,
+        )
+
+        numerators = np.zeros(n_rate_laws)
+        np.add.at(
+            numerators, self.numerator_rate_law, self.numerator_kcat * numerator_terms
+        )
+        numerators *= concentrations[self.rate_law_enzyme]
+        # Denominator starts at +1 for the unbound state
+        denominators = np.ones(n_rate_laws)
+        np.add.at(denominators, self.denominator_rate_law, denominator_terms - 1)
+
+        fluxes = np.zeros(self.n_reactions)
+        np.add.at(fluxes, self.rate_law_reaction, numerators / denominators)
+        return fluxes
+
+
 class KineticFluxModel(object):
     """
     A kinetic rate law class
@@ -286,6 +425,8 @@ class KineticFluxModel(object):
     Attributes:
         rate_laws: Dictionary where each reaction_id is a key and each value is a
             sub-dictionary with kinetic rate law functions for each enzyme
+        compiled_rate_laws: :py:class:`CompiledRateLaws` that evaluates all
+            rate laws at once
     """
 
     def __init__(self, all_reactions: dict, kinetic_parameters: dict):
@@ -302,6 +443,9 @@ class KineticFluxModel(object):
         self.rate_laws = make_rate_laws(
             self.reactions, self.rate_law_configuration, self.kinetic_parameters
         )
+        self.compiled_rate_laws = CompiledRateLaws(
+            self.rate_laws, self.molecule_ids, self.reaction_ids
+        )
 
     def get_fluxes(self, concentrations_dict: dict[str, float]) -> dict[str, float]:
         """
@@ -314,16 +458,22 @@ class KineticFluxModel(object):
         Returns:
             Dictionary of fluxes for all reactions
         """
+        concentrations = [concentrations_dict[mol] for mol in self.molecule_ids]
+        fluxes = self.compiled_rate_laws.fluxes(concentrations)
+        return dict(zip(self.reaction_ids, fluxes.tolist()))
 
-        # Initialize reaction_fluxes and exchange_fluxes dictionaries
-        reaction_fluxes = {reaction_id: 0.0 for reaction_id in self.reaction_ids}
+    def get_flux_array(self, concentrations: np.ndarray) -> np.ndarray:
+        """
+        Calculate flux from an array of concentrations
 
-        for reaction_id, enzymes in self.rate_laws.items():
-            for enzyme, rate_law in enzymes.items():
-                flux = rate_law(concentrations_dict)
-                reaction_fluxes[reaction_id] += flux
+        Args:
+            concentrations: concentrations of all molecules in mmol/L, in the
+                order of ``molecule_ids``
 
-        return reaction_fluxes
+        Returns:
+            Fluxes through all reactions, in the order of ``reaction_ids``
+        """
+        return self.compiled_rate_laws.fluxes(concentrations)
 
 
 toy_reactions = {
@@ -400,5 +550,46 @@ def test_kinetics():
     print(flux)
 
 
+def test_compiled_rate_laws():
+    # Reversible reaction with a km of zero in addition to the toy reactions
+    reactions = {
+        **toy_reactions,
+        "REV-RXN": {
+            "stoichiometry": {
+                ("cytoplasm", "GLT"): -1,
+                ("cytoplasm", "ATP"): -1,
+                ("cytoplasm", "ADP"): 1,
+            },
+            "is reversible": True,
+            "catalyzed by": [("membrane", "REV-CPLX")],
+        },
+    }
+    kinetics = {
+        **toy_kinetics,
+        "REV-RXN": {
+            ("membrane", "REV-CPLX"): {
+                ("cytoplasm", "GLT"): 2e-3,
+                ("cytoplasm", "ATP"): 0,
+                ("cytoplasm", "ADP"): 5e-2,
+                "kcat_f": 3.0,
+            }
+        },
+    }
+    model = KineticFluxModel(reactions, kinetics)
+    random_state = np.random.RandomState(0)
+    for _ in range(10):
+        concentrations = {mol: random_state.uniform(0, 2) for mol in model.molecule_ids}
+        compiled_fluxes = model.get_fluxes(concentrations)
+        for reaction_id in model.reaction_ids:
+            expected = sum(
+                rate_law(concentrations)
+                for rate_law in model.rate_laws.get(reaction_id, {}).values()
+            )
+            np.testing.assert_allclose(
+                compiled_fluxes[reaction_id], expected, rtol=1e-12
+            )
+
+
 if __name__ == "__main__":
     test_kinetics()
+    test_compiled_rate_laws()
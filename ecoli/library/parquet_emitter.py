@@ -1,3 +1,4 @@
+import inspect
 import os
 from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any, Callable, cast, Mapping, Optional
@@ -6,6 +7,7 @@ from urllib import parse
 import duckdb
 import numpy as np
 import polars as pl
+import pyarrow as pa
 from polars.datatypes import DataTypeClass
 from fsspec.core import filesystem, url_to_fs, OpenFile
 from fsspec.spec import AbstractFileSystem
@@ -504,6 +506,207 @@ def open_arbitrary_sim_data(sim_data_dict: dict[str, dict[int, Any]]) -> OpenFil
     return open_output_file(sim_data_path)
 
 
+def _virtual_column_udf(
+    func: Callable[..., np.ndarray], value_type: pa.DataType
+) -> Callable[..., pa.Array]:
+    """
+    Wraps a function of stacked columns (see
+    :py:data:`~ecoli.processes.registries.virtual_column_registry`) as a
+    vectorized DuckDB UDF that takes and returns PyArrow arrays. Rows where
+    any list input has a different length than the others of that input
+    (e.g. empty lists emitted before a listener first ran) give empty lists.
+    """
+
+    def udf(*arrays: pa.Array) -> pa.Array:
+        arrays = tuple(
+            a.combine_chunks() if isinstance(a, pa.ChunkedArray) else a for a in arrays
+        )
+        n_rows = len(arrays[0])
+        valid = np.ones(n_rows, dtype=np.bool_)
+        for a in arrays:
+            valid &= a.is_valid().to_numpy(zero_copy_only=False)
+            if pa.types.is_list(a.type) or pa.types.is_large_list(a.type):
+                lengths = a.value_lengths().fill_null(0).to_numpy()
+                valid &= lengths == lengths.max(initial=0)
+        mask = pa.array(valid)
+        stacked = []
+        for a in arrays:
+            a = a.filter(mask)
+            if pa.types.is_list(a.type) or pa.types.is_large_list(a.type):
+                stacked.append(
+                    a.flatten().to_numpy(zero_copy_only=False).reshape(len(a), -1)
+                )
+            else:
+                stacked.append(a.to_numpy(zero_copy_only=False))
+        values = func(*stacked) if valid.any() else np.zeros((0, 0))
+        offsets = np.zeros(n_rows + 1, dtype=np.int32)
+        offsets[1:] = np.cumsum(np.where(valid, values.shape[1], 0))
+        return pa.ListArray.from_arrays(
+            pa.array(offsets),
+            pa.array(np.ravel(values), type=value_type, safe=False),
+        )
+
+    # DuckDB checks the number of parameters against the input types
+    udf.__signature__ = inspect.signature(func)  # type: ignore[attr-defined]
+    return udf
+
+
+def add_virtual_columns(
+    conn: duckdb.DuckDBPyConnection,
+    history_sql: str,
+    config_sql: str,
+    sim_data_path: str,
+    udf_suffix: str = "",
+) -> str:
+    """
+    Adds columns of virtual listeners to a history query. Listeners in
+    :py:data:`~ecoli.processes.registries.virtual_column_registry` can be
+    configured to skip outputs that are pure functions of other emitted
+    columns and ``sim_data`` (``virtual_listeners`` simulation option). This
+    registers a vectorized UDF on ``conn`` for every such column that is
+    missing from the output but whose inputs were emitted and adds it to the
+    query under its usual name, so analyses can read it like any other column.
+    DuckDB only evaluates the UDFs for queries that use these columns.
+
+    Called by :py:mod:`runscripts.analysis` for all analysis scripts. For
+    example, to use virtual columns in an interactive session::
+
+        conn = create_duckdb_conn()
+        history_sql, config_sql, _ = dataset_sql('out/', ['exp_id'])
+        history_sql = add_virtual_columns(
+            conn, history_sql, config_sql, 'out/kb/simData.cPickle')
+        monomer_counts = read_stacked_columns(
+            history_sql, ['listeners__monomer_counts'], conn=conn)
+
+    Args:
+        conn: DuckDB connection that the returned query must be run with
+        history_sql: DuckDB SQL string from :py:func:`~.dataset_sql`,
+            potentially with filters appended in ``WHERE`` clause
+        config_sql: DuckDB SQL string for sim configs from
+            :py:func:`~.dataset_sql` (for output metadata)
+        sim_data_path: Local path to the sim_data pickle used for the sims
+        udf_suffix: Appended to the names of the registered UDFs so that
+            queries for sims with different sim_data can be combined (see
+            :py:func:`~.add_virtual_columns_by_variant`)
+
+    Returns:
+        ``history_sql`` with virtual columns added (unchanged if no sims
+        were run with ``virtual_listeners``)
+    """
+    # Avoid loading sim_data unless some sims were run with virtual listeners
+    config_columns = conn.sql(f"SELECT * FROM ({config_sql})").columns
+    if "virtual_listeners" not in config_columns:
+        return history_sql
+    any_virtual = cast(
+        tuple,
+        conn.sql(f"SELECT bool_or(virtual_listeners) FROM ({config_sql})").fetchone(),
+    )[0]
+    if not any_virtual:
+        return history_sql
+    relation = conn.sql(f"SELECT * FROM ({history_sql})")
+    column_types = dict(zip(relation.columns, relation.types))
+
+    # Import here to avoid circular imports and loading all processes
+    # unless needed
+    from ecoli.library.sim_data import LoadSimData
+    from ecoli.processes import registries
+    import ecoli.processes  # noqa: F401 (registers virtual listeners)
+
+    registry = registries.virtual_column_registry
+    load_sim_data = None
+    column_exprs = []
+    for listener_name in registry.list():
+        if load_sim_data is None:
+            load_sim_data = LoadSimData(sim_data_path=sim_data_path, seed=0)
+        listener_config = load_sim_data.get_config_by_name(listener_name)
+        virtual_columns = registry.access(listener_name)(
+            listener_config,
+            lambda field: field_metadata(conn, config_sql, field),
+        )
+        for column, (inputs, func) in virtual_columns.items():
+            if column in column_types or any(i not in column_types for i in inputs):
+                continue
+            if column in USE_UINT16:
+                value_type, duckdb_type = pa.uint16(), duckdb.typing.USMALLINT
+            elif column in USE_UINT32:
+                value_type, duckdb_type = pa.uint32(), duckdb.typing.UINTEGER
+            else:
+                value_type, duckdb_type = pa.float64(), duckdb.typing.DOUBLE
+            udf_name = f"virtual__{column}{udf_suffix}"
+            try:
+                conn.remove_function(udf_name)
+            except duckdb.InvalidInputException:
+                pass
+            conn.create_function(
+                udf_name,
+                _virtual_column_udf(func, value_type),
+                [column_types[i] for i in inputs],
+                duckdb.list_type(duckdb_type),
+                type="arrow",
+            )
+            column_exprs.append(f"{udf_name}({', '.join(inputs)}) AS {column}")
+    if len(column_exprs) == 0:
+        return history_sql
+    return f"SELECT *, {', '.join(column_exprs)} FROM ({history_sql})"
+
+
+def add_virtual_columns_by_variant(
+    conn: duckdb.DuckDBPyConnection,
+    history_sql: str,
+    config_sql: str,
+    sim_data_dict: dict[str, dict[int, str]],
+) -> str:
+    """
+    Adds columns of virtual listeners (see :py:func:`~.add_virtual_columns`)
+    to a history query for sims of many experiments and variants. The columns
+    of each variant are computed with the sim_data of that variant. Rows of
+    variants not in ``sim_data_dict`` are kept without virtual columns.
+
+    Args:
+        conn: DuckDB connection that the returned query must be run with
+        history_sql: DuckDB SQL string from :py:func:`~.dataset_sql`,
+            potentially with filters appended in ``WHERE`` clause
+        config_sql: DuckDB SQL string for sim configs from
+            :py:func:`~.dataset_sql` (for output metadata)
+        sim_data_dict: Mapping of experiment IDs to mappings of variant
+            indices to local paths of the sim_data pickles for those variants
+            (see :py:mod:`runscripts.analysis`)
+
+    Returns:
+        ``history_sql`` with virtual columns added (unchanged if no sims
+        were run with ``virtual_listeners``)
+    """
+    sim_data_paths = [
+        (experiment_id, variant, sim_data_path)
+        for experiment_id, variants in sim_data_dict.items()
+        for variant, sim_data_path in variants.items()
+    ]
+    if len(sim_data_paths) == 1:
+        return add_virtual_columns(conn, history_sql, config_sql, sim_data_paths[0][2])
+    virtual_filters = []
+    virtual_sqls = []
+    for i, (experiment_id, variant, sim_data_path) in enumerate(sim_data_paths):
+        variant_filter = f"experiment_id = '{experiment_id}' AND variant = {variant}"
+        variant_history_sql = f"SELECT * FROM ({history_sql}) WHERE {variant_filter}"
+        variant_sql = add_virtual_columns(
+            conn,
+            variant_history_sql,
+            f"SELECT * FROM ({config_sql}) WHERE {variant_filter}",
+            sim_data_path,
+            udf_suffix=f"__{i}",
+        )
+        if variant_sql != variant_history_sql:
+            virtual_filters.append(f"({variant_filter})")
+            virtual_sqls.append(variant_sql)
+    if len(virtual_sqls) == 0:
+        return history_sql
+    # All other rows are kept without virtual columns
+    virtual_sqls.append(
+        f"SELECT * FROM ({history_sql}) WHERE NOT ({' OR '.join(virtual_filters)})"
+    )
+    return " UNION ALL BY NAME ".join(f"({sql})" for sql in virtual_sqls)
+
+
 def read_stacked_columns(
     history_sql: str,
     columns: list[str],
@@ -6,7 +6,10 @@ Simulation Helper Functions
 This is a collection of helper functions used thoughout our code base.
 """
 
-from typing import List, Tuple, Dict, Any
+import abc
+from typing import List, Tuple, Dict, Any, Optional
+import warnings
+import weakref
 
 import numpy as np
 from vivarium.core.store import Store
@@ -331,8 +334,120 @@ def bulk_numpy_updater(
     return result
 
 
+class UniqueViewCache:
+    """Caches the attributes of active unique molecules pulled out by
+    :py:func:`attrs`. Unique molecule stores only change when
+    :py:class:`UniqueNumpyUpdater` applies the updates accumulated over an
+    execution layer, so every process and listener that reads the same
+    attribute of a store in between can share a single copy. The active row
+    indices of each store are computed once per version of the store and
+    each attribute is copied at most once per version.
+
+    Only read-only arrays (unique molecule stores outside of the updater)
+    are cached. The cached arrays are read-only, so make a copy before
+    modifying them in place. Code that writes to a store array directly must
+    call :py:meth:`invalidate` afterwards.
+
+    Attributes:
+        hits: Number of attributes returned from the cache
+        misses: Number of attributes copied out of a store
+        bytes_copied: Total size of the copied attributes and active row
+            indices in bytes
+        n_invalidations: Number of times that a store was updated after
+            attributes were cached for it
+    """
+
+    def __init__(self):
+        # Maps id of store array to (weak reference to store array,
+        # active row indices, {attribute: cached array})
+        self._entries: Dict[
+            int, Tuple[weakref.ref, np.ndarray, Dict[str, np.ndarray]]
+        ] = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Resets the counters in :py:meth:`stats`."""
+        self.hits = 0
+        self.misses = 0
+        self.bytes_copied = 0
+        self.n_invalidations = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Returns the cache counters and the fraction of attributes
+        returned from the cache."""
+        n_requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / n_requests if n_requests > 0 else 0.0,
+            "bytes_copied": self.bytes_copied,
+            "n_invalidations": self.n_invalidations,
+        }
+
+    def _entry(self, states: np.ndarray):
+        key = id(states)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0]() is states:
+            return entry
+
+        def remove(ref, key=key):
+            # Only remove the entry for the array that was garbage collected
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is ref:
+                del self._entries[key]
+
+        # _entryState has dtype int8 so this works
+        active_idx = np.flatnonzero(states["_entryState"].view(np.bool_))
+        active_idx.flags.writeable = False
+        self.bytes_copied += active_idx.nbytes
+        entry = (weakref.ref(states, remove), active_idx, {})
+        self._entries[key] = entry
+        return entry
+
+    def active_indices(self, states: np.ndarray) -> np.ndarray:
+        """Returns the (read-only) row indices of active molecules."""
+        if states.flags.writeable:
+            return np.flatnonzero(states["_entryState"].view(np.bool_))
+        return self._entry(states)[1]
+
+    def get(self, states: np.ndarray, attributes: List[str]) -> List[np.ndarray]:
+        """See :py:func:`attrs`."""
+        if states.flags.writeable:
+            # Not a store array (e.g. while building initial state)
+            mol_mask = states["_entryState"].view(np.bool_)
+            return [np.asarray(states[attribute][mol_mask]) for attribute in attributes]
+        _, active_idx, columns = self._entry(states)
+        values = []
+        for attribute in attributes:
+            value = columns.get(attribute)
+            if value is None:
+                value = np.asarray(states[attribute][active_idx])
+                value.flags.writeable = False
+                columns[attribute] = value
+                self.misses += 1
+                self.bytes_copied += value.nbytes
+            else:
+                self.hits += 1
+            values.append(value)
+        return values
+
+    def invalidate(self, states: np.ndarray):
+        """Drops the cached attributes of a store array after it was
+        modified in place."""
+        entry = self._entries.pop(id(states), None)
+        if entry is not None and entry[0]() is states:
+            self.n_invalidations += 1
+
+
+unique_view_cache = UniqueViewCache()
+"""Cache used by :py:func:`attrs` for all unique molecule stores."""
+
+
 def attrs(states: MetadataArray, attributes: List[str]) -> List[np.ndarray]:
-    """Helper function to pull out arrays for unique molecule attributes
+    """Helper function to pull out arrays for unique molecule attributes.
+    Results for unique molecule stores are shared between all callers until
+    the store is next updated (see :py:class:`UniqueViewCache`) and must
+    not be modified in place.
 
     Args:
         states: Structured Numpy array for all unique molecules of a given
@@ -345,9 +460,326 @@ def attrs(states: MetadataArray, attributes: List[str]) -> List[np.ndarray]:
         corresponds to the value of that attribute for the nth active
         unique molecule in ``states``
     """
-    # _entryState has dtype int8 so this works
-    mol_mask = states["_entryState"].view(np.bool_)
-    return [np.asarray(states[attribute][mol_mask]) for attribute in attributes]
+    return unique_view_cache.get(states, attributes)
+
+
+class StoreLedger(abc.ABC):
+    """Base class for running totals of store arrays that are kept up to
+    date by the store updaters. Totals are dictionaries keyed by the identity
+    of the store array and dropped once the array is garbage collected.
+    Subclasses compute totals from scratch when a store is tracked and
+    implement :py:meth:`_drift` to compare them with the running totals.
+
+    Stores that are replaced (e.g. on division) or modified outside of the
+    updaters are not (correctly) tracked. Callers should periodically track
+    stores again, which recomputes their totals from scratch and records the
+    drift of the running totals.
+
+    Attributes:
+        n_audits: Number of times that an already tracked store was tracked
+            again (i.e. audited)
+        max_drift: Largest difference between running and recomputed totals
+            seen in an audit
+        tolerance: Drift above which a warning is issued
+    """
+
+    totals_name = "totals"
+
+    def __init__(self, tolerance: float = 0.0):
+        # Maps id of store array to (weak reference to store array, totals)
+        self._entries: Dict[int, Tuple[weakref.ref, Dict[str, Any]]] = {}
+        self.tolerance = tolerance
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Resets the counters in :py:meth:`stats`."""
+        self.n_audits = 0
+        self.max_drift = 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """Returns the audit counters."""
+        return {"n_audits": self.n_audits, "max_drift": self.max_drift}
+
+    def get(self, states: np.ndarray) -> Optional[Dict[str, Any]]:
+        """Returns the totals of a tracked store or None if untracked."""
+        entry = self._entries.get(id(states))
+        if entry is not None and entry[0]() is states:
+            return entry[1]
+        return None
+
+    @abc.abstractmethod
+    def _drift(self, old_totals: Dict[str, Any], totals: Dict[str, Any]) -> float:
+        """Returns the difference between running and recomputed totals."""
+
+    def _drifted(self, old_totals: Dict[str, Any], totals: Dict[str, Any]) -> bool:
+        """Returns whether the running totals drifted beyond the tolerance."""
+        return self._drift(old_totals, totals) > self.tolerance
+
+    def _track(self, states: np.ndarray, totals: Dict[str, Any]) -> Dict[str, Any]:
+        old_totals = self.get(states)
+        if old_totals is not None:
+            self.n_audits += 1
+            drift = self._drift(old_totals, totals)
+            self.max_drift = max(self.max_drift, drift)
+            if self._drifted(old_totals, totals):
+                warnings.warn(
+                    f"Running {self.totals_name} drifted by {drift:.3g}"
+                    " from recomputed totals. Some updates were applied"
+                    " outside of the store updaters."
+                )
+
+        key = id(states)
+
+        def remove(ref, key=key):
+            # Only remove the entry for the array that was garbage collected
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is ref:
+                del self._entries[key]
+
+        self._entries[key] = (weakref.ref(states, remove), totals)
+        return totals
+
+    def move(self, states: np.ndarray, new_states: np.ndarray):
+        """Transfers the totals of a store to the array replacing it."""
+        totals = self.get(states)
+        if totals is not None and new_states is not states:
+            del self._entries[id(states)]
+            self._track(new_states, totals)
+
+
+class MassLedger(StoreLedger):
+    """Running totals of the submasses of bulk and unique molecule stores.
+    Once a unique molecule store is tracked (see :py:meth:`track_unique`),
+    :py:class:`UniqueNumpyUpdater` folds every change it applies into its
+    totals, so reading the mass of a store costs nothing and keeping it up
+    to date costs time proportional to the number of changed entries. Bulk
+    stores (see :py:meth:`track_bulk`) keep a copy of the counts instead and
+    :py:meth:`get_bulk` folds in the rows whose counts changed since it was
+    last called, so bulk updates do no extra work.
+
+    Drift is the largest absolute difference between running and recomputed
+    submasses. A warning is issued for submasses that are not close (see
+    :py:func:`numpy.isclose`) within ``tolerance`` (relative) and ``atol``
+    (absolute, in the units of the submasses), so that floating point
+    residue in submasses that should be zero does not cause warnings.
+    """
+
+    totals_name = "submass totals"
+
+    def __init__(self, tolerance: float = 1e-6, atol: float = 1e-9):
+        super().__init__(tolerance)
+        self.atol = atol
+
+    def _drift(self, old_totals: Dict[str, Any], totals: Dict[str, Any]) -> float:
+        return np.max(
+            np.abs(old_totals["submasses"] - totals["submasses"]), initial=0.0
+        )
+
+    def _drifted(self, old_totals: Dict[str, Any], totals: Dict[str, Any]) -> bool:
+        return not np.allclose(
+            old_totals["submasses"],
+            totals["submasses"],
+            rtol=self.tolerance,
+            atol=self.atol,
+        )
+
+    def track_bulk(
+        self,
+        states: np.ndarray,
+        masses: np.ndarray,
+        compartments: np.ndarray,
+        n_compartments: int,
+    ) -> Dict[str, Any]:
+        """Computes the total submasses of a bulk molecule store and keeps
+        them up to date from now on.
+
+        Args:
+            states: Bulk molecule structured array
+            masses: Submasses of each row of ``states``
+                (rows x submasses)
+            compartments: Compartment index of each row of ``states``
+                (-1 for molecules not in any compartment)
+            n_compartments: Number of compartments
+
+        Returns:
+            Dictionary with running totals under the keys ``submasses``
+            (1D array) and ``compartment_masses`` (compartments x submasses)
+        """
+        # Bring the running totals up to date before they are audited
+        self.get_bulk(states)
+        weighted_masses = states["count"][:, np.newaxis] * masses
+        # Extra row collects molecules not in any compartment
+        compartment_masses = np.zeros((n_compartments + 1, masses.shape[1]))
+        np.add.at(compartment_masses, compartments, weighted_masses)
+        return self._track(
+            states,
+            {
+                "masses": masses,
+                "compartments": compartments,
+                "counts": states["count"].copy(),
+                "submasses": weighted_masses.sum(axis=0),
+                "compartment_masses": compartment_masses[:n_compartments],
+                "_all_compartment_masses": compartment_masses,
+            },
+        )
+
+    def get_bulk(self, states: np.ndarray) -> Optional[Dict[str, Any]]:
+        """Returns the totals of a tracked bulk molecule store (or None if
+        untracked) after adding the masses of all changes in counts since
+        the last call."""
+        totals = self.get(states)
+        if totals is not None:
+            rows = np.flatnonzero(states["count"] != totals["counts"])
+            if len(rows) > 0:
+                self.add_bulk_changes(
+                    totals, rows, states["count"][rows] - totals["counts"][rows]
+                )
+                totals["counts"][rows] = states["count"][rows]
+        return totals
+
+    def track_unique(
+        self, states: np.ndarray, mass: np.ndarray, mass_diff_names: List[str]
+    ) -> Dict[str, Any]:
+        """Computes the total submasses of a unique molecule store and keeps
+        them up to date from now on.
+
+        Args:
+            states: Unique molecule structured array
+            mass: Submasses of one molecule without any mass differences
+            mass_diff_names: Attributes holding the mass difference of each
+                molecule for each submass (in the same order as ``mass``)
+
+        Returns:
+            Dictionary with running totals under the key ``submasses``
+        """
+        totals = {
+            "mass": np.asarray(mass, dtype=np.float64),
+            "columns": {name: i for i, name in enumerate(mass_diff_names)},
+            "submasses": np.zeros(len(mass_diff_names)),
+        }
+        self.add_unique_rows(totals, states, np.flatnonzero(states["_entryState"]))
+        return self._track(states, totals)
+
+    @staticmethod
+    def add_bulk_changes(
+        totals: Dict[str, Any], rows: np.ndarray, count_changes: np.ndarray
+    ):
+        """Adds the masses of changes in the counts of some bulk molecules.
+        The rows must be unique."""
+        weighted_masses = count_changes[:, np.newaxis] * totals["masses"][rows]
+        totals["submasses"] += weighted_masses.sum(axis=0)
+        np.add.at(
+            totals["_all_compartment_masses"],
+            totals["compartments"][rows],
+            weighted_masses,
+        )
+
+    @staticmethod
+    def add_unique_rows(
+        totals: Dict[str, Any], states: np.ndarray, rows: np.ndarray, sign: int = 1
+    ):
+        """Adds (or subtracts with ``sign=-1``) the masses of the active
+        molecules among some rows of a unique molecule store."""
+        rows = np.unique(rows)
+        rows = rows[states["_entryState"][rows].view(np.bool_)]
+        totals["submasses"] += sign * len(rows) * totals["mass"]
+        for column, submass_idx in totals["columns"].items():
+            totals["submasses"][submass_idx] += sign * states[column][rows].sum()
+
+
+mass_ledger = MassLedger()
+"""Running submass totals updated by the bulk and unique molecule updaters."""
+
+
+class UniqueCountLedger(StoreLedger):
+    """Running counts of the active molecules in unique molecule stores.
+    Once a store is tracked (see :py:meth:`track`),
+    :py:class:`UniqueNumpyUpdater` updates its counts as molecules are added
+    and deleted, so reading them costs nothing. Counts can optionally be
+    broken down by the value of an integer attribute (e.g. ``TU_index`` of
+    RNAs), which are also updated when that attribute is set. Drift is the
+    largest absolute difference in any count.
+    """
+
+    totals_name = "unique molecule counts"
+
+    def _drift(self, old_totals: Dict[str, Any], totals: Dict[str, Any]) -> float:
+        drift = abs(old_totals["count"] - totals["count"])
+        if totals["group_by"] is not None and (
+            old_totals["group_by"] == totals["group_by"]
+            and len(old_totals["group_counts"]) == len(totals["group_counts"])
+        ):
+            drift = max(
+                drift,
+                np.abs(old_totals["group_counts"] - totals["group_counts"]).max(
+                    initial=0
+                ),
+            )
+        return float(drift)
+
+    def track(
+        self,
+        states: np.ndarray,
+        group_by: Optional[str] = None,
+        n_groups: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Counts the active molecules of a unique molecule store and keeps
+        the counts up to date from now on.
+
+        Args:
+            states: Unique molecule structured array
+            group_by: Integer attribute to also count molecules by (if
+                None, keeps counting by the attribute that the store is
+                already tracked with, if any)
+            n_groups: Number of groups (e.g. number of TUs), required with
+                ``group_by``. Values of ``group_by`` outside of
+                ``[0, n_groups)`` are not counted.
+
+        Returns:
+            Dictionary with running counts under the keys ``count``
+            (number of active molecules) and ``group_counts`` (number of
+            active molecules with each value of ``group_by`` or None)
+        """
+        old_totals = self.get(states)
+        if group_by is None and old_totals is not None:
+            group_by = old_totals["group_by"]
+            if group_by is not None:
+                n_groups = len(old_totals["group_counts"])
+        if group_by is not None and n_groups is None:
+            raise ValueError(f"Number of groups required to count by {group_by}.")
+        totals = {
+            "count": 0,
+            "group_by": group_by,
+            "group_counts": None
+            if group_by is None
+            else np.zeros(n_groups, dtype=np.int64),
+        }
+        self.add_rows(totals, states, np.flatnonzero(states["_entryState"]))
+        return self._track(states, totals)
+
+    @staticmethod
+    def add_groups(totals: Dict[str, Any], values: np.ndarray, sign: int = 1):
+        """Adds (or subtracts with ``sign=-1``) molecules with the given
+        values of the attribute that molecules are counted by."""
+        n_groups = len(totals["group_counts"])
+        values = values[(values >= 0) & (values < n_groups)]
+        totals["group_counts"] += sign * np.bincount(values, minlength=n_groups)
+
+    @staticmethod
+    def add_rows(
+        totals: Dict[str, Any], states: np.ndarray, rows: np.ndarray, sign: int = 1
+    ):
+        """Adds (or subtracts with ``sign=-1``) the active molecules among
+        some rows of a unique molecule store."""
+        rows = np.unique(rows)
+        rows = rows[states["_entryState"][rows].view(np.bool_)]
+        totals["count"] += sign * len(rows)
+        if totals["group_by"] is not None:
+            UniqueCountLedger.add_groups(totals, states[totals["group_by"]][rows], sign)
+
+
+unique_count_ledger = UniqueCountLedger()
+"""Running unique molecule counts updated by the unique molecule updater."""
 
 
 def get_free_indices(
@@ -519,6 +951,19 @@ class UniqueNumpyUpdater:
         if not update.get("update", False):
             return current
 
+        # Store is unchanged so cached attributes are still valid
+        if (
+            len(self.set_updates) == 0
+            and len(self.add_updates) == 0
+            and len(self.delete_updates) == 0
+        ):
+            current.flags.writeable = False
+            return current
+
+        unique_view_cache.invalidate(current)
+        totals = mass_ledger.get(current)
+        count_totals = unique_count_ledger.get(current)
+        group_by = None if count_totals is None else count_totals["group_by"]
         result = current
         # Numpy arrays are read-only outside of updater
         result.flags.writeable = True
@@ -531,7 +976,23 @@ class UniqueNumpyUpdater:
             # each value is an array. They are designed to apply to all rows
             # (molecules) that were active at the beginning of a timestep
             for col, col_values in set_update.items():
+                if col == group_by:
+                    unique_count_ledger.add_groups(
+                        count_totals, result[col][active_mask], sign=-1
+                    )
+                if totals is not None and col in totals["columns"]:
+                    totals["submasses"][totals["columns"][col]] -= result[col][
+                        active_mask
+                    ].sum()
                 result[col][active_mask] = col_values
+                if totals is not None and col in totals["columns"]:
+                    totals["submasses"][totals["columns"][col]] += result[col][
+                        active_mask
+                    ].sum()
+                if col == group_by:
+                    unique_count_ledger.add_groups(
+                        count_totals, result[col][active_mask]
+                    )
         for add_update in self.add_updates:
             # Add updates are dictionaries where each key is a column and
             # each value is an array. The nth element of each array is the value
@@ -546,11 +1007,26 @@ class UniqueNumpyUpdater:
             for col, col_values in add_update.items():
                 result[col][free_indices] = col_values
             result["_entryState"][free_indices] = 1
+            if totals is not None:
+                mass_ledger.add_unique_rows(totals, result, free_indices)
+            if count_totals is not None:
+                unique_count_ledger.add_rows(count_totals, result, free_indices)
         for delete_indices in self.delete_updates:
             # Delete updates are arrays of active row indices to delete
             rows_to_delete = initially_active_idx[delete_indices]
+            if totals is not None:
+                mass_ledger.add_unique_rows(totals, result, rows_to_delete, sign=-1)
+            if count_totals is not None:
+                unique_count_ledger.add_rows(
+                    count_totals, result, rows_to_delete, sign=-1
+                )
             result[rows_to_delete] = np.zeros(1, dtype=result.dtype)
 
+        if result is not current:
+            # Array was grown to fit new molecules
+            mass_ledger.move(current, result)
+            unique_count_ledger.move(current, result)
+
         self.add_updates = []
         self.delete_updates = []
         self.set_updates = []
@@ -955,3 +1431,238 @@ def get_descendent_domains(root_domains, domain_index, child_domains, place_hold
             ]
         )
     )
+
+
+class DomainTree:
+    """Index-backed view of the chromosome domain tree. Domain indexes are
+    small non-negative integers, so the position of each domain in the
+    chromosome domain arrays is kept in a lookup array indexed by domain
+    index. This turns the per-domain ``np.where`` scans needed to follow the
+    tree into single array lookups, so batched replication initiation and
+    termination updates cost O(domains involved) instead of O(domains x
+    molecules).
+
+    Args:
+        domain_index: Array of all domain indices for chromosome domains
+        child_domains: Array of child domains for each index in
+            ``domain_index``
+        place_holder: Placeholder domain index (e.g. used in
+            ``child_domains`` for domain indices that do not have any child
+            domains)
+    """
+
+    def __init__(
+        self, domain_index: np.ndarray, child_domains: np.ndarray, place_holder: int
+    ):
+        self.domain_index = domain_index
+        self.child_domains = child_domains
+        self.place_holder = place_holder
+        self.size = domain_index.max() + 1 if len(domain_index) > 0 else 0
+        self._positions = np.full(self.size, -1, dtype=np.int64)
+        self._positions[domain_index] = np.arange(len(domain_index))
+
+    def positions(self, domains: np.ndarray) -> np.ndarray:
+        """Returns the positions of the given domains in ``domain_index``."""
+        return self._positions[domains]
+
+    def children(self, domains: np.ndarray) -> np.ndarray:
+        """Returns the child domains (one row per domain) of the given
+        domains."""
+        return self.child_domains[self.positions(domains)]
+
+    def add_children(self, parent_domains: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Creates two new child domains for each of the given (childless)
+        domains. New domain indexes are assigned in order of the parents'
+        positions in ``domain_index``, two consecutive indexes per parent.
+
+        Returns:
+            Tuple of the domain indexes of the new domains and the updated
+            child domains of all existing domains
+        """
+        parent_positions = np.sort(self.positions(parent_domains))
+        new_domains = np.arange(
+            self.size, self.size + 2 * len(parent_positions), dtype=np.int32
+        )
+        child_domains = self.child_domains.copy()
+        child_domains[parent_positions] = new_domains.reshape(-1, 2)
+        return new_domains, child_domains
+
+    def replace_with_first_child(
+        self, domains: np.ndarray, finished_domains: np.ndarray
+    ) -> np.ndarray:
+        """Replaces each of ``domains`` that is in ``finished_domains`` with
+        its first child domain, repeating for children that have also
+        finished.
+
+        Returns:
+            Copy of ``domains`` with finished domains replaced
+        """
+        domains = np.array(domains)
+        first_child = np.full(self.size, -1, dtype=np.int64)
+        first_child[finished_domains] = self.children(finished_domains)[:, 0]
+        while True:
+            to_replace = np.flatnonzero(first_child[domains] != -1)
+            if len(to_replace) == 0:
+                return domains
+            domains[to_replace] = first_child[domains[to_replace]]
+
+
+def test_unique_view_cache():
+    dtype = [("unique_index", np.int64), ("_entryState", np.int8), ("x", np.float64)]
+    store = MetadataArray(np.zeros(5, dtype=dtype), 3)
+    store["_entryState"][[0, 2, 3]] = 1
+    store["unique_index"][[0, 2, 3]] = [0, 1, 2]
+    store["x"][[0, 2, 3]] = [1.0, 2.0, 3.0]
+    updater = UniqueNumpyUpdater().updater
+    store = updater(store, {"update": True})
+    unique_view_cache.reset_stats()
+
+    # Attributes are copied once and shared until the store is updated
+    (x,) = attrs(store, ["x"])
+    (x_again, unique_index) = attrs(store, ["x", "unique_index"])
+    assert x is x_again
+    np.testing.assert_array_equal(x, [1.0, 2.0, 3.0])
+    assert not x.flags.writeable
+    assert unique_view_cache.stats()["hits"] == 1
+    assert unique_view_cache.stats()["misses"] == 2
+
+    # Layers without updates keep the cache
+    store = updater(store, {"update": True})
+    assert attrs(store, ["x"])[0] is x
+
+    # Updates invalidate the cache
+    updater(store, {"set": {"x": x * 2}})
+    updater(store, {"delete": [1]})
+    store = updater(store, {"add": {"x": [4.0]}, "update": True})
+    (new_x,) = attrs(store, ["x"])
+    np.testing.assert_array_equal(new_x, [2.0, 4.0, 6.0])
+    np.testing.assert_array_equal(x, [1.0, 2.0, 3.0])
+    assert unique_view_cache.stats()["n_invalidations"] == 1
+
+    # Writeable arrays (e.g. initial state being built) are not cached
+    initial = np.zeros(2, dtype=dtype)
+    initial["_entryState"][1] = 1
+    initial["x"][1] = 5.0
+    (initial_x,) = attrs(initial, ["x"])
+    np.testing.assert_array_equal(initial_x, [5.0])
+    assert initial_x.flags.writeable
+
+
+def test_mass_ledger():
+    bulk_dtype = [("id", "U10"), ("count", np.int64)]
+    bulk = np.zeros(4, dtype=bulk_dtype)
+    bulk["count"] = [1, 2, 3, 4]
+    bulk.flags.writeable = False
+    masses = np.array([[1.0, 0.0], [0.0, 2.0], [3.0, 0.0], [0.0, 0.0]])
+    totals = mass_ledger.track_bulk(bulk, masses, np.array([0, 1, 0, -1]), 2)
+    np.testing.assert_allclose(totals["submasses"], [10.0, 4.0])
+    np.testing.assert_allclose(totals["compartment_masses"], [[10.0, 0.0], [0.0, 4.0]])
+
+    # Repeated indices only change counts once
+    bulk = bulk_numpy_updater(bulk, [(np.array([0, 0]), 2), (2, -1), (slice(1, 3), 1)])
+    np.testing.assert_array_equal(bulk["count"], [3, 3, 3, 4])
+    assert mass_ledger.get_bulk(bulk) is totals
+    np.testing.assert_allclose(totals["submasses"], [12.0, 6.0])
+    np.testing.assert_allclose(totals["compartment_masses"], [[12.0, 0.0], [0.0, 6.0]])
+
+    dtype = [
+        ("unique_index", np.int64),
+        ("_entryState", np.int8),
+        ("massDiff_a", np.float64),
+        ("massDiff_b", np.float64),
+    ]
+    store = MetadataArray(np.zeros(2, dtype=dtype), 1)
+    store["_entryState"][0] = 1
+    store["massDiff_a"][0] = 0.5
+    store.flags.writeable = False
+    totals = mass_ledger.track_unique(store, [1.0, 1.0], ["massDiff_a", "massDiff_b"])
+    np.testing.assert_allclose(totals["submasses"], [1.5, 1.0])
+
+    # Store is grown to fit new molecules and running totals follow it
+    updater = UniqueNumpyUpdater().updater
+    updater(store, {"set": {"massDiff_b": np.array([2.0])}})
+    store = updater(
+        store,
+        {"add": {"massDiff_a": np.ones(3), "massDiff_b": np.zeros(3)}, "update": True},
+    )
+    totals = mass_ledger.get(store)
+    np.testing.assert_allclose(totals["submasses"], [7.5, 6.0])
+    store = updater(store, {"delete": [0, 1], "update": True})
+    np.testing.assert_allclose(totals["submasses"], [4.0, 2.0])
+
+    # Tracking again audits the running totals against recalculated totals
+    mass_ledger.reset_stats()
+    mass_ledger.track_unique(store, [1.0, 1.0], ["massDiff_a", "massDiff_b"])
+    assert mass_ledger.stats()["n_audits"] == 1
+    assert mass_ledger.stats()["max_drift"] < 1e-12
+
+    # Floating point residue in submasses that should be zero is not drift
+    mass = [1.0, 0.0]
+    store = MetadataArray(np.zeros(2, dtype=dtype), 0)
+    store["_entryState"] = 1
+    store.flags.writeable = False
+    mass_ledger.track_unique(store, mass, ["massDiff_a", "massDiff_b"])
+    store = updater(store, {"set": {"massDiff_b": np.full(2, 0.1)}})
+    store = updater(store, {"set": {"massDiff_b": np.zeros(2)}})
+    mass_ledger.get(store)["submasses"][1] = 1e-16
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        mass_ledger.track_unique(store, mass, ["massDiff_a", "massDiff_b"])
+        assert len(caught) == 0
+        mass_ledger.get(store)["submasses"][0] += 1e-3
+        mass_ledger.track_unique(store, mass, ["massDiff_a", "massDiff_b"])
+        assert len(caught) == 1 and "drifted" in str(caught[0].message)
+
+
+def test_unique_count_ledger():
+    dtype = [
+        ("unique_index", np.int64),
+        ("_entryState", np.int8),
+        ("TU_index", np.int64),
+    ]
+    store = MetadataArray(np.zeros(3, dtype=dtype), 2)
+    store["unique_index"][:2] = [0, 1]
+    store["_entryState"][:2] = 1
+    store["TU_index"][:2] = [1, 1]
+    store.flags.writeable = False
+    totals = unique_count_ledger.track(store, group_by="TU_index", n_groups=4)
+    assert totals["count"] == 2
+    np.testing.assert_array_equal(totals["group_counts"], [0, 2, 0, 0])
+
+    # Counts follow additions, deletions, and sets of the grouping attribute
+    # (values outside of the configured groups are not counted)
+    updater = UniqueNumpyUpdater().updater
+    updater(store, {"set": {"TU_index": np.array([0, 1])}})
+    store = updater(store, {"add": {"TU_index": np.array([3, 3, 4])}, "update": True})
+    totals = unique_count_ledger.get(store)
+    assert totals["count"] == 5
+    np.testing.assert_array_equal(totals["group_counts"], [1, 1, 0, 2])
+    store = updater(store, {"delete": [0, 2], "update": True})
+    assert totals["count"] == 3
+    np.testing.assert_array_equal(totals["group_counts"], [0, 1, 0, 1])
+
+    # Tracking again validates the running counts against the active rows
+    unique_count_ledger.reset_stats()
+    unique_count_ledger.track(store)
+    assert unique_count_ledger.get(store)["group_by"] == "TU_index"
+    assert unique_count_ledger.stats() == {"n_audits": 1, "max_drift": 0.0}
+
+
+def test_domain_tree():
+    # 0 -> (1, 2), 1 -> (3, 4); domains stored out of order
+    domain_index = np.array([2, 0, 4, 1, 3])
+    child_domains = np.array([[-1, -1], [1, 2], [-1, -1], [3, 4], [-1, -1]])
+    tree = DomainTree(domain_index, child_domains, -1)
+    np.testing.assert_array_equal(tree.children(np.array([0, 1])), [[1, 2], [3, 4]])
+
+    # New domains are numbered after the largest existing domain index
+    new_domains, new_child_domains = tree.add_children(np.array([3, 2, 4]))
+    np.testing.assert_array_equal(new_domains, [5, 6, 7, 8, 9, 10])
+    np.testing.assert_array_equal(
+        new_child_domains[[0, 2, 4]], [[5, 6], [7, 8], [9, 10]]
+    )
+    assert np.all(child_domains[[0, 2, 4]] == -1)
+
+    # Chains of finished domains are followed to the first unfinished child
+    replaced = tree.replace_with_first_child(np.array([0, 2]), np.array([0, 1]))
+    np.testing.assert_array_equal(replaced, [3, 2])
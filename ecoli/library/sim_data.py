@@ -1,5 +1,8 @@
 import re
 import binascii
+import hashlib
+import io
+import json
 from itertools import chain
 import numpy as np
 import pandas as pd
@@ -14,6 +17,7 @@ from wholecell.utils.filepath import ROOT_PATH
 
 from ecoli.processes.polypeptide_elongation import MICROMOLAR_UNITS
 from ecoli.library.parameters import param_store
+from ecoli.library.schema import MetadataArray
 from ecoli.library.initial_conditions import (
     calculate_cell_mass,
     initialize_bulk_counts,
@@ -26,6 +30,58 @@ if TYPE_CHECKING:
     from reconstruction.ecoli.simulation_data import SimulationDataEcoli
 
 RAND_MAX = 2**31
+# Bump whenever the format or contents of cached initial states change
+INITIAL_STATE_CACHE_VERSION = 3
+# Bump whenever the format of process config bundles changes
+PROCESS_CONFIG_BUNDLE_VERSION = 2
+# Hashes of sim_data files keyed by (path, modification time, size)
+_SIM_DATA_HASHES: dict[tuple[str, int, int], str] = {}
+
+
+def hash_sim_data(sim_data_path: str) -> str:
+    """
+    Computes the SHA-256 digest of a sim_data pickle, reusing the digest from
+    previous calls if the file has not been modified since.
+    """
+    stat = os.stat(sim_data_path)
+    file_key = (os.path.abspath(sim_data_path), stat.st_mtime_ns, stat.st_size)
+    if file_key not in _SIM_DATA_HASHES:
+        digest = hashlib.sha256()
+        with open(sim_data_path, "rb") as sim_data_file:
+            for chunk in iter(lambda: sim_data_file.read(2**20), b""):
+                digest.update(chunk)
+        _SIM_DATA_HASHES[file_key] = digest.hexdigest()
+    return _SIM_DATA_HASHES[file_key]
+
+
+def hash_options(key: dict[str, Any]) -> str:
+    """
+    Computes the SHA-256 digest of a dictionary of options. Arrays are
+    hashed by value (their ``repr`` abbreviates large arrays).
+    """
+
+    def to_json(value):
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        if isinstance(value, np.generic):
+            return value.item()
+        return repr(value)
+
+    return hashlib.sha256(
+        json.dumps(key, sort_keys=True, default=to_json).encode("utf-8")
+    ).hexdigest()
+
+
+def write_atomically(path: str, data: bytes):
+    """
+    Writes to a temporary file first and then renames it so that concurrent
+    readers never see a partially written file.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
 
 
 class LoadSimData:
@@ -57,6 +113,9 @@ class LoadSimData:
         aa_supply_in_charging: bool = True,
         disable_ppgpp_elongation_inhibition: bool = False,
         emit_unique: bool = False,
+        virtual_listeners: bool = False,
+        initial_state_cache: Optional[str] = None,
+        process_config_bundle: Optional[str] = None,
         **kwargs,
     ):
         """
@@ -134,7 +193,22 @@ class LoadSimData:
             disable_ppgpp_elongation_inhibition: Turn off ppGpp-mediated
                 inhibition in :py:class:`~ecoli.processes.polypeptide_elongation.PolypeptideElongation`
                 when ``trna_charging`` is ``True``
+            emit_unique: Emit all unique molecule data (for debugging)
+            virtual_listeners: Skip emitting listener columns that can be
+                computed from other emitted columns and sim_data (see
+                :py:func:`~ecoli.library.parquet_emitter.add_virtual_columns`)
+            initial_state_cache: Directory in which to cache initial states
+                generated by :py:meth:`generate_initial_state`, keyed by the
+                hash of the sim_data file, seed, position of
+                :py:attr:`random_state`, and all other options (see
+                :py:meth:`initial_state_cache_key`)
+            process_config_bundle: Directory in which to save the configs
+                returned by :py:meth:`get_config_by_name` for each sim_data
+                file and set of options (see :py:meth:`save_process_config_bundle`).
+                If a bundle was saved, sim_data is only loaded if a config not
+                in the bundle is requested or sim_data is accessed directly.
         """
+        self.sim_data_path = sim_data_path
         self.seed = seed
         self.max_duration = max_duration
         self.random_state = np.random.RandomState(seed=seed)
@@ -162,14 +236,110 @@ class LoadSimData:
         self.disable_ppgpp_elongation_inhibition = disable_ppgpp_elongation_inhibition
         self.recycle_stalled_elongation = recycle_stalled_elongation
         self.emit_unique = emit_unique
+        self.virtual_listeners = virtual_listeners
+        self.mar_regulon = mar_regulon
+        self.initial_state_cache = initial_state_cache
+        # Internal shift function and parameters applied to sim_data (if any)
+        self.internal_shift: Optional[tuple[str, tuple]] = None
 
         # NEW to vivarium-ecoli: Whether to lump miscRNA with mRNAs
         # when calculating degradation
         self.degrade_misc = False
 
+        # Only used by _load_sim_data to modify sim_data after loading it
+        self._agent_id = kwargs.get("agent_id")
+        self._amp_lysis = amp_lysis
+        # Copy sRNA-mRNA duplex options because process configs are replaced
+        # with full configs when processes are made
+        self._process_configs = {}
+        if isinstance(process_configs, dict) and isinstance(
+            process_configs.get("ecoli-rna-interference"), dict
+        ):
+            self._process_configs["ecoli-rna-interference"] = dict(
+                process_configs["ecoli-rna-interference"]
+            )
+
+        # Options that select which process config bundle to use
+        self.process_config_bundle = process_config_bundle
+        self._bundle_options = {
+            "max_duration": max_duration,
+            "media_timeline": media_timeline,
+            "condition": condition,
+            "trna_charging": trna_charging,
+            "ppgpp_regulation": ppgpp_regulation,
+            "mar_regulon": mar_regulon,
+            "amp_lysis": amp_lysis,
+            "initial_state_gaussian": initial_state_gaussian,
+            "superhelical_density": superhelical_density,
+            "recycle_stalled_elongation": recycle_stalled_elongation,
+            "mechanistic_replisome": mechanistic_replisome,
+            "trna_attenuation": trna_attenuation,
+            "variable_elongation_transcription": variable_elongation_transcription,
+            "variable_elongation_translation": variable_elongation_translation,
+            "mechanistic_translation_supply": mechanistic_translation_supply,
+            "mechanistic_aa_transport": mechanistic_aa_transport,
+            "translation_supply": translation_supply,
+            "aa_supply_in_charging": aa_supply_in_charging,
+            "disable_ppgpp_elongation_inhibition": disable_ppgpp_elongation_inhibition,
+            "emit_unique": emit_unique,
+            "virtual_listeners": virtual_listeners,
+        }
+        # Only these sRNA-mRNA duplex options are used to modify sim_data
+        if "ecoli-rna-interference" in self._process_configs:
+            self._bundle_options["rna_interference"] = {
+                key: self._process_configs["ecoli-rna-interference"].get(key)
+                for key in [
+                    "duplex_ids",
+                    "duplex_deg_rates",
+                    "duplex_km",
+                    "srna_ids",
+                    "target_ids",
+                    "binding_probs",
+                ]
+            }
+        # Maps (name, time_step) to (config without seed, seed source) for
+        # configs read from a saved bundle
+        self._config_bundle: Optional[dict[tuple[str, Any], tuple[dict, Any]]] = None
+        # Stream of configs to save, pickled with a single Pickler so that
+        # objects shared by configs are only stored once
+        self._bundle_stream: Optional[io.BytesIO] = None
+        self._bundle_pickler: Optional[pickle.Pickler] = None
+        self._config_bundle_updated = False
+        # Names passed to _seedFromName while recording seed sources
+        self._seed_names: Optional[list[str]] = None
+
+        self._sim_data: Optional["SimulationDataEcoli"] = None
+        saved_bundle = None
+        if self.process_config_bundle is not None:
+            saved_bundle = self._read_process_config_bundle()
+        if saved_bundle is None:
+            self._load_sim_data()
+        else:
+            self._config_bundle = self._unpickle_config_bundle(saved_bundle)
+
+    @property
+    def sim_data(self) -> "SimulationDataEcoli":
+        """Simulation data, loaded from ``sim_data_path`` on first access
+        if a process config bundle was used instead."""
+        if self._sim_data is None:
+            self._load_sim_data()
+        return self._sim_data
+
+    def _load_sim_data(self):
+        """
+        Loads sim_data and applies all modifications configured by options
+        (condition, internal shifts, marA regulon, sRNA-mRNA duplexes, and
+        ampicillin).
+        """
+        sim_data_path = self.sim_data_path
+        condition = self._bundle_options["condition"]
+        mar_regulon = self.mar_regulon
+        process_configs = self._process_configs
+        amp_lysis = self._amp_lysis
+
         # load sim_data
         with open(sim_data_path, "rb") as sim_data_file:
-            self.sim_data: "SimulationDataEcoli" = pickle.load(sim_data_file)
+            self._sim_data = pickle.load(sim_data_file)
 
         if condition is not None:
             self.sim_data.condition = condition
@@ -181,8 +351,8 @@ class LoadSimData:
         }
 
         # Logic to handle internal shifts
-        if "agent_id" in kwargs and hasattr(self.sim_data, "internal_shift_dict"):
-            generation = len(kwargs["agent_id"])
+        if self._agent_id is not None and hasattr(self.sim_data, "internal_shift_dict"):
+            generation = len(self._agent_id)
             func_to_apply = None
             func_params = ()
             for shift_gen, (
@@ -194,6 +364,7 @@ class LoadSimData:
                     func_params = shift_params
             if func_to_apply is not None:
                 func_to_apply(self.sim_data, *func_params)
+                self.internal_shift = (func_to_apply.__name__, func_params)
 
         # NEW to vivarium-ecoli
         # Changes gene expression upon tetracycline exposure
@@ -571,6 +742,8 @@ class LoadSimData:
         return [int(np.where(rna_ids == name)[0][0]) for name in names]
 
     def _seedFromName(self, name):
+        if self._seed_names is not None:
+            self._seed_names.append(name)
         return binascii.crc32(name.encode("utf-8"), self.seed) & 0xFFFFFFFF
 
     def get_config_by_name(self, name, time_step=1):
@@ -608,15 +781,180 @@ class LoadSimData:
             "exchange_data": self.get_exchange_data_config,
             "media_update": self.get_media_update_config,
             "bulk-timeline": self.get_bulk_timeline_config,
+            "unique-update": self.get_unique_update_config,
+            "ecoli-cell-division": self.get_cell_division_config,
         }
 
         try:
-            return name_config_mapping[name](time_step=time_step)
+            if self.process_config_bundle is None:
+                return name_config_mapping[name](time_step=time_step)
+            return self._get_bundled_config(name, time_step, name_config_mapping[name])
         except KeyError:
             raise KeyError(
                 f"Process of name {name} is not known to LoadSimData.get_config_by_name"
             )
 
+    def _get_bundled_config(self, name, time_step, get_config):
+        """
+        Returns a config from the process config bundle, or gets it with
+        ``get_config`` and adds it to the bundle. Seeds are not bundled but
+        drawn again in the same way as ``get_config`` drew them, so configs
+        from bundles are identical to those made from sim_data.
+        """
+        entry = None
+        if self._config_bundle is not None:
+            entry = self._config_bundle.get((name, time_step))
+        if entry is not None:
+            # Copy so that adding the seed does not change the bundled config
+            config, seed_source = dict(entry[0]), entry[1]
+            if seed_source is True:
+                config["seed"] = self.random_state.randint(RAND_MAX)
+            elif seed_source is not None:
+                config["seed"] = self._seedFromName(seed_source)
+            return config
+
+        # Config getters use attributes set while loading sim_data
+        if self._sim_data is None:
+            self._load_sim_data()
+        self._seed_names = []
+        try:
+            config = get_config(time_step=time_step)
+        finally:
+            seed_names = self._seed_names
+            self._seed_names = None
+        if "seed" not in config:
+            seed_source = None
+        elif len(seed_names) == 0:
+            # Drawn from self.random_state
+            seed_source = True
+        elif len(seed_names) == 1:
+            seed_source = seed_names[0]
+        else:
+            return config
+        # Pickle now so that processes modifying their config in place
+        # do not change the bundled config
+        self._add_to_config_bundle(
+            (name, time_step),
+            {key: value for key, value in config.items() if key != "seed"},
+            seed_source,
+        )
+        return config
+
+    @staticmethod
+    def _unpickle_config_bundle(
+        saved_bundle: bytes,
+    ) -> dict[tuple[str, Any], tuple[dict, Any]]:
+        """
+        Unpickles all ``(key, config, seed source)`` records of a saved
+        bundle with a single Unpickler, so objects shared by configs (e.g.
+        sim_data objects bound to methods in configs) are only loaded once.
+        """
+        unpickler = pickle.Unpickler(io.BytesIO(saved_bundle))
+        config_bundle = {}
+        while True:
+            try:
+                key, config, seed_source = unpickler.load()
+            except EOFError:
+                return config_bundle
+            config_bundle[key] = (config, seed_source)
+
+    def _add_to_config_bundle(self, key: tuple[str, Any], config: dict, seed_source):
+        """
+        Pickles a config into the stream of configs to save. Configs with
+        values that cannot be pickled are skipped and always made from sim_data.
+        """
+        if self._bundle_pickler is None:
+            self._bundle_stream = io.BytesIO()
+            self._bundle_pickler = pickle.Pickler(
+                self._bundle_stream, protocol=pickle.HIGHEST_PROTOCOL
+            )
+            # Records can only refer to objects pickled earlier by the same
+            # Pickler, so pickle (unmodified) saved configs again
+            saved_bundle = None
+            if self._config_bundle is not None:
+                saved_bundle = self._read_process_config_bundle()
+            if saved_bundle is not None:
+                saved_configs = self._unpickle_config_bundle(saved_bundle)
+                for saved_key, (saved_config, saved_source) in saved_configs.items():
+                    self._bundle_pickler.dump((saved_key, saved_config, saved_source))
+        position = self._bundle_stream.tell()
+        memo = self._bundle_pickler.memo.copy()
+        try:
+            self._bundle_pickler.dump((key, config, seed_source))
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # Discard the partially pickled record
+            self._bundle_stream.seek(position)
+            self._bundle_stream.truncate()
+            self._bundle_pickler.memo = memo
+            return
+        self._config_bundle_updated = True
+
+    def _process_config_bundle_path(self) -> Optional[str]:
+        """
+        Path of the process config bundle for the sim_data file and options
+        of this instance, or None if it cannot be known without loading
+        sim_data (internal shifts of sim_data file not saved yet).
+        """
+        sim_data_dir = os.path.join(
+            self.process_config_bundle, hash_sim_data(self.sim_data_path)
+        )
+        # Internal shift applied to sim_data depends on cell generation
+        internal_shift = None
+        if self._agent_id is not None:
+            shifts_path = os.path.join(sim_data_dir, "internal_shifts.json")
+            if not os.path.exists(shifts_path):
+                return None
+            with open(shifts_path) as f:
+                shift_generations = json.load(f)
+            generation = len(self._agent_id)
+            for shift_generation in shift_generations:
+                if generation >= shift_generation:
+                    internal_shift = shift_generation
+        key = {
+            "version": PROCESS_CONFIG_BUNDLE_VERSION,
+            "options": self._bundle_options,
+            "internal_shift": internal_shift,
+        }
+        return os.path.join(sim_data_dir, f"{hash_options(key)}.pkl")
+
+    def _read_process_config_bundle(self) -> Optional[bytes]:
+        """Reads the saved process config bundle, if any."""
+        bundle_path = self._process_config_bundle_path()
+        if bundle_path is None or not os.path.exists(bundle_path):
+            return None
+        with open(bundle_path, "rb") as f:
+            return f.read()
+
+    def save_process_config_bundle(self):
+        """
+        Saves all configs returned by :py:meth:`get_config_by_name` so far
+        (except seeds) to the ``process_config_bundle`` directory, where
+        instances with the same sim_data file and options (except seed) will
+        find them. Configs are pickled together, so objects shared by
+        configs (e.g. sim_data objects bound to methods in configs) are
+        stored and loaded once. Called by
+        :py:class:`~ecoli.composites.ecoli_master.Ecoli` after making all
+        processes and steps.
+        """
+        if self.process_config_bundle is None or not self._config_bundle_updated:
+            return
+        # Save internal shifts first so bundle path can be found without
+        # loading sim_data
+        shifts_path = os.path.join(
+            self.process_config_bundle,
+            hash_sim_data(self.sim_data_path),
+            "internal_shifts.json",
+        )
+        if not os.path.exists(shifts_path):
+            shift_generations = list(
+                getattr(self.sim_data, "internal_shift_dict", {}).keys()
+            )
+            write_atomically(shifts_path, json.dumps(shift_generations).encode())
+        write_atomically(
+            self._process_config_bundle_path(), self._bundle_stream.getvalue()
+        )
+        self._config_bundle_updated = False
+
     def get_chromosome_replication_config(self, time_step=1):
         get_dna_critical_mass = self.sim_data.mass.get_dna_critical_mass
         doubling_time = self.sim_data.condition_to_doubling_time[
@@ -1080,6 +1418,7 @@ class LoadSimData:
     def get_two_component_system_config(self, time_step=1):
         two_component_system_config = {
             "time_step": time_step,
+            # Numba-compiled derivatives, opt in through process_configs
             "jit": False,
             # TODO -- wcEcoli has this in 1/mmol, why?
             "n_avogadro": self.sim_data.constants.n_avogadro.asNumber(1 / units.mmol),
@@ -1087,6 +1426,7 @@ class LoadSimData:
                 units.g / units.L
             ),
             "moleculesToNextTimeStep": self.sim_data.process.two_component_system.molecules_to_next_time_step,
+            "make_integrator": self.sim_data.process.two_component_system.make_integrator,
             "moleculeNames": self.sim_data.process.two_component_system.molecule_names,
             "seed": self._seedFromName("TwoComponentSystem"),
             "emit_unique": self.emit_unique,
@@ -1098,6 +1438,7 @@ class LoadSimData:
     def get_equilibrium_config(self, time_step=1):
         equilibrium_config = {
             "time_step": time_step,
+            # Numba-compiled derivatives, opt in through process_configs
             "jit": False,
             "n_avogadro": self.sim_data.constants.n_avogadro.asNumber(1 / units.mol),
             "cell_density": self.sim_data.constants.cell_density.asNumber(
@@ -1437,6 +1778,7 @@ class LoadSimData:
             ],
             "cistron_tu_mapping_matrix": self.sim_data.process.transcription.cistron_tu_mapping_matrix,
             "emit_unique": self.emit_unique,
+            "virtual": self.virtual_listeners,
         }
         counts_config["mRNA_TU_ids"] = counts_config["all_TU_ids"][
             counts_config["mRNA_indexes"]
@@ -1498,6 +1840,7 @@ class LoadSimData:
             "equilibrium_stoich": self.sim_data.process.equilibrium.stoich_matrix_monomers(),
             "two_component_system_stoich": self.sim_data.process.two_component_system.stoich_matrix_monomers(),
             "emit_unique": self.emit_unique,
+            "virtual": self.virtual_listeners,
         }
 
         return monomer_counts_config
@@ -1524,6 +1867,22 @@ class LoadSimData:
         }
         return allocator_config
 
+    def get_unique_update_config(self, time_step=1):
+        unique_mols = (
+            self.sim_data.internal_state.unique_molecule.unique_molecule_definitions
+        ).keys()
+        unique_topo = {
+            unique_mol + "s": ("unique", unique_mol)
+            for unique_mol in unique_mols
+            if unique_mol not in ["active_ribosome", "DnaA_box"]
+        }
+        unique_topo["active_ribosome"] = ("unique", "active_ribosome")
+        unique_topo["DnaA_boxes"] = ("unique", "DnaA_box")
+        return {"unique_topo": unique_topo, "emit_unique": self.emit_unique}
+
+    def get_cell_division_config(self, time_step=1):
+        return {"dry_mass_inc_dict": self.sim_data.expectedDryMassIncreaseDict}
+
     def get_chromosome_structure_config(self, time_step=1):
         transcription = self.sim_data.process.transcription
         mature_rna_ids = transcription.mature_rna_data["id"]
@@ -1783,13 +2142,93 @@ class LoadSimData:
             },
         }
 
+    def initial_state_cache_key(self) -> str:
+        """
+        Content address of the initial state that :py:meth:`generate_initial_state`
+        would generate if called now. Covers the sim_data file contents, every
+        option that alters sim_data (including ampicillin lysis and sRNA-mRNA
+        duplexes, which add bulk molecules) or initial state generation, and
+        the current state of :py:attr:`random_state`, which some process
+        configs (e.g. RNA interference) draw from before the initial state is
+        generated.
+        """
+        key = {
+            "version": INITIAL_STATE_CACHE_VERSION,
+            "sim_data": hash_sim_data(self.sim_data_path),
+            "seed": self.seed,
+            "random_state": self.random_state.get_state(),
+            "options": self._bundle_options,
+            "timeline_id": self.sim_data.external_state.current_timeline_id,
+            "internal_shift": self.internal_shift,
+        }
+        return hash_options(key)
+
     def generate_initial_state(self):
         """
         Calculate the initial conditions for a new cell without inherited state
-        from a parent cell.
+        from a parent cell. If ``initial_state_cache`` is set, bulk and unique
+        molecule states are loaded from (or saved to) that directory and
+        :py:attr:`random_state` is left exactly as if they had been generated.
+        """
+        if self.initial_state_cache is None:
+            return self._generate_initial_state()
+
+        cache_path = os.path.join(
+            self.initial_state_cache, f"{self.initial_state_cache_key()}.pkl"
+        )
+        if os.path.exists(cache_path):
+            with open(cache_path, "rb") as f:
+                cached = pickle.load(f)
+            self.random_state.set_state(cached["random_state"])
+            initial_state = self._generate_initial_state(molecules=cached)
+        else:
+            initial_state = self._generate_initial_state()
+            cached = {
+                "bulk": np.asarray(initial_state["bulk"]),
+                # Pickling drops the metadata (next unique index) of unique arrays
+                "unique": {
+                    name: (np.asarray(unique_state), unique_state.metadata)
+                    for name, unique_state in initial_state["unique"].items()
+                },
+                "random_state": self.random_state.get_state(),
+            }
+            write_atomically(
+                cache_path, pickle.dumps(cached, protocol=pickle.HIGHEST_PROTOCOL)
+            )
+        return initial_state
+
+    def generate_initial_states(self, seeds: list[int]) -> list[dict[str, Any]]:
+        """
+        Generate the initial state for each seed by calling
+        :py:meth:`generate_initial_state` once per seed with a fresh
+        :py:attr:`random_state`. States are generated one at a time, but
+        loading sim_data, applying options, and seed-independent lookup tables
+        (see
+        :py:func:`~ecoli.library.initial_conditions.get_cistron_positions_in_TUs`)
+        are shared by all seeds. Each state is identical to the one generated
+        by a new :py:class:`LoadSimData` instance created with that seed.
+        """
+        seed = self.seed
+        random_state = self.random_state
+        initial_states = []
+        try:
+            for new_seed in seeds:
+                self.seed = new_seed
+                self.random_state = np.random.RandomState(seed=new_seed)
+                initial_states.append(self.generate_initial_state())
+        finally:
+            self.seed = seed
+            self.random_state = random_state
+        return initial_states
+
+    def _generate_initial_state(self, molecules: Optional[dict[str, Any]] = None):
+        """
+        Calculate the initial conditions for a new cell. If ``molecules`` is
+        given, use the cached bulk and unique molecule states in it instead of
+        generating new ones.
         """
         mass_coeff = 1.0
-        if self.initial_state_gaussian:
+        if self.initial_state_gaussian and molecules is None:
             mass_coeff = self.random_state.normal(loc=1.0, scale=0.1)
 
         # if current_timeline_id is specified by a variant in sim_data,
@@ -1808,6 +2247,45 @@ class LoadSimData:
         constrained = exchange_data["importConstrainedExchangeMolecules"]
         import_molecules = set(unconstrained) | set(constrained)
 
+        if molecules is None:
+            bulk_state, unique_molecules = self._generate_molecules(
+                media_id, import_molecules, mass_coeff
+            )
+        else:
+            bulk_state = molecules["bulk"]
+            unique_molecules = {
+                name: MetadataArray(unique_state, metadata)
+                for name, (unique_state, metadata) in molecules["unique"].items()
+            }
+
+        # Numpy arrays are read-only outside of updaters for safety
+        bulk_state.flags.writeable = False
+        for unique_state in unique_molecules.values():
+            unique_state.flags.writeable = False
+
+        return {
+            "bulk": bulk_state,
+            "unique": unique_molecules,
+            "environment": {
+                "exchange": {mol: 0 for mol in current_concentrations},
+                "exchange_data": {
+                    "unconstrained": sorted(unconstrained),
+                    "constrained": constrained,
+                },
+                "media_id": media_id,
+            },
+            "boundary": {
+                "external": {
+                    mol: conc * vivunits.mM
+                    for mol, conc in current_concentrations.items()
+                }
+            },
+        }
+
+    def _generate_molecules(self, media_id, import_molecules, mass_coeff):
+        """
+        Generate bulk and unique molecule states for a new cell.
+        """
         bulk_state = initialize_bulk_counts(
             self.sim_data,
             media_id,
@@ -1851,26 +2329,4 @@ class LoadSimData:
             cell_mass,
         )
 
-        # Numpy arrays are read-only outside of updaters for safety
-        bulk_state.flags.writeable = False
-        for unique_state in unique_molecules.values():
-            unique_state.flags.writeable = False
-
-        return {
-            "bulk": bulk_state,
-            "unique": unique_molecules,
-            "environment": {
-                "exchange": {mol: 0 for mol in current_concentrations},
-                "exchange_data": {
-                    "unconstrained": sorted(unconstrained),
-                    "constrained": constrained,
-                },
-                "media_id": media_id,
-            },
-            "boundary": {
-                "external": {
-                    mol: conc * vivunits.mM
-                    for mol, conc in current_concentrations.items()
-                }
-            },
-        }
+        return bulk_state, unique_molecules
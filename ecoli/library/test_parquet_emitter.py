@@ -5,6 +5,7 @@ import shutil
 import duckdb
 import numpy as np
 import polars as pl
+import pyarrow as pa
 import pytest
 import time
 import math
@@ -20,6 +21,8 @@ from ecoli.library.parquet_emitter import (
     ndidx_to_duckdb_expr,
     flatten_dict,
     union_pl_dtypes,
+    _virtual_column_udf,
+    add_virtual_columns_by_variant,
     ParquetEmitter,
 )
 
@@ -251,6 +254,71 @@ class TestHelperFunctions:
             pl.UInt32,
         ) == pl.List(pl.List(pl.List(pl.UInt32)))
 
+    def test_virtual_column_udf(self):
+        """Test computing list columns from other columns with a UDF."""
+        conn = duckdb.connect()
+        df = pl.DataFrame(
+            {
+                "a": [[], [1, 2], [3, 4], None, [5, 6]],
+                "b": [0, 1, 2, 3, 4],
+            },
+            schema={"a": pl.List(pl.Int64), "b": pl.Int64},
+        )
+        conn.register("df", df)
+        operator = np.array([[1, 1], [1, -1], [0, 2]])
+        udf = _virtual_column_udf(
+            lambda a, b: a.dot(operator.T) + b[:, np.newaxis], pa.float64()
+        )
+        conn.create_function(
+            "virtual_c",
+            udf,
+            [duckdb.list_type("BIGINT"), "BIGINT"],
+            duckdb.list_type("DOUBLE"),
+            type="arrow",
+        )
+        result = conn.sql("SELECT virtual_c(a, b) AS c FROM df").pl()["c"]
+        # Rows with mismatched inputs give empty lists, null inputs give null
+        assert result.to_list() == [
+            [],
+            [4.0, 0.0, 5.0],
+            [9.0, 1.0, 10.0],
+            None,
+            [15.0, 3.0, 16.0],
+        ]
+
+    def test_add_virtual_columns_by_variant(self):
+        """Test that virtual columns of each variant use its own sim_data."""
+        conn = duckdb.connect()
+        history = pl.DataFrame(
+            {
+                "experiment_id": ["exp", "exp", "exp", "other"],
+                "variant": [0, 1, 2, 0],
+                "x": [1, 2, 3, 4],
+            }
+        )
+        conn.register("history", history)
+        sim_data_dict = {"exp": {0: "sim_data_0", 1: "sim_data_1", 2: "sim_data_2"}}
+
+        def add_virtual_columns(conn, history_sql, config_sql, sim_data_path, **kw):
+            # Only variants 0 and 1 were run with virtual listeners
+            if sim_data_path == "sim_data_2":
+                return history_sql
+            return f"SELECT *, '{sim_data_path}' AS virtual FROM ({history_sql})"
+
+        with patch(
+            "ecoli.library.parquet_emitter.add_virtual_columns", add_virtual_columns
+        ):
+            history_sql = add_virtual_columns_by_variant(
+                conn, "SELECT * FROM history", "SELECT 1", sim_data_dict
+            )
+            single_sql = add_virtual_columns_by_variant(
+                conn, "SELECT * FROM history", "SELECT 1", {"exp": {2: "sim_data_2"}}
+            )
+        result = conn.sql(f"SELECT * FROM ({history_sql}) ORDER BY x").pl()
+        assert result["x"].to_list() == [1, 2, 3, 4]
+        assert result["virtual"].to_list() == ["sim_data_0", "sim_data_1", None, None]
+        assert single_sql == "SELECT * FROM history"
+
 
 def compare_nested(a: list, b: list) -> bool:
     """
@@ -0,0 +1,284 @@
+"""
+Tests for the initial state cache and process config bundles of
+:py:class:`~ecoli.library.sim_data.LoadSimData` that use a small stand-in for
+the sim_data object generated by the ParCa.
+"""
+
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from ecoli.library.schema import MetadataArray
+from ecoli.library.sim_data import LoadSimData, RAND_MAX
+
+
+class FakeExternalState:
+    def __init__(self):
+        self.current_timeline_id = None
+        self.saved_timelines = {}
+        self.saved_media = {"minimal": {"GLC[p]": 10.0, "OXYGEN-MOLECULE[p]": 5.0}}
+
+    def exchange_data_from_concentrations(self, concentrations):
+        return {
+            "importUnconstrainedExchangeMolecules": ["OXYGEN-MOLECULE[p]"],
+            "importConstrainedExchangeMolecules": {"GLC[p]": 20.0},
+        }
+
+
+class FakeSimData:
+    def __init__(self, condition="basal"):
+        self.condition = condition
+        self.external_state = FakeExternalState()
+
+
+def fake_generate_molecules(self, media_id, import_molecules, mass_coeff):
+    """Draws molecule counts from the random state like the real method."""
+    fake_generate_molecules.n_calls += 1
+    bulk_state = np.zeros(3, dtype=[("id", "U40"), ("count", np.int64)])
+    bulk_state["id"] = ["A[c]", "B[c]", "C[c]"]
+    bulk_state["count"] = self.random_state.poisson(100 * mass_coeff, size=3)
+    rnas = MetadataArray(
+        np.zeros(
+            4,
+            dtype=[
+                ("unique_index", np.int64),
+                ("_entryState", np.int8),
+                ("TU_index", np.int64),
+            ],
+        ),
+        2,
+    )
+    rnas["unique_index"][:2] = [0, 1]
+    rnas["_entryState"][:2] = 1
+    rnas["TU_index"][:2] = self.random_state.randint(10, size=2)
+    return bulk_state, {"RNA": rnas}
+
+
+@pytest.fixture
+def fake_sim_data(tmp_path, monkeypatch):
+    """Path to a pickled stand-in for sim_data. Loading it only unpickles it
+    and counts the number of loads in ``LoadSimData.n_loads``."""
+
+    def load_sim_data(self):
+        LoadSimData.n_loads += 1
+        with open(self.sim_data_path, "rb") as f:
+            self._sim_data = pickle.load(f)
+
+    monkeypatch.setattr(LoadSimData, "n_loads", 0, raising=False)
+    monkeypatch.setattr(LoadSimData, "_load_sim_data", load_sim_data)
+    fake_generate_molecules.n_calls = 0
+    monkeypatch.setattr(LoadSimData, "_generate_molecules", fake_generate_molecules)
+    sim_data_path = str(tmp_path / "simData.cPickle")
+    with open(sim_data_path, "wb") as f:
+        pickle.dump(FakeSimData(), f)
+    return sim_data_path
+
+
+def assert_same_initial_state(state, expected):
+    np.testing.assert_array_equal(state["bulk"], expected["bulk"])
+    assert state["unique"].keys() == expected["unique"].keys()
+    for name, unique_state in state["unique"].items():
+        np.testing.assert_array_equal(unique_state, expected["unique"][name])
+        assert unique_state.metadata == expected["unique"][name].metadata
+    assert state["environment"] == expected["environment"]
+
+
+def test_initial_state_cache(fake_sim_data, tmp_path):
+    cache_dir = str(tmp_path / "initial_states")
+    uncached = LoadSimData(fake_sim_data, seed=1)
+    expected = uncached.generate_initial_state()
+    assert fake_generate_molecules.n_calls == 1
+
+    # Miss: state is generated and saved
+    first = LoadSimData(fake_sim_data, seed=1, initial_state_cache=cache_dir)
+    key = first.initial_state_cache_key()
+    assert_same_initial_state(first.generate_initial_state(), expected)
+    assert fake_generate_molecules.n_calls == 2
+    assert os.listdir(cache_dir) == [f"{key}.pkl"]
+
+    # Hit: state is loaded and random state is left as if it was generated
+    second = LoadSimData(fake_sim_data, seed=1, initial_state_cache=cache_dir)
+    initial_state = second.generate_initial_state()
+    assert fake_generate_molecules.n_calls == 2
+    assert_same_initial_state(initial_state, expected)
+    assert not initial_state["bulk"].flags.writeable
+    assert second.random_state.randint(2**31) == uncached.random_state.randint(2**31)
+
+    # States for many seeds match those of instances created with each seed
+    initial_states = second.generate_initial_states([1, 2])
+    assert fake_generate_molecules.n_calls == 3
+    assert_same_initial_state(initial_states[0], expected)
+    assert_same_initial_state(
+        initial_states[1], LoadSimData(fake_sim_data, seed=2).generate_initial_state()
+    )
+    assert second.seed == 1
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_initial_state_cache_random_state(fake_sim_data, tmp_path):
+    cache_dir = str(tmp_path / "initial_states")
+    LoadSimData(
+        fake_sim_data, seed=1, initial_state_cache=cache_dir
+    ).generate_initial_state()
+
+    # Process configs (e.g. RNA interference) can draw from the random state
+    # before the initial state is generated, which must not hit the cache
+    # entry saved for the unadvanced random state
+    for n_draws in (1, 2, 1):
+        uncached = LoadSimData(fake_sim_data, seed=1)
+        uncached.random_state.randint(RAND_MAX, size=n_draws)
+        expected = uncached.generate_initial_state()
+
+        cached = LoadSimData(fake_sim_data, seed=1, initial_state_cache=cache_dir)
+        cached.random_state.randint(RAND_MAX, size=n_draws)
+        assert_same_initial_state(cached.generate_initial_state(), expected)
+        assert cached.random_state.randint(RAND_MAX) == uncached.random_state.randint(
+            RAND_MAX
+        )
+    assert len(os.listdir(cache_dir)) == 3
+    assert fake_generate_molecules.n_calls == 6
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"seed": 2},
+        {"amp_lysis": True},
+        {"mar_regulon": True},
+        {"initial_state_gaussian": False},
+        {"condition": "with_aa"},
+        {"media_timeline": ((0, "minimal_plus_amino_acids"),)},
+        {
+            "process_configs": {
+                "ecoli-rna-interference": {
+                    "srna_ids": ["MICF-RNA[c]"],
+                    "target_ids": ["EG10671_RNA[c]"],
+                    "binding_probs": [0.5],
+                    "duplex_ids": ["micF-ompF[c]"],
+                }
+            }
+        },
+    ],
+)
+def test_initial_state_cache_key(fake_sim_data, options):
+    key = LoadSimData(fake_sim_data).initial_state_cache_key()
+    assert LoadSimData(fake_sim_data).initial_state_cache_key() == key
+    assert LoadSimData(fake_sim_data, **options).initial_state_cache_key() != key
+
+
+def test_initial_state_cache_key_sim_data(fake_sim_data):
+    key = LoadSimData(fake_sim_data).initial_state_cache_key()
+    # Rewriting the sim_data file with different contents invalidates states
+    with open(fake_sim_data, "wb") as f:
+        pickle.dump(FakeSimData(condition="acetate"), f)
+    assert LoadSimData(fake_sim_data).initial_state_cache_key() != key
+
+
+def fake_mass_listener_config(self, time_step=1):
+    return {
+        "time_step": time_step,
+        "saved_media": self.sim_data.external_state.saved_media,
+        "seed": self._seedFromName("MassListener"),
+    }
+
+
+def fake_exchange_data_config(self, time_step=1):
+    return {
+        "time_step": time_step,
+        "exchange_data_from_concentrations": (
+            self.sim_data.external_state.exchange_data_from_concentrations
+        ),
+        "seed": self.random_state.randint(RAND_MAX),
+    }
+
+
+def fake_media_update_config(self, time_step=1):
+    return {
+        "time_step": time_step,
+        "get_saved_media": lambda: self.sim_data.external_state.saved_media,
+    }
+
+
+@pytest.fixture
+def fake_config_getters(monkeypatch):
+    monkeypatch.setattr(
+        LoadSimData, "get_mass_listener_config", fake_mass_listener_config
+    )
+    monkeypatch.setattr(
+        LoadSimData, "get_exchange_data_config", fake_exchange_data_config
+    )
+    monkeypatch.setattr(
+        LoadSimData, "get_media_update_config", fake_media_update_config
+    )
+
+
+def assert_same_config(config, expected):
+    assert config.keys() == expected.keys()
+    for key, value in config.items():
+        if key == "exchange_data_from_concentrations":
+            assert value.__func__ is expected[key].__func__
+            assert value({}) == expected[key]({})
+        else:
+            assert value == expected[key]
+
+
+def test_process_config_bundle(fake_sim_data, fake_config_getters, tmp_path):
+    bundle_dir = str(tmp_path / "bundles")
+    names = [("ecoli-mass-listener", 1), ("exchange_data", 1), ("exchange_data", 2)]
+    direct = LoadSimData(fake_sim_data, seed=3)
+    expected = {name: direct.get_config_by_name(*name) for name in names}
+    expected_random_draw = direct.random_state.randint(RAND_MAX)
+
+    # Configs are made from sim_data and saved
+    first = LoadSimData(fake_sim_data, seed=3, process_config_bundle=bundle_dir)
+    assert LoadSimData.n_loads == 2
+    for name in names:
+        assert_same_config(first.get_config_by_name(*name), expected[name])
+    first.save_process_config_bundle()
+
+    # Saved configs (and seeds) are identical and sim_data is not loaded
+    second = LoadSimData(fake_sim_data, seed=3, process_config_bundle=bundle_dir)
+    bundled = {name: second.get_config_by_name(*name) for name in names}
+    assert LoadSimData.n_loads == 2
+    for name in names:
+        assert_same_config(bundled[name], expected[name])
+    assert second.random_state.randint(RAND_MAX) == expected_random_draw
+
+    # Objects shared by configs are only stored and loaded once
+    external_state = bundled[("exchange_data", 1)][
+        "exchange_data_from_concentrations"
+    ].__self__
+    assert (
+        external_state.saved_media is bundled[("ecoli-mass-listener", 1)]["saved_media"]
+    )
+    assert (
+        bundled[("exchange_data", 2)]["exchange_data_from_concentrations"].__self__
+        is external_state
+    )
+
+    # Configs that cannot be pickled are always made from sim_data
+    config = second.get_config_by_name("media_update")
+    assert LoadSimData.n_loads == 3
+    assert config["get_saved_media"]() == FakeSimData().external_state.saved_media
+
+    # New configs are added to the saved configs
+    new_config = second.get_config_by_name("ecoli-mass-listener", 2)
+    second.save_process_config_bundle()
+    third = LoadSimData(fake_sim_data, seed=3, process_config_bundle=bundle_dir)
+    for name in names:
+        assert_same_config(third.get_config_by_name(*name), expected[name])
+    assert_same_config(third.get_config_by_name("ecoli-mass-listener", 2), new_config)
+    assert LoadSimData.n_loads == 3
+    assert len(os.listdir(os.path.dirname(second._process_config_bundle_path()))) == 2
+
+    # Bundles are not shared by instances with different options
+    other = LoadSimData(
+        fake_sim_data, seed=3, process_config_bundle=bundle_dir, trna_charging=False
+    )
+    assert LoadSimData.n_loads == 4
+    assert_same_config(
+        other.get_config_by_name("ecoli-mass-listener"),
+        expected[("ecoli-mass-listener", 1)],
+    )
@@ -4,70 +4,32 @@ from scipy.integrate import solve_ivp
 from vivarium.core.process import Process
 from vivarium.library.units import units
 
-from ecoli.library.units import add_units, remove_units
 from ecoli.processes.antibiotics.antibiotic_transport_steady_state import (
     SPECIES,
     SPECIES_TO_INDEX,
-    UNITS,
-    GAS_CONSTANT,
-    TEMPERATURE,
-    FARADAY,
-    INNER_POTENTIAL,
-    OUTER_POTENTIAL,
-    species_derivatives,
-    species_array_to_dict,
+    antibiotic_updates,
+    batch_reaction_parameters,
+    integrate_species_batch,
+    internal_counts,
+    prepare_antibiotic_states,
     species_dict_to_array,
 )
 
 
-def update_from_odeint(
-    initial_state, reaction_params, outer_internal_bias, inner_internal_bias, timestep
-):
-    """Compute an update given a steady-state solution.
-
-    Beginning from the initial state, numerically integrates the
-    species ODEs to find the final state.
-
-    Args:
-        initial_state: Initial state dictionary.
-        reaction_params: Dictionary of reaction parameters.
-        outer_internal_bias: See :py:func:`species_derivatives`.
-        inner_internal_bias: See :py:func:`species_derivatives`.
-        timestep: Timestep for update.
-
-    Returns:
-        Update dictionary.
-    """
-    assert set(SPECIES) == initial_state.keys()
-    initial_state_arr = species_dict_to_array(initial_state, SPECIES_TO_INDEX)
-
-    args = (reaction_params, outer_internal_bias, inner_internal_bias)
-    result = solve_ivp(
-        lambda t, state_arr, *args: species_derivatives(state_arr, *args),
-        [0, timestep],
-        initial_state_arr,
-        args=args,
-    )
-    assert result.success
-    final_state_arr = result.y[:, -1].T
-
-    delta_arr = final_state_arr - initial_state_arr
-    delta = species_array_to_dict(delta_arr, SPECIES_TO_INDEX)
-    return {
-        "species": delta,
-    }
-
-
 class AntibioticTransportOdeint(Process):
     name = "antibiotic-transport-odeint"
     defaults = {
         "initial_reaction_parameters": {},
         "diffusion_only": False,
+        # Integration method for scipy.integrate.solve_ivp. Implicit methods
+        # (e.g. "BDF") are given the analytic Jacobian.
+        "method": "RK45",
     }
 
     def __init__(self, parameters=None):
         super().__init__(parameters)
         self.antibiotics = list(self.parameters["initial_reaction_parameters"].keys())
+        self.method = self.parameters["method"]
 
     def initial_state(self, config=None):
         state = {
@@ -117,87 +79,46 @@ class AntibioticTransportOdeint(Process):
         return schema
 
     def next_update(self, timestep, state):
-        update = {}
-        for antibiotic in self.antibiotics:
-            antibiotic_state = state[antibiotic]
-            # Prepare the state by doing unit conversions.
-            prepared_state = {
-                "species": antibiotic_state["species"],
-                "reaction_parameters": antibiotic_state["reaction_parameters"],
-            }
-            prepared_state, saved_units = remove_units(prepared_state, UNITS)
+        if not self.antibiotics:
+            return {}
 
-            charge = prepared_state["reaction_parameters"]["diffusion"]["charge"]
-            # Biases diffusion to favor higher internal concentrations
-            # according to the Goldman-Hodgkin-Katz flux equation assuming
-            # the outer membrane has a potential from the Donnan equilibrium.
-            outer_internal_bias = (
-                charge * FARADAY * OUTER_POTENTIAL / GAS_CONSTANT / TEMPERATURE
-            ).magnitude
-            inner_internal_bias = (
-                charge * FARADAY * INNER_POTENTIAL / GAS_CONSTANT / TEMPERATURE
-            ).magnitude
-
-            # No export or hydrolysis if modelling diffusion only
-            if self.parameters["diffusion_only"]:
-                prepared_state["reaction_parameters"]["export"]["kcat"] = 0 / units.sec
-                prepared_state["reaction_parameters"]["hydrolysis"]["kcat"] = (
-                    0 / units.sec
-                )
-
-            # Compute the update.
-            antibiotic_update = update_from_odeint(
-                prepared_state["species"],
-                prepared_state["reaction_parameters"],
-                outer_internal_bias,
-                inner_internal_bias,
-                timestep,
-            )
-
-            # Make sure there are no NANs in the update.
-            assert not np.any(np.isnan(list(antibiotic_update["species"].values())))
-
-            # Change in external counts = -(Change in internal counts)
-            # Divide concentrations by 1000 to convert mM to M
-            delta_periplasm_counts = (
-                (
-                    antibiotic_update["species"]["periplasm"]
-                    + antibiotic_update["species"]["hydrolyzed_periplasm"]
-                )
-                / 1000
-                * (
-                    N_A
-                    * prepared_state["reaction_parameters"]["diffusion"][
-                        "periplasm_volume"
-                    ]
-                )
+        prepared_states, saved_units, outer_biases, inner_biases = (
+            prepare_antibiotic_states(
+                state, self.antibiotics, self.parameters["diffusion_only"]
             )
-            delta_cytoplasm_counts = (
-                (
-                    antibiotic_update["species"]["cytoplasm"]
-                    + antibiotic_update["species"]["hydrolyzed_cytoplasm"]
-                )
-                / 1000
-                * (
-                    N_A
-                    * prepared_state["reaction_parameters"]["diffusion"][
-                        "cytoplasm_volume"
-                    ]
-                )
-            )
-            delta_internal_counts = delta_periplasm_counts + delta_cytoplasm_counts
-
-            # Add units back in
-            antibiotic_update["species"] = add_units(
-                antibiotic_update["species"],
-                saved_units["species"],
-                strict=not self.parameters["diffusion_only"],
-            )
-
-            antibiotic_update["exchanges"] = {"external": -delta_internal_counts}
-
-            update[antibiotic] = antibiotic_update
-        return update
+        )
+        reaction_params = batch_reaction_parameters(
+            [
+                prepared_state["reaction_parameters"]
+                for prepared_state in prepared_states
+            ]
+        )
+        initial_state_arr = np.array(
+            [
+                species_dict_to_array(prepared_state["species"], SPECIES_TO_INDEX)
+                for prepared_state in prepared_states
+            ]
+        ).reshape(len(self.antibiotics), len(SPECIES))
+
+        # Compute the update for all antibiotics at once
+        final_state_arr = integrate_species_batch(
+            initial_state_arr,
+            reaction_params,
+            outer_biases,
+            inner_biases,
+            timestep,
+            method=self.method,
+        )
+        delta_arr = final_state_arr - initial_state_arr
+
+        # Change in external counts = -(Change in internal counts)
+        return antibiotic_updates(
+            self.antibiotics,
+            delta_arr,
+            -internal_counts(delta_arr, reaction_params),
+            saved_units,
+            self.parameters["diffusion_only"],
+        )
 
 
 def _dummy_derivative(_, y):
@@ -1,6 +1,7 @@
 import numpy as np
 from scipy.constants import N_A
 from scipy.integrate import solve_ivp
+from scipy.linalg import block_diag
 from scipy.optimize import root
 from vivarium.core.process import Process
 from vivarium.library.units import units
@@ -296,56 +297,6 @@ def find_steady_state(
     return result.x
 
 
-def update_from_steady_state(
-    internal_steady_state,
-    initial_state,
-    reaction_params,
-    outer_internal_bias,
-    inner_internal_bias,
-    timestep,
-):
-    """Compute an update given a steady-state solution.
-
-    Beginning from the steady-state solution, numerically integrates the
-    species ODEs to find the final state.
-
-    Args:
-        internal_steady_state: Vector of steady-state concentrations
-            [``periplasm``, ``cytoplasm``].
-        initial_state: Initial state dictionary.
-        reaction_params: Dictionary of reaction parameters.
-        outer_internal_bias: See :py:func:`species_derivatives`.
-        inner_internal_bias: See :py:func:`species_derivatives`.
-        timestep: Timestep for update.
-
-    Returns:
-        Update dictionary.
-    """
-    assert set(SPECIES) == initial_state.keys()
-    steady_state = initial_state.copy()
-    # Assume that steady state is reached exclusively through diffusion
-    steady_state["periplasm"] = internal_steady_state[0]
-    steady_state["cytoplasm"] = internal_steady_state[1]
-    steady_state_arr = species_dict_to_array(steady_state, SPECIES_TO_INDEX)
-
-    args = (reaction_params, outer_internal_bias, inner_internal_bias)
-    result = solve_ivp(
-        lambda t, state_arr, *args: species_derivatives(state_arr, *args),
-        [0, timestep],
-        steady_state_arr,
-        args=args,
-    )
-    assert result.success
-    final_state_arr = result.y[:, -1].T
-
-    initial_state_arr = species_dict_to_array(initial_state, SPECIES_TO_INDEX)
-    delta_arr = final_state_arr - initial_state_arr
-    delta = species_array_to_dict(delta_arr, SPECIES_TO_INDEX)
-    return {
-        "species": delta,
-    }
-
-
 def species_array_to_dict(array, species_to_index):
     """Convert an array of values to a map from name to value index.
 
@@ -405,6 +356,306 @@ def species_dict_to_array(species_dict, species_to_index):
     return array
 
 
+# The batched functions below solve several independent transport systems
+# together. The processes only batch the antibiotics of one cell: each agent
+# still runs its own process instance with its own solver calls, so systems
+# are not batched across cells.
+
+#: Integration methods that make use of the analytic Jacobian
+IMPLICIT_METHODS = ("BDF", "Radau", "LSODA")
+
+
+def batch_reaction_parameters(reaction_params_list):
+    """Gather the reaction parameters of many systems into arrays.
+
+    Args:
+        reaction_params_list: List of reaction parameter dictionaries (see
+            :py:func:`species_derivatives`), one per system.
+
+    Returns:
+        Dictionary with the same nesting as each reaction parameter
+        dictionary where every leaf is an array with one value per system.
+    """
+    return {
+        reaction: {
+            parameter: np.array(
+                [params[reaction][parameter] for params in reaction_params_list],
+                dtype=np.float64,
+            )
+            for parameter in UNITS["reaction_parameters"][reaction]
+        }
+        for reaction in UNITS["reaction_parameters"]
+    }
+
+
+def _diffusion_coefficients(bias):
+    """Coefficients of the Goldman-Hodgkin-Katz flux equation.
+
+    Returns ``(scale, exp_bias)`` such that the flux is proportional to
+    ``scale * (outside - inside * exp_bias)``, which simplifies to Fick's
+    law when the bias is 0.
+    """
+    exp_bias = np.exp(bias)
+    scale = np.ones_like(bias)
+    nonzero = bias != 0
+    scale[nonzero] = bias[nonzero] / (exp_bias[nonzero] - 1)
+    exp_bias[~nonzero] = 1
+    return scale, exp_bias
+
+
+def _michaelis_menten(conc, kcat, enzyme_conc, km, n):
+    """Hill-type Michaelis-Menten rates and their derivatives."""
+    conc_n = conc**n
+    denominator = km + conc_n
+    rate = kcat * enzyme_conc * conc_n / denominator
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d_conc_n = np.where(conc_n != 0, n * conc_n / conc, n * (n == 1))
+    d_rate = kcat * enzyme_conc * km * d_conc_n / denominator**2
+    return rate, d_rate
+
+
+def batch_reaction_rates(
+    state_arr, reaction_params, outer_internal_bias, inner_internal_bias
+):
+    """Compute reaction rates and their derivatives for many systems.
+
+    Args:
+        state_arr: Array of shape (systems, species) with the
+            concentrations of each species in :py:data:`SPECIES` order.
+        reaction_params: Batched reaction parameters from
+            :py:func:`batch_reaction_parameters`.
+        outer_internal_bias: Array of outer membrane biases, one per system
+            (see :py:func:`species_derivatives`).
+        inner_internal_bias: Array of inner membrane biases, one per system.
+
+    Returns:
+        Tuple of reaction rates with shape (systems, reactions) and their
+        derivatives with respect to each species, with shape (systems,
+        reactions, species).
+    """
+    periplasm = state_arr[:, SPECIES_TO_INDEX["periplasm"]]
+    cytoplasm = state_arr[:, SPECIES_TO_INDEX["cytoplasm"]]
+    external = state_arr[:, SPECIES_TO_INDEX["external"]]
+    diffusion = reaction_params["diffusion"]
+    export = reaction_params["export"]
+    hydrolysis = reaction_params["hydrolysis"]
+
+    outer_rate_constant = (
+        diffusion["outer_area"]
+        * diffusion["outer_permeability"]
+        / diffusion["periplasm_volume"]
+    )
+    inner_rate_constant = (
+        diffusion["inner_area"]
+        * diffusion["inner_permeability"]
+        / diffusion["cytoplasm_volume"]
+    )
+    outer_scale, outer_exp_bias = _diffusion_coefficients(outer_internal_bias)
+    inner_scale, inner_exp_bias = _diffusion_coefficients(inner_internal_bias)
+
+    rates = np.zeros((state_arr.shape[0], len(REACTIONS)))
+    d_rates = np.zeros((state_arr.shape[0], len(REACTIONS), len(SPECIES)))
+    i_periplasm = SPECIES_TO_INDEX["periplasm"]
+    i_cytoplasm = SPECIES_TO_INDEX["cytoplasm"]
+
+    i_rxn = REACTIONS_TO_INDEX["periplasm_diffusion"]
+    rates[:, i_rxn] = (
+        outer_rate_constant * outer_scale * (external - periplasm * outer_exp_bias)
+    )
+    d_rates[:, i_rxn, SPECIES_TO_INDEX["external"]] = outer_rate_constant * outer_scale
+    d_rates[:, i_rxn, i_periplasm] = -outer_rate_constant * outer_scale * outer_exp_bias
+
+    i_rxn = REACTIONS_TO_INDEX["cytoplasm_diffusion"]
+    rates[:, i_rxn] = (
+        inner_rate_constant * inner_scale * (periplasm - cytoplasm * inner_exp_bias)
+    )
+    d_rates[:, i_rxn, i_periplasm] = inner_rate_constant * inner_scale
+    d_rates[:, i_rxn, i_cytoplasm] = -inner_rate_constant * inner_scale * inner_exp_bias
+
+    for reaction, conc, i_species, params, side in (
+        ("periplasm_export", periplasm, i_periplasm, export, "outer"),
+        ("cytoplasm_export", cytoplasm, i_cytoplasm, export, "inner"),
+        ("periplasm_hydrolysis", periplasm, i_periplasm, hydrolysis, "outer"),
+        ("cytoplasm_hydrolysis", cytoplasm, i_cytoplasm, hydrolysis, "inner"),
+    ):
+        i_rxn = REACTIONS_TO_INDEX[reaction]
+        rates[:, i_rxn], d_rates[:, i_rxn, i_species] = _michaelis_menten(
+            conc,
+            params[f"{side}_kcat"],
+            params[f"{side}_enzyme_conc"],
+            params[f"{side}_km"],
+            params[f"{side}_n"],
+        )
+
+    return rates, d_rates
+
+
+def batch_species_derivatives(
+    state_arr, reaction_params, outer_internal_bias, inner_internal_bias
+):
+    """Vectorized version of :py:func:`species_derivatives` for many systems.
+
+    Args:
+        state_arr: Array of shape (systems, species).
+        reaction_params: Batched reaction parameters from
+            :py:func:`batch_reaction_parameters`.
+        outer_internal_bias: Array of outer membrane biases.
+        inner_internal_bias: Array of inner membrane biases.
+
+    Returns:
+        Tuple of the derivatives of each species, with shape (systems,
+        species), and the Jacobian of each system, with shape (systems,
+        species, species).
+    """
+    rates, d_rates = batch_reaction_rates(
+        state_arr, reaction_params, outer_internal_bias, inner_internal_bias
+    )
+    return rates @ STOICH.T, STOICH @ d_rates
+
+
+def integrate_species_batch(
+    initial_state_arr,
+    reaction_params,
+    outer_internal_bias,
+    inner_internal_bias,
+    timestep,
+    method="RK45",
+):
+    """Integrate the species ODEs of many systems together.
+
+    All systems are stacked into one state vector and integrated with a
+    single call to :py:func:`scipy.integrate.solve_ivp`. The block-diagonal
+    analytic Jacobian is supplied to implicit methods.
+
+    Args:
+        initial_state_arr: Array of shape (systems, species).
+        reaction_params: Batched reaction parameters from
+            :py:func:`batch_reaction_parameters`.
+        outer_internal_bias: Array of outer membrane biases.
+        inner_internal_bias: Array of inner membrane biases.
+        timestep: Timestep for update.
+        method: Integration method passed to ``solve_ivp``.
+
+    Returns:
+        Array of shape (systems, species) with the final state.
+    """
+    shape = initial_state_arr.shape
+    args = (reaction_params, outer_internal_bias, inner_internal_bias)
+
+    def derivatives(t, y):
+        return batch_species_derivatives(y.reshape(shape), *args)[0].ravel()
+
+    def jacobian(t, y):
+        return block_diag(*batch_species_derivatives(y.reshape(shape), *args)[1])
+
+    options = {"jac": jacobian} if method in IMPLICIT_METHODS else {}
+    result = solve_ivp(
+        derivatives,
+        [0, timestep],
+        initial_state_arr.ravel(),
+        method=method,
+        **options,
+    )
+    assert result.success
+    return result.y[:, -1].reshape(shape)
+
+
+def find_steady_state_batch(
+    external,
+    reaction_params,
+    outer_internal_bias,
+    inner_internal_bias,
+    max_iterations=50,
+    tolerance=1e-10,
+):
+    """Find steady-state periplasm and cytoplasm concentrations of many
+    systems at once.
+
+    Uses Newton's method with the analytic Jacobian, starting from the same
+    initial guess as :py:func:`find_steady_state` (clipped to be positive).
+    Steps are damped to keep concentrations nonnegative, so the physical
+    steady state is found even when the Michaelis-Menten terms admit other
+    roots. Systems where Newton's method does not converge (e.g. singular
+    Jacobians) fall back to :py:func:`find_steady_state`. For systems with only diffusion, the
+    derivatives are linear and Newton's method gives the closed-form
+    solution in one step.
+
+    Args:
+        external: Array of external concentrations, one per system.
+        reaction_params: Batched reaction parameters from
+            :py:func:`batch_reaction_parameters`.
+        outer_internal_bias: Array of outer membrane biases.
+        inner_internal_bias: Array of inner membrane biases.
+        max_iterations: Maximum number of Newton iterations.
+        tolerance: Convergence tolerance on the derivatives, relative to
+            the external concentration.
+
+    Returns:
+        Array of shape (systems, 2) with steady-state concentrations of the
+        form [``periplasm``, ``cytoplasm``].
+    """
+    internal_idx = [SPECIES_TO_INDEX["periplasm"], SPECIES_TO_INDEX["cytoplasm"]]
+    state_arr = np.zeros((len(external), len(SPECIES)))
+    state_arr[:, SPECIES_TO_INDEX["external"]] = external
+    state_arr[:, internal_idx[0]] = external * outer_internal_bias
+    state_arr[:, internal_idx[1]] = external * outer_internal_bias * inner_internal_bias
+    # Start from a nonnegative guess so iterates stay on the physical branch
+    state_arr[:, internal_idx] = np.where(
+        state_arr[:, internal_idx] > 0,
+        state_arr[:, internal_idx],
+        np.abs(external)[:, np.newaxis],
+    )
+
+    scale = np.fmax(np.abs(external), 1)
+    converged = np.zeros(len(external), dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for _ in range(max_iterations):
+            derivs, jac = batch_species_derivatives(
+                state_arr, reaction_params, outer_internal_bias, inner_internal_bias
+            )
+            residual = derivs[:, internal_idx]
+            converged = np.all(
+                np.abs(residual) <= tolerance * scale[:, np.newaxis], axis=1
+            )
+            if converged.all():
+                break
+
+            # Closed-form solution of each 2x2 Newton system
+            jac = jac[:, internal_idx][:, :, internal_idx]
+            det = jac[:, 0, 0] * jac[:, 1, 1] - jac[:, 0, 1] * jac[:, 1, 0]
+            step = (
+                np.stack(
+                    [
+                        jac[:, 1, 1] * residual[:, 0] - jac[:, 0, 1] * residual[:, 1],
+                        jac[:, 0, 0] * residual[:, 1] - jac[:, 1, 0] * residual[:, 0],
+                    ],
+                    axis=1,
+                )
+                / det[:, np.newaxis]
+            )
+            step[converged | ~np.isfinite(step).all(axis=1)] = 0
+
+            # Damp steps that would make a concentration negative so that
+            # Newton's method cannot jump to an unphysical root
+            current = state_arr[:, internal_idx]
+            with np.errstate(divide="ignore"):
+                limits = np.where(step > current, 0.5 * current / step, 1)
+            state_arr[:, internal_idx] -= step * limits.min(axis=1)[:, np.newaxis]
+
+    steady_state = state_arr[:, internal_idx]
+    for i in np.where(~converged | ~np.isfinite(steady_state).all(axis=1))[0]:
+        steady_state[i] = find_steady_state(
+            external[i],
+            {
+                reaction: {parameter: values[i] for parameter, values in params.items()}
+                for reaction, params in reaction_params.items()
+            },
+            outer_internal_bias[i],
+            inner_internal_bias[i],
+        )
+    return steady_state
+
+
 class AntibioticTransportSteadyState(Process):
     name = "antibiotic-transport-steady-state"
     defaults = {
@@ -464,129 +715,170 @@ class AntibioticTransportSteadyState(Process):
         return schema
 
     def next_update(self, timestep, state):
-        update = {}
-        for antibiotic in self.antibiotics:
-            antibiotic_state = state[antibiotic]
-            # Prepare the state for the bioscrape process by moving
-            # species from 'external' to 'species' where the bioscrape
-            # process expects them to be, renaming variables, and doing
-            # unit conversions.
-            # NOTE: This is a relic from when we used a bioscrape process
-            prepared_state = {
-                "species": antibiotic_state["species"],
-                "reaction_parameters": antibiotic_state["reaction_parameters"],
-            }
-            prepared_state, saved_units = remove_units(prepared_state, UNITS)
+        if not self.antibiotics:
+            return {}
 
-            # Save initial total count
-            periplasm_counts = (
-                (
-                    prepared_state["species"]["periplasm"]
-                    + prepared_state["species"]["hydrolyzed_periplasm"]
-                )
-                / 1000
-                * (
-                    N_A
-                    * prepared_state["reaction_parameters"]["diffusion"][
-                        "periplasm_volume"
-                    ]
-                )
-            )
-            cytoplasm_counts = (
-                (
-                    prepared_state["species"]["cytoplasm"]
-                    + prepared_state["species"]["hydrolyzed_cytoplasm"]
-                )
-                / 1000
-                * (
-                    N_A
-                    * prepared_state["reaction_parameters"]["diffusion"][
-                        "cytoplasm_volume"
-                    ]
-                )
-            )
-            initial_internal_counts = periplasm_counts + cytoplasm_counts
-
-            # Compute the update.
-            charge = prepared_state["reaction_parameters"]["diffusion"]["charge"]
-            # Biases diffusion to favor higher internal concentrations
-            # according to the Goldman-Hodgkin-Katz flux equation assuming
-            # the outer membrane has a potential from the Donnan equilibrium.
-            outer_internal_bias = (
-                charge * FARADAY * OUTER_POTENTIAL / GAS_CONSTANT / TEMPERATURE
-            ).magnitude
-            inner_internal_bias = (
-                charge * FARADAY * INNER_POTENTIAL / GAS_CONSTANT / TEMPERATURE
-            ).magnitude
-
-            # No export or hydrolysis if modelling diffusion only
-            if self.parameters["diffusion_only"]:
-                prepared_state["reaction_parameters"]["export"]["kcat"] = 0 / units.sec
-                prepared_state["reaction_parameters"]["hydrolysis"]["kcat"] = (
-                    0 / units.sec
-                )
-            # Compute the update.
-            internal_steady_state = find_steady_state(
-                prepared_state["species"]["external"],
-                prepared_state["reaction_parameters"],
-                outer_internal_bias,
-                inner_internal_bias,
-            )
-            antibiotic_update = update_from_steady_state(
-                internal_steady_state,
-                prepared_state["species"],
-                prepared_state["reaction_parameters"],
-                outer_internal_bias,
-                inner_internal_bias,
-                timestep,
+        prepared_states, saved_units, outer_biases, inner_biases = (
+            prepare_antibiotic_states(
+                state, self.antibiotics, self.parameters["diffusion_only"]
             )
+        )
+        reaction_params = batch_reaction_parameters(
+            [
+                prepared_state["reaction_parameters"]
+                for prepared_state in prepared_states
+            ]
+        )
+        initial_state_arr = np.array(
+            [
+                species_dict_to_array(prepared_state["species"], SPECIES_TO_INDEX)
+                for prepared_state in prepared_states
+            ]
+        ).reshape(len(self.antibiotics), len(SPECIES))
+
+        # Compute the update for all antibiotics at once, assuming that steady
+        # state is reached exclusively through diffusion
+        internal_steady_state = find_steady_state_batch(
+            initial_state_arr[:, SPECIES_TO_INDEX["external"]],
+            reaction_params,
+            outer_biases,
+            inner_biases,
+        )
+        steady_state_arr = initial_state_arr.copy()
+        steady_state_arr[:, SPECIES_TO_INDEX["periplasm"]] = internal_steady_state[:, 0]
+        steady_state_arr[:, SPECIES_TO_INDEX["cytoplasm"]] = internal_steady_state[:, 1]
+        final_state_arr = integrate_species_batch(
+            steady_state_arr, reaction_params, outer_biases, inner_biases, timestep
+        )
 
-            # Make sure there are no NANs in the update.
-            assert not np.any(np.isnan(list(antibiotic_update["species"].values())))
+        delta_arr = final_state_arr - initial_state_arr
+
+        # Change in external counts = -(Change in internal counts)
+        final_internal_counts = internal_counts(delta_arr, reaction_params)
+        initial_internal_counts = internal_counts(initial_state_arr, reaction_params)
+        return antibiotic_updates(
+            self.antibiotics,
+            delta_arr,
+            -(final_internal_counts - initial_internal_counts),
+            saved_units,
+            self.parameters["diffusion_only"],
+        )
 
-            # Change in external counts = -(Change in internal counts)
-            # Divide concentrations by 1000 to convert mM to M
-            periplasm_counts = (
-                (
-                    antibiotic_update["species"]["periplasm"]
-                    + antibiotic_update["species"]["hydrolyzed_periplasm"]
-                )
-                / 1000
-                * (
-                    N_A
-                    * prepared_state["reaction_parameters"]["diffusion"][
-                        "periplasm_volume"
-                    ]
-                )
-            )
-            cytoplasm_counts = (
-                (
-                    antibiotic_update["species"]["cytoplasm"]
-                    + antibiotic_update["species"]["hydrolyzed_cytoplasm"]
-                )
-                / 1000
-                * (
-                    N_A
-                    * prepared_state["reaction_parameters"]["diffusion"][
-                        "cytoplasm_volume"
-                    ]
-                )
-            )
-            final_internal_counts = periplasm_counts + cytoplasm_counts
 
-            # Add units back in
-            antibiotic_update["species"] = add_units(
-                antibiotic_update["species"],
-                saved_units["species"],
-                strict=not self.parameters["diffusion_only"],
-            )
+def prepare_antibiotic_states(state, antibiotics, diffusion_only):
+    """Remove units from the state of each antibiotic and compute the
+    membrane biases.
+
+    Args:
+        state: State of an antibiotic transport process.
+        antibiotics: Names of the antibiotics in ``state``.
+        diffusion_only: Whether export and hydrolysis are disabled.
+
+    Returns:
+        Tuple of the unitless state of each antibiotic, the units removed
+        from each, and arrays of outer and inner membrane biases (see
+        :py:func:`species_derivatives`).
+    """
+    prepared_states = []
+    saved_units = []
+    charges = []
+    for antibiotic in antibiotics:
+        antibiotic_state = state[antibiotic]
+        # Prepare the state by doing unit conversions.
+        prepared_state = {
+            "species": antibiotic_state["species"],
+            "reaction_parameters": antibiotic_state["reaction_parameters"],
+        }
+        prepared_state, antibiotic_units = remove_units(prepared_state, UNITS)
+
+        # No export or hydrolysis if modelling diffusion only
+        if diffusion_only:
+            prepared_state["reaction_parameters"]["export"]["kcat"] = 0 / units.sec
+            prepared_state["reaction_parameters"]["hydrolysis"]["kcat"] = 0 / units.sec
+
+        prepared_states.append(prepared_state)
+        saved_units.append(antibiotic_units)
+        charges.append(prepared_state["reaction_parameters"]["diffusion"]["charge"])
+
+    # Biases diffusion to favor higher internal concentrations
+    # according to the Goldman-Hodgkin-Katz flux equation assuming
+    # the outer membrane has a potential from the Donnan equilibrium.
+    charges = np.array(charges, dtype=np.float64)
+    outer_biases = (
+        charges * (FARADAY * OUTER_POTENTIAL / GAS_CONSTANT / TEMPERATURE).magnitude
+    )
+    inner_biases = (
+        charges * (FARADAY * INNER_POTENTIAL / GAS_CONSTANT / TEMPERATURE).magnitude
+    )
+    return prepared_states, saved_units, outer_biases, inner_biases
 
-            antibiotic_update["exchanges"] = {
-                "external": -(final_internal_counts - initial_internal_counts)
-            }
 
-            update[antibiotic] = antibiotic_update
-        return update
+def internal_counts(state_arr, reaction_params):
+    """Total counts of internal (periplasm and cytoplasm) species.
+
+    Args:
+        state_arr: Array of shape (antibiotics, species) of concentrations
+            (or changes in concentration) in mM.
+        reaction_params: Batched reaction parameters from
+            :py:func:`batch_reaction_parameters`.
+
+    Returns:
+        Array of counts, one per antibiotic.
+    """
+    # Divide concentrations by 1000 to convert mM to M
+    periplasm_counts = (
+        (
+            state_arr[:, SPECIES_TO_INDEX["periplasm"]]
+            + state_arr[:, SPECIES_TO_INDEX["hydrolyzed_periplasm"]]
+        )
+        / 1000
+        * (N_A * reaction_params["diffusion"]["periplasm_volume"])
+    )
+    cytoplasm_counts = (
+        (
+            state_arr[:, SPECIES_TO_INDEX["cytoplasm"]]
+            + state_arr[:, SPECIES_TO_INDEX["hydrolyzed_cytoplasm"]]
+        )
+        / 1000
+        * (N_A * reaction_params["diffusion"]["cytoplasm_volume"])
+    )
+    return periplasm_counts + cytoplasm_counts
+
+
+def antibiotic_updates(
+    antibiotics, delta_arr, external_exchanges, saved_units, diffusion_only
+):
+    """Form the update of each antibiotic from the change in concentrations.
+
+    Args:
+        antibiotics: Names of the antibiotics.
+        delta_arr: Array of shape (antibiotics, species) with the change in
+            concentration of each species.
+        external_exchanges: Array of exchanges with the environment in
+            counts, one per antibiotic.
+        saved_units: Units removed from each antibiotic state by
+            :py:func:`prepare_antibiotic_states`.
+        diffusion_only: Whether export and hydrolysis are disabled.
+
+    Returns:
+        Update dictionary keyed by antibiotic.
+    """
+    # Make sure there are no NANs in the update.
+    assert not np.any(np.isnan(delta_arr))
+
+    update = {}
+    for i, antibiotic in enumerate(antibiotics):
+        delta = species_array_to_dict(delta_arr[i], SPECIES_TO_INDEX)
+        update[antibiotic] = {
+            # Add units back in
+            "species": add_units(
+                delta,
+                saved_units[i]["species"],
+                strict=not diffusion_only,
+            ),
+            "exchanges": {"external": external_exchanges[i]},
+        }
+    return update
 
 
 def test_antibiotic_transport_steady_state():
@@ -54,7 +54,7 @@ from ecoli.library.cell_wall.column_sampler import (
     geom_sampler,
     sample_column,
 )
-from ecoli.library.cell_wall.hole_detection import detect_holes_skimage
+from ecoli.library.cell_wall.hole_detection import detect_holes_union_find
 from ecoli.library.cell_wall.lattice import (
     calculate_lattice_size,
     get_length_distributions,
@@ -328,7 +328,7 @@ class CellWall(Process):
         )
 
         # Crack detection (cracking is irreversible)
-        hole_sizes, _ = detect_holes_skimage(new_lattice)
+        hole_sizes, _ = detect_holes_union_find(new_lattice)
         max_size = hole_sizes.max() * self.peptidoglycan_unit_area * extension_factor
 
         # See if stretching will save from cracking
@@ -379,7 +379,7 @@ class CellWall(Process):
             )
 
             # Crack detection (cracking is irreversible)
-            hole_sizes, _ = detect_holes_skimage(new_lattice)
+            hole_sizes, _ = detect_holes_union_find(new_lattice)
             max_size = (
                 hole_sizes.max() * self.peptidoglycan_unit_area * extension_factor
             )
@@ -0,0 +1,216 @@
+"""
+Compare the batched antibiotic transport functions (rates, Jacobian,
+integration and steady state) against the scalar functions for one system.
+"""
+
+import numpy as np
+import pytest
+from numpy.polynomial import polynomial
+from scipy.integrate import solve_ivp
+
+from ecoli.processes.antibiotics.antibiotic_transport_steady_state import (
+    SPECIES,
+    SPECIES_TO_INDEX,
+    batch_reaction_parameters,
+    batch_reaction_rates,
+    batch_species_derivatives,
+    find_steady_state,
+    find_steady_state_batch,
+    integrate_species_batch,
+    species_derivatives,
+)
+
+
+def make_reaction_params(
+    outer_kcat=0.0,
+    inner_kcat=0.0,
+    outer_n=1.0,
+    inner_n=1.0,
+    outer_permeability=1.0,
+    inner_permeability=1.0,
+    km=1.0,
+):
+    """Unitless reaction parameters with hydrolysis at half the export rate."""
+    return {
+        "diffusion": {
+            "outer_permeability": outer_permeability,
+            "outer_area": 1.0,
+            "periplasm_volume": 1.0,
+            "charge": 0.0,
+            "inner_permeability": inner_permeability,
+            "inner_area": 1.0,
+            "cytoplasm_volume": 1.0,
+        },
+        "export": {
+            "outer_kcat": outer_kcat,
+            "outer_km": km,
+            "outer_enzyme_conc": 1.0,
+            "outer_n": outer_n,
+            "inner_kcat": inner_kcat,
+            "inner_km": km,
+            "inner_enzyme_conc": 1.0,
+            "inner_n": inner_n,
+        },
+        "hydrolysis": {
+            "outer_kcat": outer_kcat,
+            "outer_km": km,
+            "outer_enzyme_conc": 0.5,
+            "outer_n": outer_n,
+            "inner_kcat": inner_kcat,
+            "inner_km": km,
+            "inner_enzyme_conc": 0.5,
+            "inner_n": inner_n,
+        },
+    }
+
+
+def random_systems(n_systems, seed=0):
+    """Reaction parameters, biases and states of random systems with
+    nonnegative membrane biases (for which both paths find the same root)."""
+    random_state = np.random.RandomState(seed)
+    params_list = []
+    for _ in range(n_systems):
+        params = make_reaction_params()
+        for reaction_params in params.values():
+            for parameter in reaction_params:
+                if parameter.endswith("_n"):
+                    reaction_params[parameter] = float(random_state.choice([1, 2]))
+                elif parameter != "charge":
+                    reaction_params[parameter] = random_state.uniform(0.5, 3)
+        params_list.append(params)
+    outer_biases = random_state.choice([0, 0.5, 1.5], n_systems)
+    inner_biases = random_state.choice([0, 0.3, 1], n_systems)
+    state_arr = random_state.uniform(0, 3, (n_systems, len(SPECIES)))
+    # Michaelis-Menten derivatives at zero concentration
+    state_arr[0, SPECIES_TO_INDEX["periplasm"]] = 0
+    state_arr[1, SPECIES_TO_INDEX["cytoplasm"]] = 0
+    return params_list, outer_biases, inner_biases, state_arr
+
+
+def test_batch_species_derivatives():
+    params_list, outer_biases, inner_biases, state_arr = random_systems(8)
+    reaction_params = batch_reaction_parameters(params_list)
+    derivs, jac = batch_species_derivatives(
+        state_arr, reaction_params, outer_biases, inner_biases
+    )
+    rates, _ = batch_reaction_rates(
+        state_arr, reaction_params, outer_biases, inner_biases
+    )
+    assert rates.shape == (len(params_list), 6)
+
+    eps = 1e-6
+    for i, params in enumerate(params_list):
+        args = (params, outer_biases[i], inner_biases[i])
+        np.testing.assert_allclose(
+            derivs[i], species_derivatives(state_arr[i], *args), rtol=1e-12
+        )
+
+        # Central differences of the scalar derivatives
+        expected_jac = np.zeros((len(SPECIES), len(SPECIES)))
+        for j in range(len(SPECIES)):
+            dy = np.zeros(len(SPECIES))
+            dy[j] = eps
+            expected_jac[:, j] = (
+                species_derivatives(state_arr[i] + dy, *args)
+                - species_derivatives(state_arr[i] - dy, *args)
+            ) / (2 * eps)
+        np.testing.assert_allclose(jac[i], expected_jac, rtol=1e-5, atol=1e-8)
+
+
+@pytest.mark.parametrize("method", ["RK45", "BDF", "LSODA"])
+def test_integrate_species_batch(method):
+    params_list, outer_biases, inner_biases, state_arr = random_systems(5, seed=1)
+    final_state_arr = integrate_species_batch(
+        state_arr,
+        batch_reaction_parameters(params_list),
+        outer_biases,
+        inner_biases,
+        2.0,
+        method=method,
+    )
+    for i, params in enumerate(params_list):
+        result = solve_ivp(
+            lambda t, y: species_derivatives(
+                y, params, outer_biases[i], inner_biases[i]
+            ),
+            [0, 2.0],
+            state_arr[i],
+            rtol=1e-8,
+            atol=1e-10,
+        )
+        assert result.success
+        np.testing.assert_allclose(
+            final_state_arr[i], result.y[:, -1], rtol=1e-2, atol=1e-3
+        )
+
+
+def test_find_steady_state_batch():
+    params_list, outer_biases, inner_biases, state_arr = random_systems(8, seed=2)
+    # Only diffusion (linear) and no inner membrane transport (singular
+    # Jacobian, which falls back to the scalar path)
+    params_list.append(make_reaction_params())
+    params_list.append(make_reaction_params(outer_kcat=4, inner_permeability=0))
+    outer_biases = np.append(outer_biases, [1.0, 0])
+    inner_biases = np.append(inner_biases, [0.5, 0])
+    external = np.append(state_arr[:, SPECIES_TO_INDEX["external"]], [2.0, 3.0])
+
+    steady_state = find_steady_state_batch(
+        external, batch_reaction_parameters(params_list), outer_biases, inner_biases
+    )
+    for i, params in enumerate(params_list):
+        expected = find_steady_state(
+            external[i], params, outer_biases[i], inner_biases[i]
+        )
+        np.testing.assert_allclose(steady_state[i], expected, rtol=1e-6, atol=1e-9)
+        assert np.all(steady_state[i] >= 0)
+
+
+@pytest.mark.parametrize("n", [1.0, 2.0])
+def test_find_steady_state_batch_roots(n):
+    """With a negative outer membrane bias, the periplasm steady state is
+    a root of a polynomial with one nonnegative root and other negative
+    ones (the scalar path, starting from a negative guess, can converge to
+    a negative root). The batched path returns the nonnegative root."""
+    external = 1.5
+    bias = -1.0
+    vmax = 10.0
+    params = make_reaction_params(outer_kcat=vmax / 1.5, outer_n=n)
+    steady_state = find_steady_state_batch(
+        np.array([external]),
+        batch_reaction_parameters([params]),
+        np.array([bias]),
+        np.zeros(1),
+    )[0]
+
+    # Without inner membrane enzymes or bias, cytoplasm equals periplasm
+    # and the periplasm concentration p is a root of
+    # s * (external - p * q) * (km + p^n) - vmax * p^n
+    q = np.exp(bias)
+    s = bias / (q - 1)
+    p_n = polynomial.polypow([0, 1], int(n))
+    roots = polynomial.polyroots(
+        polynomial.polysub(
+            polynomial.polymul(
+                s * np.array([external, -q]), polynomial.polyadd(1, p_n)
+            ),
+            vmax * p_n,
+        )
+    )
+    real_roots = roots[np.isreal(roots)].real
+    nonnegative_roots = real_roots[real_roots >= 0]
+    assert len(real_roots) > 1
+    assert len(nonnegative_roots) == 1
+    np.testing.assert_allclose(
+        steady_state, [nonnegative_roots[0], nonnegative_roots[0]], rtol=1e-8
+    )
+    for root in real_roots:
+        state_arr = np.zeros(len(SPECIES))
+        state_arr[SPECIES_TO_INDEX["external"]] = external
+        state_arr[SPECIES_TO_INDEX["periplasm"]] = root
+        state_arr[SPECIES_TO_INDEX["cytoplasm"]] = root
+        derivs = species_derivatives(state_arr, params, bias, 0)
+        np.testing.assert_allclose(
+            derivs[[SPECIES_TO_INDEX["periplasm"], SPECIES_TO_INDEX["cytoplasm"]]],
+            0,
+            atol=1e-8,
+        )
@@ -24,6 +24,7 @@ from ecoli.library.schema import (
     attrs,
     bulk_name_to_idx,
     listener_schema,
+    DomainTree,
 )
 
 from wholecell.utils import units
@@ -273,22 +274,19 @@ class ChromosomeReplication(PartitionedProcess):
             # Get attributes of existing oriCs and domains
             (domain_index_existing_oric,) = attrs(states["oriCs"], ["domain_index"])
 
-            # Get indexes of the domains that would be getting child domains
-            # (domains that contain an origin)
-            new_parent_domains = np.where(
-                np.in1d(domain_index_existing_domain, domain_index_existing_oric)
-            )[0]
+            # Create two child domains for each domain that contains an
+            # origin
+            domain_tree = DomainTree(
+                domain_index_existing_domain, child_domains, self.no_child_place_holder
+            )
+            domain_index_new, child_domains = domain_tree.add_children(
+                domain_index_existing_oric
+            )
 
             # Calculate counts of new replisomes and domains to add
             n_new_replisome = 2 * n_oriC
             n_new_domain = 2 * n_oriC
 
-            # Calculate the domain indexes of new domains and oriC's
-            max_domain_index = domain_index_existing_domain.max()
-            domain_index_new = np.arange(
-                max_domain_index + 1, max_domain_index + 2 * n_oriC + 1, dtype=np.int32
-            )
-
             # Add new oriC's, and reset attributes of existing oriC's
             # All oriC's must be assigned new domain indexes
             update["oriCs"]["set"] = {"domain_index": domain_index_new[:n_oriC]}
@@ -328,7 +326,6 @@ class ChromosomeReplication(PartitionedProcess):
             }
 
             # Add new domains as children of existing domains
-            child_domains[new_parent_domains] = domain_index_new.reshape(-1, 2)
             existing_domains_update = {"set": {"child_domains": child_domains}}
             update["chromosome_domains"].update(
                 {**new_domains_update, **existing_domains_update}
@@ -434,11 +431,6 @@ class ChromosomeReplication(PartitionedProcess):
 
         # If any forks were terminated,
         if terminated_replisomes.sum() > 0:
-            # Get domain indexes of terminated forks
-            terminated_domains = np.unique(
-                domain_index_replisome[terminated_replisomes]
-            )
-
             # Get attributes of existing domains and full chromosomes
             (
                 domain_index_domains,
@@ -447,51 +439,32 @@ class ChromosomeReplication(PartitionedProcess):
             (domain_index_full_chroms,) = attrs(
                 states["full_chromosomes"], ["domain_index"]
             )
+            domain_tree = DomainTree(
+                domain_index_domains, child_domains, self.no_child_place_holder
+            )
 
-            # Initialize array of replisomes that should be deleted
-            replisomes_to_delete = np.zeros_like(domain_index_replisome, dtype=np.bool_)
-
-            # Count number of new full chromosomes that should be created
-            n_new_chromosomes = 0
-
-            # Initialize array for domain indexes of new full chromosomes
-            domain_index_new_full_chroms = []
+            # If both replisomes in a domain have terminated, we are ready to
+            # split the chromosome and update the attributes.
+            n_terminated_per_domain = np.bincount(
+                domain_index_replisome[terminated_replisomes],
+                minlength=domain_tree.size,
+            )
+            finished_domains = np.flatnonzero(n_terminated_per_domain == 2)
 
-            for terminated_domain_index in terminated_domains:
-                # Get all terminated replisomes in the terminated domain
-                terminated_domain_matching_replisomes = np.logical_and(
-                    domain_index_replisome == terminated_domain_index,
-                    terminated_replisomes,
-                )
+            # Tag replisomes in finished domains for deletion
+            replisomes_to_delete = np.logical_and(
+                terminated_replisomes,
+                n_terminated_per_domain[domain_index_replisome] == 2,
+            )
 
-                # If both replisomes in the domain have terminated, we are
-                # ready to split the chromosome and update the attributes.
-                if terminated_domain_matching_replisomes.sum() == 2:
-                    # Tag replisomes and domains with the given domain index
-                    # for deletion
-                    replisomes_to_delete = np.logical_or(
-                        replisomes_to_delete, terminated_domain_matching_replisomes
-                    )
-
-                    domain_mask = domain_index_domains == terminated_domain_index
-
-                    # Get child domains of deleted domain
-                    child_domains_this_domain = child_domains[
-                        np.where(domain_mask)[0][0], :
-                    ]
-
-                    # Modify domain index of one existing full chromosome to
-                    # index of first child domain
-                    domain_index_full_chroms = domain_index_full_chroms.copy()
-                    domain_index_full_chroms[
-                        np.where(domain_index_full_chroms == terminated_domain_index)[0]
-                    ] = child_domains_this_domain[0]
-
-                    # Increment count of new full chromosome
-                    n_new_chromosomes += 1
-
-                    # Append chromosome index of new full chromosome
-                    domain_index_new_full_chroms.append(child_domains_this_domain[1])
+            # Modify domain index of the existing full chromosome of each
+            # finished domain to the index of its first child domain, and
+            # create a new full chromosome for its second child domain
+            n_new_chromosomes = len(finished_domains)
+            domain_index_full_chroms = domain_tree.replace_with_first_child(
+                domain_index_full_chroms, finished_domains
+            )
+            domain_index_new_full_chroms = domain_tree.children(finished_domains)[:, 1]
 
             # Delete terminated replisomes
             update["active_replisomes"]["delete"] = np.where(replisomes_to_delete)[0]
@@ -8,6 +8,8 @@ Chromosome Structure
 - Reset the boundaries and linking numbers of chromosomal segments.
 """
 
+from typing import Callable
+
 import numpy as np
 import numpy.typing as npt
 import warnings
@@ -127,6 +129,10 @@ class ChromosomeStructure(Step):
         self.unprocessed_rna_index_mapping = self.parameters[
             "unprocessed_rna_index_mapping"
         ]
+        # Column of mature_rna_end_positions for each TU (-1 if processed)
+        self.unprocessed_rna_columns = np.full(self.n_TUs, -1, dtype=np.int64)
+        for rna_index, column in self.unprocessed_rna_index_mapping.items():
+            self.unprocessed_rna_columns[rna_index] = column
 
         # Load sim options
         self.calculate_superhelical_densities = self.parameters[
@@ -308,71 +314,37 @@ class ChromosomeStructure(Step):
             states["DnaA_boxes"], ["domain_index", "coordinates", "DnaA_bound"]
         )
 
-        # Build dictionary of replisome coordinates with domain indexes as keys
-        replisome_coordinates_from_domains = {
-            domain_index: replisome_coordinates[
-                replisome_domain_indexes == domain_index
-            ]
-            for domain_index in np.unique(replisome_domain_indexes)
-        }
-
-        def get_removed_molecules_mask(domain_indexes, coordinates):
-            """
-            Computes the boolean mask of unique molecules that should be
-            removed based on the progression of the replication forks.
-            """
-            mask = np.zeros_like(domain_indexes, dtype=np.bool_)
-
-            # Loop through all domains
-            for domain_index in np.unique(domain_indexes):
-                # Domain has active replisomes
-                if domain_index in replisome_coordinates_from_domains:
-                    domain_replisome_coordinates = replisome_coordinates_from_domains[
-                        domain_index
-                    ]
-
-                    # Get mask for molecules on this domain that are out of range
-                    # It's rare but we have to remove molecules at the exact same
-                    # coordinates as the replisomes as well so that they do not break
-                    # the chromosome segment calculations if they are removed by a
-                    # different process (hence, >= and <= instead of > and <)
-                    domain_mask = np.logical_and.reduce(
-                        (
-                            domain_indexes == domain_index,
-                            coordinates >= domain_replisome_coordinates.min(),
-                            coordinates <= domain_replisome_coordinates.max(),
-                        )
-                    )
-
-                # Domain has no active replisomes
-                else:
-                    children_of_domain = child_domains[
-                        all_chromosome_domain_indexes == domain_index
-                    ]
-                    # Child domains are full chromosomes (domain has finished replicating)
-                    if np.all(np.isin(children_of_domain, mother_domain_indexes)):
-                        # Remove all molecules on this domain
-                        domain_mask = domain_indexes == domain_index
-                    # Domain has not started replication or replication was interrupted
-                    else:
-                        continue
-
-                mask[domain_mask] = True
-
-            return mask
-
-        # Build mask for molecules that should be removed
-        removed_RNAPs_mask = get_removed_molecules_mask(
-            RNAP_domain_indexes, RNAP_coordinates
-        )
-        removed_promoters_mask = get_removed_molecules_mask(
-            promoter_domain_indexes, promoter_coordinates
-        )
-        removed_genes_mask = get_removed_molecules_mask(
-            gene_domain_indexes, gene_coordinates
+        # Build masks for molecules that should be removed, for all types of
+        # molecules bound to the chromosome at once
+        molecule_domain_indexes = (
+            RNAP_domain_indexes,
+            promoter_domain_indexes,
+            gene_domain_indexes,
+            DnaA_box_domain_indexes,
         )
-        removed_DnaA_boxes_mask = get_removed_molecules_mask(
-            DnaA_box_domain_indexes, DnaA_box_coordinates
+        (
+            removed_RNAPs_mask,
+            removed_promoters_mask,
+            removed_genes_mask,
+            removed_DnaA_boxes_mask,
+        ) = np.split(
+            get_removed_molecules_mask(
+                np.concatenate(molecule_domain_indexes),
+                np.concatenate(
+                    (
+                        RNAP_coordinates,
+                        promoter_coordinates,
+                        gene_coordinates,
+                        DnaA_box_coordinates,
+                    )
+                ),
+                replisome_domain_indexes,
+                replisome_coordinates,
+                all_chromosome_domain_indexes,
+                child_domains,
+                mother_domain_indexes,
+            ),
+            np.cumsum([len(d) for d in molecule_domain_indexes])[:-1],
         )
 
         # Build masks for head-on and co-directional collisions between RNAPs
@@ -440,6 +412,19 @@ class ChromosomeStructure(Step):
             all_new_segment_domain_indexes = np.array([], dtype=np.int32)
             all_new_linking_numbers = np.array([], dtype=np.float64)
 
+            # Group molecules by domain once so that each domain only touches
+            # its own molecules
+            RNAPs_in_domain = group_by_domain(RNAP_domain_indexes)
+            replisomes_in_domain = group_by_domain(replisome_domain_indexes)
+            segments_in_domain = group_by_domain(segment_domain_indexes)
+            # Parent of each domain (first one listed if there are several)
+            parent_domain_indexes = dict(
+                zip(
+                    child_domains[::-1].ravel(),
+                    np.repeat(all_chromosome_domain_indexes[::-1], 2),
+                )
+            )
+
             # Iteratively tally RNAPs that were removed due to collisions with
             # replication forks with or without replisomes on each domain
             removed_RNAP_masks_all_domains = np.full_like(removed_RNAPs_mask, False)
@@ -452,32 +437,32 @@ class ChromosomeStructure(Step):
                 domain_spans_terC = domain_index in mother_domain_indexes
 
                 # Parse attributes of remaining RNAPs in this domain
-                RNAPs_domain_mask = RNAP_domain_indexes == domain_index
-                RNAP_coordinates_this_domain = RNAP_coordinates[RNAPs_domain_mask]
-                RNAP_unique_indexes_this_domain = RNAP_unique_indexes[RNAPs_domain_mask]
-                domain_remaining_RNAPs_mask = ~removed_RNAPs_mask[RNAPs_domain_mask]
+                RNAPs_this_domain = RNAPs_in_domain(domain_index)
+                RNAP_coordinates_this_domain = RNAP_coordinates[RNAPs_this_domain]
+                RNAP_unique_indexes_this_domain = RNAP_unique_indexes[RNAPs_this_domain]
+                domain_remaining_RNAPs_mask = ~removed_RNAPs_mask[RNAPs_this_domain]
 
                 # Parse attributes of segments in this domain
-                segments_domain_mask = segment_domain_indexes == domain_index
+                segments_this_domain = segments_in_domain(domain_index)
                 boundary_molecule_indexes_this_domain = boundary_molecule_indexes[
-                    segments_domain_mask, :
+                    segments_this_domain, :
                 ]
                 boundary_coordinates_this_domain = boundary_coordinates[
-                    segments_domain_mask, :
+                    segments_this_domain, :
                 ]
-                linking_numbers_this_domain = linking_numbers[segments_domain_mask]
+                linking_numbers_this_domain = linking_numbers[segments_this_domain]
 
                 new_molecule_coordinates_this_domain = np.array([], dtype=np.int64)
                 new_molecule_indexes_this_domain = np.array([], dtype=np.int64)
                 # Append coordinates and indexes of replisomes on this domain,
                 # if any
                 if not domain_spans_oriC:
-                    replisome_domain_mask = replisome_domain_indexes == domain_index
+                    replisomes_this_domain = replisomes_in_domain(domain_index)
                     replisome_coordinates_this_domain = replisome_coordinates[
-                        replisome_domain_mask
+                        replisomes_this_domain
                     ]
                     replisome_molecule_indexes_this_domain = replisome_unique_indexes[
-                        replisome_domain_mask
+                        replisomes_this_domain
                     ]
 
                     # If one or more replisomes was removed in the last time step,
@@ -502,13 +487,9 @@ class ChromosomeStructure(Step):
                         domain_remaining_RNAPs_mask = np.logical_and(
                             domain_remaining_RNAPs_mask, ~RNAPs_on_forks
                         )
-                        full_removed_RNAPs_mask = np.full_like(
-                            removed_RNAPs_mask, False
-                        )
-                        full_removed_RNAPs_mask[RNAPs_domain_mask] = RNAPs_on_forks
-                        removed_RNAP_masks_all_domains = np.logical_or(
-                            removed_RNAP_masks_all_domains, full_removed_RNAPs_mask
-                        )
+                        removed_RNAP_masks_all_domains[
+                            RNAPs_this_domain[RNAPs_on_forks]
+                        ] = True
 
                     new_molecule_coordinates_this_domain = np.concatenate(
                         (
@@ -526,17 +507,13 @@ class ChromosomeStructure(Step):
                 # Append coordinates and indexes of parent domain replisomes,
                 # if any
                 if not domain_spans_terC:
-                    parent_domain_index = all_chromosome_domain_indexes[
-                        np.where(child_domains == domain_index)[0][0]
-                    ]
-                    replisome_parent_domain_mask = (
-                        replisome_domain_indexes == parent_domain_index
-                    )
+                    parent_domain_index = parent_domain_indexes[domain_index]
+                    replisomes_parent_domain = replisomes_in_domain(parent_domain_index)
                     replisome_coordinates_parent_domain = replisome_coordinates[
-                        replisome_parent_domain_mask
+                        replisomes_parent_domain
                     ]
                     replisome_molecule_indexes_parent_domain = replisome_unique_indexes[
-                        replisome_parent_domain_mask
+                        replisomes_parent_domain
                     ]
 
                     # If one or more replisomes was removed in the last time step,
@@ -544,14 +521,12 @@ class ChromosomeStructure(Step):
                     if len(replisome_molecule_indexes_parent_domain) != 2:
                         assert len(replisome_molecule_indexes_parent_domain) < 2
                         # Parse attributes of segments in parent domain
-                        parent_segments_domain_mask = (
-                            segment_domain_indexes == parent_domain_index
-                        )
+                        segments_parent_domain = segments_in_domain(parent_domain_index)
                         boundary_molecule_indexes_parent_domain = (
-                            boundary_molecule_indexes[parent_segments_domain_mask, :]
+                            boundary_molecule_indexes[segments_parent_domain, :]
                         )
                         boundary_coordinates_parent_domain = boundary_coordinates[
-                            parent_segments_domain_mask, :
+                            segments_parent_domain, :
                         ]
                         (
                             replisome_coordinates_parent_domain,
@@ -571,13 +546,9 @@ class ChromosomeStructure(Step):
                         domain_remaining_RNAPs_mask = np.logical_and(
                             domain_remaining_RNAPs_mask, ~RNAPs_on_forks
                         )
-                        full_removed_RNAPs_mask = np.full_like(
-                            removed_RNAPs_mask, False
-                        )
-                        full_removed_RNAPs_mask[RNAPs_domain_mask] = RNAPs_on_forks
-                        removed_RNAP_masks_all_domains = np.logical_or(
-                            removed_RNAP_masks_all_domains, full_removed_RNAPs_mask
-                        )
+                        removed_RNAP_masks_all_domains[
+                            RNAPs_this_domain[RNAPs_on_forks]
+                        ] = True
 
                     new_molecule_coordinates_this_domain = np.concatenate(
                         (
@@ -719,49 +690,46 @@ class ChromosomeStructure(Step):
                     incomplete_rna_indexes, minlength=self.n_TUs
                 )
 
+                # Not every removed RNAP has a transcript
+                n_incomplete_RNAs = len(incomplete_rna_indexes)
                 incomplete_sequences = buildSequences(
                     self.rna_sequences,
                     incomplete_rna_indexes,
-                    np.zeros(n_total_collisions, dtype=np.int64),
-                    np.full(n_total_collisions, incomplete_sequence_lengths.max()),
+                    np.zeros(n_incomplete_RNAs, dtype=np.int64),
+                    np.full(n_incomplete_RNAs, incomplete_sequence_lengths.max()),
                 )
 
-                mature_rna_counts = np.zeros(self.n_mature_rnas, dtype=np.int64)
-                base_counts = np.zeros(self.n_fragment_bases, dtype=np.int64)
-
-                for ri, sl, seq in zip(
-                    incomplete_rna_indexes,
-                    incomplete_sequence_lengths,
-                    incomplete_sequences,
-                ):
-                    # Check if incomplete RNA is an unprocessed RNA
-                    if ri in self.unprocessed_rna_index_mapping:
-                        # Find mature RNA molecules that would need to be added
-                        # given the length of the incomplete RNA
-                        mature_rna_end_pos = self.mature_rna_end_positions[
-                            :, self.unprocessed_rna_index_mapping[ri]
-                        ]
-                        mature_rnas_produced = np.logical_and(
-                            mature_rna_end_pos != 0, mature_rna_end_pos < sl
-                        )
-
-                        # Increment counts of mature RNAs
-                        mature_rna_counts += mature_rnas_produced
+                # Count bases of all incomplete transcripts at once
+                base_counts = np.bincount(
+                    incomplete_sequences[
+                        np.arange(incomplete_sequences.shape[1])
+                        < incomplete_sequence_lengths[:, np.newaxis]
+                    ],
+                    minlength=self.n_fragment_bases,
+                ).astype(np.int64)
 
-                        # Increment counts of fragment NTPs, but exclude bases
-                        # that are part of the mature RNAs generated
-                        base_counts += np.bincount(
-                            seq[:sl], minlength=self.n_fragment_bases
-                        ) - self.mature_rna_nt_counts[mature_rnas_produced, :].sum(
-                            axis=0
-                        )
+                # Find mature RNA molecules that would need to be added given
+                # the lengths of incomplete unprocessed RNAs
+                unprocessed_columns = self.unprocessed_rna_columns[
+                    incomplete_rna_indexes
+                ]
+                is_unprocessed = unprocessed_columns >= 0
+                mature_rna_counts = np.zeros(self.n_mature_rnas, dtype=np.int64)
+                if is_unprocessed.any():
+                    mature_rna_end_pos = self.mature_rna_end_positions[
+                        :, unprocessed_columns[is_unprocessed]
+                    ]
+                    mature_rnas_produced = np.logical_and(
+                        mature_rna_end_pos != 0,
+                        mature_rna_end_pos
+                        < incomplete_sequence_lengths[is_unprocessed],
+                    )
+                    mature_rna_counts += mature_rnas_produced.sum(axis=1)
 
-                        # Exclude ppi molecules that are part of mature RNAs
-                        n_ppi_added -= mature_rnas_produced.sum()
-                    else:
-                        base_counts += np.bincount(
-                            seq[:sl], minlength=self.n_fragment_bases
-                        )
+                    # Exclude bases and ppi molecules that are part of the
+                    # mature RNAs generated
+                    base_counts -= mature_rna_counts.dot(self.mature_rna_nt_counts)
+                    n_ppi_added -= mature_rnas_produced.sum()
 
                 # Increment counts of mature RNAs, fragment NTPs and phosphates
                 update["bulk"].append((self.mature_rna_idx, mature_rna_counts))
@@ -813,12 +781,13 @@ class ChromosomeStructure(Step):
                     np.full(n_removed_ribosomes, incomplete_sequence_lengths.max()),
                 )
 
-                amino_acid_counts = np.zeros(self.n_amino_acids, dtype=np.int64)
-
-                for sl, seq in zip(incomplete_sequence_lengths, incomplete_sequences):
-                    amino_acid_counts += np.bincount(
-                        seq[:sl], minlength=self.n_amino_acids
-                    )
+                amino_acid_counts = np.bincount(
+                    incomplete_sequences[
+                        np.arange(incomplete_sequences.shape[1])
+                        < incomplete_sequence_lengths[:, np.newaxis]
+                    ],
+                    minlength=self.n_amino_acids,
+                ).astype(np.int64)
 
                 # Increment counts of free amino acids and decrease counts of
                 # free water molecules
@@ -833,6 +802,8 @@ class ChromosomeStructure(Step):
         # Write to listener
         update["listeners"]["rnap_data"]["n_removed_ribosomes"] = n_removed_ribosomes
 
+        domain_order = np.argsort(all_chromosome_domain_indexes)
+
         def get_replicated_motif_attributes(old_coordinates, old_domain_indexes):
             """
             Computes the attributes of replicated motifs on the chromosome,
@@ -843,12 +814,13 @@ class ChromosomeStructure(Step):
 
             # Domain indexes are set to the child indexes of the original index
             new_domain_indexes = child_domains[
-                np.array(
-                    [
-                        np.where(all_chromosome_domain_indexes == idx)[0][0]
-                        for idx in old_domain_indexes
-                    ]
-                ),
+                domain_order[
+                    np.searchsorted(
+                        all_chromosome_domain_indexes,
+                        old_domain_indexes,
+                        sorter=domain_order,
+                    )
+                ],
                 :,
             ].flatten()
 
@@ -1113,22 +1085,22 @@ class ChromosomeStructure(Step):
 
         # Recalculate linking numbers of each segment after accounting for
         # boundary molecules that were removed in the current timestep
-        linking_numbers_after_removal = []
         right_boundaries_retained = np.isin(
             old_boundary_molecule_indexes_sorted[:, 1], new_molecule_indexes_sorted
         )
 
         # Add up linking numbers of each segment until each retained boundary
-        ln_this_fragment = 0.0
-        for retained, ln in zip(right_boundaries_retained, old_linking_numbers_sorted):
-            ln_this_fragment += ln
-
-            if retained:
-                linking_numbers_after_removal.append(ln_this_fragment)
-                ln_this_fragment = 0.0
-
-        # Number of segments should be equal to number of retained boundaries
-        assert len(linking_numbers_after_removal) == right_boundaries_retained.sum()
+        # (segments after the last retained boundary are dropped)
+        n_retained = np.count_nonzero(right_boundaries_retained)
+        merged_segment_index = (
+            np.cumsum(right_boundaries_retained) - right_boundaries_retained
+        )
+        before_last_retained = merged_segment_index < n_retained
+        linking_numbers_after_removal = np.bincount(
+            merged_segment_index[before_last_retained],
+            weights=old_linking_numbers_sorted[before_last_retained],
+            minlength=n_retained,
+        )
 
         # Redistribute linking numbers of the two terC segments such that the
         # segments have same superhelical densities
@@ -1143,23 +1115,20 @@ class ChromosomeStructure(Step):
                 retained_boundary_indexes[-2], 1
             ]
 
-            # Get mapping from molecule index to chromosomal coordinates
-            molecule_index_to_coordinates = {
-                index: coordinates
-                for index, coordinates in zip(
-                    new_molecule_indexes_sorted, new_molecule_coordinates_sorted
-                )
-            }
+            # Get chromosomal coordinates of these molecules (last one listed
+            # for the terC dummy molecule)
+            def molecule_coordinates(index):
+                return new_molecule_coordinates_sorted[
+                    np.flatnonzero(new_molecule_indexes_sorted == index)[-1]
+                ]
 
             # Distribute linking number between two segments proportional to
             # the length of each segment
             left_segment_length = (
-                molecule_index_to_coordinates[left_segment_boundary_index]
-                - self.min_coordinates
+                molecule_coordinates(left_segment_boundary_index) - self.min_coordinates
             )
-            right_segment_length = (
-                self.max_coordinates
-                - molecule_index_to_coordinates[right_segment_boundary_index]
+            right_segment_length = self.max_coordinates - molecule_coordinates(
+                right_segment_boundary_index
             )
             full_segment_length = left_segment_length + right_segment_length
             full_linking_number = (
@@ -1186,25 +1155,31 @@ class ChromosomeStructure(Step):
         assert len(segment_split_sizes) == len(linking_numbers_after_removal)
 
         # Calculate linking numbers of each segment after accounting for new
-        # boundaries that were added
-        new_linking_numbers = []
-        i = 0
-
-        for ln, size in zip(linking_numbers_after_removal, segment_split_sizes):
-            if size == 1:
-                new_linking_numbers.append(ln)
-            else:
-                # Split linking number proportional to length of segment
-                total_length = segment_lengths[i : i + size].sum()
-                new_linking_numbers.extend(
-                    list(ln * segment_lengths[i : i + size] / total_length)
-                )
-            i += size
+        # boundaries that were added by splitting the linking number of each
+        # segment proportional to the lengths of the new segments
+        split_segment_index = np.repeat(
+            np.arange(len(segment_split_sizes)), segment_split_sizes
+        )
+        split_lengths = segment_lengths[: len(split_segment_index)]
+        split_total_lengths = np.bincount(
+            split_segment_index,
+            weights=split_lengths,
+            minlength=len(segment_split_sizes),
+        )
+        split_linking_numbers = linking_numbers_after_removal[split_segment_index]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            new_linking_numbers = np.where(
+                segment_split_sizes[split_segment_index] == 1,
+                split_linking_numbers,
+                split_linking_numbers
+                * split_lengths
+                / split_total_lengths[split_segment_index],
+            )
 
         # Handle edge case where a domain was just initialized, and two
         # replisomes are bound to the origin
         if len(new_linking_numbers) == 0:
-            new_linking_numbers = [np.float64(0)]
+            new_linking_numbers = np.zeros(1)
 
         # Build Mx2 array for boundary indexes and coordinates
         new_boundary_molecule_indexes = np.hstack(
@@ -1219,8 +1194,6 @@ class ChromosomeStructure(Step):
                 new_molecule_coordinates_sorted[1:, np.newaxis],
             )
         )
-        new_linking_numbers = np.array(new_linking_numbers)
-
         # If domain does not span oriC, remove new segment that spans origin
         if not spans_oriC:
             oriC_fragment_mask = np.logical_not(
@@ -1249,6 +1222,105 @@ class ChromosomeStructure(Step):
         }
 
 
+def group_by_domain(domain_indexes: np.ndarray) -> Callable[[int], np.ndarray]:
+    """
+    Sorts molecules by domain index once so that the molecules on any domain
+    can be looked up without scanning all molecules.
+
+    Args:
+        domain_indexes: Domain indexes of molecules
+
+    Returns:
+        Function that takes a domain index and returns the indexes of the
+        molecules on that domain (in their original order)
+    """
+    order = np.argsort(domain_indexes, kind="stable")
+    sorted_domain_indexes = domain_indexes[order]
+
+    def molecules_in_domain(domain_index: int) -> np.ndarray:
+        return order[
+            np.searchsorted(
+                sorted_domain_indexes, domain_index, "left"
+            ) : np.searchsorted(sorted_domain_indexes, domain_index, "right")
+        ]
+
+    return molecules_in_domain
+
+
+def get_removed_molecules_mask(
+    domain_indexes: np.ndarray,
+    coordinates: np.ndarray,
+    replisome_domain_indexes: np.ndarray,
+    replisome_coordinates: np.ndarray,
+    chromosome_domain_indexes: np.ndarray,
+    child_domains: np.ndarray,
+    full_chromosome_domain_indexes: np.ndarray,
+) -> np.ndarray:
+    """
+    Computes the boolean mask of unique molecules that should be removed
+    based on the progression of the replication forks. The replisomes are
+    grouped by domain once so that the cost does not depend on the number of
+    domains (i.e. the number of replication forks).
+
+    Args:
+        domain_indexes: (N,) array of domain indexes of molecules
+        coordinates: (N,) array of chromosomal coordinates of molecules
+        replisome_domain_indexes: Domain indexes of active replisomes
+        replisome_coordinates: Chromosomal coordinates of active replisomes
+        chromosome_domain_indexes: Domain indexes of all chromosome domains
+        child_domains: (D, 2) array of child domains for each domain in
+            ``chromosome_domain_indexes``
+        full_chromosome_domain_indexes: Domain indexes of full chromosomes
+
+    Returns:
+        (N,) boolean array that is ``True`` for molecules to remove
+    """
+    # Domains without active replisomes whose child domains are full
+    # chromosomes have finished replicating, so remove all molecules on them
+    replicated_domains = chromosome_domain_indexes[
+        np.all(np.isin(child_domains, full_chromosome_domain_indexes), axis=1)
+    ]
+    mask = np.logical_or(
+        np.isin(domain_indexes, replicated_domains),
+        ~np.isin(domain_indexes, chromosome_domain_indexes),
+    )
+    if len(replisome_domain_indexes) == 0:
+        return mask
+
+    # Range of coordinates covered by the replisomes of each domain
+    fork_domains, fork_groups = np.unique(replisome_domain_indexes, return_inverse=True)
+    fork_groups = fork_groups.reshape(-1)
+    fork_min = np.full(
+        len(fork_domains),
+        np.iinfo(replisome_coordinates.dtype).max,
+        dtype=replisome_coordinates.dtype,
+    )
+    fork_max = np.full(
+        len(fork_domains),
+        np.iinfo(replisome_coordinates.dtype).min,
+        dtype=replisome_coordinates.dtype,
+    )
+    np.minimum.at(fork_min, fork_groups, replisome_coordinates)
+    np.maximum.at(fork_max, fork_groups, replisome_coordinates)
+
+    # Molecules on domains with active replisomes are removed if they are
+    # between the forks. It's rare but we have to remove molecules at the
+    # exact same coordinates as the replisomes as well so that they do not
+    # break the chromosome segment calculations if they are removed by a
+    # different process (hence, >= and <= instead of > and <)
+    fork_idx = np.minimum(
+        np.searchsorted(fork_domains, domain_indexes), len(fork_domains) - 1
+    )
+    has_forks = fork_domains[fork_idx] == domain_indexes
+    return np.where(
+        has_forks,
+        np.logical_and(
+            coordinates >= fork_min[fork_idx], coordinates <= fork_max[fork_idx]
+        ),
+        mask,
+    )
+
+
 def get_last_known_replisome_data(
     boundary_coordinates: np.ndarray,
     boundary_molecule_indexes: np.ndarray,
@@ -1710,5 +1782,28 @@ def test_superhelical_removal_sim():
     )
 
 
+def test_get_removed_molecules_mask():
+    # Domain 0 is replicating with forks on it and on child domain 1. Domain 3
+    # finished replicating into full chromosomes 4 and 5.
+    domain_indexes = np.array([0, 0, 0, 1, 1, 2, 3, 4, 6])
+    coordinates = np.array([-500, -100, 300, -50, 0, 20, 100, 100, 0])
+    mask = get_removed_molecules_mask(
+        domain_indexes,
+        coordinates,
+        replisome_domain_indexes=np.array([0, 1, 0, 1]),
+        replisome_coordinates=np.array([-200, -10, 300, 10]),
+        chromosome_domain_indexes=np.array([0, 1, 2, 3, 4, 5]),
+        child_domains=np.array(
+            [[1, 2], [-1, -1], [-1, -1], [4, 5], [-1, -1], [-1, -1]]
+        ),
+        full_chromosome_domain_indexes=np.array([0, 4, 5]),
+    )
+    # Molecules between (or on) forks, on replicated domains or on unknown
+    # domains are removed
+    np.testing.assert_array_equal(
+        mask, [False, True, True, False, True, False, True, False, True]
+    )
+
+
 if __name__ == "__main__":
     test_superhelical_removal_sim()
@@ -17,6 +17,8 @@ simulation.
 # - allow for shuffling when appropriate (maybe in another process)
 # - handle protein complex dissociation
 
+import time
+
 import numpy as np
 from stochastic_arrow import StochasticSystem
 
@@ -25,6 +27,7 @@ from vivarium.core.composition import simulate_process
 from ecoli.library.schema import numpy_schema, bulk_name_to_idx, counts, listener_schema
 from ecoli.processes.registries import topology_registry
 from ecoli.processes.partition import PartitionedProcess
+from wholecell.utils.tau_leaping import TauLeapingSystem
 
 # Register default topology for this process, associating it with process name
 NAME = "ecoli-complexation"
@@ -45,6 +48,9 @@ class Complexation(PartitionedProcess):
         "reaction_ids": [],
         "complex_ids": [],
         "time_step": 1,
+        # "exact" for Gillespie SSA or "tau_leaping" for hybrid tau-leaping
+        "method": "exact",
+        "tau_leaping_epsilon": 0.03,
     }
 
     def __init__(self, parameters=None):
@@ -59,7 +65,31 @@ class Complexation(PartitionedProcess):
 
         self.randomState = np.random.RandomState(seed=self.parameters["seed"])
         self.seed = self.randomState.randint(2**31)
-        self.system = StochasticSystem(self.stoichiometry, random_seed=self.seed)
+        if self.parameters["method"] == "exact":
+            self.system = StochasticSystem(self.stoichiometry, random_seed=self.seed)
+        elif self.parameters["method"] == "tau_leaping":
+            self.system = TauLeapingSystem(
+                self.stoichiometry,
+                random_seed=self.seed,
+                epsilon=self.parameters["tau_leaping_epsilon"],
+            )
+        else:
+            raise ValueError(
+                f"Unknown complexation method: {self.parameters['method']}"
+            )
+
+        # Reactions consuming and producing each molecule, used to find the
+        # reactions affected when the allocator trims the request
+        self.reactant_matrix = (self.stoichiometry < 0).astype(np.int64)
+        self.product_matrix = (self.stoichiometry > 0).astype(np.int64)
+
+        # Trajectory simulated in calculate_request, reused in evolve_state
+        self.requested_occurrences = None
+        self.requested_counts = None
+        self.ssa_events = 0
+        # Wall-clock time spent simulating in the last step, kept out of the
+        # listener so that output does not depend on the machine
+        self.ssa_time = 0.0
 
     def ports_schema(self):
         return {
@@ -71,7 +101,8 @@ class Complexation(PartitionedProcess):
                             "complexation_events": (
                                 [0] * len(self.reaction_ids),
                                 self.reaction_ids,
-                            )
+                            ),
+                            "ssa_events": 0,
                         }
                     )
                 },
@@ -79,6 +110,27 @@ class Complexation(PartitionedProcess):
             "timestep": {"_default": self.parameters["time_step"]},
         }
 
+    def simulate(self, timestep, molecule_counts, rates):
+        """Run the stochastic simulation, keeping track of the number of
+        simulated events and the time spent simulating them."""
+        start = time.perf_counter()
+        result = self.system.evolve(timestep, molecule_counts, rates)
+        self.ssa_time += time.perf_counter() - start
+        self.ssa_events += int(result["occurrences"].sum())
+        return result["occurrences"].astype(np.int64)
+
+    def affected_reactions(self, shortfall):
+        """Find reactions that consume molecules whose allocation is short of
+        the request, as well as all reactions downstream of them (consuming
+        their products, directly or indirectly)."""
+        affected = self.reactant_matrix.dot(shortfall) > 0
+        while True:
+            products = self.product_matrix[affected].any(axis=0)
+            downstream = affected | (self.reactant_matrix.dot(products) > 0)
+            if np.array_equal(downstream, affected):
+                return affected
+            affected = downstream
+
     def calculate_request(self, timestep, states):
         timestep = states["timestep"]
         if self.molecule_idx is None:
@@ -88,28 +140,48 @@ class Complexation(PartitionedProcess):
 
         moleculeCounts = counts(states["bulk"], self.molecule_idx)
 
-        result = self.system.evolve(timestep, moleculeCounts, self.rates)
-        updatedMoleculeCounts = result["outcome"]
+        self.ssa_events = 0
+        self.ssa_time = 0.0
+        self.requested_occurrences = self.simulate(timestep, moleculeCounts, self.rates)
+        updatedMoleculeCounts = moleculeCounts + self.requested_occurrences.dot(
+            self.stoichiometry
+        )
+        self.requested_counts = np.fmax(moleculeCounts - updatedMoleculeCounts, 0)
         requests = {}
-        requests["bulk"] = [
-            (self.molecule_idx, np.fmax(moleculeCounts - updatedMoleculeCounts, 0))
-        ]
+        requests["bulk"] = [(self.molecule_idx, self.requested_counts)]
         return requests
 
     def evolve_state(self, timestep, states):
         timestep = states["timestep"]
         substrate = counts(states["bulk"], self.molecule_idx)
 
-        result = self.system.evolve(timestep, substrate, self.rates)
-        complexationEvents = result["occurrences"]
-        outcome = result["outcome"] - substrate
+        if self.requested_occurrences is None:
+            # No trajectory from the request phase to reuse
+            self.ssa_events = 0
+            self.ssa_time = 0.0
+            complexationEvents = self.simulate(timestep, substrate, self.rates)
+        else:
+            complexationEvents = self.requested_occurrences
+            shortfall = substrate < self.requested_counts
+            if shortfall.any():
+                # Keep events of unaffected reactions and re-simulate the
+                # affected ones with the molecules that remain
+                affected = self.affected_reactions(shortfall)
+                complexationEvents = np.where(affected, 0, complexationEvents)
+                remaining = substrate + complexationEvents.dot(self.stoichiometry)
+                complexationEvents += self.simulate(
+                    timestep, remaining, np.where(affected, self.rates, 0)
+                )
+            self.requested_occurrences = None
+        outcome = complexationEvents.dot(self.stoichiometry)
 
         # Write outputs to listeners
         update = {
             "bulk": [(self.molecule_idx, outcome)],
             "listeners": {
                 "complexation_listener": {
-                    "complexation_events": complexationEvents.astype(int)
+                    "complexation_events": complexationEvents.astype(int),
+                    "ssa_events": self.ssa_events,
                 }
             },
         }
@@ -154,5 +226,54 @@ def test_complexation():
     print(data)
 
 
+def test_complexation_trimmed_allocation():
+    # A + B -> AB, AB + C -> ABC, D + E -> DE
+    test_config = {
+        "stoichiometry": np.array(
+            [
+                [-1, -1, 1, 0, 0, 0, 0, 0],
+                [0, 0, -1, -1, 1, 0, 0, 0],
+                [0, 0, 0, 0, 0, -1, -1, 1],
+            ],
+            np.int64,
+        ),
+        "rates": np.array([0.01, 0.01, 0.01], np.float64),
+        "molecule_names": ["A", "B", "AB", "C", "ABC", "D", "E", "DE"],
+        "seed": 1,
+        "reaction_ids": ["AB", "ABC", "DE"],
+        "complex_ids": ["AB", "ABC", "DE"],
+    }
+    complexation = Complexation(test_config)
+    bulk = np.array(
+        [(name, 100) for name in test_config["molecule_names"]],
+        dtype=[("id", "U40"), ("count", int)],
+    )
+    states = {"bulk": bulk, "timestep": 1}
+
+    # Full allocation reuses the trajectory from the request
+    request = complexation.calculate_request(1, states)["bulk"][0][1]
+    events = complexation.requested_occurrences.copy()
+    allocated = bulk.copy()
+    allocated["count"] = request
+    update = complexation.evolve_state(1, {"bulk": allocated, "timestep": 1})
+    listener = update["listeners"]["complexation_listener"]
+    assert np.array_equal(listener["complexation_events"], events)
+    assert listener["ssa_events"] == events.sum()
+
+    # Trimming A only re-simulates reactions downstream of A
+    complexation.calculate_request(1, states)
+    events = complexation.requested_occurrences.copy()
+    trimmed = allocated.copy()
+    trimmed["count"] = request
+    trimmed["count"][0] = request[0] // 2
+    update = complexation.evolve_state(1, {"bulk": trimmed, "timestep": 1})
+    complexation_events = update["listeners"]["complexation_listener"][
+        "complexation_events"
+    ]
+    assert complexation_events[2] == events[2]
+    assert np.all(trimmed["count"] + update["bulk"][0][1] >= 0)
+
+
 if __name__ == "__main__":
     test_complexation()
+    test_complexation_trimmed_allocation()
@@ -125,15 +125,13 @@ class EnzymeKinetics(Process):
 
         # TODO (Cyrus) -- convert molecules to concentrations
         molecule_counts = counts(states["bulk"], self.molecules_idx)
-        tuplified_states = {
-            ("bulk", mol): molecule_counts[i]
-            for i, mol in enumerate(self.molecules_ids)
-        }
 
         # get flux, which is in units of mmol / L
-        fluxes = self.kinetic_rate_laws.get_fluxes(tuplified_states)
+        fluxes = self.kinetic_rate_laws.get_flux_array(molecule_counts)
 
-        return {"fluxes": fluxes}
+        return {
+            "fluxes": dict(zip(self.kinetic_rate_laws.reaction_ids, fluxes.tolist()))
+        }
 
 
 def test_enzyme_kinetics(end_time=100):
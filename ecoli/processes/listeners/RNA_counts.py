@@ -5,10 +5,12 @@ RNA Counts Listener
 """
 
 import numpy as np
+import scipy.sparse
+
 from ecoli.library.schema import numpy_schema, attrs, listener_schema
 from vivarium.core.process import Step
 
-from ecoli.processes.registries import topology_registry
+from ecoli.processes.registries import topology_registry, virtual_column_registry
 
 
 NAME = "RNA_counts_listener"
@@ -35,6 +37,7 @@ class RNACounts(Step):
         "mrna_indexes": [],
         "time_step": 1,
         "emit_unique": False,
+        "virtual": False,
     }
 
     def __init__(self, parameters=None):
@@ -57,22 +60,29 @@ class RNACounts(Step):
         # Get mapping matrix between TUs and cistrons
         self.cistron_tu_mapping_matrix = self.parameters["cistron_tu_mapping_matrix"]
 
+        # Cistron counts are linear functions of the TU counts so they can be
+        # skipped here and computed when reading the output instead (see
+        # virtual_rna_counts)
+        self.virtual = self.parameters["virtual"]
+
     def ports_schema(self):
+        listeners = listener_schema(
+            {
+                "mRNA_counts": ([], self.mRNA_TU_ids),
+                "full_mRNA_counts": ([], self.mRNA_TU_ids),
+                "partial_mRNA_counts": ([], self.mRNA_TU_ids),
+                "mRNA_cistron_counts": ([], self.mRNA_cistron_ids),
+                "full_mRNA_cistron_counts": ([], self.mRNA_cistron_ids),
+                "partial_mRNA_cistron_counts": ([], self.mRNA_cistron_ids),
+                "partial_rRNA_counts": ([], self.rRNA_TU_ids),
+                "partial_rRNA_cistron_counts": ([], self.rRNA_cistron_ids),
+            }
+        )
+        if self.virtual:
+            for column in VIRTUAL_COLUMNS:
+                listeners[column]["_emit"] = False
         return {
-            "listeners": {
-                "rna_counts": listener_schema(
-                    {
-                        "mRNA_counts": ([], self.mRNA_TU_ids),
-                        "full_mRNA_counts": ([], self.mRNA_TU_ids),
-                        "partial_mRNA_counts": ([], self.mRNA_TU_ids),
-                        "mRNA_cistron_counts": ([], self.mRNA_cistron_ids),
-                        "full_mRNA_cistron_counts": ([], self.mRNA_cistron_ids),
-                        "partial_mRNA_cistron_counts": ([], self.mRNA_cistron_ids),
-                        "partial_rRNA_counts": ([], self.rRNA_TU_ids),
-                        "partial_rRNA_cistron_counts": ([], self.rRNA_cistron_ids),
-                    }
-                )
-            },
+            "listeners": {"rna_counts": listeners},
             "RNAs": numpy_schema("RNAs", emit=self.parameters["emit_unique"]),
             "global_time": {"_default": 0.0},
             "timestep": {"_default": self.parameters["time_step"]},
@@ -104,6 +114,18 @@ class RNACounts(Step):
         # All unique rRNAs are partially transcribed
         partial_rRNA_counts = all_TU_counts[self.rRNA_indexes]
 
+        if self.virtual:
+            return {
+                "listeners": {
+                    "rna_counts": {
+                        "mRNA_counts": mRNA_counts,
+                        "full_mRNA_counts": full_mRNA_counts,
+                        "partial_mRNA_counts": partial_mRNA_counts,
+                        "partial_rRNA_counts": partial_rRNA_counts,
+                    }
+                }
+            }
+
         # Calculate counts of mRNA cistrons from transcription unit counts
         # TODO (ggsun): Partial RNA cistron counts should take into account
         # 	the lengths of each RNA transcript.
@@ -134,6 +156,74 @@ class RNACounts(Step):
         return update
 
 
+VIRTUAL_COLUMNS = [
+    "mRNA_cistron_counts",
+    "full_mRNA_cistron_counts",
+    "partial_mRNA_cistron_counts",
+    "partial_rRNA_cistron_counts",
+]
+"""Listener outputs that are skipped when the listener is virtual."""
+
+
+def virtual_rna_counts(config, metadata):
+    """
+    Builds the cistron counts of :py:class:`RNACounts` from its emitted
+    transcription unit counts. Unique RNAs are only counted if they are mRNAs
+    or rRNAs, so the counts of all transcription units are the mRNA counts and
+    the partial rRNA counts placed at their indexes (zero elsewhere) and the
+    cistron counts are linear maps of these.
+
+    Args:
+        config: Listener config from
+            :py:meth:`~ecoli.library.sim_data.LoadSimData.get_rna_counts_listener_config`
+        metadata: Function that returns the output metadata of a column
+
+    Returns:
+        Mapping from names of virtual columns to tuples of the names of the
+        emitted columns they are computed from and a function that takes the
+        stacked values of these columns (one row per emit) and returns the
+        stacked values of the virtual column
+    """
+    mapping = scipy.sparse.csr_matrix(config["cistron_tu_mapping_matrix"])
+    mRNA_indexes = config["mRNA_indexes"]
+    rRNA_indexes = config["rRNA_indexes"]
+    mRNA_cistrons = mapping[np.asarray(config["cistron_is_mRNA"]), :]
+    rRNA_cistrons = mapping[np.asarray(config["cistron_is_rRNA"]), :]
+
+    def from_tu_counts(cistrons, mRNA_column):
+        operator = scipy.sparse.hstack(
+            [cistrons[:, mRNA_indexes], cistrons[:, rRNA_indexes]]
+        ).tocsr()
+        return (
+            (
+                f"listeners__rna_counts__{mRNA_column}",
+                "listeners__rna_counts__partial_rRNA_counts",
+            ),
+            lambda mRNA, rRNA: operator.dot(np.hstack([mRNA, rRNA]).T).T,
+        )
+
+    # Only mRNAs can be full transcripts
+    full_operator = mRNA_cistrons[:, mRNA_indexes].tocsr()
+    return {
+        "listeners__rna_counts__mRNA_cistron_counts": from_tu_counts(
+            mRNA_cistrons, "mRNA_counts"
+        ),
+        "listeners__rna_counts__full_mRNA_cistron_counts": (
+            ("listeners__rna_counts__full_mRNA_counts",),
+            lambda mRNA: full_operator.dot(mRNA.T).T,
+        ),
+        "listeners__rna_counts__partial_mRNA_cistron_counts": from_tu_counts(
+            mRNA_cistrons, "partial_mRNA_counts"
+        ),
+        "listeners__rna_counts__partial_rRNA_cistron_counts": from_tu_counts(
+            rRNA_cistrons, "mRNA_counts"
+        ),
+    }
+
+
+virtual_column_registry.register(NAME, virtual_rna_counts)
+
+
 def test_rna_counts_listener():
     from ecoli.experiments.ecoli_master_sim import EcoliSim
 
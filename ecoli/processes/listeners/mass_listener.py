@@ -10,7 +10,13 @@ import numpy as np
 from numpy.lib import recfunctions as rfn
 
 from vivarium.core.process import Step
-from ecoli.library.schema import numpy_schema, counts, attrs, bulk_name_to_idx
+from ecoli.library.schema import (
+    numpy_schema,
+    counts,
+    attrs,
+    bulk_name_to_idx,
+    mass_ledger,
+)
 from ecoli.processes.registries import topology_registry
 from wholecell.utils import units
 
@@ -66,6 +72,10 @@ class MassListener(Step):
         "time_step": 1.0,
         "emit_unique": False,
         "match_wcecoli": False,
+        # Number of updates between full recalculations of the running
+        # submass totals of the bulk and unique stores (1 to recalculate
+        # all masses every update)
+        "audit_interval": 100,
     }
 
     def __init__(self, parameters=None):
@@ -146,6 +156,8 @@ class MassListener(Step):
 
         # Enable flag for perfect recapitulation of wcEcoli mass calculations
         self.match_wcecoli = self.parameters["match_wcecoli"]
+        self.audit_interval = self.parameters["audit_interval"]
+        self.n_updates = 0
 
     def ports_schema(self):
         def split_divider_schema(metadata):
@@ -232,53 +244,60 @@ class MassListener(Step):
             self.bulk_idx = bulk_name_to_idx(self.bulk_ids, bulk_ids)
             if self.match_wcecoli:
                 self.bulk_addon = np.zeros((len(self.bulk_idx), 16))
+            # Compartment of each row in bulk store (each bulk molecule is
+            # in at most one compartment)
+            self._bulk_row_compartments = np.full(len(bulk_ids), -1)
+            self._bulk_row_compartments[self.bulk_idx] = np.where(
+                self._bulk_molecule_by_compartment.any(axis=0),
+                self._bulk_molecule_by_compartment.argmax(axis=0),
+                -1,
+            )
 
         mass_update = {}
 
         # Get previous dry mass, for calculating growth later
         old_dry_mass = states["listeners"]["mass"]["dry_mass"]
 
-        # get submasses from bulk and unique
-        bulk_counts = counts(states["bulk"], self.bulk_idx)
-        bulk_masses = states["bulk"][self.ordered_submasses][self.bulk_idx]
-        bulk_masses = rfn.structured_to_unstructured(bulk_masses)
-        bulk_submasses = np.dot(bulk_counts, bulk_masses)
-        bulk_compartment_masses = np.dot(
-            bulk_counts * self._bulk_molecule_by_compartment, bulk_masses
-        )
         if self.match_wcecoli:
-            bulk_counts = np.hstack(
-                [self.bulk_addon, counts(states["bulk"], self.bulk_idx)[:, np.newaxis]]
-            )
-            bulk_submasses = np.dot(bulk_counts.T, bulk_masses).sum(axis=0)
-            bulk_compartment_masses = np.dot(
-                bulk_counts.sum(axis=1) * self._bulk_molecule_by_compartment,
-                bulk_masses,
+            bulk_submasses, bulk_compartment_masses, unique_submasses = (
+                self._calculate_wcecoli_submasses(states)
             )
-
-        unique_submasses = np.zeros(len(self.massDiff_names))
+        else:
+            # Running totals (kept by the unique updater and brought up to
+            # date from changed bulk counts) are periodically recalculated
+            # to correct drift
+            audit = self.n_updates % self.audit_interval == 0
+            bulk_totals = mass_ledger.get_bulk(states["bulk"])
+            if audit or bulk_totals is None:
+                bulk_masses = np.zeros((len(states["bulk"]), len(self.massDiff_names)))
+                bulk_masses[self.bulk_idx] = rfn.structured_to_unstructured(
+                    states["bulk"][self.ordered_submasses][self.bulk_idx]
+                )
+                bulk_totals = mass_ledger.track_bulk(
+                    states["bulk"],
+                    bulk_masses,
+                    self._bulk_row_compartments,
+                    len(self.compartment_abbrev_to_index),
+                )
+            bulk_submasses = bulk_totals["submasses"]
+            bulk_compartment_masses = bulk_totals["compartment_masses"]
+
+            unique_submasses = np.zeros(len(self.massDiff_names))
+            for unique_id, unique_mass in zip(self.unique_ids, self.unique_masses):
+                molecules = states["unique"].get(unique_id)
+                unique_totals = mass_ledger.get(molecules)
+                if audit or unique_totals is None:
+                    unique_totals = mass_ledger.track_unique(
+                        molecules, unique_mass, self.massDiff_names
+                    )
+                unique_submasses += unique_totals["submasses"]
+            self.n_updates += 1
+
+        # All unique molecules are in the cytosol
         unique_compartment_masses = np.zeros_like(bulk_compartment_masses)
-        for unique_id, unique_mass in zip(self.unique_ids, self.unique_masses):
-            molecules = states["unique"].get(unique_id)
-            n_molecules = molecules["_entryState"].sum()
-
-            if n_molecules == 0:
-                continue
-
-            unique_submasses += unique_mass * n_molecules
-            unique_compartment_masses[self.compartment_abbrev_to_index["c"], :] += (
-                unique_mass * n_molecules
-            )
-
-            massDiffs = np.array(list(attrs(molecules, self.massDiff_names))).T
-            if self.match_wcecoli:
-                massDiffs = np.core.records.fromarrays(
-                    attrs(molecules, self.massDiff_names)
-                ).view((np.float64, len(self.massDiff_names)))
-            unique_submasses += massDiffs.sum(axis=0)
-            unique_compartment_masses[self.compartment_abbrev_to_index["c"], :] += (
-                massDiffs.sum(axis=0)
-            )
+        unique_compartment_masses[self.compartment_abbrev_to_index["c"], :] = (
+            unique_submasses
+        )
 
         # all of the submasses
         all_submasses = bulk_submasses + unique_submasses
@@ -371,6 +390,38 @@ class MassListener(Step):
         update = {"listeners": {"mass": mass_update}}
         return update
 
+    def _calculate_wcecoli_submasses(self, states):
+        """
+        Calculates bulk, bulk compartment, and unique submasses from scratch
+        in the same order of operations as wcEcoli.
+        """
+        bulk_masses = states["bulk"][self.ordered_submasses][self.bulk_idx]
+        bulk_masses = rfn.structured_to_unstructured(bulk_masses)
+        bulk_counts = np.hstack(
+            [self.bulk_addon, counts(states["bulk"], self.bulk_idx)[:, np.newaxis]]
+        )
+        bulk_submasses = np.dot(bulk_counts.T, bulk_masses).sum(axis=0)
+        bulk_compartment_masses = np.dot(
+            bulk_counts.sum(axis=1) * self._bulk_molecule_by_compartment,
+            bulk_masses,
+        )
+
+        unique_submasses = np.zeros(len(self.massDiff_names))
+        for unique_id, unique_mass in zip(self.unique_ids, self.unique_masses):
+            molecules = states["unique"].get(unique_id)
+            n_molecules = molecules["_entryState"].sum()
+
+            if n_molecules == 0:
+                continue
+
+            unique_submasses += unique_mass * n_molecules
+            massDiffs = np.core.records.fromarrays(
+                attrs(molecules, self.massDiff_names)
+            ).view((np.float64, len(self.massDiff_names)))
+            unique_submasses += massDiffs.sum(axis=0)
+
+        return bulk_submasses, bulk_compartment_masses, unique_submasses
+
 
 topology_registry.register("post-division-mass-listener", TOPOLOGY)
 
@@ -4,11 +4,15 @@ Monomer Counts Listener
 =======================
 """
 
+import warnings
+
 import numpy as np
+import scipy.sparse
+
 from ecoli.library.schema import numpy_schema, counts, bulk_name_to_idx
 from vivarium.core.process import Step
 
-from ecoli.processes.registries import topology_registry
+from ecoli.processes.registries import topology_registry, virtual_column_registry
 
 
 NAME = "monomer_counts_listener"
@@ -25,6 +29,12 @@ topology_registry.register(NAME, TOPOLOGY)
 class MonomerCounts(Step):
     """
     Listener for the counts of each protein monomer species.
+
+    To only compute the counts every few time steps (e.g. to match the rate
+    at which they are analyzed), set ``emit_interval`` (in seconds) with
+    ``"process_configs": {"monomer_counts_listener": {"emit_interval": 10}}``.
+    The interval is rounded to a multiple of the time step. On the steps in
+    between, ``monomer_counts`` is an empty array instead of the last counts.
     """
 
     name = NAME
@@ -50,6 +60,8 @@ class MonomerCounts(Step):
         "two_component_system_stoich": [],
         "emit_unique": False,
         "time_step": 1,
+        "virtual": False,
+        "emit_interval": None,
     }
 
     def __init__(self, parameters=None):
@@ -114,8 +126,28 @@ class MonomerCounts(Step):
             )
         )
 
-        # Helper indices for Numpy indexing
-        self.monomer_idx = None
+        # Monomer counts are a linear function of the bulk molecule counts and
+        # the counts of unique molecule complexes so they can be skipped here
+        # and computed when reading the output instead (see
+        # virtual_monomer_counts)
+        self.virtual = self.parameters["virtual"]
+
+        # Interval in seconds between updates (defaults to every time step),
+        # rounded to a multiple of the time step so that it is ever reached
+        self.emit_interval = self.parameters["emit_interval"]
+        if self.emit_interval is not None:
+            time_step = self.parameters["time_step"]
+            n_steps = max(1, round(self.emit_interval / time_step))
+            if not np.isclose(n_steps * time_step, self.emit_interval):
+                warnings.warn(
+                    f"emit_interval {self.emit_interval} is not a multiple of"
+                    f" the time step {time_step}, using {n_steps * time_step}."
+                )
+            self.emit_interval = n_steps * time_step
+
+        # Sparse operators mapping bulk and unique molecule counts to monomer
+        # counts (see monomer_operators), built on the first update
+        self.monomer_operator = None
 
     def ports_schema(self):
         return {
@@ -123,7 +155,7 @@ class MonomerCounts(Step):
                 "monomer_counts": {
                     "_default": [],
                     "_updater": "set",
-                    "_emit": True,
+                    "_emit": not self.virtual,
                     "_properties": {"metadata": self.monomer_ids},
                 }
             },
@@ -144,86 +176,330 @@ class MonomerCounts(Step):
         }
 
     def update_condition(self, timestep, states):
-        return (states["global_time"] % states["timestep"]) == 0
+        return not self.virtual
 
     def next_update(self, timestep, states):
-        if self.monomer_idx is None:
-            bulk_ids = states["bulk"]["id"]
-            self.bulk_molecule_idx = bulk_name_to_idx(self.bulk_molecule_ids, bulk_ids)
-            self.monomer_idx = bulk_name_to_idx(self.monomer_ids, bulk_ids)
-            self.complexation_molecule_idx = bulk_name_to_idx(
-                self.complexation_molecule_ids, bulk_ids
-            )
-            self.complexation_complex_idx = bulk_name_to_idx(
-                self.complexation_complex_ids, bulk_ids
-            )
-            self.equilibrium_molecule_idx = bulk_name_to_idx(
-                self.equilibrium_molecule_ids, bulk_ids
-            )
-            self.equilibrium_complex_idx = bulk_name_to_idx(
-                self.equilibrium_complex_ids, bulk_ids
-            )
-            self.two_component_system_molecule_idx = bulk_name_to_idx(
-                self.two_component_system_molecule_ids, bulk_ids
-            )
-            self.two_component_system_complex_idx = bulk_name_to_idx(
-                self.two_component_system_complex_ids, bulk_ids
-            )
-            self.ribosome_subunit_idx = bulk_name_to_idx(
-                self.ribosome_subunit_ids, bulk_ids
-            )
-            self.rnap_subunit_idx = bulk_name_to_idx(self.rnap_subunit_ids, bulk_ids)
-            self.replisome_subunit_idx = bulk_name_to_idx(
-                self.replisome_subunit_ids, bulk_ids
+        if self.emit_interval is not None:
+            # Tolerate floating point error in the global time
+            remainder = states["global_time"] % self.emit_interval
+            if not (
+                np.isclose(remainder, 0) or np.isclose(remainder, self.emit_interval)
+            ):
+                # Clear the counts so stale values are not emitted
+                return {"listeners": {"monomer_counts": np.zeros(0, dtype=np.int64)}}
+
+        if self.monomer_operator is None:
+            operator, self.unique_operator = monomer_operators(
+                self, states["bulk"]["id"]
             )
+            # Only read the counts of monomers and of complexes that contain
+            # them instead of the full bulk vector
+            self.operator_bulk_idx = np.unique(operator.indices)
+            self.monomer_operator = operator[:, self.operator_bulk_idx]
 
         # Get current counts of bulk and unique molecules
-        bulkMoleculeCounts = counts(states["bulk"], self.bulk_molecule_idx)
-        n_active_ribosome = states["unique"]["active_ribosome"]["_entryState"].sum()
-        n_active_rnap = states["unique"]["active_RNAP"]["_entryState"].sum()
-        n_active_replisome = states["unique"]["active_replisome"]["_entryState"].sum()
-
-        # Account for monomers in bulk molecule complexes
-        complex_monomer_counts = np.dot(
-            self.complexation_stoich,
-            np.negative(bulkMoleculeCounts[self.complexation_complex_idx]),
-        )
-        equilibrium_monomer_counts = np.dot(
-            self.equilibrium_stoich,
-            np.negative(bulkMoleculeCounts[self.equilibrium_complex_idx]),
-        )
-        two_component_monomer_counts = np.dot(
-            self.two_component_system_stoich,
-            np.negative(bulkMoleculeCounts[self.two_component_system_complex_idx]),
+        bulk_counts = counts(states["bulk"], self.operator_bulk_idx)
+        unique_counts = np.array(
+            [
+                states["unique"]["active_ribosome"]["_entryState"].sum(),
+                states["unique"]["active_RNAP"]["_entryState"].sum(),
+                states["unique"]["active_replisome"]["_entryState"].sum(),
+            ]
         )
 
-        bulkMoleculeCounts[self.complexation_molecule_idx] += (
-            complex_monomer_counts.astype(np.int32)
+        # Free monomers plus monomers in bulk and unique molecule complexes
+        monomer_counts = self.monomer_operator.dot(bulk_counts)
+        monomer_counts += self.unique_operator.dot(unique_counts)
+
+        update = {"listeners": {"monomer_counts": monomer_counts}}
+        return update
+
+
+def monomer_operators(listener, bulk_ids):
+    """
+    Builds the sparse linear maps used by :py:class:`MonomerCounts` to
+    compute monomer counts. The complexation, equilibrium and two component
+    system stoichiometries are fused into a single operator that maps bulk
+    molecule counts to monomer counts (free monomers plus monomers in bulk
+    complexes, all computed from the counts before any complex is broken
+    down).
+
+    Args:
+        listener: :py:class:`MonomerCounts` instance
+        bulk_ids: IDs of all bulk molecules in the order of the bulk array
+
+    Returns:
+        Tuple of a sparse CSR matrix (monomers x bulk molecules) and a dense
+        matrix (monomers x 3) that maps the counts of active ribosomes, RNA
+        polymerases and replisomes to the counts of their monomer subunits
+    """
+    bulk_ids = np.asarray(bulk_ids)
+    n_molecules = len(bulk_ids)
+
+    def idx(ids):
+        return bulk_name_to_idx(ids, bulk_ids)
+
+    operator = scipy.sparse.identity(n_molecules, dtype=np.int64, format="csr")
+    for molecule_ids, complex_ids, stoich in (
+        (
+            listener.complexation_molecule_ids,
+            listener.complexation_complex_ids,
+            listener.complexation_stoich,
+        ),
+        (
+            listener.equilibrium_molecule_ids,
+            listener.equilibrium_complex_ids,
+            listener.equilibrium_stoich,
+        ),
+        (
+            listener.two_component_system_molecule_ids,
+            listener.two_component_system_complex_ids,
+            listener.two_component_system_stoich,
+        ),
+    ):
+        stoich = scipy.sparse.coo_matrix(stoich)
+        operator = operator - scipy.sparse.csr_matrix(
+            (
+                stoich.data.astype(np.int64),
+                (idx(molecule_ids)[stoich.row], idx(complex_ids)[stoich.col]),
+            ),
+            shape=(n_molecules, n_molecules),
         )
-        bulkMoleculeCounts[self.equilibrium_molecule_idx] += (
-            equilibrium_monomer_counts.astype(np.int32)
+    operator = operator.tocsr()[idx(listener.monomer_ids), :]
+    operator.eliminate_zeros()
+
+    unique_operator = np.zeros((n_molecules, 3), dtype=np.int64)
+    unique_operator[idx(listener.ribosome_subunit_ids), 0] = listener.ribosome_stoich
+    unique_operator[idx(listener.rnap_subunit_ids), 1] = listener.rnap_stoich
+    unique_operator[idx(listener.replisome_subunit_ids), 2] = listener.replisome_stoich
+    unique_operator = unique_operator[idx(listener.monomer_ids), :]
+
+    return operator, unique_operator
+
+
+def virtual_monomer_counts(config, metadata):
+    """
+    Builds the output of :py:class:`MonomerCounts` from the emitted bulk
+    molecule counts and counts of active ribosomes, RNA polymerases and
+    replisomes (from
+    :py:class:`~ecoli.processes.listeners.unique_molecule_counts.UniqueMoleculeCounts`),
+    using the same stoichiometries as the listener.
+
+    Args:
+        config: Listener config from
+            :py:meth:`~ecoli.library.sim_data.LoadSimData.get_monomer_counts_listener_config`
+        metadata: Function that returns the output metadata of a column
+
+    Returns:
+        Mapping from names of virtual columns to tuples of the names of the
+        emitted columns they are computed from and a function that takes the
+        stacked values of these columns (one row per emit) and returns the
+        stacked values of the virtual column
+    """
+    listener = MonomerCounts(config)
+    operator, unique_operator = monomer_operators(listener, metadata("bulk"))
+
+    def monomer_counts(bulk, n_ribosome, n_rnap, n_replisome):
+        unique_counts = np.column_stack([n_ribosome, n_rnap, n_replisome])
+        return (operator.dot(bulk.T).T + unique_counts.dot(unique_operator.T)).astype(
+            np.int64
         )
-        bulkMoleculeCounts[self.two_component_system_molecule_idx] += (
-            two_component_monomer_counts.astype(np.int32)
+
+    return {
+        "listeners__monomer_counts": (
+            (
+                "bulk",
+                "listeners__unique_molecule_counts__active_ribosome",
+                "listeners__unique_molecule_counts__active_RNAP",
+                "listeners__unique_molecule_counts__active_replisome",
+            ),
+            monomer_counts,
         )
+    }
+
+
+virtual_column_registry.register(NAME, virtual_monomer_counts)
+
+
+def random_monomer_counts(seed=0):
+    """
+    Builds a :py:class:`MonomerCounts` listener with random stoichiometries
+    of roughly the size of the ones in sim_data, random states and a
+    function that computes monomer counts with the dense stoichiometric
+    products that the sparse operators replaced.
+
+    Returns:
+        Tuple of the listener, states and dense monomer count function
+    """
+    rng = np.random.default_rng(seed)
+    n_bulk = 16000
+    n_monomers = 4500
+    bulk_ids = np.array([f"mol_{i}[c]" for i in range(n_bulk)])
+    monomer_ids = bulk_ids[:n_monomers]
+
+    def random_stoich(n_molecules, n_complexes, complex_start):
+        molecule_ids = rng.choice(monomer_ids, n_molecules, replace=False)
+        complex_ids = bulk_ids[complex_start : complex_start + n_complexes]
+        stoich = np.zeros((n_molecules, n_complexes))
+        for j in range(n_complexes):
+            subunits = rng.choice(n_molecules, rng.integers(1, 6), replace=False)
+            stoich[subunits, j] = -rng.integers(1, 5, len(subunits))
+        return molecule_ids.tolist(), complex_ids.tolist(), stoich
+
+    complexation = random_stoich(1500, 1100, n_monomers)
+    equilibrium = random_stoich(100, 40, n_monomers + 1100)
+    two_component_system = random_stoich(30, 20, n_monomers + 1140)
 
-        # Account for monomers in unique molecule complexes
-        n_ribosome_subunit = n_active_ribosome * self.ribosome_stoich
-        n_rnap_subunit = n_active_rnap * self.rnap_stoich
-        n_replisome_subunit = n_active_replisome * self.replisome_stoich
-        bulkMoleculeCounts[self.ribosome_subunit_idx] += n_ribosome_subunit.astype(
-            np.int32
+    def subunits(n):
+        return {
+            "subunitIds": rng.choice(monomer_ids, n, replace=False),
+            "subunitStoich": rng.integers(1, 3, n),
+        }
+
+    listener = MonomerCounts(
+        {
+            "bulk_molecule_ids": bulk_ids,
+            "monomer_ids": monomer_ids.tolist(),
+            "complexation_molecule_ids": complexation[0],
+            "complexation_complex_ids": complexation[1],
+            "complexation_stoich": complexation[2],
+            "equilibrium_molecule_ids": equilibrium[0],
+            "equilibrium_complex_ids": equilibrium[1],
+            "equilibrium_stoich": equilibrium[2],
+            "two_component_system_molecule_ids": two_component_system[0],
+            "two_component_system_complex_ids": two_component_system[1],
+            "two_component_system_stoich": two_component_system[2],
+            "ribosome_50s_subunits": subunits(30),
+            "ribosome_30s_subunits": subunits(20),
+            "rnap_subunits": subunits(4),
+            "replisome_trimer_subunits": rng.choice(
+                monomer_ids, 3, replace=False
+            ).tolist(),
+            "replisome_monomer_subunits": rng.choice(
+                monomer_ids, 5, replace=False
+            ).tolist(),
+        }
+    )
+    bulk = np.zeros(n_bulk, dtype=[("id", bulk_ids.dtype), ("count", int)])
+    bulk["id"] = bulk_ids
+    bulk["count"] = rng.integers(0, 1000, n_bulk)
+    states = {
+        "bulk": bulk,
+        "unique": {
+            name: np.zeros(n, dtype=[("_entryState", np.int8)])
+            for name, n in (
+                ("active_ribosome", 20000),
+                ("active_RNAP", 5000),
+                ("active_replisome", 2),
+            )
+        },
+    }
+    for molecules in states["unique"].values():
+        molecules["_entryState"][: len(molecules) // 2] = 1
+
+    def dense_monomer_counts():
+        # Dense products against each stoichiometric matrix (previous
+        # implementation of MonomerCounts.next_update)
+        bulk_counts = counts(states["bulk"], bulk_idx)
+        n_active = [
+            states["unique"][name]["_entryState"].sum()
+            for name in ("active_ribosome", "active_RNAP", "active_replisome")
+        ]
+        for molecule_idx, complex_idx, stoich in dense_stoichs:
+            monomers_in_complexes = np.dot(
+                stoich, np.negative(bulk_counts[complex_idx])
+            )
+            bulk_counts[molecule_idx] += monomers_in_complexes.astype(np.int32)
+        for subunit_idx, stoich, n in zip(unique_subunit_idx, unique_stoichs, n_active):
+            bulk_counts[subunit_idx] += (n * stoich).astype(np.int32)
+        return bulk_counts[monomer_idx]
+
+    def idx(ids):
+        return bulk_name_to_idx(ids, bulk_ids)
+
+    bulk_idx = idx(bulk_ids)
+    monomer_idx = idx(monomer_ids)
+    dense_stoichs = [
+        (idx(molecule_ids), idx(complex_ids), stoich)
+        for molecule_ids, complex_ids, stoich in (
+            complexation,
+            equilibrium,
+            two_component_system,
         )
-        bulkMoleculeCounts[self.rnap_subunit_idx] += n_rnap_subunit.astype(np.int32)
-        bulkMoleculeCounts[self.replisome_subunit_idx] += n_replisome_subunit.astype(
-            np.int32
+    ]
+    unique_subunit_idx = [
+        idx(listener.ribosome_subunit_ids),
+        idx(listener.rnap_subunit_ids),
+        idx(listener.replisome_subunit_ids),
+    ]
+    unique_stoichs = [
+        listener.ribosome_stoich,
+        listener.rnap_stoich,
+        listener.replisome_stoich,
+    ]
+
+    return listener, states, dense_monomer_counts
+
+
+def test_monomer_counts_sparse():
+    """Sparse operators give the same counts as the dense products."""
+    listener, states, dense_monomer_counts = random_monomer_counts()
+    rng = np.random.default_rng(1)
+    for _ in range(5):
+        states["bulk"]["count"] = rng.integers(0, 1000, len(states["bulk"]))
+        for molecules in states["unique"].values():
+            molecules["_entryState"] = rng.integers(0, 2, len(molecules))
+        sparse_counts = listener.next_update(1, states)["listeners"]["monomer_counts"]
+        np.testing.assert_array_equal(sparse_counts, dense_monomer_counts())
+
+
+def test_monomer_counts_emit_interval():
+    listener, states, dense_monomer_counts = random_monomer_counts()
+    expected = dense_monomer_counts()
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        listener = MonomerCounts(
+            {**listener.parameters, "time_step": 0.1, "emit_interval": 0.26}
         )
+    assert len(caught) == 1
+    assert np.isclose(listener.emit_interval, 0.3)
 
-        # Update monomerCounts
-        monomer_counts = bulkMoleculeCounts[self.monomer_idx]
+    global_time = 0.0
+    for step in range(7):
+        states["global_time"] = global_time
+        assert listener.update_condition(0.1, states)
+        monomer_counts = listener.next_update(0.1, states)["listeners"][
+            "monomer_counts"
+        ]
+        if step % 3 == 0:
+            np.testing.assert_array_equal(monomer_counts, expected)
+        else:
+            assert len(monomer_counts) == 0
+        # Accumulates floating point error like the global time of a sim
+        global_time += 0.1
 
-        update = {"listeners": {"monomer_counts": monomer_counts}}
-        return update
+
+def monomer_counts_runtime(n_repeats=100):
+    """
+    Prints the per-step cost of the sparse monomer accounting in
+    :py:class:`MonomerCounts` and of the dense stoichiometric products it
+    replaced.
+    """
+    from time import perf_counter
+
+    listener, states, dense_monomer_counts = random_monomer_counts()
+    tick = perf_counter()
+    for _ in range(n_repeats):
+        dense_monomer_counts()
+    dense_time = (perf_counter() - tick) / n_repeats
+    tick = perf_counter()
+    for _ in range(n_repeats):
+        listener.next_update(1, states)
+    sparse_time = (perf_counter() - tick) / n_repeats
+    print(
+        f"Monomer counts per step: dense {dense_time * 1e3:.3f} ms,"
+        f" sparse {sparse_time * 1e3:.3f} ms"
+    )
 
 
 def test_monomer_counts_listener():
@@ -242,3 +518,4 @@ def test_monomer_counts_listener():
 # uvenv ecoli/processes/listeners/monomer_counts.py
 if __name__ == "__main__":
     test_monomer_counts_listener()
+    monomer_counts_runtime()
@@ -3,11 +3,12 @@
 Unique Molecule Counts Listener
 ===============================
 
-Counts unique molecules
+Counts unique molecules using the running counts that the unique molecule
+updater keeps (see :py:class:`~ecoli.library.schema.UniqueCountLedger`)
 """
 
 from vivarium.core.process import Step
-from ecoli.library.schema import numpy_schema, listener_schema
+from ecoli.library.schema import numpy_schema, listener_schema, unique_count_ledger
 from ecoli.processes.registries import topology_registry
 
 # Register default topology for this process, associating it with process name
@@ -30,11 +31,23 @@ class UniqueMoleculeCounts(Step):
     defaults = {
         "time_step": 1,
         "emit_unique": False,
+        # Number of updates between recounting active molecules from the
+        # _entryState of each store to validate the running counts (1 to
+        # recount every update)
+        "audit_interval": 100,
+        # Unique molecule IDs mapped to an integer attribute and the number
+        # of values it can take (e.g. {"RNA": ["TU_index", n_TUs]}) to also
+        # emit counts by value of that attribute under the listener
+        # "<unique ID>_by_<attribute>"
+        "group_by": {},
     }
 
     def __init__(self, parameters=None):
         super().__init__(parameters)
         self.unique_ids = self.parameters["unique_ids"]
+        self.audit_interval = self.parameters["audit_interval"]
+        self.group_by = self.parameters["group_by"]
+        self.n_updates = 0
 
     def ports_schema(self):
         ports = {
@@ -47,7 +60,13 @@ class UniqueMoleculeCounts(Step):
             },
             "listeners": {
                 "unique_molecule_counts": listener_schema(
-                    {str(mol_id): 0 for mol_id in self.unique_ids}
+                    {
+                        **{str(mol_id): 0 for mol_id in self.unique_ids},
+                        **{
+                            f"{mol_id}_by_{attribute}": [0] * n_groups
+                            for mol_id, (attribute, n_groups) in self.group_by.items()
+                        },
+                    }
                 )
             },
             "global_time": {"_default": 0.0},
@@ -69,11 +88,21 @@ class UniqueMoleculeCounts(Step):
         return (states["global_time"] % states["timestep"]) == 0
 
     def next_update(self, timestep, states):
-        return {
-            "listeners": {
-                "unique_molecule_counts": {
-                    str(unique_id): states["unique"][unique_id]["_entryState"].sum()
-                    for unique_id in self.unique_ids
-                }
-            }
-        }
+        # Running counts kept by the unique molecule updater are periodically
+        # recounted to validate them
+        audit = self.n_updates % self.audit_interval == 0
+        unique_molecule_counts = {}
+        for unique_id in self.unique_ids:
+            molecules = states["unique"][unique_id]
+            totals = unique_count_ledger.get(molecules)
+            group_by, n_groups = self.group_by.get(unique_id, (None, None))
+            if audit or totals is None:
+                totals = unique_count_ledger.track(molecules, group_by, n_groups)
+            unique_molecule_counts[str(unique_id)] = totals["count"]
+            if group_by is not None:
+                unique_molecule_counts[f"{unique_id}_by_{group_by}"] = totals[
+                    "group_counts"
+                ].copy()
+        self.n_updates += 1
+
+        return {"listeners": {"unique_molecule_counts": unique_molecule_counts}}
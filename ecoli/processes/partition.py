@@ -12,11 +12,17 @@ A PartitionedProcess can be passed into a Requester and Evolver, which call its
 calculate_request and evolve_state methods in coordination with an Allocator process,
 which reads the requests and allocates molecular counts for the evolve_state.
 
+StoichiometryOperator applies the sparse stoichiometry of a PartitionedProcess to the
+counts it requests and is allocated.
+
 """
 
 import abc
+import time
 import warnings
 
+import numpy as np
+import scipy.sparse
 from vivarium.core.process import Step, Process
 from vivarium.library.dict_utils import deep_merge
 
@@ -244,3 +250,153 @@ class PartitionedProcess(Process):
         if "listeners" in requests:
             update["listeners"] = deep_merge(update["listeners"], requests["listeners"])
         return update
+
+
+class StoichiometryOperator:
+    """Sparse matrix (e.g. molecules x reactions) that is applied to vectors
+    of counts (e.g. of reactions or reactants). The matrix is stored by
+    column once and only the columns with nonzero counts are read, so the
+    product costs time proportional to the number of entries in those columns
+    rather than the size of the matrix. The last product is reused when the
+    same counts are given again, so a process that is allocated exactly what
+    it requested computes the product once for ``calculate_request`` and
+    ``evolve_state``.
+
+    Args:
+        matrix: Dense or sparse matrix. Stack matrices that are applied to
+            the same counts (e.g. with :py:func:`scipy.sparse.vstack`) to
+            get all products in one pass.
+        dtype: Data type of the matrix and products (defaults to the data
+            type of ``matrix``)
+    """
+
+    def __init__(self, matrix, dtype=None):
+        matrix = scipy.sparse.csc_matrix(matrix, dtype=dtype)
+        matrix.sum_duplicates()
+        matrix.eliminate_zeros()
+        self.shape = matrix.shape
+        self.dtype = matrix.dtype
+        self._indptr = matrix.indptr
+        self._indices = matrix.indices
+        self._data = matrix.data
+        self._last_counts = None
+        self._last_product = None
+
+    def dot(self, counts: np.ndarray) -> np.ndarray:
+        """Returns the (read-only) product of the matrix and ``counts``."""
+        counts = np.asarray(counts)
+        if self._last_counts is not None and np.array_equal(counts, self._last_counts):
+            return self._last_product
+
+        columns = np.flatnonzero(counts)
+        starts = self._indptr[columns]
+        n_entries = self._indptr[columns + 1] - starts
+        # Positions of the entries of all selected columns in data and indices
+        entries = np.repeat(starts - (np.cumsum(n_entries) - n_entries), n_entries)
+        entries += np.arange(entries.size)
+        product = np.bincount(
+            self._indices[entries],
+            weights=self._data[entries] * np.repeat(counts[columns], n_entries),
+            minlength=self.shape[0],
+        ).astype(np.result_type(self.dtype, counts.dtype))
+        product.flags.writeable = False
+
+        self._last_counts = counts.copy()
+        self._last_product = product
+        return product
+
+
+def test_stoichiometry_operator():
+    random_state = np.random.RandomState(0)
+    matrix = random_state.randint(-3, 4, size=(30, 200))
+    matrix[random_state.rand(*matrix.shape) < 0.9] = 0
+    operator = StoichiometryOperator(matrix)
+    for _ in range(5):
+        counts = random_state.poisson(0.05, size=200)
+        np.testing.assert_array_equal(operator.dot(counts), matrix.dot(counts))
+    # Products for the same counts are reused
+    assert operator.dot(counts.copy()) is operator.dot(counts)
+    np.testing.assert_array_equal(operator.dot(np.zeros(200, int)), np.zeros(30))
+
+
+def stoichiometry_operator_cases(random_state):
+    """
+    Random stoichiometric matrices and count samplers with the shapes and
+    sparsity of protein degradation (amino acids and water by monomers, a
+    few dozen monomers degraded per step) and RNA maturation (mature RNAs
+    and nucleotides by unprocessed RNAs, mostly zero).
+    """
+    return {
+        "protein degradation": (
+            random_state.randint(0, 50, size=(22, 4300)).astype(np.int64),
+            lambda: random_state.binomial(1, 0.01, size=4300),
+        ),
+        "RNA maturation": (
+            (
+                scipy.sparse.random(
+                    200, 400, density=0.005, random_state=random_state
+                ).toarray()
+                > 0
+            ).astype(np.int64),
+            lambda: random_state.poisson(1, size=400),
+        ),
+    }
+
+
+def test_stoichiometry_operator_cases():
+    random_state = np.random.RandomState(0)
+    for matrix, sample_counts in stoichiometry_operator_cases(random_state).values():
+        operator = StoichiometryOperator(matrix)
+        previous_counts = sample_counts()
+        for _ in range(50):
+            counts = sample_counts()
+            # Request and evolve with the same counts, then other counts
+            np.testing.assert_array_equal(operator.dot(counts), matrix.dot(counts))
+            np.testing.assert_array_equal(operator.dot(counts), matrix.dot(counts))
+            np.testing.assert_array_equal(
+                operator.dot(previous_counts), matrix.dot(previous_counts)
+            )
+            previous_counts = counts
+
+
+def stoichiometry_operator_runtime(n_repeats=1000):
+    """
+    Prints the cost of dense products and of
+    :py:class:`StoichiometryOperator` for the cases in
+    :py:func:`stoichiometry_operator_cases`.
+    """
+    random_state = np.random.RandomState(0)
+    for name, (matrix, sample_counts) in stoichiometry_operator_cases(
+        random_state
+    ).items():
+        operator = StoichiometryOperator(matrix)
+        all_counts = [sample_counts() for _ in range(n_repeats)]
+
+        start = time.perf_counter()
+        dense_products = [matrix.dot(counts) for counts in all_counts]
+        dense_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sparse_products = [operator.dot(counts) for counts in all_counts]
+        sparse_time = time.perf_counter() - start
+
+        # Request and evolve with the same allocated counts
+        start = time.perf_counter()
+        for counts in all_counts:
+            operator.dot(counts)
+            operator.dot(counts)
+        shared_time = time.perf_counter() - start
+
+        for dense, sparse in zip(dense_products, sparse_products):
+            np.testing.assert_array_equal(dense, sparse)
+        print(
+            f"{name}: dense {1e6 * dense_time / n_repeats:.1f} us/product, "
+            f"sparse {1e6 * sparse_time / n_repeats:.1f} us/product, "
+            f"request + evolve {1e6 * shared_time / n_repeats:.1f} us/step "
+            f"(dense {2e6 * dense_time / n_repeats:.1f} us/step)"
+        )
+
+
+if __name__ == "__main__":
+    test_stoichiometry_operator()
+    stoichiometry_operator_runtime()
@@ -102,6 +102,52 @@ class PolypeptideInitiation(PartitionedProcess):
             "monomer_index_to_tu_indexes"
         ]
 
+        # Build CSR-style lookups of the cistrons in each TU and of the TUs
+        # each protein can be translated from, along with the start position
+        # of the relevant cistron within each TU. Entries of row i are stored
+        # at [indptr[i], indptr[i + 1]).
+        tu_cistron_pairs = sorted(
+            self.cistron_start_end_pos_in_tu, key=lambda pair: (pair[1], pair[0])
+        )
+        self.tu_cistron_indexes = np.array(
+            [cistron_index for cistron_index, _ in tu_cistron_pairs], dtype=np.int64
+        )
+        self.tu_cistron_start_positions = np.array(
+            [self.cistron_start_end_pos_in_tu[pair][0] for pair in tu_cistron_pairs],
+            dtype=np.int64,
+        )
+        self.tu_cistron_indptr = np.zeros(self.n_TUs + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(
+                [TU_index for _, TU_index in tu_cistron_pairs], minlength=self.n_TUs
+            ),
+            out=self.tu_cistron_indptr[1:],
+        )
+
+        n_monomers = len(self.monomer_index_to_tu_indexes)
+        monomer_tu_indexes = [
+            np.asarray(self.monomer_index_to_tu_indexes[i], dtype=np.int64)
+            for i in range(n_monomers)
+        ]
+        self.monomer_tu_indexes = np.concatenate(
+            [np.empty(0, np.int64)] + monomer_tu_indexes
+        )
+        self.monomer_tu_start_positions = np.array(
+            [
+                self.cistron_start_end_pos_in_tu[
+                    (self.monomer_index_to_cistron_index[i], TU_index)
+                ][0]
+                for i, TU_indexes in enumerate(monomer_tu_indexes)
+                for TU_index in TU_indexes
+            ],
+            dtype=np.int64,
+        )
+        self.monomer_tu_indptr = np.zeros(n_monomers + 1, dtype=np.int64)
+        np.cumsum(
+            [len(TU_indexes) for TU_indexes in monomer_tu_indexes],
+            out=self.monomer_tu_indptr[1:],
+        )
+
         self.ribosome30S = self.parameters["ribosome30S"]
         self.ribosome50S = self.parameters["ribosome50S"]
 
@@ -247,16 +293,18 @@ class PolypeptideInitiation(PartitionedProcess):
         TU_index_incomplete_mRNAs = TU_index_mRNAs[is_incomplete_transcript_mRNAs]
         length_incomplete_mRNAs = length_mRNAs[is_incomplete_transcript_mRNAs]
 
-        for TU_index, length in zip(TU_index_incomplete_mRNAs, length_incomplete_mRNAs):
-            cistron_indexes = self.rna_id_to_cistron_indexes(self.tu_ids[TU_index])
-            cistron_start_positions = np.array(
-                [
-                    self.cistron_start_end_pos_in_tu[(cistron_index, TU_index)][0]
-                    for cistron_index in cistron_indexes
-                ]
-            )
-
-            cistron_counts[cistron_indexes] += length > cistron_start_positions
+        # Each cistron is counted if its start position has been transcribed
+        entry_indexes, incomplete_mRNA_indexes = concatenate_csr_rows(
+            self.tu_cistron_indptr, TU_index_incomplete_mRNAs
+        )
+        is_cistron_transcribed = (
+            length_incomplete_mRNAs[incomplete_mRNA_indexes]
+            > self.tu_cistron_start_positions[entry_indexes]
+        )
+        cistron_counts = cistron_counts + np.bincount(
+            self.tu_cistron_indexes[entry_indexes[is_cistron_transcribed]],
+            minlength=len(cistron_counts),
+        )
 
         # Calculate initiation probabilities for ribosomes based on mRNA counts
         # and associated mRNA translational efficiencies
@@ -363,59 +411,54 @@ class PolypeptideInitiation(PartitionedProcess):
 
         # Build attributes for active ribosomes.
         # Each ribosome is assigned a protein index for the protein that
-        # corresponds to the polypeptide it will polymerize. This is done in
-        # blocks of protein ids for efficiency.
-        protein_indexes = np.empty(n_ribosomes_to_activate, np.int64)
-        mRNA_indexes = np.empty(n_ribosomes_to_activate, np.int64)
-        positions_on_mRNA = np.empty(n_ribosomes_to_activate, np.int64)
-        nonzero_count = n_new_proteins > 0
-        start_index = 0
-
-        for protein_index, protein_counts in zip(
-            np.arange(n_new_proteins.size)[nonzero_count], n_new_proteins[nonzero_count]
-        ):
-            # Set protein index
-            protein_indexes[start_index : start_index + protein_counts] = protein_index
-
-            cistron_index = self.monomer_index_to_cistron_index[protein_index]
-
-            attribute_indexes = []
-            cistron_start_positions = []
-
-            for TU_index in self.monomer_index_to_tu_indexes[protein_index]:
-                attribute_indexes_this_TU = np.where(TU_index_mRNAs == TU_index)[0]
-                cistron_start_position = self.cistron_start_end_pos_in_tu[
-                    (cistron_index, TU_index)
-                ][0]
-                is_transcript_long_enough = (
-                    length_mRNAs[attribute_indexes_this_TU] >= cistron_start_position
-                )
-
-                attribute_indexes.extend(
-                    attribute_indexes_this_TU[is_transcript_long_enough]
-                )
-                cistron_start_positions.extend(
-                    [cistron_start_position]
-                    * len(attribute_indexes_this_TU[is_transcript_long_enough])
-                )
-
-            n_mRNAs = len(attribute_indexes)
-
-            # Distribute ribosomes among these mRNAs
-            n_ribosomes_per_RNA = self.random_state.multinomial(
-                protein_counts, np.full(n_mRNAs, 1.0 / n_mRNAs)
-            )
-
-            # Get unique indexes of each mRNA
-            mRNA_indexes[start_index : start_index + protein_counts] = np.repeat(
-                unique_index_mRNAs[attribute_indexes], n_ribosomes_per_RNA
-            )
-
-            positions_on_mRNA[start_index : start_index + protein_counts] = np.repeat(
-                cistron_start_positions, n_ribosomes_per_RNA
-            )
+        # corresponds to the polypeptide it will polymerize, and is placed on
+        # one of the mRNAs that protein can be translated from (transcripts
+        # of any TU containing its cistron that are long enough to include
+        # the cistron start) chosen uniformly at random.
+        protein_indexes = np.repeat(
+            np.arange(n_new_proteins.size), n_new_proteins
+        ).astype(np.int64)
+        nonzero_proteins = np.flatnonzero(n_new_proteins)
+
+        # Group mRNAs by TU index, keeping mRNAs of the same TU in order
+        mRNA_order = np.argsort(TU_index_mRNAs, kind="stable")
+        TU_mRNA_indptr = np.zeros(self.n_TUs + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(TU_index_mRNAs, minlength=self.n_TUs),
+            out=TU_mRNA_indptr[1:],
+        )
 
-            start_index += protein_counts
+        # Expand proteins into (protein, TU) entries and then into candidate
+        # (protein, mRNA) pairs. Candidates stay grouped by protein.
+        tu_entry_indexes, entry_proteins = concatenate_csr_rows(
+            self.monomer_tu_indptr, nonzero_proteins
+        )
+        sorted_mRNA_indexes, candidate_entries = concatenate_csr_rows(
+            TU_mRNA_indptr, self.monomer_tu_indexes[tu_entry_indexes]
+        )
+        candidate_mRNAs = mRNA_order[sorted_mRNA_indexes]
+        candidate_positions = self.monomer_tu_start_positions[
+            tu_entry_indexes[candidate_entries]
+        ]
+        is_transcript_long_enough = length_mRNAs[candidate_mRNAs] >= candidate_positions
+        candidate_mRNAs = candidate_mRNAs[is_transcript_long_enough]
+        candidate_positions = candidate_positions[is_transcript_long_enough]
+        n_mRNAs = np.bincount(
+            entry_proteins[candidate_entries[is_transcript_long_enough]],
+            minlength=nonzero_proteins.size,
+        )
+        candidate_indptr = np.concatenate(([0], np.cumsum(n_mRNAs)))
+
+        # Distribute ribosomes uniformly among the candidate mRNAs of each
+        # protein. Sorting the draws gives the same layout as a multinomial
+        # sample per protein expanded with np.repeat.
+        n_mRNAs_per_ribosome = np.repeat(n_mRNAs, n_new_proteins[nonzero_proteins])
+        chosen_candidates = np.sort(
+            np.repeat(candidate_indptr[:-1], n_new_proteins[nonzero_proteins])
+            + self.random_state.randint(0, n_mRNAs_per_ribosome)
+        )
+        mRNA_indexes = unique_index_mRNAs[candidate_mRNAs[chosen_candidates]]
+        positions_on_mRNA = candidate_positions[chosen_candidates]
 
         # Create active 70S ribosomes and assign their attributes
         update = {
@@ -513,6 +556,40 @@ class PolypeptideInitiation(PartitionedProcess):
         return activationProb
 
 
+def concatenate_csr_rows(
+    indptr: np.ndarray, rows: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Gathers the entries of the given rows of a CSR-style structure.
+
+    Args:
+        indptr: Entries of row ``i`` are stored at ``[indptr[i], indptr[i + 1])``
+        rows: Indexes of rows to gather (may contain duplicates)
+
+    Returns:
+        Tuple of the indexes of all entries in the given rows, in order, and
+        for each of these entries the position in ``rows`` it was taken from
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    starts = indptr[rows]
+    row_lengths = indptr[rows + 1] - starts
+    row_positions = np.repeat(np.arange(rows.size), row_lengths)
+    offsets = np.arange(row_positions.size) - np.repeat(
+        np.cumsum(row_lengths) - row_lengths, row_lengths
+    )
+    return starts[row_positions] + offsets, row_positions
+
+
+def test_concatenate_csr_rows():
+    indptr = np.array([0, 2, 2, 5])
+    entries, positions = concatenate_csr_rows(indptr, np.array([2, 1, 0, 2]))
+    np.testing.assert_array_equal(entries, [2, 3, 4, 0, 1, 2, 3, 4])
+    np.testing.assert_array_equal(positions, [0, 0, 0, 2, 2, 3, 3, 3])
+
+    entries, positions = concatenate_csr_rows(indptr, np.array([], dtype=int))
+    assert entries.size == 0 and positions.size == 0
+
+
 def test_polypeptide_initiation():
     def make_elongation_rates(self, random, base, time_step, variable_elongation=False):
         return base
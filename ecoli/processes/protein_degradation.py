@@ -23,7 +23,7 @@ from ecoli.library.data_predicates import (
 from ecoli.library.schema import numpy_schema, counts, bulk_name_to_idx
 
 from ecoli.processes.registries import topology_registry
-from ecoli.processes.partition import PartitionedProcess
+from ecoli.processes.partition import PartitionedProcess, StoichiometryOperator
 
 
 # Register default topology for this process, associating it with process name
@@ -82,6 +82,11 @@ class ProteinDegradation(PartitionedProcess):
         self.degradation_matrix[self.water_index, :] = -(
             np.sum(self.degradation_matrix[self.amino_acid_indexes, :], axis=0) - 1
         )
+        # Metabolite changes and number of hydrolysis reactions for the degraded
+        # proteins, computed in a single product
+        self.degradation_operator = StoichiometryOperator(
+            np.vstack([self.degradation_matrix, self.protein_lengths]), dtype=np.int64
+        )
 
     def ports_schema(self):
         return {
@@ -110,7 +115,7 @@ class ProteinDegradation(PartitionedProcess):
 
         # Determine the number of hydrolysis reactions
         # TODO(vivarium): Missing asNumber() and other unit-related things
-        nReactions = np.dot(self.protein_lengths, nProteinsToDegrade)
+        nReactions = self.degradation_operator.dot(nProteinsToDegrade)[-1]
 
         # Determine the amount of water required to degrade the selected proteins
         # Assuming one N-1 H2O is required per peptide chain length N
@@ -127,7 +132,7 @@ class ProteinDegradation(PartitionedProcess):
         # back into the cell, and consume H_2O that is required for the
         # degradation process
         allocated_proteins = counts(states["bulk"], self.protein_idx)
-        metabolites_delta = np.dot(self.degradation_matrix, allocated_proteins)
+        metabolites_delta = self.degradation_operator.dot(allocated_proteins)[:-1]
 
         update = {
             "bulk": [
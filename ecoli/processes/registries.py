@@ -2,3 +2,9 @@ from vivarium.core.registry import Registry
 
 #: Maps process names to topology
 topology_registry = Registry()
+
+#: Maps names of listeners that can be made virtual to functions that take
+#: the listener config and a function returning the output metadata of a
+#: column and build the skipped columns from emitted ones (see
+#: :py:func:`~ecoli.library.parquet_emitter.add_virtual_columns`)
+virtual_column_registry = Registry()
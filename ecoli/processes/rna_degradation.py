@@ -43,6 +43,7 @@ from ecoli.library.schema import (
 )
 
 from wholecell.utils import units
+from wholecell.utils.random import choose_within_groups
 
 from ecoli.processes.registries import topology_registry
 from ecoli.processes.partition import PartitionedProcess
@@ -412,22 +413,17 @@ class RnaDegradation(PartitionedProcess):
         can_translate = can_translate.copy()
         n_deactivated_unique_RNA = self.n_unique_RNAs_to_deactivate
 
-        # Deactive unique RNAs
-        non_zero_deactivation = n_deactivated_unique_RNA > 0
-
-        for index, n_degraded in zip(
-            np.arange(n_deactivated_unique_RNA.size)[non_zero_deactivation],
-            n_deactivated_unique_RNA[non_zero_deactivation],
-        ):
-            # Get mask for translatable mRNAs belonging to the degraded species
-            mask = np.logical_and(TU_index == index, can_translate)
-
-            # Choose n_degraded indexes randomly to deactivate
-            can_translate[
-                self.random_state.choice(
-                    size=n_degraded, a=np.where(mask)[0], replace=False
+        # Choose translatable mRNAs of each species randomly to deactivate
+        translatable_mRNAs = np.flatnonzero(can_translate)
+        can_translate[
+            translatable_mRNAs[
+                choose_within_groups(
+                    self.random_state,
+                    TU_index[translatable_mRNAs],
+                    n_deactivated_unique_RNA,
                 )
-            ] = False
+            ]
+        ] = False
 
         count_RNA_degraded_per_cistron = self.cistron_tu_mapping_matrix.dot(
             n_degraded_RNA[: self.n_transcribed_rnas]
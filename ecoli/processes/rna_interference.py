@@ -13,6 +13,7 @@ from vivarium.core.process import Process
 from vivarium.core.engine import Engine
 
 from ecoli.library.schema import numpy_schema, bulk_name_to_idx, counts, attrs
+from wholecell.utils.random import choose_within_groups
 from ecoli.processes.registries import topology_registry
 from ecoli.processes.unique_update import UniqueUpdate
 
@@ -56,6 +57,11 @@ class RnaInterference(Process):
         self.bulk_rna_ids = self.srna_ids + self.duplex_ids
         self.random_state = np.random.RandomState(seed=self.parameters["seed"])
 
+        # Distinct target TUs and the index of the target of each pair
+        self.target_TUs, self.pair_target = np.unique(
+            np.array(self.target_tu_ids, dtype=np.int64), return_inverse=True
+        )
+
         self.srna_idx = None
 
     def ports_schema(self):
@@ -81,6 +87,8 @@ class RnaInterference(Process):
             "RNAs": {"delete": []},
             "active_ribosome": {"delete": []},
         }
+        if len(self.target_TUs) == 0:
+            return update
 
         TU_index, can_translate, is_full_transcript, rna_indexes = attrs(
             states["RNAs"],
@@ -91,51 +99,62 @@ class RnaInterference(Process):
             states["active_ribosome"], ["mRNA_index", "unique_index"]
         )
 
-        for srna_idx, mrna_index, binding_prob, duplex_idx in zip(
-            self.srna_idx, self.target_tu_ids, self.binding_probs, self.duplex_idx
+        # Group translatable, complete mRNAs by target TU
+        target_group = np.searchsorted(self.target_TUs, TU_index)
+        target_group[target_group == len(self.target_TUs)] = 0
+        is_target = np.logical_and(
+            self.target_TUs[target_group] == TU_index,
+            np.logical_and(can_translate, is_full_transcript),
+        )
+        target_mrnas = np.flatnonzero(is_target)
+        target_group = target_group[target_mrnas]
+        n_available_mrnas = np.bincount(target_group, minlength=len(self.target_TUs))
+
+        # Each sRNA has probability binding_prob of binding a target mRNA.
+        # sRNAs that share a target bind the mRNAs left by previous ones.
+        srna_counts = counts(states["bulk"], self.srna_idx)
+        n_duplexed = np.zeros(len(self.srna_idx), dtype=np.int64)
+        for i, (srna_count, target, binding_prob) in enumerate(
+            zip(srna_counts, self.pair_target, self.binding_probs)
         ):
-            # Get count of complete sRNAs
-            srna_count = counts(states["bulk"], srna_idx)
-            if srna_count == 0:
+            if srna_count == 0 or n_available_mrnas[target] == 0:
                 continue
+            n_duplexed[i] = min(
+                self.random_state.binomial(srna_count, binding_prob),
+                n_available_mrnas[target],
+            )
+            n_available_mrnas[target] -= n_duplexed[i]
 
-            # Get mask for translatable, complete target mRNAs
-            mrna_mask = np.logical_and(TU_index == mrna_index, can_translate)
-            mrna_mask = np.logical_and(mrna_mask, is_full_transcript)
-            n_mrna = mrna_mask.sum()
-            if n_mrna == 0:
-                continue
+        if n_duplexed.sum() == 0:
+            return update
 
-            # Each sRNA has probability binding_prob of binding a target mRNA
-            n_duplexed = np.min(
-                [self.random_state.binomial(srna_count, binding_prob), mrna_mask.sum()]
+        # Choose the mRNAs to delete for all targets at once
+        mrna_to_delete = target_mrnas[
+            choose_within_groups(
+                self.random_state,
+                target_group,
+                np.bincount(
+                    self.pair_target,
+                    weights=n_duplexed,
+                    minlength=len(self.target_TUs),
+                ).astype(np.int64),
             )
+        ]
+        update["RNAs"]["delete"] = mrna_to_delete
+        update["bulk"].extend(zip(self.srna_idx, -n_duplexed))
 
-            # Choose n_duplexed mRNAs and sRNAs randomly to delete
-            mrna_to_delete = self.random_state.choice(
-                size=n_duplexed, a=np.nonzero(mrna_mask)[0], replace=False
-            ).tolist()
-            update["RNAs"]["delete"] += list(mrna_to_delete)
-            update["bulk"].append((srna_idx, -n_duplexed))
+        # Dissociate ribosomes attached to new duplexes
+        deleted_rna_indexes = np.sort(rna_indexes[mrna_to_delete])
+        ribosome_mrna = np.searchsorted(deleted_rna_indexes, mRNA_index)
+        ribosome_mrna[ribosome_mrna == len(deleted_rna_indexes)] = 0
+        ribosomes_to_delete = np.flatnonzero(
+            deleted_rna_indexes[ribosome_mrna] == mRNA_index
+        )
+        update["active_ribosome"]["delete"] = ribosomes_to_delete
+        update["bulk"].append((self.subunit_idx, len(ribosomes_to_delete)))
 
-            # Dissociate ribosomes attached to new duplexes
-            ribosomes_to_delete = list(
-                np.nonzero(np.isin(mRNA_index, rna_indexes[mrna_to_delete]))[0]
-            )
-            update["active_ribosome"]["delete"] += ribosomes_to_delete
-            update["bulk"].append((self.subunit_idx, len(ribosomes_to_delete)))
-
-            # Ensure that additional sRNAs cannot bind to mRNAs that have
-            # already been duplexed
-            remainder_mask = np.ones(TU_index.size, dtype=bool)
-            remainder_mask[mrna_to_delete] = False
-            TU_index = TU_index[remainder_mask]
-            can_translate = can_translate[remainder_mask]
-            is_full_transcript = is_full_transcript[remainder_mask]
-            rna_indexes = rna_indexes[remainder_mask]
-
-            # Add new RNA duplexes
-            update["bulk"].append((duplex_idx, n_duplexed))
+        # Add new RNA duplexes
+        update["bulk"].extend(zip(self.duplex_idx, n_duplexed))
 
         return update
 
@@ -7,9 +7,10 @@ RnaMaturation process
 """
 
 import numpy as np
+import scipy.sparse
 
 from ecoli.processes.registries import topology_registry
-from ecoli.processes.partition import PartitionedProcess
+from ecoli.processes.partition import PartitionedProcess, StoichiometryOperator
 from ecoli.library.schema import listener_schema, numpy_schema, counts, bulk_name_to_idx
 
 # Register default topology for this process, associating it with process name
@@ -48,6 +49,32 @@ class RnaMaturation(PartitionedProcess):
         self.delta_nt_counts_16s = self.parameters["delta_nt_counts_16s"]
         self.delta_nt_counts_5s = self.parameters["delta_nt_counts_5s"]
 
+        # Mature RNAs, NMPs from degraded fragments, and ppis added by the
+        # maturation of each unprocessed RNA, computed in a single product
+        self.n_mature_rnas = self.stoich_matrix.shape[0]
+        self.n_nmps = self.degraded_nt_counts.shape[1]
+        self.maturation_operator = StoichiometryOperator(
+            scipy.sparse.vstack(
+                [
+                    scipy.sparse.csr_matrix(self.stoich_matrix),
+                    scipy.sparse.csr_matrix(self.degraded_nt_counts).T,
+                    scipy.sparse.csr_matrix(self.n_ppi_added.reshape(1, -1)),
+                ]
+            ),
+            dtype=np.int64,
+        )
+        # NMPs added by the consolidation of each variant rRNA
+        self.consolidation_operator = StoichiometryOperator(
+            np.hstack(
+                [
+                    self.delta_nt_counts_23s.T,
+                    self.delta_nt_counts_16s.T,
+                    self.delta_nt_counts_5s.T,
+                ]
+            ),
+            dtype=np.int64,
+        )
+
         # Bulk molecule IDs
         self.unprocessed_rna_ids = self.parameters["unprocessed_rna_ids"]
         self.mature_rna_ids = self.parameters["mature_rna_ids"]
@@ -136,13 +163,16 @@ class RnaMaturation(PartitionedProcess):
         unprocessed_rna_counts[reaction_is_off] = 0
 
         # Calculate NMPs, water, and proton needed to balance mass
-        n_added_bases_from_maturation = np.dot(
-            self.degraded_nt_counts.T, unprocessed_rna_counts
-        )
-        n_added_bases_from_consolidation = (
-            self.delta_nt_counts_23s.T.dot(variant_23s_rRNA_counts)
-            + self.delta_nt_counts_16s.T.dot(variant_16s_rRNA_counts)
-            + self.delta_nt_counts_5s.T.dot(variant_5s_rRNA_counts)
+        maturation = self._maturation_products(unprocessed_rna_counts)
+        n_added_bases_from_maturation = maturation["nmps"]
+        n_added_bases_from_consolidation = self.consolidation_operator.dot(
+            np.concatenate(
+                [
+                    variant_23s_rRNA_counts,
+                    variant_16s_rRNA_counts,
+                    variant_5s_rRNA_counts,
+                ]
+            )
         )
         n_added_bases = n_added_bases_from_maturation + n_added_bases_from_consolidation
         n_total_added_bases = int(n_added_bases.sum())
@@ -153,7 +183,7 @@ class RnaMaturation(PartitionedProcess):
         request = {
             "bulk": [
                 (self.unprocessed_rna_idx, unprocessed_rna_counts),
-                (self.ppi_idx, self.n_ppi_added.dot(unprocessed_rna_counts)),
+                (self.ppi_idx, maturation["ppi"]),
                 (self.variant_23s_rRNA_idx, variant_23s_rRNA_counts),
                 (self.variant_16s_rRNA_idx, variant_16s_rRNA_counts),
                 (self.variant_5s_rRNA_idx, variant_5s_rRNA_counts),
@@ -177,14 +207,13 @@ class RnaMaturation(PartitionedProcess):
 
         # Calculate numbers of mature RNAs and fragment bases that are generated
         # upon maturation
-        n_mature_rnas = self.stoich_matrix.dot(unprocessed_rna_counts)
-        n_added_bases_from_maturation = np.dot(
-            self.degraded_nt_counts.T, unprocessed_rna_counts
-        )
+        maturation = self._maturation_products(unprocessed_rna_counts)
+        n_mature_rnas = maturation["mature_rnas"]
+        n_added_bases_from_maturation = maturation["nmps"]
 
         states["bulk"][self.mature_rna_idx] += n_mature_rnas
         states["bulk"][self.unprocessed_rna_idx] += -unprocessed_rna_counts
-        ppi_update = self.n_ppi_added.dot(unprocessed_rna_counts)
+        ppi_update = maturation["ppi"]
         states["bulk"][self.ppi_idx] += -ppi_update
         update = {
             "bulk": [
@@ -212,10 +241,14 @@ class RnaMaturation(PartitionedProcess):
 
         # Calculate number of NMPs that should be added to balance out the mass
         # difference during the consolidation
-        n_added_bases_from_consolidation = (
-            self.delta_nt_counts_23s.T.dot(variant_23s_rRNA_counts)
-            + self.delta_nt_counts_16s.T.dot(variant_16s_rRNA_counts)
-            + self.delta_nt_counts_5s.T.dot(variant_5s_rRNA_counts)
+        n_added_bases_from_consolidation = self.consolidation_operator.dot(
+            np.concatenate(
+                [
+                    variant_23s_rRNA_counts,
+                    variant_16s_rRNA_counts,
+                    variant_5s_rRNA_counts,
+                ]
+            )
         )
 
         # Evolve states
@@ -245,3 +278,15 @@ class RnaMaturation(PartitionedProcess):
         )
 
         return update
+
+    def _maturation_products(self, unprocessed_rna_counts):
+        """
+        Returns the numbers of mature RNAs generated, NMPs from the degraded
+        fragments, and ppis added when maturing the given unprocessed RNAs.
+        """
+        product = self.maturation_operator.dot(unprocessed_rna_counts)
+        return {
+            "mature_rnas": product[: self.n_mature_rnas],
+            "nmps": product[self.n_mature_rnas : self.n_mature_rnas + self.n_nmps],
+            "ppi": product[-1],
+        }
@@ -21,6 +21,12 @@ matrix, M, that updates the concentration, c(t), on each timestep.
 
 * Concentration update: :math:`c_{t+1} = M^{-1} * c_{t}`
 
+The matrices for all molecules are assembled together as one batched
+operator and inverted in a single call. Since the network topology and
+diffusion constants are fixed, the inverted operator only depends on node
+volumes, node lengths, and the timestep, and is cached until one of these
+changes.
+
 This process takes in molecular weights in order to solve for
 molecule hydrodynamic radii, which is it turn used to solve for
 diffusion constants. These calculations assume that all
@@ -126,6 +132,37 @@ class DiffusionNetwork(Process):
             self.molecule_ids, self.rp, self.mesh_size, self.edges, self.temp
         )
 
+        # Static network arrays used to assemble the diffusion operator
+        node_to_idx = {node: i for i, node in enumerate(self.nodes)}
+        self.edge_node_1 = np.array(
+            [node_to_idx[edge["nodes"][0]] for edge in self.edges.values()], dtype=int
+        )
+        self.edge_node_2 = np.array(
+            [node_to_idx[edge["nodes"][1]] for edge in self.edges.values()], dtype=int
+        )
+        self.cross_sectional_areas = np.array(
+            [edge["cross_sectional_area"] for edge in self.edges.values()],
+            dtype=np.float64,
+        )
+        # Diffusion constants of each molecule (columns) across each edge (rows)
+        self.edge_diffusion_constants = np.array(
+            [
+                [
+                    self.diffusion_constants[edge_id][mol_id]
+                    for mol_id in self.molecule_ids
+                ]
+                for edge_id in self.edges
+            ],
+            dtype=np.float64,
+        ).reshape(len(self.edges), len(self.molecule_ids))
+        self.mw_array = np.array(
+            [self.mw[mol_id] for mol_id in self.molecule_ids], dtype=np.float64
+        )
+
+        # Inverted diffusion operator for the last seen geometry
+        self._operator_key = None
+        self._operator_inv = None
+
     def ports_schema(self):
         """
         Dynamically constructs ports -- one port for each node in ``DiffusionNetwork.parameters['nodes']``.
@@ -152,52 +189,69 @@ class DiffusionNetwork(Process):
         }
         return schema
 
+    def diffusion_operator(self, timestep, volumes, lengths):
+        """Returns the inverted implicit Euler matrices for all molecules.
+
+        The operator is only reassembled and inverted when the node volumes,
+        node lengths, or timestep differ from the previous call.
+
+        Args:
+            timestep: Timestep in s.
+            volumes: Volume of each node, in the order of ``self.nodes``.
+            lengths: Length of each node, in the order of ``self.nodes``.
+
+        Returns:
+            Array of shape (molecules, nodes, nodes) where each slice is
+            :math:`M^{-1}` for one molecule.
+        """
+        key = (timestep, volumes.tobytes(), lengths.tobytes())
+        if key == self._operator_key:
+            return self._operator_inv
+
+        n_nodes = len(self.nodes)
+        # Built as (nodes, nodes, molecules) so that edge contributions can
+        # be scattered with np.add.at, all edges assumed bidirectional
+        M = np.zeros((n_nodes, n_nodes, len(self.molecule_ids)))
+        M[np.arange(n_nodes), np.arange(n_nodes)] = 1
+        dx = lengths[self.edge_node_1] / 2 + lengths[self.edge_node_2] / 2
+        alpha = (
+            self.edge_diffusion_constants
+            * (self.cross_sectional_areas / dx)[:, np.newaxis]
+            * timestep
+        )
+        alpha_1 = alpha / volumes[self.edge_node_1, np.newaxis]
+        alpha_2 = alpha / volumes[self.edge_node_2, np.newaxis]
+        np.add.at(M, (self.edge_node_1, self.edge_node_1), alpha_1)
+        np.add.at(M, (self.edge_node_2, self.edge_node_2), alpha_2)
+        np.add.at(M, (self.edge_node_1, self.edge_node_2), -alpha_1)
+        np.add.at(M, (self.edge_node_2, self.edge_node_1), -alpha_2)
+
+        self._operator_inv = np.linalg.inv(M.transpose(2, 0, 1))
+        self._operator_key = key
+        return self._operator_inv
+
     def next_update(self, timestep, state):
-        M = np.asarray([np.identity(len(self.nodes)) for mol in self.molecule_ids])
-
-        # construct M matrix based off of graph, all edges assumed bidirectional
-        for edge_id, edge in self.edges.items():
-            node_index_1 = np.where(self.nodes == edge["nodes"][0])[0][0]
-            node_index_2 = np.where(self.nodes == edge["nodes"][1])[0][0]
-            cross_sectional_area = edge["cross_sectional_area"]
-            vol_1 = state[edge["nodes"][0]]["volume"]
-            vol_2 = state[edge["nodes"][1]]["volume"]
-            dx = (
-                state[edge["nodes"][0]]["length"] / 2
-                + state[edge["nodes"][1]]["length"] / 2
-            )
-            diffusion_constants = array_from(self.diffusion_constants[edge_id])
-            alpha = diffusion_constants * (cross_sectional_area / dx) * timestep
-            M[:, node_index_1, node_index_1] += alpha / vol_1
-            M[:, node_index_2, node_index_2] += alpha / vol_2
-            M[:, node_index_1, node_index_2] -= alpha / vol_1
-            M[:, node_index_2, node_index_1] -= alpha / vol_2
-
-        # Calculates final concentration after one timestep
-        c_initial = np.asarray(
+        volumes = np.array(
+            [state[node]["volume"] for node in self.nodes], dtype=np.float64
+        )
+        lengths = np.array(
+            [state[node]["length"] for node in self.nodes], dtype=np.float64
+        )
+        M_inv = self.diffusion_operator(timestep, volumes, lengths)
+
+        # Calculates final concentration after one timestep for all molecules
+        count_initial = np.array(
             [
-                np.multiply(array_from(state[node]["molecules"]), array_from(self.mw))
-                / state[node]["volume"]
-                for node in state
+                [state[node]["molecules"][mol_id] for mol_id in self.molecule_ids]
+                for node in self.nodes
             ]
-        )
-        c_final = np.asarray(
-            [np.matmul(np.linalg.inv(a), c_initial[:, i]) for i, a in enumerate(M)]
-        ).T
+        ).reshape(len(self.nodes), len(self.molecule_ids))
+        c_initial = count_initial * self.mw_array / volumes[:, np.newaxis]
+        c_final = np.einsum("mij,jm->im", M_inv, c_initial)
 
         # Calculates final counts
-        volumes = np.asarray([state[node]["volume"] for node in state])
-        count_initial = np.asarray(
-            [array_from(state[node]["molecules"]) for node in state]
-        )
         count_final_unrounded = (
-            np.asarray(
-                [
-                    np.divide(node * volumes[i], array_from(self.mw))
-                    for i, node in enumerate(c_final)
-                ]
-            )
-            + self.remainder
+            c_final * volumes[:, np.newaxis] / self.mw_array + self.remainder
         )
         count_final = np.asarray(
             [saferound(col, 0) for col in count_final_unrounded.T]
@@ -214,12 +268,9 @@ class DiffusionNetwork(Process):
 
         update = {
             node_id: {
-                "molecules": array_to(
-                    self.molecule_ids,
-                    delta[np.where(self.nodes == node_id)[0][0]].astype(int),
-                ),
+                "molecules": array_to(self.molecule_ids, delta[i].astype(int)),
             }
-            for node_id in self.nodes
+            for i, node_id in enumerate(self.nodes)
         }
         return update
 
@@ -290,6 +341,50 @@ def test_diffusion_network_process(out_dir=None):
         plot_output(output, sim_settings["initial_state"], out_dir)
 
 
+def test_diffusion_operator_cache():
+    molecule_ids = ["small", "large"]
+    parameters = {
+        "nodes": ["cytosol_front", "nucleoid", "cytosol_rear"],
+        "edges": {
+            "1": {
+                "nodes": ["cytosol_front", "nucleoid"],
+                "cross_sectional_area": np.pi * 0.3**2,
+                "mesh": True,
+            },
+            "2": {
+                "nodes": ["nucleoid", "cytosol_rear"],
+                "cross_sectional_area": np.pi * 0.3**2,
+                "mesh": True,
+            },
+        },
+        "mw": {"small": 1.0, "large": 10.0},
+        "radii": {"small": 1.0, "large": 10.0},
+    }
+    process = DiffusionNetwork(parameters)
+    volumes = np.array([0.25, 0.5, 0.25])
+    lengths = np.array([0.5, 1.0, 0.5])
+    M_inv = process.diffusion_operator(0.1, volumes, lengths)
+
+    # Compare against the matrix assembled edge by edge for each molecule
+    for mol_idx, mol_id in enumerate(molecule_ids):
+        M = np.identity(3)
+        for edge_id, (i, j) in zip(["1", "2"], [(0, 1), (1, 2)]):
+            alpha = (
+                process.diffusion_constants[edge_id][mol_id]
+                * (np.pi * 0.3**2 / (lengths[i] / 2 + lengths[j] / 2))
+                * 0.1
+            )
+            M[i, i] += alpha / volumes[i]
+            M[j, j] += alpha / volumes[j]
+            M[i, j] -= alpha / volumes[i]
+            M[j, i] -= alpha / volumes[j]
+        np.testing.assert_allclose(M_inv[mol_idx], np.linalg.inv(M))
+
+    # Operator is reused until the geometry changes
+    assert process.diffusion_operator(0.1, volumes.copy(), lengths) is M_inv
+    assert process.diffusion_operator(0.1, volumes * 2, lengths) is not M_inv
+
+
 # Plots the diffusion constants by molecule sizes for edges with and without mesh
 def plot_diff_range(diffusion_constants, rp, out_dir="out"):
     plt.figure()
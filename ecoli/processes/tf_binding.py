@@ -7,6 +7,7 @@ This process models how transcription factors bind to promoters on the DNA seque
 """
 
 import numpy as np
+import scipy.sparse
 import warnings
 
 from vivarium.core.process import Step
@@ -19,7 +20,7 @@ from ecoli.library.schema import (
     counts,
 )
 
-from wholecell.utils.random import stochasticRound
+from wholecell.utils.random import choose_within_groups, stochasticRound
 from wholecell.utils import units
 
 from ecoli.processes.registries import topology_registry
@@ -84,14 +85,9 @@ class TfBinding(Step):
 
         self.rna_ids = self.parameters["rna_ids"]
 
-        # Build dict that maps TFs to transcription units they regulate
+        # Build sparse matrix of the transcription units each TF regulates
         self.delta_prob = self.parameters["delta_prob"]
-        self.TF_to_TU_idx = {}
-
-        for i, tf in enumerate(self.tf_ids):
-            self.TF_to_TU_idx[tf] = self.delta_prob["deltaI"][
-                self.delta_prob["deltaJ"] == i
-            ]
+        self.tf_targets = tf_target_matrix(self.delta_prob, self.n_TF)
 
         # Get total counts of transcription units
         self.n_TU = self.delta_prob["shape"][0]
@@ -137,9 +133,15 @@ class TfBinding(Step):
         self.seed = self.parameters["seed"]
         self.random_state = np.random.RandomState(seed=self.seed)
 
+        # TFs whose binding probability depends on their inactive form
+        self.tf_is_0CS = np.array(
+            [self.tf_to_tf_type[tf] == "0CS" for tf in self.tf_ids], dtype=bool
+        )
+
         # Helper indices for Numpy indexing
         self.active_tf_idx = None
         if "PD00365" in self.tf_ids:
+            self.marA_tf_idx = list(self.tf_ids).index("PD00365")
             self.marR_name = "CPLX0-7710[c]"
             self.marR_tet = "marR-tet[c]"
         self.submass_indices = self.parameters["submass_indices"]
@@ -192,14 +194,17 @@ class TfBinding(Step):
         # At t=0, convert all strings to indices
         if self.active_tf_idx is None:
             bulk_ids = states["bulk"]["id"]
-            self.active_tf_idx = {
-                tf_id: bulk_name_to_idx(tf_name, bulk_ids)
-                for tf_id, tf_name in self.active_tfs.items()
-            }
-            self.inactive_tf_idx = {
-                tf_id: bulk_name_to_idx(tf_name, bulk_ids)
-                for tf_id, tf_name in self.inactive_tfs.items()
-            }
+            self.active_tf_idx = bulk_name_to_idx(
+                [self.active_tfs[tf_id] for tf_id in self.tf_ids], bulk_ids
+            )
+            self.inactive_tf_idx = bulk_name_to_idx(
+                [
+                    self.inactive_tfs[tf_id]
+                    for tf_id, is_0CS in zip(self.tf_ids, self.tf_is_0CS)
+                    if not is_0CS
+                ],
+                bulk_ids,
+            )
             if "PD00365" in self.tf_ids:
                 self.marR_idx = bulk_name_to_idx(self.marR_name, bulk_ids)
                 self.marR_tet_idx = bulk_name_to_idx(self.marR_tet, bulk_ids)
@@ -214,104 +219,60 @@ class TfBinding(Step):
         # Calculate number of bound TFs for each TF prior to changes
         n_bound_TF = bound_TF.sum(axis=0)
 
-        # Initialize new bound_TF array
-        bound_TF_new = np.zeros_like(bound_TF)
-
-        # Create vectors for storing values
+        # Get counts of transcription factors, counting all DNA-bound
+        # transcription factors as free active transcription factors
+        tf_counts = counts(states["bulk"], self.active_tf_idx)
+        active_tf_counts = counts(states["bulk_total"], self.active_tf_idx) + n_bound_TF
+        n_available_active_tfs = tf_counts + n_bound_TF
+        inactive_tf_counts = np.zeros(self.n_TF, dtype=int)
+        inactive_tf_counts[~self.tf_is_0CS] = counts(
+            states["bulk_total"], self.inactive_tf_idx
+        )
+
+        # NEW to vivarium-ecoli
+        # Uncomplexed marR reduces active marA
+        if "PD00365" in self.tf_ids:
+            marR_count = counts(states["bulk_total"], self.marR_idx)
+            marR_tet_count = counts(states["bulk_total"], self.marR_tet_idx)
+            # marA activity ramps up as more marR is complexed off
+            # TODO: Figure out how to modify ParCa so MarA/R are included
+            # as active TFs so no need to compromise basal or tetracycline
+            # behavior when total MarR count is zero
+            ratio = marR_tet_count / max(marR_count + marR_tet_count, 1)
+            # 34 = # of promoters for genes that marA regulates
+            n_available_active_tfs[self.marA_tf_idx] = int(34 * ratio)
+
+        # Get all (promoter, TF) pairs where the TF can bind the promoter
+        site_promoter, site_TF = tf_binding_sites(self.tf_targets, TU_index)
+        n_promoters = np.bincount(site_TF, minlength=self.n_TF)
+
+        # Compute probability of binding the promoter for TFs that have
+        # active molecules to work with (the others do not bind)
         pPromotersBound = np.zeros(self.n_TF, dtype=np.float64)
-        nPromotersBound = np.zeros(self.n_TF, dtype=int)
-        nActualBound = np.zeros(self.n_TF, dtype=int)
-        n_promoters = np.zeros(self.n_TF, dtype=int)
-        n_bound_TF_per_TU = np.zeros((self.n_TU, self.n_TF), dtype=np.int16)
-
-        update = {"bulk": []}
-
-        for tf_idx, tf_id in enumerate(self.tf_ids):
-            # Free all DNA-bound transcription factors into free active
-            # transcription factors
-            curr_tf_idx = self.active_tf_idx[tf_id]
-            tf_count = counts(states["bulk"], curr_tf_idx)
-
-            bound_tf_counts = n_bound_TF[tf_idx]
-            update["bulk"].append((curr_tf_idx, bound_tf_counts))
-
-            # Get counts of transcription factors
-            active_tf_counts = (
-                counts(states["bulk_total"], curr_tf_idx) + bound_tf_counts
+        has_active_tfs = n_available_active_tfs > 0
+        pPromotersBound[has_active_tfs & self.tf_is_0CS] = 1.0
+        for tf_idx in np.flatnonzero(has_active_tfs & ~self.tf_is_0CS):
+            pPromotersBound[tf_idx] = self.p_promoter_bound_tf(
+                active_tf_counts[tf_idx], inactive_tf_counts[tf_idx]
             )
-            n_available_active_tfs = tf_count + bound_tf_counts
-
-            # NEW to vivarium-ecoli
-            # Uncomplexed marR reduces active marA
-            if tf_id == "PD00365":
-                marR_count = counts(states["bulk_total"], self.marR_idx)
-                marR_tet_count = counts(states["bulk_total"], self.marR_tet_idx)
-                # marA activity ramps up as more marR is complexed off
-                # TODO: Figure out how to modify ParCa so MarA/R are included
-                # as active TFs so no need to compromise basal or tetracycline
-                # behavior when total MarR count is zero
-                ratio = marR_tet_count / max(marR_count + marR_tet_count, 1)
-                # 34 = # of promoters for genes that marA regulates
-                n_available_active_tfs = int(34 * ratio)
-
-            # Determine the number of available promoter sites
-            available_promoters = np.isin(TU_index, self.TF_to_TU_idx[tf_id])
-            n_available_promoters = np.count_nonzero(available_promoters)
-            n_promoters[tf_idx] = n_available_promoters
-
-            # If there are no active transcription factors to work with,
-            # continue to the next transcription factor
-            if n_available_active_tfs == 0:
-                continue
-
-            # Compute probability of binding the promoter
-            if self.tf_to_tf_type[tf_id] == "0CS":
-                pPromoterBound = 1.0
-            else:
-                inactive_tf_counts = counts(
-                    states["bulk_total"], self.inactive_tf_idx[tf_id]
-                )
-                pPromoterBound = self.p_promoter_bound_tf(
-                    active_tf_counts, inactive_tf_counts
-                )
 
-            # Calculate the number of promoters that should be bound
-            n_to_bind = int(
-                min(
-                    stochasticRound(
-                        self.random_state,
-                        np.full(n_available_promoters, pPromoterBound),
-                    ).sum(),
-                    n_available_active_tfs,
-                )
-            )
+        # Determine randomly which DNA targets each TF binds
+        bound_sites, nPromotersBound = sample_bound_sites(
+            self.random_state, site_TF, pPromotersBound, n_available_active_tfs
+        )
+        bound_promoters = site_promoter[bound_sites]
+        bound_TFs = site_TF[bound_sites]
+        nActualBound = np.bincount(bound_TFs, minlength=self.n_TF)
 
-            bound_locs = np.zeros(n_available_promoters, dtype=bool)
-            if n_to_bind > 0:
-                # Determine randomly which DNA targets to bind based on which of
-                # the following is more limiting:
-                # number of promoter sites to bind, or number of active
-                # transcription factors
-                bound_locs[
-                    self.random_state.choice(
-                        n_available_promoters, size=n_to_bind, replace=False
-                    )
-                ] = True
-
-                # Update count of free transcription factors
-                update["bulk"].append((curr_tf_idx, -bound_locs.sum()))
-
-                # Update bound_TF array
-                bound_TF_new[available_promoters, tf_idx] = bound_locs
-
-            n_bound_TF_per_TU[:, tf_idx] = np.bincount(
-                TU_index[bound_TF_new[:, tf_idx]], minlength=self.n_TU
-            )
+        # Update bound_TF array
+        bound_TF_new = np.zeros_like(bound_TF)
+        bound_TF_new[bound_promoters, bound_TFs] = True
 
-            # Record values
-            pPromotersBound[tf_idx] = pPromoterBound
-            nPromotersBound[tf_idx] = n_to_bind
-            nActualBound[tf_idx] = bound_locs.sum()
+        n_bound_TF_per_TU = np.zeros((self.n_TU, self.n_TF), dtype=np.int16)
+        np.add.at(n_bound_TF_per_TU, (TU_index[bound_promoters], bound_TFs), 1)
+
+        # Update count of free transcription factors
+        update = {"bulk": [(self.active_tf_idx, n_bound_TF - nActualBound)]}
 
         delta_TF = bound_TF_new.astype(np.int8) - bound_TF.astype(np.int8)
         mass_diffs = delta_TF.dot(self.active_tf_masses)
@@ -337,6 +298,110 @@ class TfBinding(Step):
         return update
 
 
+def tf_target_matrix(delta_prob, n_TF):
+    """
+    Builds a sparse incidence matrix of the transcription units whose
+    promoters each transcription factor can bind.
+
+    Args:
+        delta_prob: Sparse representation of the delta probability matrix
+            (``deltaI``, ``deltaJ``, ``deltaV`` and ``shape``) from
+            :py:class:`~reconstruction.ecoli.dataclasses.process.transcription_regulation.TranscriptionRegulation`
+        n_TF: Number of transcription factors
+
+    Returns:
+        Boolean CSR matrix (transcription units x transcription factors)
+    """
+    targets = np.unique(
+        np.column_stack([delta_prob["deltaI"], delta_prob["deltaJ"]]), axis=0
+    ).reshape(-1, 2)
+    return scipy.sparse.csr_matrix(
+        (np.ones(len(targets), dtype=bool), (targets[:, 0], targets[:, 1])),
+        shape=(delta_prob["shape"][0], n_TF),
+    )
+
+
+def tf_binding_sites(tf_targets, TU_index):
+    """
+    Lists every promoter-transcription factor pair where the transcription
+    factor can bind the promoter.
+
+    Args:
+        tf_targets: Matrix from :py:func:`tf_target_matrix`
+        TU_index: Transcription unit index of each promoter
+
+    Returns:
+        Tuple of promoter indexes and transcription factor indexes of all
+        binding sites, grouped by promoter
+    """
+    starts = tf_targets.indptr[TU_index]
+    n_sites = tf_targets.indptr[TU_index + 1] - starts
+    site_promoter = np.repeat(np.arange(len(TU_index)), n_sites)
+    site_rank = np.arange(n_sites.sum()) - np.repeat(
+        np.cumsum(n_sites) - n_sites, n_sites
+    )
+    site_TF = tf_targets.indices[np.repeat(starts, n_sites) + site_rank]
+    return site_promoter, site_TF
+
+
+def sample_bound_sites(random_state, site_TF, p_promoter_bound, n_available_tfs):
+    """
+    Decides which binding sites are bound for all transcription factors at
+    once. The number of promoters each transcription factor binds is the
+    stochastically rounded sum of its binding probability over its sites,
+    capped by the number of its available active molecules. The bound sites
+    are then chosen uniformly without replacement among its sites.
+
+    Args:
+        random_state: Random state for sampling
+        site_TF: Transcription factor index of each binding site (see
+            :py:func:`tf_binding_sites`)
+        p_promoter_bound: Probability of each transcription factor binding
+            a promoter
+        n_available_tfs: Counts of available active molecules of each
+            transcription factor
+
+    Returns:
+        Tuple of the indexes of the bound sites and the number of promoters
+        bound by each transcription factor
+    """
+    n_to_bind = np.bincount(
+        site_TF,
+        weights=stochasticRound(random_state, p_promoter_bound[site_TF]),
+        minlength=len(p_promoter_bound),
+    ).astype(int)
+    n_to_bind = np.minimum(n_to_bind, n_available_tfs)
+    return choose_within_groups(random_state, site_TF, n_to_bind), n_to_bind
+
+
+def test_sample_bound_sites():
+    # TF 0 regulates TUs 0 and 2, TF 1 regulates TU 2, TF 2 regulates TU 1
+    delta_prob = {
+        "deltaI": np.array([0, 2, 2, 1]),
+        "deltaJ": np.array([0, 0, 1, 2]),
+        "deltaV": np.ones(4),
+        "shape": (3, 3),
+    }
+    tf_targets = tf_target_matrix(delta_prob, 3)
+    TU_index = np.array([2, 0, 2, 1, 2])
+    site_promoter, site_TF = tf_binding_sites(tf_targets, TU_index)
+    sites = set(zip(site_promoter.tolist(), site_TF.tolist()))
+    assert sites == {(0, 0), (0, 1), (1, 0), (2, 0), (2, 1), (3, 2), (4, 0), (4, 1)}
+
+    random_state = np.random.RandomState(0)
+    bound_sites, n_to_bind = sample_bound_sites(
+        random_state, site_TF, np.array([1.0, 0.5, 1.0]), np.array([10, 10, 0])
+    )
+    bound_TFs = site_TF[bound_sites]
+    assert n_to_bind[0] == 4 and n_to_bind[2] == 0
+    np.testing.assert_array_equal(np.bincount(bound_TFs, minlength=3), n_to_bind)
+    # Limited by the number of available TFs
+    _, n_to_bind = sample_bound_sites(
+        random_state, site_TF, np.array([1.0, 1.0, 1.0]), np.array([2, 10, 10])
+    )
+    np.testing.assert_array_equal(n_to_bind, [2, 3, 1])
+
+
 def test_tf_binding_listener():
     from ecoli.experiments.ecoli_master_sim import EcoliSim
 
@@ -159,16 +159,26 @@ class TranscriptElongation(PartitionedProcess):
         self.n_avogadro = self.parameters["n_avogadro"]
         self.stop_probabilities = self.parameters["get_attenuation_stop_probabilities"]
         self.attenuated_rna_indices = self.parameters["attenuated_rna_indices"]
-        self.attenuated_rna_indices_lookup = {
-            idx: i for i, idx in enumerate(self.attenuated_rna_indices)
-        }
         self.attenuated_rnas = self.rnaIds[self.attenuated_rna_indices]
         self.location_lookup = self.parameters["location_lookup"]
+        # Per-TU arrays of the index of each TU in attenuated_rna_indices
+        # (-1 if not attenuated) and of the attenuation stop location
+        n_TUs = len(self.rnaIds)
+        self.attenuation_column = np.full(n_TUs, -1, dtype=np.int64)
+        self.attenuation_column[self.attenuated_rna_indices] = np.arange(
+            len(self.attenuated_rna_indices)
+        )
+        self.attenuation_location = np.zeros(n_TUs, dtype=np.int64)
+        for idx, location in self.location_lookup.items():
+            self.attenuation_location[idx] = location
 
         # random seed
         self.seed = self.parameters["seed"]
         self.random_state = np.random.RandomState(seed=self.seed)
 
+        # Positions of partial RNAs by unique index of their RNAPs
+        self.partial_RNA_positions = UniqueIndexMap()
+
         # Helper indices for Numpy indexing
         self.bulk_RNA_idx = None
 
@@ -352,19 +362,16 @@ class TranscriptElongation(PartitionedProcess):
             attenuation_probability = self.stop_probabilities(
                 counts_to_molar * counts(states["bulk_total"], self.charged_trnas_idx)
             )
-            prob_lookup = {
-                tu: prob
-                for tu, prob in zip(
-                    self.attenuated_rna_indices, attenuation_probability
-                )
-            }
-            tu_stop_probability = np.array(
-                [
-                    prob_lookup.get(idx, 0)
-                    * (length < self.location_lookup.get(idx, 0))
-                    for idx, length in zip(TU_index_partial_RNAs, length_partial_RNAs)
-                ]
+            # Transcripts of attenuated TUs can only be attenuated before
+            # they reach the attenuation stop location
+            attenuation_column = self.attenuation_column[TU_index_partial_RNAs]
+            can_attenuate = (attenuation_column != -1) & (
+                length_partial_RNAs < self.attenuation_location[TU_index_partial_RNAs]
             )
+            tu_stop_probability = np.zeros(len(TU_index_partial_RNAs))
+            tu_stop_probability[can_attenuate] = attenuation_probability[
+                attenuation_column[can_attenuate]
+            ]
             rna_to_attenuate = stochasticRound(
                 self.random_state, tu_stop_probability
             ).astype(bool)
@@ -418,8 +425,9 @@ class TranscriptElongation(PartitionedProcess):
         assert np.count_nonzero(RNAP_index_partial_RNAs == -1) == 0
 
         # Get mapping indexes between partial RNAs to RNAPs
-        partial_RNA_to_RNAP_mapping, _ = get_mapping_arrays(
-            RNAP_index_partial_RNAs, RNAP_unique_index
+        self.partial_RNA_positions.update(RNAP_index_partial_RNAs)
+        partial_RNA_to_RNAP_mapping = self.partial_RNA_positions.positions(
+            RNAP_unique_index
         )
 
         # Rescale boolean array of directions to an array of 1's and -1's.
@@ -501,10 +509,11 @@ class TranscriptElongation(PartitionedProcess):
         }
 
         # Attenuation removes RNAs and RNAPs
-        counts_attenuated = np.zeros(len(self.attenuated_rna_indices), dtype=int)
+        counts_attenuated = np.bincount(
+            self.attenuation_column[TU_index_partial_RNAs[rna_to_attenuate]],
+            minlength=len(self.attenuated_rna_indices),
+        )
         if np.any(rna_to_attenuate):
-            for idx in TU_index_partial_RNAs[rna_to_attenuate]:
-                counts_attenuated[self.attenuated_rna_indices_lookup[idx]] += 1
             update["RNAs"]["delete"] = np.append(
                 update["RNAs"]["delete"], partial_transcript_indexes[rna_to_attenuate]
             )
@@ -543,11 +552,9 @@ class TranscriptElongation(PartitionedProcess):
 
                 # Count the number of fragment bases in these transcripts up
                 # until the stalled length
-                base_counts = np.zeros(self.n_fragment_bases, dtype=np.int64)
-                for sl, seq in zip(stalled_sequence_lengths, stalled_sequences):
-                    base_counts += np.bincount(
-                        seq[:sl], minlength=self.n_fragment_bases
-                    )
+                base_counts = count_bases(
+                    stalled_sequences, stalled_sequence_lengths, self.n_fragment_bases
+                )
 
                 # Increment counts of fragment NTPs and phosphates
                 update["bulk"].append((self.fragmentBases_idx, base_counts))
@@ -603,6 +610,66 @@ def get_mapping_arrays(x, y):
     return x_to_y, y_to_x
 
 
+class UniqueIndexMap:
+    """
+    Persistent lookup from unique indexes to positions in an array of
+    unique indexes. Like :py:func:`get_mapping_arrays`, but without sorting:
+    the positions are scattered into a buffer indexed by unique index
+    (offset by the smallest current index) that is kept and reused between
+    time steps, so refreshing it after molecules are added or deleted costs
+    O(molecules). Falls back to sorting if the current unique indexes are
+    too spread out for the buffer to stay small.
+    """
+
+    def __init__(self):
+        self._offset = 0
+        self._positions = np.zeros(0, dtype=np.int64)
+        self._sorted_index = None
+        self._sorter = None
+
+    def update(self, unique_index):
+        """
+        Sets the unique indexes to look up positions in.
+
+        Args:
+            unique_index: Array of distinct unique indexes
+        """
+        self._sorted_index = None
+        if len(unique_index) == 0:
+            return
+        self._offset = unique_index.min()
+        span = unique_index.max() - self._offset + 1
+        if span > max(4096, 64 * len(unique_index)):
+            self._sorter = np.argsort(unique_index)
+            self._sorted_index = unique_index[self._sorter]
+            return
+        if span > len(self._positions):
+            self._positions = np.empty(max(span, 2 * len(self._positions)), np.int64)
+        self._positions[unique_index - self._offset] = np.arange(len(unique_index))
+
+    def positions(self, unique_index):
+        """
+        Returns the positions of the given unique indexes (all of which must
+        have been passed to the last call of :py:meth:`update`).
+        """
+        if self._sorted_index is not None:
+            return self._sorter[np.searchsorted(self._sorted_index, unique_index)]
+        return self._positions[unique_index - self._offset]
+
+
+def count_bases(sequences, lengths, n_bases):
+    """
+    Counts the bases in the first ``lengths[i]`` positions of each row
+    ``i`` of ``sequences`` (e.g. from
+    :py:func:`~wholecell.utils.polymerize.buildSequences`).
+
+    Returns:
+        Array with the total count of each base
+    """
+    in_sequence = np.arange(sequences.shape[1]) < np.asarray(lengths)[:, np.newaxis]
+    return np.bincount(sequences[in_sequence], minlength=n_bases)
+
+
 def format_data(data, bulk_ids, rna_dtypes, rnap_dtypes, submass_dtypes):
     # Format unique and bulk data for assertions
     data["unique"]["RNA"] = [
@@ -620,6 +687,156 @@ def format_data(data, bulk_ids, rna_dtypes, rnap_dtypes, submass_dtypes):
     return data
 
 
+def elongation_bookkeeping_paths(rng, n_RNAPs, index_spread=4):
+    """
+    Builds random RNAP and transcript states and, for the RNAP to partial
+    RNA mapping, attenuation and stalled transcript accounting in
+    :py:meth:`TranscriptElongation.evolve_state`, functions that compute
+    the same result with the sorting and Python loops they replaced and
+    with the current array-based code.
+
+    Args:
+        rng: Numpy random generator
+        n_RNAPs: Number of active RNAPs (and partial transcripts)
+        index_spread: Range of the RNAP unique indexes relative to the
+            number of RNAPs (large values use the sorting fallback of
+            :py:class:`UniqueIndexMap`)
+
+    Returns:
+        List of tuples of the name, old path and new path of each step
+    """
+    n_TUs = 4000
+    n_bases = 4
+    attenuated_rna_indices = rng.choice(n_TUs, 20, replace=False)
+    attenuation_probability = rng.random(len(attenuated_rna_indices))
+    location_lookup = {
+        idx: location
+        for idx, location in zip(
+            attenuated_rna_indices, rng.integers(50, 200, len(attenuated_rna_indices))
+        )
+    }
+    attenuation_column = np.full(n_TUs, -1, dtype=np.int64)
+    attenuation_column[attenuated_rna_indices] = np.arange(len(attenuated_rna_indices))
+    attenuation_location = np.zeros(n_TUs, dtype=np.int64)
+    for idx, location in location_lookup.items():
+        attenuation_location[idx] = location
+    partial_RNA_positions = UniqueIndexMap()
+
+    # Active RNAPs have recent unique indexes in arbitrary order
+    RNAP_unique_index = rng.permutation(
+        rng.choice(
+            np.arange(10**6, 10**6 + index_spread * n_RNAPs), n_RNAPs, replace=False
+        )
+    )
+    RNAP_index_partial_RNAs = rng.permutation(RNAP_unique_index)
+    TU_index = rng.integers(0, n_TUs, n_RNAPs)
+    TU_index[: n_RNAPs // 10] = rng.choice(attenuated_rna_indices, n_RNAPs // 10)
+    length = rng.integers(0, 300, n_RNAPs)
+    n_stalled = n_RNAPs // 20
+    stalled_lengths = rng.integers(0, 3000, n_stalled)
+    stalled_sequences = rng.integers(0, n_bases, (n_stalled, 3000)).astype(np.int8)
+
+    def dense_mapping():
+        return get_mapping_arrays(RNAP_index_partial_RNAs, RNAP_unique_index)[0]
+
+    def sparse_mapping():
+        partial_RNA_positions.update(RNAP_index_partial_RNAs)
+        return partial_RNA_positions.positions(RNAP_unique_index)
+
+    def loop_attenuation():
+        prob_lookup = dict(zip(attenuated_rna_indices, attenuation_probability))
+        return np.array(
+            [
+                prob_lookup.get(idx, 0) * (rna_length < location_lookup.get(idx, 0))
+                for idx, rna_length in zip(TU_index, length)
+            ]
+        )
+
+    def array_attenuation():
+        column = attenuation_column[TU_index]
+        can_attenuate = (column != -1) & (length < attenuation_location[TU_index])
+        stop_probability = np.zeros(len(TU_index))
+        stop_probability[can_attenuate] = attenuation_probability[column[can_attenuate]]
+        return stop_probability
+
+    def loop_base_counts():
+        base_counts = np.zeros(n_bases, dtype=np.int64)
+        for sl, seq in zip(stalled_lengths, stalled_sequences):
+            base_counts += np.bincount(seq[:sl], minlength=n_bases)
+        return base_counts
+
+    def array_base_counts():
+        return count_bases(stalled_sequences, stalled_lengths, n_bases)
+
+    return [
+        ("RNAP mapping", dense_mapping, sparse_mapping),
+        ("attenuation", loop_attenuation, array_attenuation),
+        ("stalled bases", loop_base_counts, array_base_counts),
+    ]
+
+
+def test_elongation_bookkeeping():
+    """Array-based bookkeeping matches the sorting and loops it replaced."""
+    rng = np.random.default_rng(0)
+    for n_RNAPs, index_spread in ((1, 4), (40, 4), (1000, 4), (1000, 1000)):
+        for _, old, new in elongation_bookkeeping_paths(rng, n_RNAPs, index_spread):
+            np.testing.assert_array_equal(old(), new())
+
+
+def test_unique_index_map():
+    """Positions stay correct as molecules are added and deleted between
+    updates of the same map."""
+    rng = np.random.default_rng(1)
+    partial_RNA_positions = UniqueIndexMap()
+    unique_index = np.arange(1000)
+    next_index = len(unique_index)
+    for _ in range(20):
+        # Delete some molecules, add new ones with larger unique indexes
+        # and sometimes one far larger index (sorting fallback)
+        keep = rng.random(len(unique_index)) > 0.2
+        n_new = rng.integers(0, 400)
+        new_index = np.arange(next_index, next_index + n_new)
+        next_index += n_new
+        if rng.random() < 0.2:
+            new_index = np.append(new_index, next_index + 10**7)
+            next_index += 10**7 + 1
+        unique_index = rng.permutation(np.append(unique_index[keep], new_index))
+        lookup = rng.permutation(unique_index)
+
+        partial_RNA_positions.update(unique_index)
+        np.testing.assert_array_equal(
+            partial_RNA_positions.positions(lookup),
+            get_mapping_arrays(unique_index, lookup)[0],
+        )
+
+
+def elongation_bookkeeping_runtime(n_repeats=20):
+    """
+    Prints the per-step cost of the paths compared in
+    :py:func:`test_elongation_bookkeeping` for increasing numbers of
+    transcripts.
+    """
+    from time import perf_counter
+
+    rng = np.random.default_rng(0)
+
+    def timed(f):
+        tick = perf_counter()
+        for _ in range(n_repeats):
+            result = f()
+        return result, (perf_counter() - tick) / n_repeats
+
+    for n_RNAPs in (1000, 5000, 20000):
+        for name, old, new in elongation_bookkeeping_paths(rng, n_RNAPs):
+            old_result, old_time = timed(old)
+            new_result, new_time = timed(new)
+            np.testing.assert_array_equal(old_result, new_result)
+            print(
+                f"[{n_RNAPs} RNAPs] {name}: {old_time * 1e3:.3f} ms before,"
+                f" {new_time * 1e3:.3f} ms after"
+            )
+
+
 def test_transcript_elongation():
     def make_elongation_rates(random, base, time_step, variable_elongation=False):
         size = 9  # number of TUs
@@ -979,3 +1196,4 @@ def assertions(config, actual_update):
 
 if __name__ == "__main__":
     test_transcript_elongation()
+    elongation_bookkeeping_runtime()
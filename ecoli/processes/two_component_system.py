@@ -43,6 +43,7 @@ class TwoComponentSystem(PartitionedProcess):
                 [],
             )
         ),
+        "make_integrator": None,
         "moleculeNames": [],
         "seed": 0,
     }
@@ -60,6 +61,11 @@ class TwoComponentSystem(PartitionedProcess):
 
         # Create method
         self.moleculesToNextTimeStep = self.parameters["moleculesToNextTimeStep"]
+        # Persistent BDF integrator that keeps its step size and Jacobian
+        # factorization between timesteps (created on first use since it
+        # cannot be pickled when processes are sent to parallel workers)
+        self.make_integrator = self.parameters["make_integrator"]
+        self.integrator = None
 
         # Build views
         self.moleculeNames = self.parameters["moleculeNames"]
@@ -84,6 +90,9 @@ class TwoComponentSystem(PartitionedProcess):
                 self.moleculeNames, states["bulk"]["id"]
             )
 
+            if self.make_integrator is not None:
+                self.integrator = self.make_integrator(jit=self.jit)
+
         # Get molecule counts
         moleculeCounts = counts(states["bulk"], self.molecule_idx)
 
@@ -106,6 +115,7 @@ class TwoComponentSystem(PartitionedProcess):
                 self.random_state,
                 method="BDF",
                 jit=self.jit,
+                integrator=self.integrator,
             )
         )
         requests = {"bulk": [(self.molecule_idx, self.molecules_required.astype(int))]}
@@ -115,6 +125,10 @@ class TwoComponentSystem(PartitionedProcess):
         moleculeCounts = counts(states["bulk"], self.molecule_idx)
         # Check if any molecules were allocated fewer counts than requested
         if (self.molecules_required > moleculeCounts).any():
+            # Roll the integrator back afterwards so that the next timestep
+            # continues from the requested (not the long) integration
+            if self.integrator is not None:
+                integrator_state = self.integrator.save()
             _, self.all_molecule_changes = self.moleculesToNextTimeStep(
                 moleculeCounts,
                 self.cellVolume,
@@ -124,7 +138,10 @@ class TwoComponentSystem(PartitionedProcess):
                 method="BDF",
                 min_time_step=states["timestep"],
                 jit=self.jit,
+                integrator=self.integrator,
             )
+            if self.integrator is not None:
+                self.integrator.restore(integrator_state)
         # Increment changes in molecule counts
         update = {"bulk": [(self.molecule_idx, self.all_molecule_changes.astype(int))]}
 
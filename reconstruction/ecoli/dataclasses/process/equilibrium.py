@@ -4,10 +4,8 @@ Equilibrium.
 
 import numpy as np
 from scipy import integrate
-import sympy as sp
 
 from wholecell.utils import build_ode, data, units
-from wholecell.utils.random import stochasticRound
 
 
 class EquilibriumError(Exception):
@@ -191,8 +189,7 @@ class Equilibrium(object):
                 "Rp",
                 "Pp",
                 "mets_to_rxn_fluxes",
-                "symbolic_rates",
-                "symbolic_rates_jacobian",
+                "reverse_rate_exponents",
                 "_rates",
                 "_rates_jacobian",
             ),
@@ -275,8 +272,11 @@ class Equilibrium(object):
         self._makeMatrices()
         self._make_rates()
 
-        self._rates = build_ode.rates(self.symbolic_rates)
-        self._rates_jacobian = build_ode.rates_jacobian(self.symbolic_rates_jacobian)
+        S = self.stoich_matrix()
+        self._rates = build_ode.mass_action_rates(S, self.reverse_rate_exponents)
+        self._rates_jacobian = build_ode.mass_action_rates_jacobian(
+            S, self.reverse_rate_exponents
+        )
 
     def _makeMatrices(self):
         """
@@ -309,62 +309,25 @@ class Equilibrium(object):
 
     def _make_rates(self):
         """
-        Creates symbolic representation of the rates for ordinary differential
-        equations and the Jacobian. Used during simulations.
+        Finds the exponent of the reverse rate constant of each reaction for
+        the mass-action rates of the ordinary differential equations. Used
+        during simulations.
         """
         S = self.stoich_matrix()
 
-        yStrings = ["y[%d]" % x for x in range(S.shape[0])]
-        ratesFwdStrings = ["kf[%d]" % x for x in range(S.shape[0])]
-        ratesRevStrings = ["kr[%d]" % x for x in range(S.shape[0])]
-        y = sp.symbols(yStrings)
-        ratesFwd = sp.symbols(ratesFwdStrings)
-        ratesRev = sp.symbols(ratesRevStrings)
-
-        rates = []
-
-        for colIdx in range(S.shape[1]):
-            negIdxs = np.where(S[:, colIdx] < 0)[0]
-            posIdxs = np.where(S[:, colIdx] > 0)[0]
-
-            fwd_stoich = 1.0
-            reactantFlux = ratesFwd[colIdx]
-            for negIdx in negIdxs:
-                stoich = -S[negIdx, colIdx]
-                if stoich == 1:
-                    reactantFlux *= y[negIdx]
-                else:
-                    if stoich > fwd_stoich:
-                        fwd_stoich = stoich
-                    reactantFlux *= y[negIdx] ** stoich
-
-            # Need to scale the rate by the number of dissociation reactions
-            # which is the highest stoichiometry in the forward direction
-            if fwd_stoich > 1:
-                productFlux = ratesRev[colIdx] ** fwd_stoich
-            else:
-                productFlux = ratesRev[colIdx]
-            for posIdx in posIdxs:
-                stoich = S[posIdx, colIdx]
-                if stoich == 1:
-                    productFlux *= y[posIdx]
-                else:
-                    # If this needs to be included, it may affect the rate
-                    # calculation with multiple products so double check before
-                    # implementing.  For now, the assumption is that there will
-                    # only be one product and this verifies that assumption.
-                    raise ValueError(
-                        "Expected a single product (stoichiometry"
-                        f" of 1) for equilibrium reaction {self.rxn_ids[colIdx]}"
-                    )
-
-            rates.append(reactantFlux - productFlux)
-
-        dy = sp.Matrix(rates)
-        J = dy.jacobian(y)
+        # Need to scale the rate by the number of dissociation reactions
+        # which is the highest stoichiometry in the forward direction
+        self.reverse_rate_exponents = np.fmax(np.max(-S, axis=0), 1)
 
-        self.symbolic_rates = dy
-        self.symbolic_rates_jacobian = J
+        # If products with a stoichiometry other than one need to be included,
+        # it may affect the rate calculation with multiple products so double
+        # check before implementing. For now, the assumption is that there
+        # will only be one product and this verifies that assumption.
+        for colIdx in np.where(np.any(S > 1, axis=0))[0]:
+            raise ValueError(
+                "Expected a single product (stoichiometry"
+                f" of 1) for equilibrium reaction {self.rxn_ids[colIdx]}"
+            )
 
     def derivatives(self, t, y):
         return self._stoichMatrix.dot(
@@ -386,18 +349,85 @@ class Equilibrium(object):
             self._rates_jacobian[1](t, y, self.rates_fwd, self.rates_rev)
         )
 
-    def fluxes_and_molecules_to_SS(
-        self,
-        moleculeCounts,
-        cellVolume,
-        nAvogadro,
-        random_state,
-        time_limit=1e20,
-        max_iter=100,
-        jit=True,
-    ):
-        y_init = moleculeCounts / (cellVolume * nAvogadro)
+    def steady_state_newton(self, y_init, scale=1.0, max_iter=100, tol=1e-6, jit=True):
+        """
+        Finds the steady state concentrations of the mass-action system with
+        damped Newton iterations on the reaction extents, which automatically
+        conserves the total amount of each subunit.
+
+        Every reaction has a single product, so the columns of the
+        stoichiometric matrix are linearly independent and the steady state
+        is where all net reaction rates are zero. Steps are limited so that
+        concentrations stay nonnegative and are halved until the residual
+        decreases. Since counts at the start of each time step are already
+        close to the previous steady state, this usually converges in a few
+        iterations.
+
+        Args:
+            y_init: initial concentrations of each molecule
+            scale: factor to convert concentrations to counts
+            max_iter: maximum number of Newton iterations
+            tol: convergence tolerance on the step size in counts
+            jit: whether to use the JIT versions of the rate functions
+
+        Returns:
+            Steady state concentrations, or None if Newton's method failed
+        """
+        S = self._stoichMatrix
+        rates, rates_jacobian = (
+            (self._rates[1], self._rates_jacobian[1])
+            if jit
+            else (self._rates[0], self._rates_jacobian[0])
+        )
+
+        y = y_init
+        residual = rates(0, y, self.rates_fwd, self.rates_rev)
+        for _ in range(max_iter):
+            jacobian = rates_jacobian(0, y, self.rates_fwd, self.rates_rev).dot(S)
+            try:
+                step = np.linalg.solve(jacobian, -residual)
+            except np.linalg.LinAlgError:
+                return None
+            dy = S.dot(step)
+            if not np.all(np.isfinite(dy)):
+                return None
+
+            # Stay strictly inside the nonnegative orthant
+            decreasing = dy < 0
+            alpha = min(1.0, 0.99 * np.min(-y[decreasing] / dy[decreasing], initial=2))
+            if alpha == 0:
+                return None
+
+            # Backtrack until the residual decreases
+            norm = np.linalg.norm(residual)
+            while alpha > 1e-10:
+                y_new = np.fmax(y + alpha * dy, 0)
+                residual_new = rates(0, y_new, self.rates_fwd, self.rates_rev)
+                if np.linalg.norm(residual_new) <= norm or norm == 0:
+                    break
+                alpha /= 2
+            else:
+                return None
+
+            y, residual = y_new, residual_new
+            if np.max(np.abs(alpha * dy)) * scale < tol:
+                return y
+
+        return None
+
+    def steady_state_integration(self, y_init, time_limit=1e20, jit=True):
+        """
+        Finds the steady state concentrations of the mass-action system by
+        integrating the ordinary differential equations to ``time_limit``.
+
+        Args:
+            y_init: initial concentrations of each molecule
+            time_limit: time to integrate to
+            jit: whether to use the JIT versions of the rate functions
 
+        Returns:
+            Concentrations at ``time_limit``
+        """
         # In this version of SciPy, solve_ivp does not support args so need to
         # select the derivatives functions to use. Could be simplified to single
         # functions that take a jit argument from solve_ivp in the future.
@@ -427,31 +457,52 @@ class Equilibrium(object):
                 "Could not solve ODEs in equilibrium to SS."
                 " Try adjusting time step or changing methods."
             )
+        return sol.y[:, -1]
+
+    def fluxes_and_molecules_to_SS(
+        self,
+        moleculeCounts,
+        cellVolume,
+        nAvogadro,
+        random_state,
+        time_limit=1e20,
+        max_iter=100,
+        jit=True,
+    ):
+        """
+        Finds the steady state of the equilibrium reactions from the current
+        counts and picks integer reaction fluxes to reach it.
 
-        y = sol.y.T
+        The steady state is found directly with Newton's method (see
+        :py:meth:`steady_state_newton`) and the ODEs are only integrated to
+        ``time_limit`` if Newton's method fails (see
+        :py:meth:`steady_state_integration`).
 
-        if np.any(y[-1, :] * (cellVolume * nAvogadro) <= -1):
+        Returns:
+            rxnFluxes: integer number of times each reaction occurs
+            moleculesNeeded: counts of molecules consumed by the reactions
+        """
+        scale = cellVolume * nAvogadro
+        y_init = moleculeCounts / scale
+
+        derivatives = self.derivatives_jit if jit else self.derivatives
+
+        y_ss = self.steady_state_newton(y_init, scale=scale, max_iter=max_iter, jit=jit)
+        if y_ss is None or np.linalg.norm(derivatives(0, y_ss), np.inf) * scale > 1:
+            y_ss = self.steady_state_integration(y_init, time_limit=time_limit, jit=jit)
+
+        if np.any(y_ss * scale <= -1):
             raise ValueError(
                 "Have negative values at equilibrium steady state -- probably due to numerical instability."
             )
-        if (
-            np.linalg.norm(derivatives(0, y[-1, :]), np.inf) * (cellVolume * nAvogadro)
-            > 1
-        ):
+        if np.linalg.norm(derivatives(0, y_ss), np.inf) * scale > 1:
             raise RuntimeError("Did not reach steady state for equilibrium.")
-        y[y < 0] = 0
-        yMolecules = y * (cellVolume * nAvogadro)
+        y_ss = np.fmax(y_ss, 0)
 
         # Pick rounded solution that does not cause negative counts
-        dYMolecules = yMolecules[-1, :] - yMolecules[0, :]
-        for i in range(max_iter):
-            rxnFluxes = stochasticRound(
-                random_state, np.dot(self.mets_to_rxn_fluxes, dYMolecules)
-            )
-            if np.all(moleculeCounts + self._stoichMatrix.dot(rxnFluxes) >= 0):
-                break
-        else:
-            raise ValueError("Negative counts in equilibrium steady state.")
+        dYMolecules = (y_ss - y_init) * scale
+        fluxes = np.dot(self.mets_to_rxn_fluxes, dYMolecules)
+        rxnFluxes = self.round_fluxes(moleculeCounts, fluxes, random_state, max_iter)
 
         rxnFluxesN = -1.0 * (rxnFluxes < 0) * rxnFluxes
         rxnFluxesP = 1.0 * (rxnFluxes > 0) * rxnFluxes
@@ -459,6 +510,44 @@ class Equilibrium(object):
 
         return rxnFluxes, moleculesNeeded
 
+    def round_fluxes(self, moleculeCounts, fluxes, random_state, max_iter=100):
+        """
+        Stochastically rounds reaction fluxes, retrying up to ``max_iter``
+        times until the rounded fluxes do not cause negative counts.
+
+        Gives the same fluxes and draws the same random numbers as calling
+        :py:func:`~wholecell.utils.random.stochasticRound` once per attempt,
+        but draws and checks the candidate roundings in vectorized chunks of
+        doubling size. Random numbers drawn for candidates after the first
+        feasible one are given back by rewinding ``random_state``.
+
+        Returns:
+            rxnFluxes: integer number of times each reaction occurs
+        """
+        floor = np.floor(fluxes)
+        remainder = fluxes % 1
+        n_tried = 0
+        n_candidates = 1
+        while n_tried < max_iter:
+            n_candidates = min(n_candidates, max_iter - n_tried)
+            rng_state = random_state.get_state()
+            candidates = floor + (
+                random_state.rand(n_candidates, fluxes.size) < remainder
+            )
+            feasible = np.all(
+                moleculeCounts + candidates.dot(self._stoichMatrix.T) >= 0, axis=1
+            )
+            if feasible.any():
+                first = np.argmax(feasible)
+                if first < n_candidates - 1:
+                    random_state.set_state(rng_state)
+                    random_state.rand((first + 1) * fluxes.size)
+                return candidates[first]
+            n_tried += n_candidates
+            n_candidates *= 2
+
+        raise ValueError("Negative counts in equilibrium steady state.")
+
     def get_monomers(self, cplxId):
         """
         Returns subunits for a complex (or any ID passed). If the ID passed is
@@ -13,11 +13,10 @@ import scipy
 import scipy.integrate
 import re
 
-import sympy as sp
-
 from wholecell.utils import build_ode
 from wholecell.utils import data
 from wholecell.utils import units
+from wholecell.utils.warm_start_bdf import WarmStartBDF
 
 
 # Alternative methods to try (in order of priority) when solving ODEs to the next time step
@@ -222,14 +221,9 @@ class TwoComponentSystem(object):
         return data.dissoc_strict(
             self.__dict__,
             (
-                "symbolic_rates",
-                "symbolic_rates_jacobian",
-                "derivatives_parca_symbolic",
-                "derivatives_parca_jacobian_symbolic",
                 "_rates",
                 "_rates_jacobian",
-                "derivatives_parca",
-                "derivatives_parca_jacobian",
+                "_parca_mask",
                 "dependency_matrix",
                 "_stoich_matrix",
             ),
@@ -329,90 +323,35 @@ class TwoComponentSystem(object):
         return out
 
     def _populate_derivative_and_jacobian(self):
-        """Compile callable functions for computing the derivative and the Jacobian."""
-        self._make_derivative()
-        self._make_derivative_parca()
-
-        self._rates = build_ode.derivatives(self.symbolic_rates)
-        self._rates_jacobian = build_ode.derivatives_jacobian(
-            self.symbolic_rates_jacobian
-        )
+        """Build callable functions for computing the derivative and the Jacobian."""
         self._stoich_matrix = (
             self.stoich_matrix()
         )  # Matrix is small and can be cached for derivatives
+        self._rates = build_ode.mass_action_rates(self._stoich_matrix)
+        self._rates_jacobian = build_ode.mass_action_rates_jacobian(self._stoich_matrix)
 
-        # WORKAROUND: Avoid Numba LoweringError JIT-compiling these functions:
-        self.derivatives_parca = build_ode.derivatives(self.derivatives_parca_symbolic)[
-            0
-        ]
-        self.derivatives_parca_jacobian = build_ode.derivatives_jacobian(
-            self.derivatives_parca_jacobian_symbolic
-        )[0]
-
-    def _make_y_dy(self):
-        S = self.stoich_matrix()
-
-        yStrings = ["y[%d]" % x for x in range(S.shape[0])]
-        y = sp.symbols(yStrings)
-
-        rates = []
-        for colIdx in range(S.shape[1]):
-            negIdxs = np.where(S[:, colIdx] < 0)[0]
-            posIdxs = np.where(S[:, colIdx] > 0)[0]
-
-            reactantFlux = self.rates_fwd[colIdx]
-            for negIdx in negIdxs:
-                stoich = -S[negIdx, colIdx]
-                if stoich == 1:
-                    reactantFlux *= y[negIdx]
-                else:
-                    reactantFlux *= y[negIdx] ** stoich
-
-            productFlux = self.rates_rev[colIdx]
-            for posIdx in posIdxs:
-                stoich = S[posIdx, colIdx]
-                if stoich == 1:
-                    productFlux *= y[posIdx]
-                else:
-                    productFlux *= y[posIdx] ** stoich
-
-            rates.append(reactantFlux - productFlux)
-
-        return y, rates
+        # Metabolism will keep these molecules at steady state in the parca
+        constantMolecules = ["ATP[c]", "ADP[c]", "Pi[c]", "WATER[c]", "PROTON[c]"]
+        self._parca_mask = ~np.isin(self.molecule_names, constantMolecules)
 
-    def _make_derivative(self):
+    def derivatives_parca(self, y, t):
         """
-        Creates symbolic representation of the ordinary differential equations
-        and the Jacobian. Used during simulations.
+        Calculate derivatives assuming ATP, ADP, Pi, water and protons are at
+        steady state with argument order for odeint. Used in the parca.
         """
-        y, rates = self._make_y_dy()
-
-        rates = sp.Matrix(rates)
-        J = rates.jacobian(y)
-
-        self.symbolic_rates = rates
-        self.symbolic_rates_jacobian = J
+        return self._parca_mask * self._stoich_matrix.dot(
+            self._rates[0](t, y, self.rates_fwd, self.rates_rev)
+        )
 
-    def _make_derivative_parca(self):
+    def derivatives_parca_jacobian(self, y, t):
         """
-        Creates symbolic representation of the ordinary differential equations
-        and the Jacobian assuming ATP, ADP, Pi, water and protons are at
-        steady state. Used in the parca.
+        Calculate the jacobian of derivatives assuming ATP, ADP, Pi, water and
+        protons are at steady state with argument order for odeint. Used in the
+        parca.
         """
-        y, rates = self._make_y_dy()
-        dy = self.stoich_matrix().dot(rates)
-
-        # Metabolism will keep these molecules at steady state
-        constantMolecules = ["ATP[c]", "ADP[c]", "Pi[c]", "WATER[c]", "PROTON[c]"]
-        for molecule in constantMolecules:
-            moleculeIdx = np.where(self.molecule_names == molecule)[0][0]
-            dy[moleculeIdx] = sp.S.Zero
-
-        dy = sp.Matrix(dy)
-        J = dy.jacobian(y)
-
-        self.derivatives_parca_jacobian_symbolic = J
-        self.derivatives_parca_symbolic = dy
+        return self._parca_mask[:, np.newaxis] * self._stoich_matrix.dot(
+            self._rates_jacobian[0](t, y, self.rates_fwd, self.rates_rev)
+        )
 
     def molecules_to_next_time_step(
         self,
@@ -425,6 +364,7 @@ class TwoComponentSystem(object):
         min_time_step=None,
         jit=True,
         methods_tried=None,
+        integrator=None,
     ):
         """
         Calculates the changes in the counts of molecules in the next timestep
@@ -444,6 +384,9 @@ class TwoComponentSystem(object):
                         functions
                 methods_tried (Optional[Set[str]]): methods for the solver that have
                         already been tried
+                integrator (Optional[WarmStartBDF]): persistent integrator from
+                        make_integrator() to use instead of solve_ivp when method
+                        is BDF (ignores jit)
 
         Returns:
                 moleculesNeeded (1d ndarray, ints): counts of molecules that need
@@ -463,16 +406,23 @@ class TwoComponentSystem(object):
             derivatives = self.derivatives
             derivatives_jacobian = self.derivatives_jacobian
 
-        sol = scipy.integrate.solve_ivp(
-            derivatives,
-            [0, timeStepSec],
-            y_init,
-            method=method,
-            t_eval=[0, timeStepSec],
-            atol=1e-8,
-            jac=derivatives_jacobian,
-        )
-        y = sol.y.T
+        y = None
+        if integrator is not None and method == "BDF":
+            try:
+                y = np.vstack([y_init, integrator.integrate(y_init, timeStepSec)])
+            except RuntimeError:
+                integrator.reset()
+        if y is None:
+            sol = scipy.integrate.solve_ivp(
+                derivatives,
+                [0, timeStepSec],
+                y_init,
+                method=method,
+                t_eval=[0, timeStepSec],
+                atol=1e-8,
+                jac=derivatives_jacobian,
+            )
+            y = sol.y.T
 
         # Handle negative counts by attempting to solve again with different options
         if np.any(y[-1, :] * (cellVolume * nAvogadro) <= -1e-3):
@@ -487,6 +437,7 @@ class TwoComponentSystem(object):
                     method=method,
                     min_time_step=min_time_step,
                     jit=jit,
+                    integrator=integrator,
                 )
 
             # Try with different method for better stability
@@ -509,6 +460,7 @@ class TwoComponentSystem(object):
                     min_time_step=min_time_step,
                     jit=jit,
                     methods_tried=methods_tried,
+                    integrator=integrator,
                 )
             else:
                 raise Exception(
@@ -590,6 +542,23 @@ class TwoComponentSystem(object):
 
         return moleculesNeeded, allMoleculesChanges
 
+    def make_integrator(self, jit=True):
+        """
+        Creates a persistent BDF integrator that keeps its step size and
+        Jacobian factorization between calls, to pass to
+        molecules_to_next_time_step() when solving the system every timestep.
+
+        Args:
+                jit (bool): if True, use the jit compiled version of derivatives
+                        functions
+
+        Returns:
+                WarmStartBDF: integrator of the system
+        """
+        if jit:
+            return WarmStartBDF(self.derivatives_jit, self.derivatives_jacobian_jit)
+        return WarmStartBDF(self.derivatives, self.derivatives_jacobian)
+
     def molecules_to_ss(self, moleculeCounts, cellVolume, nAvogadro, timeStepSec=1e20):
         """
         Calculates the changes in the counts of molecules as the system
@@ -747,25 +716,33 @@ class TwoComponentSystem(object):
         Calculate derivatives from stoichiometry and rates with argument order
         for solve_ivp.
         """
-        return self._stoich_matrix.dot(self._rates[0](y, t))
+        return self._stoich_matrix.dot(
+            self._rates[0](t, y, self.rates_fwd, self.rates_rev)
+        )
 
     def derivatives_jacobian(self, t, y):
         """
         Calculate the jacobian of derivatives from stoichiometry and rates
         with argument order for solve_ivp.
         """
-        return self._stoich_matrix.dot(self._rates_jacobian[0](y, t))
+        return self._stoich_matrix.dot(
+            self._rates_jacobian[0](t, y, self.rates_fwd, self.rates_rev)
+        )
 
     def derivatives_jit(self, t, y):
         """
         Calculate derivatives from stoichiometry and rates with argument order
         for solve_ivp.
         """
-        return self._stoich_matrix.dot(self._rates[1](y, t))
+        return self._stoich_matrix.dot(
+            self._rates[1](t, y, self.rates_fwd, self.rates_rev)
+        )
 
     def derivatives_jacobian_jit(self, t, y):
         """
         Calculate the jacobian of derivatives from stoichiometry and rates
         with argument order for solve_ivp.
         """
-        return self._stoich_matrix.dot(self._rates_jacobian[1](y, t))
+        return self._stoich_matrix.dot(
+            self._rates_jacobian[1](t, y, self.rates_fwd, self.rates_rev)
+        )
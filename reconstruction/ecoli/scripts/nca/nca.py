@@ -8,10 +8,10 @@ from typing import Callable, cast, Dict, List, Optional, Set, Tuple
 
 import numpy as np
 import scipy.linalg
-import scipy.optimize
 import swiglpk as glp
 
 from wholecell.utils import parallelization
+from wholecell.utils.fast_nonnegative_least_squares import fast_nnls_batch
 
 
 # Function names of the different NCA methods that have been implemented below
@@ -22,18 +22,19 @@ class NotValidMatrixError(Exception):
     pass
 
 
-def nonnegative_least_squares(A: np.ndarray, B: np.ndarray) -> np.ndarray:
+def nonnegative_least_squares(
+    A: np.ndarray, B: np.ndarray, cpus: int = 1
+) -> np.ndarray:
     """
     Solve nonnegative least squares with two matrices.
     min ||AX - B||
      st X >= 0
-    """
 
-    X = np.zeros((A.shape[1], B.shape[1]))
-    for i, b in enumerate(B.T):
-        X[:, i] = scipy.optimize.nnls(A, b)[0]
+    All columns of B are solved together with a batched active-set solver,
+    optionally split across cpus processes.
+    """
 
-    return X
+    return fast_nnls_batch(A, B, cpus=cpus)[0]
 
 
 def nca_criteria_check(
@@ -297,7 +298,6 @@ def robust_nca(
     if verbose:
         print("Solving with ROBNCA...")
     n_genes = E.shape[0]
-    n_tfs = A.shape[1]
     A_est = A.astype(float)
     outliers = np.zeros_like(E)
     zero_mask = A == 0
@@ -311,17 +311,21 @@ def robust_nca(
         X = E - outliers
         S = np.linalg.inv(A_est.T.dot(A_est)).dot(A_est.T).dot(X)
 
-        # Update A
+        # Update A, solving together all genes with the same zero constraints
         Qinv = np.linalg.inv(S.dot(S.T))
-        for col, a in enumerate(A_est):
-            zero_idx = np.where(a == 0)[0]
-            Cn = np.zeros((len(zero_idx), n_tfs))
-            Cn[range(len(zero_idx)), zero_idx] = 1
-            psi = Cn.dot(Qinv).dot(Cn.T)
-            w = S.dot(X.T[:, col])
-            A_est[col, :] = Qinv.dot(
-                w - Cn.T.dot(np.linalg.inv(psi)).dot(Cn).dot(Qinv).dot(w)
-            )
+        W = S.dot(X.T)
+        patterns, gene_pattern = np.unique(A_est == 0, axis=0, return_inverse=True)
+        gene_pattern = gene_pattern.ravel()
+        for pattern_idx, is_zero in enumerate(patterns):
+            genes = gene_pattern == pattern_idx
+            w = W[:, genes]
+            Qinv_w = Qinv.dot(w)
+            if np.any(is_zero):
+                psi = Qinv[np.ix_(is_zero, is_zero)]
+                correction = np.zeros_like(w)
+                correction[is_zero, :] = np.linalg.solve(psi, Qinv_w[is_zero, :])
+                Qinv_w -= Qinv.dot(correction)
+            A_est[genes, :] = Qinv_w.T
         A_est[zero_mask] = 0
 
         # Update outliers
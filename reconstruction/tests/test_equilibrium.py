@@ -0,0 +1,164 @@
+"""
+Test equilibrium.py
+"""
+
+import unittest
+
+import numpy as np
+
+from reconstruction.ecoli.dataclasses.process.equilibrium import Equilibrium
+from wholecell.utils.random import stochasticRound
+
+# Silence Sphinx autodoc warning
+unittest.TestCase.__module__ = "unittest"
+
+# Molecules: A, B, AB, C, ABC, D2, D
+# Reactions: A + B <-> AB, AB + C <-> ABC, 2 D <-> D2
+STOICH_I = np.array([0, 1, 2, 2, 3, 4, 6, 5])
+STOICH_J = np.array([0, 0, 0, 1, 1, 1, 2, 2])
+STOICH_V = np.array([-1.0, -1.0, 1.0, -1.0, -1.0, 1.0, -2.0, 1.0])
+
+# Concentrations are in counts so the integrator's default absolute
+# tolerance is small compared to the molecule counts
+SCALE = 1.0
+
+
+def make_equilibrium(rates_fwd, rates_rev):
+    """Builds a small Equilibrium instance without raw_data."""
+    equilibrium = Equilibrium.__new__(Equilibrium)
+    equilibrium.__setstate__(
+        {
+            "_stoichMatrixI": STOICH_I,
+            "_stoichMatrixJ": STOICH_J,
+            "_stoichMatrixV": STOICH_V,
+            "rates_fwd": np.array(rates_fwd, dtype=float),
+            "rates_rev": np.array(rates_rev, dtype=float),
+            "rxn_ids": ["AB_RXN", "ABC_RXN", "D2_RXN"],
+        }
+    )
+    return equilibrium
+
+
+class Test_Equilibrium(unittest.TestCase):
+    def setUp(self):
+        self.systems = [
+            # Dissociation constants near the concentrations
+            make_equilibrium([1e-2, 1e-2, 1e-2], [1.0, 1.0, 1.0]),
+            # Tight binding that consumes nearly all of a limiting subunit
+            make_equilibrium([10.0, 1.0, 1.0], [1e-3, 1e-2, 1e-1]),
+            # Weak binding that leaves most subunits free
+            make_equilibrium([1e-4, 1e-3, 1e-5], [1.0, 10.0, 1.0]),
+        ]
+        self.counts = [
+            np.array([500, 200, 0, 300, 0, 0, 1000]),
+            np.array([0, 0, 200, 100, 50, 400, 10]),
+            np.array([3, 2000, 20, 1, 0, 0, 1]),
+        ]
+
+    def test_steady_state_newton(self):
+        for equilibrium in self.systems:
+            for counts in self.counts:
+                for jit in (False, True):
+                    y_init = counts / SCALE
+                    y_newton = equilibrium.steady_state_newton(
+                        y_init, scale=SCALE, jit=jit
+                    )
+                    y_integrated = equilibrium.steady_state_integration(y_init, jit=jit)
+                    self.assertIsNotNone(y_newton)
+                    np.testing.assert_allclose(
+                        y_newton * SCALE, y_integrated * SCALE, rtol=2e-3, atol=0.1
+                    )
+
+                    # Newton's method is at least as close to steady state
+                    self.assertLessEqual(
+                        np.linalg.norm(equilibrium.derivatives(0, y_newton)),
+                        np.linalg.norm(equilibrium.derivatives(0, y_integrated)) + 1e-8,
+                    )
+
+                    # Subunits are conserved
+                    S = equilibrium._stoichMatrix
+                    extents = np.linalg.lstsq(S, y_newton - y_init, rcond=None)[0]
+                    np.testing.assert_allclose(
+                        S.dot(extents), y_newton - y_init, atol=1e-6 / SCALE
+                    )
+
+    def test_fluxes_and_molecules_to_SS(self):
+        equilibrium = self.systems[0]
+        counts = self.counts[0]
+        random_state = np.random.RandomState(0)
+        rxn_fluxes, molecules_needed = equilibrium.fluxes_and_molecules_to_SS(
+            counts, SCALE, 1.0, random_state
+        )
+
+        # Integer fluxes that reach the integrated steady state
+        y_ss = equilibrium.steady_state_integration(counts / SCALE) * SCALE
+        new_counts = counts + equilibrium._stoichMatrix.dot(rxn_fluxes)
+        np.testing.assert_array_equal(rxn_fluxes, np.round(rxn_fluxes))
+        np.testing.assert_allclose(new_counts, y_ss, atol=2)
+        self.assertTrue(np.all(new_counts >= 0))
+        np.testing.assert_array_equal(
+            molecules_needed,
+            equilibrium.Rp.dot(np.fmax(rxn_fluxes, 0))
+            + equilibrium.Pp.dot(np.fmax(-rxn_fluxes, 0)),
+        )
+
+        # Rounding only draws one random number per reaction when the first
+        # rounded solution is feasible
+        expected_state = np.random.RandomState(0)
+        expected_state.rand(len(rxn_fluxes))
+        self.assertEqual(random_state.rand(), expected_state.rand())
+
+    def test_fluxes_and_molecules_to_SS_jit(self):
+        """The compiled and NumPy derivatives give the same fluxes."""
+        for equilibrium in self.systems:
+            for counts in self.counts:
+                results = [
+                    equilibrium.fluxes_and_molecules_to_SS(
+                        counts, SCALE, 1.0, np.random.RandomState(0), jit=jit
+                    )
+                    for jit in (False, True)
+                ]
+                for no_jit, jit in zip(*results):
+                    np.testing.assert_array_equal(no_jit, jit)
+
+    def test_round_fluxes(self):
+        """Vectorized rounding gives the same fluxes and leaves the random
+        state in the same position as rounding one candidate at a time."""
+        equilibrium = self.systems[0]
+        S = equilibrium._stoichMatrix
+        random_state = np.random.RandomState(0)
+        n_infeasible = 0
+        for seed in range(200):
+            # Few molecules so that many roundings cause negative counts
+            counts = random_state.randint(0, 3, S.shape[0])
+            fluxes = random_state.uniform(-1, 1.5, S.shape[1])
+            max_iter = random_state.randint(1, 20)
+
+            loop_state = np.random.RandomState(seed)
+            for _ in range(max_iter):
+                expected = stochasticRound(loop_state, fluxes)
+                if np.all(counts + S.dot(expected) >= 0):
+                    break
+            else:
+                expected = None
+
+            vectorized_state = np.random.RandomState(seed)
+            if expected is None:
+                n_infeasible += 1
+                with self.assertRaises(ValueError):
+                    equilibrium.round_fluxes(counts, fluxes, vectorized_state, max_iter)
+            else:
+                np.testing.assert_array_equal(
+                    equilibrium.round_fluxes(
+                        counts, fluxes, vectorized_state, max_iter
+                    ),
+                    expected,
+                )
+                self.assertEqual(vectorized_state.rand(), loop_state.rand())
+        # Both outcomes are covered
+        self.assertGreater(n_infeasible, 0)
+        self.assertLess(n_infeasible, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -33,6 +33,7 @@ from fsspec import url_to_fs  # noqa: E402
 from configs import CONFIG_DIR_PATH  # noqa: E402
 from ecoli.experiments.ecoli_master_sim import SimConfig  # noqa: E402
 from ecoli.library.parquet_emitter import (  # noqa: E402
+    add_virtual_columns_by_variant,
     dataset_sql,
     create_duckdb_conn,
     open_output_file,
@@ -295,6 +296,10 @@ def main():
     # Establish DuckDB connection
     conn = create_duckdb_conn(out_uri, gcs_bucket, config.get("cpus"))
     history_sql, config_sql, success_sql = dataset_sql(out_uri, config["experiment_id"])
+    # Compute columns that were skipped by virtual listeners on the fly
+    history_sql = add_virtual_columns_by_variant(
+        conn, history_sql, config_sql, sim_data_dict
+    )
     # If no explicit analysis type given, run all types in config JSON
     if "analysis_types" not in config:
         config["analysis_types"] = [
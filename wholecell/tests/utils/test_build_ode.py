@@ -0,0 +1,85 @@
+"""
+Test the vectorized mass-action ODE functions against the code generated
+from sympy expressions.
+
+        pytest wholecell/tests/utils/test_build_ode.py
+"""
+
+import unittest
+
+import numpy as np
+import numpy.testing as npt
+import sympy as sp
+
+from wholecell.utils import build_ode
+
+# Silence Sphinx autodoc warning
+unittest.TestCase.__module__ = "unittest"
+
+
+def random_network(random_state, n_molecules=12, n_reactions=8):
+    """Random network of reactions with up to three reactants (some with
+    stoichiometry 2) and one or two products."""
+    stoich = np.zeros((n_molecules, n_reactions))
+    for reaction in range(n_reactions):
+        molecules = random_state.choice(
+            n_molecules, random_state.randint(2, 6), replace=False
+        )
+        n_reactants = random_state.randint(1, min(4, len(molecules)))
+        stoich[molecules[:n_reactants], reaction] = -random_state.randint(
+            1, 3, n_reactants
+        )
+        stoich[molecules[n_reactants:], reaction] = 1
+    return stoich
+
+
+def symbolic_rates(stoich, reverse_rate_exponents):
+    """Mass-action rates and their Jacobian built with sympy."""
+    y = sp.symbols([f"y[{i}]" for i in range(stoich.shape[0])])
+    kf = sp.symbols([f"kf[{i}]" for i in range(stoich.shape[1])])
+    kr = sp.symbols([f"kr[{i}]" for i in range(stoich.shape[1])])
+    rates = []
+    for reaction in range(stoich.shape[1]):
+        forward = kf[reaction]
+        reverse = kr[reaction] ** int(reverse_rate_exponents[reaction])
+        for molecule, coeff in enumerate(stoich[:, reaction]):
+            if coeff < 0:
+                forward *= y[molecule] ** int(-coeff)
+            elif coeff > 0:
+                reverse *= y[molecule] ** int(coeff)
+        rates.append(forward - reverse)
+    rates = sp.Matrix(rates)
+    return rates, rates.jacobian(y)
+
+
+class Test_build_ode(unittest.TestCase):
+    def setUp(self):
+        self.random_state = np.random.RandomState(0)
+
+    def test_mass_action_matches_sympy(self):
+        for _ in range(5):
+            stoich = random_network(self.random_state)
+            exponents = self.random_state.randint(1, 3, stoich.shape[1])
+            rates, jacobian = symbolic_rates(stoich, exponents)
+            expected_rates = build_ode.rates(rates)[0]
+            expected_jacobian = build_ode.rates_jacobian(jacobian)[0]
+
+            network_rates = build_ode.mass_action_rates(stoich, exponents)
+            network_jacobian = build_ode.mass_action_rates_jacobian(stoich, exponents)
+
+            y = self.random_state.rand(stoich.shape[0])
+            y[self.random_state.rand(len(y)) < 0.2] = 0
+            kf = self.random_state.rand(stoich.shape[1])
+            kr = self.random_state.rand(stoich.shape[1])
+            for f in network_rates:
+                npt.assert_allclose(
+                    f(0, y, kf, kr), expected_rates(0, y, kf, kr), rtol=1e-12
+                )
+            for f in network_jacobian:
+                npt.assert_allclose(
+                    f(0, y, kf, kr), expected_jacobian(0, y, kf, kr), rtol=1e-12
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,7 +5,11 @@ Test the fast nonnegative least squares (NNLS) utils function
         pytest wholecell/tests/utils/test_fast_nnls.py
 """
 
-from wholecell.utils.fast_nonnegative_least_squares import fast_nnls
+from wholecell.utils.fast_nonnegative_least_squares import (
+    fast_nnls,
+    fast_nnls_batch,
+    nnls_batch,
+)
 
 import numpy as np
 import numpy.testing as npt
@@ -167,3 +171,91 @@ class Test_fast_nnls(unittest.TestCase):
         time_fast = time_this(lambda: fast_nnls(A, b))
 
         self.assertLess(time_slow, time_fast)
+
+    def test_batch_equivalence_to_nnls(self):
+        """
+        Test nnls_batch and fast_nnls_batch return the same norm of the
+        residual as scipy nnls for each column of a random matrix B.
+        """
+        A = np.random.rand(self.default_array_size, self.default_array_size)
+        A[np.random.rand(*A.shape) < 0.5] = 0
+        A -= 0.25
+        B = np.random.rand(self.default_array_size, 5) - 0.5
+
+        X = nnls_batch(A, B)
+        X_fast, R_fast = fast_nnls_batch(sparse.csr_matrix(A), B)
+        assert np.all(X >= 0)
+        npt.assert_array_almost_equal(R_fast, A.dot(X_fast) - B)
+
+        for i, b in enumerate(B.T):
+            x_slow, _ = nnls(A, b)
+            rnorm_slow = np.linalg.norm(A.dot(x_slow) - b)
+            self.assertAlmostEqual(rnorm_slow, np.linalg.norm(A.dot(X[:, i]) - b))
+            self.assertAlmostEqual(rnorm_slow, np.linalg.norm(R_fast[:, i]))
+
+    def test_batch_rank_deficient(self):
+        """
+        Test nnls_batch and fast_nnls_batch against scipy nnls for sparse,
+        rank-deficient and underdetermined matrices A, including ones with
+        duplicated columns.
+        """
+        rng = np.random.default_rng(1)
+        for t in range(300):
+            m = rng.integers(2, 40)
+            n = rng.integers(2, 40)
+            A = rng.random((m, n))
+            A[rng.random((m, n)) < 0.6] = 0
+            if t % 3 == 0:
+                A[:, n // 2 : 2 * (n // 2)] = A[:, : n // 2]
+            B = rng.random((m, 3)) - 0.3
+
+            X = nnls_batch(A, B)
+            _, R_fast = fast_nnls_batch(sparse.csr_matrix(A), B)
+            assert np.all(X >= 0)
+            for i, b in enumerate(B.T):
+                x_slow, _ = nnls(A, b)
+                rnorm_slow = np.linalg.norm(A.dot(x_slow) - b)
+                self.assertAlmostEqual(rnorm_slow, np.linalg.norm(A.dot(X[:, i]) - b))
+                self.assertAlmostEqual(rnorm_slow, np.linalg.norm(R_fast[:, i]))
+
+    def test_batch_fallback(self):
+        """
+        Test that columns that do not converge within max_iter are solved with
+        scipy nnls.
+        """
+        A = np.random.rand(9, 18)
+        A[np.random.rand(*A.shape) < 0.6] = 0
+        A[:, 9:] = A[:, :9]
+        B = np.random.rand(9, 4) - 0.3
+
+        for max_iter in (0, 1, 2):
+            X = nnls_batch(A, B, max_iter=max_iter)
+            for i, b in enumerate(B.T):
+                x_slow, rnorm_slow = nnls(A, b)
+                self.assertAlmostEqual(rnorm_slow, np.linalg.norm(A.dot(X[:, i]) - b))
+
+    def test_single_entry_subproblems(self):
+        """
+        Test that subproblems with a single nonzero entry a of A are solved
+        with max(0, b/a), as by scipy nnls.
+        """
+        A = np.diag([2.0, 0.5, -4.0])
+        b = np.array([3.0, -1.0, -2.0])
+
+        x, r = fast_nnls(A, b)
+        X, _ = fast_nnls_batch(A, b[:, np.newaxis])
+        npt.assert_array_equal(x, [1.5, 0, 0.5])
+        npt.assert_array_equal(X[:, 0], x)
+        npt.assert_array_almost_equal(x, nnls(A, b)[0])
+
+    def test_batch_type_error(self):
+        """
+        Test that fast_nnls_batch requires a two-dimensional B.
+        """
+        A = np.random.rand(5, 3)
+        b = np.random.rand(5)
+
+        with self.assertRaisesRegex(TypeError, r"two-dimensional ndarray"):
+            fast_nnls_batch(A, b)
+        with self.assertRaisesRegex(TypeError, r"Dimensions of"):
+            fast_nnls_batch(A, np.random.rand(3, 2))
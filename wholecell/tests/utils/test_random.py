@@ -0,0 +1,60 @@
+"""
+Test random.py
+
+        pytest wholecell/tests/utils/test_random.py
+"""
+
+import unittest
+
+import numpy as np
+import numpy.testing as npt
+
+from wholecell.utils.random import choose_within_groups
+
+# Silence Sphinx autodoc warning
+unittest.TestCase.__module__ = "unittest"
+
+
+class Test_random(unittest.TestCase):
+    def test_choose_within_groups(self):
+        """
+        Test that the requested number of elements is chosen from each group.
+        """
+        random_state = np.random.RandomState(0)
+        group_indexes = np.array([2, 0, 2, 1, 2, 0, 3, 2])
+        n_to_choose = np.array([2, 0, 3, 1])
+
+        for _ in range(20):
+            chosen = choose_within_groups(random_state, group_indexes, n_to_choose)
+            npt.assert_array_equal(chosen, np.unique(chosen))
+            npt.assert_array_equal(
+                np.bincount(group_indexes[chosen], minlength=4), n_to_choose
+            )
+
+        chosen = choose_within_groups(random_state, group_indexes, np.zeros(4, int))
+        self.assertEqual(chosen.size, 0)
+
+        with self.assertRaises(ValueError):
+            choose_within_groups(random_state, group_indexes, np.array([3, 0, 0, 0]))
+
+    def test_choose_within_groups_is_uniform(self):
+        """
+        Test that every element of a group is equally likely to be chosen.
+        """
+        random_state = np.random.RandomState(0)
+        group_indexes = np.array([0, 1, 0, 1, 0, 1, 0])
+        n_to_choose = np.array([1, 2])
+        n_samples = 20000
+
+        times_chosen = np.zeros(group_indexes.size)
+        for _ in range(n_samples):
+            times_chosen[
+                choose_within_groups(random_state, group_indexes, n_to_choose)
+            ] += 1
+
+        expected = np.where(group_indexes == 0, 1 / 4, 2 / 3) * n_samples
+        npt.assert_allclose(times_chosen, expected, rtol=0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
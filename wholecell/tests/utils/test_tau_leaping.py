@@ -0,0 +1,95 @@
+"""
+Test the hybrid tau-leaping stochastic simulation
+
+        pytest wholecell/tests/utils/test_tau_leaping.py
+"""
+
+import unittest
+
+import numpy as np
+import numpy.testing as npt
+from stochastic_arrow import StochasticSystem
+
+from wholecell.utils.tau_leaping import TauLeapingSystem
+
+# Silence Sphinx autodoc warning
+unittest.TestCase.__module__ = "unittest"
+
+
+# A + B -> AB, AB + C -> ABC, 2 D -> D2, E <-> F
+STOICHIOMETRY = np.array(
+    [
+        [-1, -1, 1, 0, 0, 0, 0, 0, 0],
+        [0, 0, -1, -1, 1, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, -2, 1, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, -1, 1],
+        [0, 0, 0, 0, 0, 0, 0, 1, -1],
+    ]
+)
+RATES = np.array([2e-5, 2e-5, 2e-6, 1.0, 0.5])
+INITIAL_STATE = np.array([250000, 200000, 0, 150000, 0, 300000, 0, 500000, 0])
+
+
+class Test_tau_leaping(unittest.TestCase):
+    def test_propensities(self):
+        """
+        Test that propensities match stochastic_arrow's mass action law.
+        """
+        system = TauLeapingSystem(STOICHIOMETRY)
+        state = np.array([3, 4, 5, 6, 0, 7, 0, 8, 9])
+        npt.assert_allclose(
+            system.propensities(state, RATES),
+            RATES * np.array([3 * 4, 5 * 6, 7 * 6 / 2, 8, 9]),
+        )
+
+    def test_conservation_and_nonnegativity(self):
+        """
+        Test that outcomes follow from the occurrences and stay nonnegative
+        when reactants are nearly exhausted.
+        """
+        system = TauLeapingSystem(STOICHIOMETRY, random_seed=0)
+        state = np.array([30, 25000, 0, 20, 0, 5, 0, 500000, 0])
+        result = system.evolve(10.0, state, RATES)
+        npt.assert_array_equal(
+            result["outcome"], state + result["occurrences"].dot(STOICHIOMETRY)
+        )
+        self.assertTrue(np.all(result["outcome"] >= 0))
+        self.assertEqual(result["steps"], result["occurrences"].sum())
+
+    def test_no_reactions(self):
+        """
+        Test that nothing happens when no reaction can fire.
+        """
+        system = TauLeapingSystem(STOICHIOMETRY)
+        state = np.array([0, 10, 0, 10, 0, 1, 0, 0, 0])
+        result = system.evolve(1.0, state, RATES)
+        npt.assert_array_equal(result["outcome"], state)
+        self.assertEqual(result["steps"], 0)
+
+    def test_agreement_with_exact(self):
+        """
+        Test that mean outcomes agree with exact stochastic simulation for
+        high-count species.
+        """
+        n_samples = 5
+        exact = StochasticSystem(STOICHIOMETRY, random_seed=0)
+        leaping = TauLeapingSystem(STOICHIOMETRY, random_seed=0)
+        exact_outcomes = np.mean(
+            [
+                exact.evolve(1.0, INITIAL_STATE, RATES)["outcome"]
+                for _ in range(n_samples)
+            ],
+            axis=0,
+        )
+        leaping_outcomes = np.mean(
+            [
+                leaping.evolve(1.0, INITIAL_STATE, RATES)["outcome"]
+                for _ in range(n_samples)
+            ],
+            axis=0,
+        )
+        npt.assert_allclose(leaping_outcomes, exact_outcomes, rtol=0.02)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""
+Test the persistent BDF integrator
+
+        pytest wholecell/tests/utils/test_warm_start_bdf.py
+"""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+import numpy.testing as npt
+import scipy.integrate
+
+from wholecell.utils.warm_start_bdf import WarmStartBDF, supports_warm_start
+
+# Silence Sphinx autodoc warning
+unittest.TestCase.__module__ = "unittest"
+
+
+# Robertson's stiff chemical kinetics problem
+def derivatives(t, y):
+    return np.array(
+        [
+            -0.04 * y[0] + 1e4 * y[1] * y[2],
+            0.04 * y[0] - 1e4 * y[1] * y[2] - 3e7 * y[1] ** 2,
+            3e7 * y[1] ** 2,
+        ]
+    )
+
+
+def derivatives_jacobian(t, y):
+    return np.array(
+        [
+            [-0.04, 1e4 * y[2], 1e4 * y[1]],
+            [0.04, -1e4 * y[2] - 6e7 * y[1], -1e4 * y[1]],
+            [0, 6e7 * y[1], 0],
+        ]
+    )
+
+
+Y0 = np.array([1.0, 0, 0])
+
+
+def solve_ivp(y0, duration):
+    return scipy.integrate.solve_ivp(
+        derivatives,
+        [0, duration],
+        y0,
+        method="BDF",
+        rtol=1e-6,
+        atol=1e-10,
+        jac=derivatives_jacobian,
+    ).y[:, -1]
+
+
+class Test_warm_start_bdf(unittest.TestCase):
+    def setUp(self):
+        self.integrator = WarmStartBDF(
+            derivatives, derivatives_jacobian, rtol=1e-6, atol=1e-10
+        )
+
+    def test_repeated_timesteps(self):
+        """
+        Test that consecutive perturbed timesteps agree with solve_ivp.
+        """
+        random_state = np.random.RandomState(0)
+        y = Y0
+        for _ in range(20):
+            expected = solve_ivp(y, 1.0)
+            y_end = self.integrator.integrate(y, 1.0)
+            npt.assert_allclose(y_end, expected, rtol=1e-4, atol=1e-9)
+            y = y_end * (1 + 1e-3 * random_state.rand(3))
+
+    def test_continuation_is_cheaper(self):
+        """
+        Test that continuing close to a previous solution takes fewer
+        function evaluations than starting fresh.
+        """
+        y = self.integrator.integrate(Y0, 10.0)
+        fresh_nfev = self.integrator._restart_cost
+        self.integrator.integrate(y, 1.0)
+        self.assertLess(self.integrator._continue_cost, fresh_nfev)
+
+    def test_save_restore(self):
+        """
+        Test that restoring a snapshot discards the integrations in between.
+        """
+        y = self.integrator.integrate(Y0, 1.0)
+        state = self.integrator.save()
+        expected = self.integrator.integrate(y, 1.0)
+
+        self.integrator.restore(state)
+        self.integrator.integrate(y / 2, 1e4)
+        self.integrator.restore(state)
+        npt.assert_array_equal(self.integrator.integrate(y, 1.0), expected)
+
+    def test_cold_start_fallback(self):
+        """
+        Test that every integration starts fresh if the SciPy solver does not
+        have the private attributes needed to continue it.
+        """
+        self.integrator.integrate(Y0, 1.0)
+        self.assertTrue(supports_warm_start(self.integrator._solver))
+
+        # A SciPy version whose solver does not have one of the attributes
+        integrator = WarmStartBDF(
+            derivatives, derivatives_jacobian, rtol=1e-6, atol=1e-10
+        )
+        with mock.patch(
+            "wholecell.utils.warm_start_bdf.BDF_STATE_ATTRIBUTES",
+            ("D", "h_abs", "order", "renamed_attribute"),
+        ):
+            with self.assertWarns(UserWarning):
+                y = integrator.integrate(Y0, 1.0)
+            state = integrator.save()
+            for _ in range(3):
+                solver = integrator._solver
+                expected = solve_ivp(y, 1.0)
+                y = integrator.integrate(y, 1.0)
+                self.assertIsNot(integrator._solver, solver)
+                npt.assert_allclose(y, expected, rtol=1e-4, atol=1e-9)
+            integrator.restore(state)
+            self.assertIsNone(integrator._solver)
+
+
+if __name__ == "__main__":
+    unittest.main()
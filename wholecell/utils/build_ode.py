@@ -1,7 +1,10 @@
 """
-Utilities to compile functions, esp. from Sympy-constructed Matrix math.
+Utilities to compile functions, esp. from Sympy-constructed Matrix math, and
+to build vectorized mass-action rate functions directly from a stoichiometric
+matrix.
 """
 
+from numba import njit
 import numpy as np
 from sympy import Matrix
 from typing import Any, Callable
@@ -65,3 +68,199 @@ def rates(matrix: Matrix) -> tuple[Callable, Callable]:
 def rates_jacobian(jacobian_matrix: Matrix) -> tuple[Callable, Callable]:
     """Build an optimized rates Jacobian function(t, y, kf, kr)."""
     return build_functions("t, y, kf, kr", _matrix_to_array(jacobian_matrix))
+
+
+def _padded_terms(orders: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Convert a (reactions, molecules) matrix of reaction orders into
+    (reactions, max terms) arrays of molecule indexes and orders. Padding
+    entries point to an extra molecule (index = number of molecules) with
+    order 0."""
+    n_reactions, n_molecules = orders.shape
+    max_terms = max(1, int((orders > 0).sum(axis=1).max(initial=0)))
+    indexes = np.full((n_reactions, max_terms), n_molecules, dtype=np.int64)
+    padded_orders = np.zeros((n_reactions, max_terms))
+    for reaction, row in enumerate(orders):
+        molecules = np.where(row > 0)[0]
+        indexes[reaction, : len(molecules)] = molecules
+        padded_orders[reaction, : len(molecules)] = row[molecules]
+    return indexes, padded_orders
+
+
+class MassActionNetwork:
+    """Reactant and product terms of a network of reversible mass-action
+    reactions, with net rates
+
+            r_j = kf_j * prod_i y_i^a_ij - kr_j^e_j * prod_i y_i^b_ij
+
+    where a and b are the reactant and product stoichiometries and e are
+    optional exponents on the reverse rate constants.
+
+    Args:
+            stoich: stoichiometric matrix (molecules x reactions)
+            reverse_rate_exponents: exponent of each reverse rate constant
+                    (default 1)
+    """
+
+    def __init__(
+        self, stoich: np.ndarray, reverse_rate_exponents: np.ndarray | None = None
+    ):
+        stoich = np.asarray(stoich, dtype=np.float64)
+        self.n_molecules, n_reactions = stoich.shape
+        self.reactant_indexes, self.reactant_orders = _padded_terms(
+            np.fmax(-stoich.T, 0)
+        )
+        self.product_indexes, self.product_orders = _padded_terms(np.fmax(stoich.T, 0))
+        if reverse_rate_exponents is None:
+            reverse_rate_exponents = np.ones(n_reactions)
+        self.reverse_rate_exponents = np.asarray(
+            reverse_rate_exponents, dtype=np.float64
+        )
+        self.reaction_indexes = np.arange(n_reactions)[:, np.newaxis]
+
+    def rates(self, t, y, kf, kr):
+        """Net rate of each reaction."""
+        y = np.append(y, 1.0)
+        forward = kf * np.prod(y[self.reactant_indexes] ** self.reactant_orders, axis=1)
+        reverse = kr**self.reverse_rate_exponents * np.prod(
+            y[self.product_indexes] ** self.product_orders, axis=1
+        )
+        return forward - reverse
+
+    def rates_jacobian(self, t, y, kf, kr):
+        """Jacobian of the net reaction rates (reactions x molecules)."""
+        y = np.append(y, 1.0)
+        jacobian = np.zeros((len(kf), self.n_molecules + 1))
+        for indexes, orders, k, sign in (
+            (self.reactant_indexes, self.reactant_orders, kf, 1),
+            (
+                self.product_indexes,
+                self.product_orders,
+                kr**self.reverse_rate_exponents,
+                -1,
+            ),
+        ):
+            y_terms = y[indexes]
+            factors = y_terms**orders
+            # Product of all other factors of each term without dividing
+            # (concentrations can be zero)
+            ones = np.ones((len(k), 1))
+            before = np.cumprod(np.hstack([ones, factors[:, :-1]]), axis=1)
+            after = np.cumprod(np.hstack([ones, factors[:, :0:-1]]), axis=1)[:, ::-1]
+            partials = orders * y_terms ** np.fmax(orders - 1, 0) * before * after
+            jacobian[self.reaction_indexes, indexes] += (
+                sign * k[:, np.newaxis] * partials
+            )
+        return jacobian[:, :-1]
+
+    def rates_jit(self, t, y, kf, kr):
+        """Net rate of each reaction using a compiled kernel."""
+        return _mass_action_rates_kernel(
+            np.asarray(y, dtype=np.float64),
+            np.asarray(kf, dtype=np.float64),
+            np.asarray(kr, dtype=np.float64) ** self.reverse_rate_exponents,
+            self.reactant_indexes,
+            self.reactant_orders,
+            self.product_indexes,
+            self.product_orders,
+        )
+
+    def rates_jacobian_jit(self, t, y, kf, kr):
+        """Jacobian of the net reaction rates using a compiled kernel."""
+        return _mass_action_jacobian_kernel(
+            np.asarray(y, dtype=np.float64),
+            np.asarray(kf, dtype=np.float64),
+            np.asarray(kr, dtype=np.float64) ** self.reverse_rate_exponents,
+            self.reactant_indexes,
+            self.reactant_orders,
+            self.product_indexes,
+            self.product_orders,
+        )
+
+
+# Kernels only depend on array types (not on the reaction network), so Numba
+# compiles them once and caches the result on disk for all networks
+@njit(cache=True)
+def _term_product(y, indexes, orders, reaction, skip):
+    product = 1.0
+    for term in range(indexes.shape[1]):
+        if term != skip and orders[reaction, term] > 0:
+            product *= y[indexes[reaction, term]] ** orders[reaction, term]
+    return product
+
+
+@njit(cache=True)
+def _mass_action_rates_kernel(
+    y, kf, kr, reactant_indexes, reactant_orders, product_indexes, product_orders
+):
+    rates = np.empty(len(kf))
+    for reaction in range(len(kf)):
+        rates[reaction] = kf[reaction] * _term_product(
+            y, reactant_indexes, reactant_orders, reaction, -1
+        ) - kr[reaction] * _term_product(
+            y, product_indexes, product_orders, reaction, -1
+        )
+    return rates
+
+
+@njit(cache=True)
+def _mass_action_jacobian_kernel(
+    y, kf, kr, reactant_indexes, reactant_orders, product_indexes, product_orders
+):
+    jacobian = np.zeros((len(kf), len(y)))
+    for reaction in range(len(kf)):
+        for term in range(reactant_indexes.shape[1]):
+            order = reactant_orders[reaction, term]
+            if order > 0:
+                molecule = reactant_indexes[reaction, term]
+                jacobian[reaction, molecule] += (
+                    kf[reaction]
+                    * order
+                    * y[molecule] ** (order - 1)
+                    * _term_product(
+                        y, reactant_indexes, reactant_orders, reaction, term
+                    )
+                )
+        for term in range(product_indexes.shape[1]):
+            order = product_orders[reaction, term]
+            if order > 0:
+                molecule = product_indexes[reaction, term]
+                jacobian[reaction, molecule] -= (
+                    kr[reaction]
+                    * order
+                    * y[molecule] ** (order - 1)
+                    * _term_product(y, product_indexes, product_orders, reaction, term)
+                )
+    return jacobian
+
+
+def mass_action_rates(
+    stoich: np.ndarray, reverse_rate_exponents: np.ndarray | None = None
+) -> tuple[Callable, Callable]:
+    """Build vectorized rates functions(t, y, kf, kr) of a network of
+    reversible mass-action reactions directly from its stoichiometric matrix
+    (see :py:class:`MassActionNetwork`). Unlike :py:func:`rates`, this does
+    not generate any code so construction cost is linear in the number of
+    reactions.
+
+    Returns:
+            a NumPy function(t, y, kf, kr),
+            the same function using a Numba kernel compiled once and cached
+            on disk
+    """
+    network = MassActionNetwork(stoich, reverse_rate_exponents)
+    return network.rates, network.rates_jit
+
+
+def mass_action_rates_jacobian(
+    stoich: np.ndarray, reverse_rate_exponents: np.ndarray | None = None
+) -> tuple[Callable, Callable]:
+    """Build vectorized rates Jacobian functions(t, y, kf, kr) of a network
+    of reversible mass-action reactions (see :py:func:`mass_action_rates`).
+
+    Returns:
+            a NumPy function(t, y, kf, kr),
+            the same function using a Numba kernel compiled once and cached
+            on disk
+    """
+    network = MassActionNetwork(stoich, reverse_rate_exponents)
+    return network.rates_jacobian, network.rates_jacobian_jit
@@ -3,7 +3,109 @@ Faster implementation of nonnegative least squares.
 """
 
 import numpy as np
+from scipy import sparse
 from scipy.optimize import nnls
+from scipy.sparse.csgraph import connected_components
+
+from wholecell.utils import parallelization
+
+
+def _check_inputs(A, b, b_ndim):
+    """
+    Raises TypeError if A is not two-dimensional or b does not have the
+    expected number of dimensions and rows.
+    """
+    if A.ndim != 2:
+        raise TypeError(
+            "Input array A must be a two-dimensional numpy ndarray or sparse csr_matrix"
+        )
+    elif not isinstance(b, np.ndarray) or b.ndim != b_ndim:
+        raise TypeError(
+            "Input array b must be a {}-dimensional ndarray.".format(
+                "one" if b_ndim == 1 else "two"
+            )
+        )
+    elif A.shape[0] != b.shape[0]:
+        raise TypeError("Dimensions of input arrays A and b do not match.")
+
+
+def nnls_subproblems(A):
+    """
+    Divides matrix A into independent nonnegative least squares problems. Rows
+    and columns of A are grouped into the same problem if they are connected
+    through nonzero entries of A, which are found as the connected components
+    of the bipartite graph between rows and columns.
+
+    Args:
+            A: np.ndarray or scipy.sparse matrix of size (M, N)
+    Returns:
+            subproblems: list of (row_indexes, column_indexes, submatrix) for
+                    each subproblem, where submatrix is a full np.ndarray. Columns
+                    of A with no nonzero entries are not included in any
+                    subproblem.
+    """
+    n_rows, n_cols = A.shape
+    if sparse.issparse(A):
+        A_coo = sparse.coo_matrix(A)
+        nonzero_mask = A_coo.data != 0
+        A_nonzero_row_indexes = A_coo.row[nonzero_mask]
+        A_nonzero_column_indexes = A_coo.col[nonzero_mask]
+        A_nonzero_values = A_coo.data[nonzero_mask]
+    else:
+        A_nonzero_row_indexes, A_nonzero_column_indexes = A.nonzero()
+        A_nonzero_values = A[A_nonzero_row_indexes, A_nonzero_column_indexes]
+
+    # Rows are nodes 0..M-1 and columns are nodes M..M+N-1 of the graph
+    graph = sparse.coo_matrix(
+        (
+            np.ones(len(A_nonzero_row_indexes)),
+            (A_nonzero_row_indexes, A_nonzero_column_indexes + n_rows),
+        ),
+        shape=(n_rows + n_cols, n_rows + n_cols),
+    )
+    _, labels = connected_components(graph, directed=False)
+    row_labels = labels[:n_rows]
+    column_labels = labels[n_rows:]
+    entry_labels = row_labels[A_nonzero_row_indexes]
+
+    # Group rows, columns and nonzero entries by subproblem. Only components
+    # that include at least one nonzero entry are subproblems.
+    component_labels = np.unique(entry_labels)
+    row_order = np.argsort(row_labels, kind="stable")
+    column_order = np.argsort(column_labels, kind="stable")
+    entry_order = np.argsort(entry_labels, kind="stable")
+    row_bounds, column_bounds, entry_bounds = [
+        np.searchsorted(sorted_labels, [component_labels, component_labels + 1])
+        for sorted_labels in (
+            row_labels[row_order],
+            column_labels[column_order],
+            entry_labels[entry_order],
+        )
+    ]
+
+    # Position of each row and column within its subproblem
+    row_positions = np.empty(n_rows, dtype=int)
+    row_positions[row_order] = np.arange(n_rows) - np.searchsorted(
+        row_labels[row_order], row_labels[row_order]
+    )
+    column_positions = np.empty(n_cols, dtype=int)
+    column_positions[column_order] = np.arange(n_cols) - np.searchsorted(
+        column_labels[column_order], column_labels[column_order]
+    )
+
+    subproblems = []
+    for i in range(len(component_labels)):
+        row_indexes = row_order[row_bounds[0, i] : row_bounds[1, i]]
+        column_indexes = column_order[column_bounds[0, i] : column_bounds[1, i]]
+        entries = entry_order[entry_bounds[0, i] : entry_bounds[1, i]]
+        submatrix = np.zeros((len(row_indexes), len(column_indexes)))
+        submatrix[
+            row_positions[A_nonzero_row_indexes[entries]],
+            column_positions[A_nonzero_column_indexes[entries]],
+        ] = A_nonzero_values[entries]
+        subproblems.append((row_indexes, column_indexes, submatrix))
+
+    return subproblems
 
 
 def fast_nnls(A, b):
@@ -24,84 +126,17 @@ def fast_nnls(A, b):
             r: numpy.ndarray of size (M, ), the residual vector (Ax - b) of the NNLS
                     problem.
     """
-    # Check input types and dimensions
-    if A.ndim != 2:
-        raise TypeError(
-            "Input array A must be a two-dimensional numpy ndarray or sparse csr_matrix"
-        )
-    elif not isinstance(b, np.ndarray) or b.ndim != 1:
-        raise TypeError("Input array b must be a one-dimensional ndarray.")
-    elif A.shape[0] != len(b):
-        raise TypeError("Dimensions of input arrays A and b do not match.")
-
-    # Divide matrix A into smaller submatrices
-    A_nonzero_row_indexes, A_nonzero_column_indexes = A.nonzero()
-
-    visited_row_indexes = set()
-    visited_column_indexes = set()
-    submatrix_indexes = []
-
-    def column_DFS(index, all_row_indexes, all_column_indexes):
-        """
-        Recursive function to look for columns and rows in matrix A that should
-        be grouped into the same NNLS problem.
-        """
-        visited_column_indexes.add(index)
-        all_column_indexes.append(index)
-
-        for i in A_nonzero_row_indexes[A_nonzero_column_indexes == index]:
-            if i not in visited_row_indexes:
-                row_DFS(i, all_row_indexes, all_column_indexes)
-
-    def row_DFS(index, all_row_indexes, all_column_indexes):
-        """
-        Recursive function to look for columns and rows in matrix A that should
-        be grouped into the same NNLS problem.
-        """
-        visited_row_indexes.add(index)
-        all_row_indexes.append(index)
-
-        for i in A_nonzero_column_indexes[A_nonzero_row_indexes == index]:
-            if i not in visited_column_indexes:
-                column_DFS(i, all_row_indexes, all_column_indexes)
-
-    # Loop through each column of matrix A
-    for column_index in range(A.shape[1]):
-        # Search for columns and rows that can be grouped into a single NNLS
-        # problem as the given column
-        if column_index not in visited_column_indexes:
-            submatrix_row_indexes = []
-            submatrix_column_indexes = []
-            column_DFS(column_index, submatrix_row_indexes, submatrix_column_indexes)
-
-            if len(submatrix_row_indexes) > 0:
-                submatrix_indexes.append(
-                    (
-                        np.array(submatrix_row_indexes),
-                        np.array(submatrix_column_indexes),
-                    )
-                )
+    _check_inputs(A, b, 1)
 
     # Initialize x
     x = np.zeros(A.shape[1])
 
-    # Solve NNLS for each subproblem identified above
-    for row_indexes, column_indexes in submatrix_indexes:
+    # Solve NNLS for each independent subproblem of A
+    for row_indexes, column_indexes, submatrix in nnls_subproblems(A):
+        # A single nonzero entry a has the closed-form solution max(0, b/a)
         if len(row_indexes) == 1 and len(column_indexes) == 1:
-            x[column_indexes] = max(0, b[row_indexes])
+            x[column_indexes] = max(0, b[row_indexes[0]] / submatrix[0, 0])
         else:
-            # Build a full submatrix A for each subproblem
-            submatrix = np.zeros((len(row_indexes), len(column_indexes)))
-            mask = np.isin(A_nonzero_row_indexes, row_indexes)
-            for i, j in zip(
-                A_nonzero_row_indexes[mask], A_nonzero_column_indexes[mask]
-            ):
-                submatrix[
-                    np.where(row_indexes == i)[0][0],
-                    np.where(column_indexes == j)[0][0],
-                ] = A[i, j]
-
-            # Solve the subproblem
             x_subproblem, _ = nnls(submatrix, b[row_indexes])
             x[column_indexes] = x_subproblem
 
@@ -111,3 +146,168 @@ def fast_nnls(A, b):
     r = A.dot(x) - b
 
     return x, r
+
+
+def _solve_passive_sets(A, B, passive):
+    """
+    Solves the unconstrained least squares problem min ||Ax - b||_2 over the
+    variables in the passive set of each column b of B. Columns sharing the
+    same passive set are solved together with a single least squares solve
+    on the corresponding columns of A, which (unlike the normal equations) is
+    also accurate for rank-deficient A.
+    """
+    X = np.zeros((A.shape[1], B.shape[1]))
+    patterns, inverse = np.unique(passive.T, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    for pattern_index, pattern in enumerate(patterns):
+        if not pattern.any():
+            continue
+
+        columns = np.where(inverse == pattern_index)[0]
+        X[np.ix_(pattern, columns)] = np.linalg.lstsq(
+            A[:, pattern], B[:, columns], rcond=None
+        )[0]
+
+    return X
+
+
+def nnls_batch(A, B, max_iter=None, tol=None):
+    """
+    Solves the nonnegative least squares problem min ||Ax - b||_2 s.t. x >= 0
+    for every column b of B with the fast combinatorial active-set algorithm
+    (Van Benthem and Keenan, J. Chemometrics 2004). The gradients A^T A x -
+    A^T b are computed for all right-hand sides at once, and columns that
+    share the same passive set in an iteration are solved together. Columns
+    that have not converged after max_iter iterations (e.g. from cycling on
+    degenerate problems) are solved one at a time with scipy.optimize.nnls.
+
+    Args:
+            A: np.ndarray of size (M, N)
+            B: np.ndarray of size (M, K)
+            max_iter: maximum number of iterations of the batched solver
+                    (default 3 * N)
+            tol: tolerance on the gradient for optimality
+    Returns:
+            X: np.ndarray of size (N, K), the solution to each NNLS problem
+    """
+    A = np.asarray(A, dtype=np.float64)
+    B = np.asarray(B, dtype=np.float64)
+    AtA = A.T.dot(A)
+    AtB = A.T.dot(B)
+    n_vars, n_rhs = AtB.shape
+
+    if max_iter is None:
+        max_iter = 3 * n_vars
+    if tol is None:
+        tol = 10 * np.finfo(np.float64).eps * np.linalg.norm(AtA, 1) * max(A.shape)
+
+    # Start from the unconstrained solution
+    X = _solve_passive_sets(A, B, np.ones((n_vars, n_rhs), dtype=bool))
+    passive = X > 0
+    X[~passive] = 0
+    D = X.copy()
+    unsolved = np.where(~passive.all(axis=0))[0]
+
+    n_iter = 0
+    while unsolved.size > 0:
+        X[:, unsolved] = _solve_passive_sets(A, B[:, unsolved], passive[:, unsolved])
+
+        # Move variables out of the passive set until all solutions are feasible
+        infeasible = unsolved[(X[:, unsolved] < 0).any(axis=0)]
+        while infeasible.size > 0 and n_iter < max_iter:
+            n_iter += 1
+            X_infeasible = X[:, infeasible]
+            D_infeasible = D[:, infeasible]
+            negative = passive[:, infeasible] & (X_infeasible < 0)
+            alpha = np.full(X_infeasible.shape, np.inf)
+            alpha[negative] = D_infeasible[negative] / (
+                D_infeasible[negative] - X_infeasible[negative]
+            )
+            min_index = alpha.argmin(axis=0)
+            alpha_min = alpha[min_index, np.arange(infeasible.size)]
+            D[:, infeasible] = D_infeasible - alpha_min * (D_infeasible - X_infeasible)
+            D[min_index, infeasible] = 0
+            passive[min_index, infeasible] = False
+
+            X[:, infeasible] = _solve_passive_sets(
+                A, B[:, infeasible], passive[:, infeasible]
+            )
+            infeasible = infeasible[(X[:, infeasible] < 0).any(axis=0)]
+        if infeasible.size > 0:
+            break
+
+        # Check optimality with the gradient of the active variables
+        W = AtB[:, unsolved] - AtA.dot(X[:, unsolved])
+        W_active = np.where(passive[:, unsolved], -np.inf, W)
+        not_optimal = (W_active > tol).any(axis=0)
+        unsolved = unsolved[not_optimal]
+
+        # Add the active variable with the largest gradient to the passive set
+        if unsolved.size > 0:
+            if n_iter >= max_iter:
+                break
+            n_iter += 1
+            passive[W_active[:, not_optimal].argmax(axis=0), unsolved] = True
+            D[:, unsolved] = X[:, unsolved]
+
+    # Fall back to solving the columns that did not converge one at a time
+    for column in unsolved:
+        X[:, column], _ = nnls(A, B[:, column])
+
+    return X
+
+
+def _solve_nnls_subproblems(subproblems, n_columns, B):
+    """
+    Solves the independent NNLS subproblems of A for all columns of B.
+    """
+    X = np.zeros((n_columns, B.shape[1]))
+    for row_indexes, column_indexes, submatrix in subproblems:
+        if len(row_indexes) == 1 and len(column_indexes) == 1:
+            X[column_indexes, :] = np.fmax(0, B[row_indexes, :] / submatrix[0, 0])
+        else:
+            X[column_indexes, :] = nnls_batch(submatrix, B[row_indexes, :])
+
+    return X
+
+
+def fast_nnls_batch(A, B, cpus=1):
+    """
+    Batched version of fast_nnls that solves the nonnegative least squares
+    problem for every column of B. A is divided into independent subproblems
+    once, and each subproblem is solved for all right-hand sides at once with
+    nnls_batch. Columns of B can also be split across a pool of processes.
+
+    Args:
+            A: np.ndarray or scipy.sparse.csr.csr_matrix of size (M, N)
+            B: numpy.ndarray of size (M, K)
+            cpus: number of processes to split the columns of B across
+    Returns:
+            X: numpy.ndarray of size (N, K), the solutions to the NNLS problems.
+            R: numpy.ndarray of size (M, K), the residuals (AX - B) of the NNLS
+                    problems.
+    """
+    _check_inputs(A, B, 2)
+
+    subproblems = nnls_subproblems(A)
+    n_columns = A.shape[1]
+
+    cpus = min(parallelization.cpus(cpus), B.shape[1])
+    if cpus > 1:
+        pool = parallelization.pool(cpus)
+        results = [
+            pool.apply_async(_solve_nnls_subproblems, (subproblems, n_columns, B_chunk))
+            for B_chunk in np.array_split(B, cpus, axis=1)
+        ]
+        pool.close()
+        pool.join()
+        X = np.hstack([result.get() for result in results])
+    else:
+        X = _solve_nnls_subproblems(subproblems, n_columns, B)
+
+    assert np.all(X >= 0)
+
+    # Calculate residuals
+    R = A.dot(X) - B
+
+    return X, R
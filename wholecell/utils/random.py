@@ -57,6 +57,42 @@ def stochasticRound(randomState, value):
         return valueRavel
 
 
+def choose_within_groups(randomState, group_indexes, n_to_choose):
+    """
+    Randomly chooses elements without replacement separately within each
+    group, as one call of randomState.choice(..., replace=False) per group
+    would, using a single random permutation for all groups.
+
+    Args:
+            randomState (RandomState): for generating random numbers.
+            group_indexes (array[int]): non-negative group index of each
+                    element.
+            n_to_choose (array[int]): number of elements to choose from each
+                    group, indexed by group index.
+
+    Returns:
+            array[int]: sorted indexes of the chosen elements.
+    """
+    group_indexes = np.asarray(group_indexes, dtype=np.int64)
+    n_to_choose = np.asarray(n_to_choose, dtype=np.int64)
+
+    # Only elements of groups that are sampled from need to be shuffled
+    candidates = np.flatnonzero(n_to_choose[group_indexes] > 0)
+    shuffled = candidates[randomState.permutation(candidates.size)]
+
+    # Group the shuffled elements and take the first n_to_choose of each group
+    shuffled = shuffled[np.argsort(group_indexes[shuffled], kind="stable")]
+    groups = group_indexes[shuffled]
+    group_sizes = np.bincount(groups, minlength=n_to_choose.size)
+    if np.any(group_sizes < n_to_choose):
+        raise ValueError("Cannot choose more elements than a group contains.")
+    rank_in_group = (
+        np.arange(shuffled.size) - (np.cumsum(group_sizes) - group_sizes)[groups]
+    )
+
+    return np.sort(shuffled[rank_in_group < n_to_choose[groups]])
+
+
 def make_elongation_rates_flat(
     size, base, amplified, ceiling, variable_elongation=False
 ):
@@ -0,0 +1,195 @@
+"""
+Hybrid tau-leaping / exact stochastic simulation of mass action systems.
+
+Reactions fire with the same propensities as ``stochastic_arrow``
+(``rate * prod(choose(count, stoichiometry))`` over reactants) but, when all
+reactants are abundant, many events are fired at once by sampling Poisson
+numbers of occurrences over a leap whose length is chosen with the error
+control of Cao, Gillespie and Petzold (J. Chem. Phys. 124, 044109, 2006).
+Reactions close to exhausting a reactant ("critical" reactions) fire at most
+once per leap, and when leaping would not take more than a few exact steps,
+the system falls back to the exact Gillespie algorithm.
+"""
+
+import numpy as np
+from scipy.special import binom
+from stochastic_arrow import StochasticSystem
+
+
+class TauLeapingSystem(object):
+    """
+    Drop-in replacement for :py:class:`stochastic_arrow.StochasticSystem`
+    that uses tau-leaping for high-count species.
+
+    Args:
+            stoichiometry: np.ndarray of size (reactions, molecules)
+            random_seed: seed for the random number generators
+            epsilon: bound on the relative change in propensities per leap
+            n_critical: reactions that can fire fewer than this many more
+                    times before exhausting a reactant are treated as critical
+            exact_threshold: number of expected exact steps below which a leap
+                    is replaced by exact simulation
+            exact_steps: approximate number of events to simulate exactly
+                    before trying to leap again
+    """
+
+    def __init__(
+        self,
+        stoichiometry,
+        random_seed=0,
+        epsilon=0.03,
+        n_critical=10,
+        exact_threshold=10,
+        exact_steps=100,
+    ):
+        self.stoichiometry = np.asarray(stoichiometry, dtype=np.int64)
+        self.epsilon = epsilon
+        self.n_critical = n_critical
+        self.exact_threshold = exact_threshold
+        self.exact_steps = exact_steps
+
+        self.random_state = np.random.RandomState(random_seed)
+        self.exact_system = StochasticSystem(
+            self.stoichiometry, random_seed=self.random_state.randint(2**31)
+        )
+
+        # Sparse (reaction, molecule, stoichiometry) entries of all reactants
+        self.reactant_reactions, self.reactant_molecules = np.where(
+            self.stoichiometry < 0
+        )
+        self.reactant_stoichiometry = -self.stoichiometry[
+            self.reactant_reactions, self.reactant_molecules
+        ]
+
+        # Highest order of any reaction consuming each molecule, used to bound
+        # the relative change in propensities (g_i in Cao et al.)
+        order = np.zeros(self.stoichiometry.shape[0], dtype=np.int64)
+        np.add.at(order, self.reactant_reactions, self.reactant_stoichiometry)
+        self.highest_order = np.zeros(self.stoichiometry.shape[1], dtype=np.int64)
+        np.maximum.at(
+            self.highest_order,
+            self.reactant_molecules,
+            order[self.reactant_reactions],
+        )
+        self.is_reactant = self.highest_order > 0
+
+    def propensities(self, state, rates):
+        """
+        Calculates the propensity of each reaction for the given counts.
+        """
+        propensities = np.array(rates, dtype=np.float64)
+        np.multiply.at(
+            propensities,
+            self.reactant_reactions,
+            binom(state[self.reactant_molecules], self.reactant_stoichiometry),
+        )
+        return propensities
+
+    def _max_firings(self, state):
+        """
+        Number of times each reaction can fire before exhausting a reactant.
+        """
+        max_firings = np.full(self.stoichiometry.shape[0], np.inf)
+        np.minimum.at(
+            max_firings,
+            self.reactant_reactions,
+            state[self.reactant_molecules] // self.reactant_stoichiometry,
+        )
+        return max_firings
+
+    def _leap_size(self, state, propensities, noncritical):
+        """
+        Largest leap that keeps the expected relative change in every
+        propensity below epsilon (Cao et al. 2006, eq. 33).
+        """
+        a = np.where(noncritical, propensities, 0)
+        stoich = self.stoichiometry[:, self.is_reactant]
+        mean = a.dot(stoich)
+        variance = a.dot(stoich**2)
+        bound = np.fmax(
+            self.epsilon
+            * state[self.is_reactant]
+            / self.highest_order[self.is_reactant],
+            1,
+        )
+        with np.errstate(divide="ignore"):
+            tau = np.fmin(bound / np.abs(mean), bound**2 / variance)
+        return tau.min(initial=np.inf)
+
+    def evolve(self, duration, state, rates):
+        """
+        Simulates the system for the given duration.
+
+        Args:
+                duration: length of time to simulate
+                state: np.ndarray of initial counts of each molecule
+                rates: np.ndarray of rate constants of each reaction
+
+        Returns:
+                dict with the same keys as ``StochasticSystem.evolve``:
+                ``steps`` (number of events), ``time`` (time of the last leap
+                or event), ``events`` (empty, since individual events are not
+                tracked when leaping), ``occurrences`` (number of times each
+                reaction fired), and ``outcome`` (final counts)
+        """
+        state = np.array(state, dtype=np.int64)
+        rates = np.asarray(rates, dtype=np.float64)
+        occurrences = np.zeros(len(rates), dtype=np.int64)
+        time = 0.0
+
+        while time < duration:
+            propensities = self.propensities(state, rates)
+            total = propensities.sum()
+            if total == 0:
+                break
+
+            critical = (self._max_firings(state) < self.n_critical) & (propensities > 0)
+            tau_noncritical = self._leap_size(state, propensities, ~critical)
+
+            # Leaping would not save much over exact simulation
+            if tau_noncritical < self.exact_threshold / total:
+                exact_duration = min(self.exact_steps / total, duration - time)
+                result = self.exact_system.evolve(exact_duration, state, rates)
+                occurrences += result["occurrences"].astype(np.int64)
+                state = result["outcome"].astype(np.int64)
+                time += exact_duration
+                continue
+
+            critical_total = propensities[critical].sum()
+            while True:
+                tau_critical = (
+                    self.random_state.exponential(1 / critical_total)
+                    if critical_total > 0
+                    else np.inf
+                )
+                tau = min(tau_noncritical, tau_critical, duration - time)
+
+                firings = np.zeros(len(rates), dtype=np.int64)
+                firings[~critical] = self.random_state.poisson(
+                    propensities[~critical] * tau
+                )
+                if tau_critical <= tau:
+                    probabilities = np.where(critical, propensities, 0)
+                    firings[
+                        self.random_state.choice(
+                            len(rates), p=probabilities / critical_total
+                        )
+                    ] += 1
+
+                new_state = state + firings.dot(self.stoichiometry)
+                if np.all(new_state >= 0):
+                    break
+                # Leap overshot, try again with a smaller one
+                tau_noncritical /= 2
+
+            occurrences += firings
+            state = new_state
+            time += tau
+
+        return {
+            "steps": int(occurrences.sum()),
+            "time": min(time, duration),
+            "events": np.array([], dtype=np.int64),
+            "occurrences": occurrences,
+            "outcome": state,
+        }
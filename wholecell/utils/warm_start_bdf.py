@@ -0,0 +1,198 @@
+"""
+Persistent BDF integrator for ODE systems that are solved repeatedly from
+slightly perturbed initial conditions, e.g. once per simulation timestep.
+
+Rather than starting :py:class:`scipy.integrate.BDF` from scratch every time
+(which selects a tiny first step and spends most of its steps climbing back up
+through the orders and step sizes), :py:class:`WarmStartBDF` can continue the
+solver of the previous call: the new initial state replaces the current value
+of the interpolating polynomial while the step size, order, backward
+differences, Jacobian and LU factorization are kept. When the state changed
+between calls only by rounding to molecule counts this takes a handful of
+steps, but after larger perturbations the old history can be worse than a
+fresh start, so the integrator keeps track of the cost (function evaluations)
+of both strategies and uses whichever was cheaper most recently.
+
+Continuing relies on private attributes of :py:class:`scipy.integrate.BDF`.
+If a SciPy version does not have them, every integration starts fresh.
+"""
+
+from typing import Callable, NamedTuple, Optional
+import warnings
+
+import numpy as np
+from scipy.integrate import BDF
+
+# Private attributes of the SciPy BDF solver that are read or replaced to
+# continue a previous integration
+BDF_STATE_ATTRIBUTES = ("D", "h_abs", "order", "J", "LU", "n_equal_steps", "t_old")
+
+
+def supports_warm_start(solver: BDF) -> bool:
+    """
+    Returns whether the solver has the private state needed to continue it
+    from a new initial state. The backward differences D must be an array
+    with one row per difference (the first row is the current state).
+    """
+    if not all(hasattr(solver, attr) for attr in BDF_STATE_ATTRIBUTES):
+        return False
+    D = solver.D
+    return isinstance(D, np.ndarray) and D.ndim == 2 and D.shape[1] == solver.n
+
+
+class BDFState(NamedTuple):
+    """Snapshot of the solver state, see :py:meth:`WarmStartBDF.save`."""
+
+    solver: Optional[BDF]
+    y: Optional[np.ndarray]
+    D: Optional[np.ndarray]
+    h_abs: float
+    order: int
+    J: Optional[np.ndarray]
+    LU: Optional[tuple]
+    continue_cost: float
+    restart_cost: float
+
+
+class WarmStartBDF(object):
+    """
+    Args:
+            fun: right-hand side function(t, y) of the ODE system
+            jac: Jacobian function(t, y) of the ODE system
+            rtol: relative tolerance (as for :py:func:`scipy.integrate.solve_ivp`)
+            atol: absolute tolerance (as for :py:func:`scipy.integrate.solve_ivp`)
+            decay: factor applied to the last observed cost of the strategy
+                    that was not used in a call, so that it is eventually tried
+                    again after the system changes
+    """
+
+    def __init__(
+        self,
+        fun: Callable,
+        jac: Callable,
+        rtol: float = 1e-3,
+        atol: float = 1e-8,
+        decay: float = 0.9,
+    ):
+        self.fun = fun
+        self.jac = jac
+        self.rtol = rtol
+        self.atol = atol
+        self.decay = decay
+
+        self._solver = None
+        self._continue_cost = 0.0
+        self._restart_cost = np.inf
+        self._warm_start = True
+
+    def save(self) -> BDFState:
+        """
+        Returns a snapshot of the solver that can be passed to
+        :py:meth:`restore` to discard any integrations done in between.
+        """
+        solver = self._solver
+        if solver is None or not self._warm_start:
+            return BDFState(None, None, None, 0.0, 0, None, None, 0.0, np.inf)
+        return BDFState(
+            solver,
+            solver.y,
+            solver.D.copy(),
+            solver.h_abs,
+            solver.order,
+            solver.J,
+            solver.LU,
+            self._continue_cost,
+            self._restart_cost,
+        )
+
+    def restore(self, state: BDFState):
+        """Rolls the solver back to a snapshot returned by :py:meth:`save`."""
+        self._solver = state.solver
+        self._continue_cost = state.continue_cost
+        self._restart_cost = state.restart_cost
+        if state.solver is not None and self._warm_start:
+            state.solver.y = state.y
+            state.solver.D[:] = state.D
+            state.solver.h_abs = state.h_abs
+            state.solver.order = state.order
+            state.solver.J = state.J
+            state.solver.LU = state.LU
+
+    def reset(self):
+        """Discards the solver so that the next integration starts fresh."""
+        self._solver = None
+        self._continue_cost = 0.0
+        self._restart_cost = np.inf
+
+    def _restart(self, y0, duration):
+        self._solver = BDF(
+            self.fun,
+            0,
+            y0,
+            duration,
+            rtol=self.rtol,
+            atol=self.atol,
+            jac=self.jac,
+        )
+        if self._warm_start and not supports_warm_start(self._solver):
+            warnings.warn(
+                "scipy.integrate.BDF does not have the private attributes"
+                f" {BDF_STATE_ATTRIBUTES} needed to continue integrations, so"
+                " every integration will start fresh."
+            )
+            self._warm_start = False
+
+    def _continue(self, y0, duration):
+        # The first backward difference is the current value of the
+        # interpolating polynomial. Steps longer than the new interval are
+        # shortened by the solver itself.
+        solver = self._solver
+        solver.t = 0.0
+        solver.t_old = None
+        solver.t_bound = float(duration)
+        solver.status = "running"
+        solver.y = np.array(y0, dtype=np.float64)
+        solver.D[0] = solver.y
+        solver.n_equal_steps = 0
+
+    def _run(self):
+        """Steps to the end of the interval. Returns the number of function
+        evaluations and the error message if the solver failed."""
+        solver = self._solver
+        nfev = solver.nfev
+        message = None
+        while solver.status == "running":
+            message = solver.step()
+        return solver.nfev - nfev, message if solver.status == "failed" else None
+
+    def integrate(self, y0: np.ndarray, duration: float) -> np.ndarray:
+        """
+        Integrates the system from y0 over [0, duration].
+
+        Returns:
+                the solution at t = duration
+
+        Raises:
+                RuntimeError: if the solver fails (e.g. the step size becomes
+                        too small) even when started fresh
+        """
+        if (
+            self._warm_start
+            and self._solver is not None
+            and self._continue_cost <= self._restart_cost
+        ):
+            self._continue(y0, duration)
+            cost, message = self._run()
+            self._continue_cost = cost
+            if message is None:
+                self._restart_cost *= self.decay
+                return self._solver.y.copy()
+
+        self._restart(y0, duration)
+        cost, message = self._run()
+        if message is not None:
+            self.reset()
+            raise RuntimeError(message)
+        self._restart_cost = cost
+        self._continue_cost *= self.decay
+        return self._solver.y.copy()